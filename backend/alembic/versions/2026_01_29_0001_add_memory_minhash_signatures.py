@@ -0,0 +1,91 @@
+"""Add memory_minhash_signatures near-duplicate index
+
+Revision ID: 20260129_mem_minhash
+Revises: 20260128_mem_activation
+Create Date: 2026-01-29
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "20260129_mem_minhash"
+down_revision: Union[str, None] = "20260128_mem_activation"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "memory_minhash_signatures",
+        sa.Column(
+            "memory_id",
+            postgresql.UUID(as_uuid=False),
+            sa.ForeignKey("memory_metadata.id", ondelete="CASCADE"),
+            primary_key=True,
+            nullable=False,
+        ),
+        sa.Column(
+            "organization_id",
+            postgresql.UUID(as_uuid=False),
+            sa.ForeignKey("organizations.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("signature", sa.LargeBinary(), nullable=False),
+        sa.Column("num_perm", sa.Integer(), nullable=False),
+        sa.Column("band_keys", postgresql.ARRAY(sa.BigInteger()), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.func.now(),
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.func.now(),
+        ),
+    )
+
+    op.create_index(
+        "ix_memory_minhash_signatures_organization_id",
+        "memory_minhash_signatures",
+        ["organization_id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_memory_minhash_org_created_at",
+        "memory_minhash_signatures",
+        ["organization_id", "created_at"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_memory_minhash_band_keys",
+        "memory_minhash_signatures",
+        ["band_keys"],
+        unique=False,
+        postgresql_using="gin",
+    )
+
+    op.execute("ALTER TABLE memory_minhash_signatures ENABLE ROW LEVEL SECURITY;")
+    op.execute("ALTER TABLE memory_minhash_signatures FORCE ROW LEVEL SECURITY;")
+    op.execute("""
+        CREATE POLICY org_isolation_memory_minhash ON memory_minhash_signatures
+        USING (organization_id = nullif(current_setting('app.current_org_id', true), '')::uuid)
+        WITH CHECK (organization_id = nullif(current_setting('app.current_org_id', true), '')::uuid);
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP POLICY IF EXISTS org_isolation_memory_minhash ON memory_minhash_signatures;")
+    op.execute("ALTER TABLE memory_minhash_signatures DISABLE ROW LEVEL SECURITY;")
+
+    op.drop_index("ix_memory_minhash_band_keys", table_name="memory_minhash_signatures")
+    op.drop_index("ix_memory_minhash_org_created_at", table_name="memory_minhash_signatures")
+    op.drop_index("ix_memory_minhash_signatures_organization_id", table_name="memory_minhash_signatures")
+    op.drop_table("memory_minhash_signatures")
@@ -0,0 +1,101 @@
+"""Add knowledge synthesis aggregate tables
+
+Revision ID: 20260130_knowledge_aggs
+Revises: 20260129_mem_minhash
+Create Date: 2026-01-30
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "20260130_knowledge_aggs"
+down_revision: Union[str, None] = "20260129_mem_minhash"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+TABLES = ("knowledge_tag_stats", "knowledge_tag_pairs", "knowledge_tag_weeks")
+
+
+def _org_column() -> sa.Column:
+    return sa.Column(
+        "organization_id",
+        postgresql.UUID(as_uuid=False),
+        sa.ForeignKey("organizations.id", ondelete="CASCADE"),
+        primary_key=True,
+        nullable=False,
+    )
+
+
+def _timestamps() -> list:
+    return [
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+    ]
+
+
+def upgrade() -> None:
+    op.create_table(
+        "knowledge_tag_stats",
+        _org_column(),
+        sa.Column("tag", sa.String(), primary_key=True, nullable=False),
+        sa.Column("memory_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("relationship_count", sa.Integer(), nullable=False, server_default="0"),
+        *_timestamps(),
+    )
+    op.create_index(
+        "ix_knowledge_tag_stats_org_count",
+        "knowledge_tag_stats",
+        ["organization_id", "memory_count"],
+        unique=False,
+    )
+
+    op.create_table(
+        "knowledge_tag_pairs",
+        _org_column(),
+        sa.Column("tag_a", sa.String(), primary_key=True, nullable=False),
+        sa.Column("tag_b", sa.String(), primary_key=True, nullable=False),
+        sa.Column("memory_count", sa.Integer(), nullable=False, server_default="0"),
+        *_timestamps(),
+    )
+
+    op.create_table(
+        "knowledge_tag_weeks",
+        _org_column(),
+        sa.Column("tag", sa.String(), primary_key=True, nullable=False),
+        sa.Column("week_start", sa.Date(), primary_key=True, nullable=False),
+        sa.Column("memory_count", sa.Integer(), nullable=False, server_default="0"),
+        *_timestamps(),
+    )
+    op.create_index(
+        "ix_knowledge_tag_weeks_org_week",
+        "knowledge_tag_weeks",
+        ["organization_id", "week_start"],
+        unique=False,
+    )
+
+    for table in TABLES:
+        op.execute(f"ALTER TABLE {table} ENABLE ROW LEVEL SECURITY;")
+        op.execute(f"ALTER TABLE {table} FORCE ROW LEVEL SECURITY;")
+        op.execute(f"""
+            CREATE POLICY org_isolation_{table} ON {table}
+            USING (organization_id = nullif(current_setting('app.current_org_id', true), '')::uuid)
+            WITH CHECK (organization_id = nullif(current_setting('app.current_org_id', true), '')::uuid);
+        """)
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.execute(f"DROP POLICY IF EXISTS org_isolation_{table} ON {table};")
+        op.execute(f"ALTER TABLE {table} DISABLE ROW LEVEL SECURITY;")
+
+    op.drop_index("ix_knowledge_tag_weeks_org_week", table_name="knowledge_tag_weeks")
+    op.drop_table("knowledge_tag_weeks")
+    op.drop_table("knowledge_tag_pairs")
+    op.drop_index("ix_knowledge_tag_stats_org_count", table_name="knowledge_tag_stats")
+    op.drop_table("knowledge_tag_stats")
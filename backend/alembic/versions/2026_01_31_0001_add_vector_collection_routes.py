@@ -0,0 +1,53 @@
+"""Add per-tenant Qdrant collection routes
+
+Revision ID: 20260131_vector_routes
+Revises: 20260130_knowledge_aggs
+Create Date: 2026-01-31
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "20260131_vector_routes"
+down_revision: Union[str, None] = "20260130_knowledge_aggs"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Platform-level routing table: read by the Qdrant client before any
+    # tenant context is set, so no RLS policy.
+    op.create_table(
+        "vector_collection_routes",
+        sa.Column(
+            "organization_id",
+            postgresql.UUID(as_uuid=False),
+            sa.ForeignKey("organizations.id", ondelete="CASCADE"),
+            primary_key=True,
+            nullable=False,
+        ),
+        sa.Column("collection_name", sa.String(255), nullable=False),
+        sa.Column("secondary_collection", sa.String(255), nullable=True),
+        sa.Column("state", sa.String(20), nullable=False, server_default="active"),
+        sa.Column("state_changed_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.Column("hnsw_m", sa.Integer(), nullable=True),
+        sa.Column("hnsw_ef_construct", sa.Integer(), nullable=True),
+        sa.Column("search_hnsw_ef", sa.Integer(), nullable=True),
+        sa.Column("quantization", sa.String(20), nullable=True),
+        sa.Column("points_copied", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.CheckConstraint(
+            "state IN ('copying', 'draining', 'active')",
+            name="ck_vector_collection_routes_state",
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("vector_collection_routes")
@@ -0,0 +1,58 @@
+"""Add keyset pagination indexes
+
+Revision ID: 20260201_keyset_indexes
+Revises: 20260131_vector_routes
+Create Date: 2026-02-01
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "20260201_keyset_indexes"
+down_revision: Union[str, None] = "20260131_vector_routes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (index, table, columns, partial predicate)
+_INDEXES = (
+    ("ix_memory_org_created_id", "memory_metadata", ["organization_id", "created_at", "id"], "is_active"),
+    ("ix_audit_org_time_id", "audit_events", ["organization_id", "timestamp", "id"], None),
+    ("ix_goals_org_updated_id", "goals", ["organization_id", "updated_at", "id"], None),
+    ("ix_memory_snapshots_org_created_id", "memory_snapshots", ["organization_id", "created_at", "id"], None),
+    ("idx_snapshot_org_created_id", "snapshots", ["organization_id", "created_at", "id"], None),
+)
+
+
+def upgrade() -> None:
+    # Built concurrently: memory_metadata and audit_events are large and
+    # serve live traffic.
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in _INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                postgresql_concurrently=True,
+                postgresql_where=sa.text(where) if where else None,
+                if_not_exists=True,
+            )
+        # Superseded by ix_audit_org_time_id (same leading columns).
+        op.drop_index("ix_audit_org_time", table_name="audit_events", postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_audit_org_time",
+            "audit_events",
+            ["organization_id", "timestamp"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        for name, table, _columns, _where in reversed(_INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
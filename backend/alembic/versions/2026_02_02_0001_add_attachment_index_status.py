@@ -0,0 +1,45 @@
+"""Add attachment index status and chunk count
+
+Revision ID: 20260202_attachment_chunks
+Revises: 20260201_keyset_indexes
+Create Date: 2026-02-02
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "20260202_attachment_chunks"
+down_revision: Union[str, None] = "20260201_keyset_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "memory_attachments",
+        sa.Column("index_status", sa.String(20), nullable=False, server_default="pending"),
+    )
+    op.add_column("memory_attachments", sa.Column("chunk_count", sa.Integer(), nullable=True))
+
+    # Attachments indexed by the inline single-vector path.
+    op.execute(
+        """
+        UPDATE memory_attachments
+        SET index_status = CASE
+            WHEN indexed_at IS NOT NULL THEN 'indexed'
+            WHEN index_error = 'no_indexable_text' THEN 'empty'
+            WHEN index_error IS NOT NULL THEN 'failed'
+            ELSE 'pending'
+        END,
+        chunk_count = CASE WHEN indexed_at IS NOT NULL THEN 1 END
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("memory_attachments", "chunk_count")
+    op.drop_column("memory_attachments", "index_status")
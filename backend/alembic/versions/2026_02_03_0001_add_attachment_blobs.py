@@ -0,0 +1,72 @@
+"""Add content-addressed attachment_blobs
+
+Revision ID: 20260203_attachment_blobs
+Revises: 20260202_attachment_chunks
+Create Date: 2026-02-03
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "20260203_attachment_blobs"
+down_revision: Union[str, None] = "20260202_attachment_chunks"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "attachment_blobs",
+        sa.Column(
+            "organization_id",
+            postgresql.UUID(as_uuid=False),
+            sa.ForeignKey("organizations.id", ondelete="CASCADE"),
+            primary_key=True,
+            nullable=False,
+        ),
+        sa.Column("sha256", sa.String(64), primary_key=True, nullable=False),
+        sa.Column("size_bytes", sa.BigInteger(), nullable=False),
+        sa.Column("ref_count", sa.Integer(), nullable=False, server_default="1"),
+        sa.Column("storage_path", sa.String(1024), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.func.now(),
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.func.now(),
+        ),
+    )
+
+    # Digest lookups for the per-digest indexing cache.
+    op.create_index(
+        "ix_memory_attachments_org_sha256",
+        "memory_attachments",
+        ["organization_id", "sha256"],
+        unique=False,
+    )
+
+    op.execute("ALTER TABLE attachment_blobs ENABLE ROW LEVEL SECURITY;")
+    op.execute("ALTER TABLE attachment_blobs FORCE ROW LEVEL SECURITY;")
+    op.execute("""
+        CREATE POLICY org_isolation_attachment_blobs ON attachment_blobs
+        USING (organization_id = nullif(current_setting('app.current_org_id', true), '')::uuid)
+        WITH CHECK (organization_id = nullif(current_setting('app.current_org_id', true), '')::uuid);
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP POLICY IF EXISTS org_isolation_attachment_blobs ON attachment_blobs;")
+    op.execute("ALTER TABLE attachment_blobs DISABLE ROW LEVEL SECURITY;")
+
+    op.drop_index("ix_memory_attachments_org_sha256", table_name="memory_attachments")
+    op.drop_table("attachment_blobs")
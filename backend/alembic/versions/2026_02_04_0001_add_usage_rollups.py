@@ -0,0 +1,65 @@
+"""Add usage_rollups (pre-aggregated request latency and token usage)
+
+Revision ID: 20260204_usage_rollups
+Revises: 20260203_attachment_blobs
+Create Date: 2026-02-04
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "20260204_usage_rollups"
+down_revision: Union[str, None] = "20260203_attachment_blobs"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "usage_rollups",
+        sa.Column(
+            "organization_id",
+            postgresql.UUID(as_uuid=False),
+            sa.ForeignKey("organizations.id", ondelete="CASCADE"),
+            primary_key=True,
+            nullable=False,
+        ),
+        sa.Column("granularity", sa.String(8), primary_key=True, nullable=False),
+        sa.Column("bucket_start", sa.DateTime(timezone=True), primary_key=True, nullable=False),
+        sa.Column("metric", sa.String(16), primary_key=True, nullable=False),
+        sa.Column("dimension", sa.String(255), primary_key=True, nullable=False),
+        sa.Column("sub_dimension", sa.String(64), primary_key=True, nullable=False, server_default=""),
+        sa.Column("count", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("error_count", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("value_sum", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("value_max", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("sketch", postgresql.ARRAY(sa.Integer()), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+    )
+    op.create_index(
+        "ix_usage_rollups_org_metric_bucket",
+        "usage_rollups",
+        ["organization_id", "metric", "granularity", "bucket_start"],
+        unique=False,
+    )
+
+    op.execute("ALTER TABLE usage_rollups ENABLE ROW LEVEL SECURITY;")
+    op.execute("ALTER TABLE usage_rollups FORCE ROW LEVEL SECURITY;")
+    op.execute("""
+        CREATE POLICY org_isolation_usage_rollups ON usage_rollups
+        USING (organization_id = nullif(current_setting('app.current_org_id', true), '')::uuid)
+        WITH CHECK (organization_id = nullif(current_setting('app.current_org_id', true), '')::uuid);
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP POLICY IF EXISTS org_isolation_usage_rollups ON usage_rollups;")
+    op.execute("ALTER TABLE usage_rollups DISABLE ROW LEVEL SECURITY;")
+    op.drop_index("ix_usage_rollups_org_metric_bucket", table_name="usage_rollups")
+    op.drop_table("usage_rollups")
@@ -0,0 +1,32 @@
+"""Drop the all-memories rows from knowledge_tag_weeks
+
+Weekly totals are now counted from memory_metadata at read time, so the
+per-org empty-tag histogram rows are no longer maintained.
+
+Revision ID: 20260205_drop_all_tags_weeks
+Revises: 20260204_usage_rollups
+Create Date: 2026-02-05
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "20260205_drop_all_tags_weeks"
+down_revision: Union[str, None] = "20260204_usage_rollups"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The org-isolation policy would hide every row from the migration role.
+    op.execute("ALTER TABLE knowledge_tag_weeks NO FORCE ROW LEVEL SECURITY;")
+    op.execute("DELETE FROM knowledge_tag_weeks WHERE tag = ''")
+    op.execute("ALTER TABLE knowledge_tag_weeks FORCE ROW LEVEL SECURITY;")
+
+
+def downgrade() -> None:
+    # The rows are rebuilt per org by SynthesisAggregates.refresh().
+    pass
@@ -65,20 +65,25 @@ class ClassificationAgent(BaseAgent):
         if strategy == "heuristic" or not content:
             outputs = self._heuristic(content=content, existing_classification=existing_classification)
         else:
-            prompt = (
-                "You are a classification engine for an enterprise memory system. Output JSON only.\n\n"
-                "Classify the memory. Consider sensitivity and classification. Do not hallucinate.\n\n"
-                f"CONTENT:\n{content}\n\n"
-                "Return JSON with keys: memory_type_suggestion, importance_score, is_sensitive, classification, domain_signals, confidence, rationale"
-            )
-            client = create_ollama_client(
-                base_url=str(getattr(settings, "OLLAMA_BASE_URL", "http://localhost:11434")),
-                model=str(getattr(settings, "OLLAMA_MODEL", "llama3.1:8b")),
-                timeout_seconds=float(getattr(settings, "OLLAMA_TIMEOUT_SECONDS", 5.0)),
-                max_concurrency=int(getattr(settings, "OLLAMA_MAX_CONCURRENCY", 2)),
-                use_circuit_breaker=True,
-            )
-            resp = await client.complete_json(prompt=prompt, schema_hint={}, tool_event_sink=context.get("tool_event_sink"))
+            combined = context.get("combined_enrichment")
+            if isinstance(combined, dict):
+                # Section of the combined multi-task prompt, prefetched by AgentRunner.
+                resp = combined.get("classification")
+            else:
+                prompt = (
+                    "You are a classification engine for an enterprise memory system. Output JSON only.\n\n"
+                    "Classify the memory. Consider sensitivity and classification. Do not hallucinate.\n\n"
+                    f"CONTENT:\n{content}\n\n"
+                    "Return JSON with keys: memory_type_suggestion, importance_score, is_sensitive, classification, domain_signals, confidence, rationale"
+                )
+                client = create_ollama_client(
+                    base_url=str(getattr(settings, "OLLAMA_BASE_URL", "http://localhost:11434")),
+                    model=str(getattr(settings, "OLLAMA_MODEL", "llama3.1:8b")),
+                    timeout_seconds=float(getattr(settings, "OLLAMA_TIMEOUT_SECONDS", 5.0)),
+                    max_concurrency=int(getattr(settings, "OLLAMA_MAX_CONCURRENCY", 2)),
+                    use_circuit_breaker=True,
+                )
+                resp = await client.complete_json(prompt=prompt, schema_hint={}, tool_event_sink=context.get("tool_event_sink"))
             # fail-closed: if ollama didn't return expected fields, fall back
             if isinstance(resp, dict) and resp.get("classification"):
                 resp["classification"] = max_classification(existing_classification, resp.get("classification"))
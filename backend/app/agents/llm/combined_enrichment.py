@@ -0,0 +1,180 @@
+"""Combined (multi-task, multi-memory) enrichment prompts.
+
+The four enrichment agents (classification, metadata, topics, patterns) each
+used to make their own LLM call per memory. In combined mode one prompt asks
+for all four sections at once, under a single schema, and a micro-batcher packs
+up to AGENT_COMBINED_BATCH_SIZE memories into each request. Agents then read
+their section from the prefetched result; a missing or invalid section falls
+back to that agent's heuristic, never to a separate LLM call.
+
+Set AGENT_COMBINED_BATCH_SIZE=1 for models that do not handle several memories
+per prompt well (one combined call per memory).
+"""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from typing import Any
+
+from app.agents.llm.base import LLMClient
+from app.agents.llm.ollama_breaker import create_ollama_client
+from app.agents.llm.tool_events import ToolEventSink
+from app.core.config import settings
+
+
+# Agent name -> section key (matches AgentRunner._load_prior_enrichment keys).
+ENRICHMENT_SECTIONS: dict[str, str] = {
+    "ClassificationAgent": "classification",
+    "MetadataExtractionAgent": "metadata",
+    "TopicModelingAgent": "topics",
+    "PatternDetectionAgent": "patterns",
+}
+
+_SECTION_KEYS = {
+    "classification": (
+        "memory_type_suggestion, importance_score, is_sensitive, classification, "
+        "domain_signals, confidence, rationale"
+    ),
+    "metadata": "tags (string[]), entities (object), summary (string), confidence (0..1), rationale",
+    "topics": "topics (string[]), primary_topic (string), confidence (0..1), rationale",
+    "patterns": "patterns (array of {pattern,type,confidence,evidence}), confidence (0..1), rationale",
+}
+
+
+@dataclass(frozen=True)
+class EnrichmentItem:
+    key: str
+    content: str
+    existing_classification: str | None = None
+
+
+def combined_enrichment_enabled() -> bool:
+    strategy = str(getattr(settings, "AGENT_STRATEGY", "llm") or "llm").strip().lower()
+    return strategy == "llm" and bool(getattr(settings, "AGENT_COMBINED_ENRICHMENT", False))
+
+
+def build_combined_prompt(items: list[EnrichmentItem]) -> str:
+    tasks = "\n".join(f"- {name}: {keys}" for name, keys in _SECTION_KEYS.items())
+    memories = "\n\n".join(
+        f"MEMORY id={item.key} existing_classification={item.existing_classification or 'internal'}\n"
+        f"CONTENT:\n{item.content}"
+        for item in items
+    )
+    return (
+        "You are an enrichment engine for an enterprise memory system. Output JSON only.\n\n"
+        "For each memory, perform all of these tasks in one pass. Consider sensitivity; "
+        "be conservative and do not hallucinate; if unknown, omit.\n"
+        f"{tasks}\n\n"
+        f"{memories}\n\n"
+        'Return JSON: {"results": [{"id": <memory id>, "classification": {...}, '
+        '"metadata": {...}, "topics": {...}, "patterns": {...}}]} with one entry per memory.'
+    )
+
+
+def parse_combined_response(resp: Any, keys: list[str]) -> dict[str, dict[str, Any]]:
+    """Map each memory key to its sections; unknown/missing memories map to {}."""
+    out: dict[str, dict[str, Any]] = {k: {} for k in keys}
+    if not isinstance(resp, dict):
+        return out
+
+    entries = resp.get("results")
+    if not isinstance(entries, list):
+        # Single-memory responses sometimes come back without the wrapper.
+        entries = [dict(resp, id=keys[0])] if len(keys) == 1 else []
+
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+        key = str(entry.get("id", ""))
+        if len(keys) == 1 and len(entries) == 1:
+            key = keys[0]
+        if key in out:
+            out[key] = {s: dict(entry[s]) for s in _SECTION_KEYS if isinstance(entry.get(s), dict)}
+    return out
+
+
+class CombinedEnrichmentBatcher:
+    """Groups concurrent enrichment requests into combined LLM calls.
+
+    Requests wait up to ``max_wait_seconds`` for company; a full batch is sent
+    immediately. Instances are bound to the event loop they are used on.
+    """
+
+    def __init__(
+        self,
+        *,
+        client: LLMClient | None = None,
+        max_batch: int | None = None,
+        max_wait_seconds: float | None = None,
+    ) -> None:
+        self._client = client
+        self.max_batch = max(1, int(max_batch or getattr(settings, "AGENT_COMBINED_BATCH_SIZE", 1) or 1))
+        if max_wait_seconds is None:
+            max_wait_seconds = float(getattr(settings, "AGENT_COMBINED_BATCH_WAIT_MS", 0) or 0) / 1000.0
+        self.max_wait_seconds = max(0.0, float(max_wait_seconds))
+        self.calls = 0
+        self._pending: list[tuple[EnrichmentItem, asyncio.Future, ToolEventSink | None]] = []
+        self._timer: asyncio.Task | None = None
+
+    def _get_client(self) -> LLMClient:
+        if self._client is None:
+            self._client = create_ollama_client(
+                base_url=str(getattr(settings, "OLLAMA_BASE_URL", "http://localhost:11434")),
+                model=str(getattr(settings, "OLLAMA_MODEL", "llama3.1:8b")),
+                timeout_seconds=float(getattr(settings, "AGENT_COMBINED_TIMEOUT_SECONDS", 20.0)),
+                max_concurrency=int(getattr(settings, "OLLAMA_MAX_CONCURRENCY", 2)),
+                use_circuit_breaker=True,
+            )
+        return self._client
+
+    async def enrich(
+        self,
+        item: EnrichmentItem,
+        *,
+        tool_event_sink: ToolEventSink | None = None,
+    ) -> dict[str, dict[str, Any]]:
+        """Sections for ``item`` ({} when the LLM failed or omitted it)."""
+        fut: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._pending.append((item, fut, tool_event_sink))
+
+        if len(self._pending) >= self.max_batch:
+            await self._send(self._take())
+        elif self._timer is None:
+            self._timer = asyncio.create_task(self._flush_later())
+        return await fut
+
+    def _take(self) -> list[tuple[EnrichmentItem, asyncio.Future, ToolEventSink | None]]:
+        batch, self._pending = self._pending[: self.max_batch], self._pending[self.max_batch :]
+        return batch
+
+    async def _flush_later(self) -> None:
+        try:
+            await asyncio.sleep(self.max_wait_seconds)
+        finally:
+            self._timer = None
+        while self._pending:
+            await self._send(self._take())
+
+    async def _send(self, batch: list[tuple[EnrichmentItem, asyncio.Future, ToolEventSink | None]]) -> None:
+        if not batch:
+            return
+        items = [item for item, _, _ in batch]
+        keys = [item.key for item in items]
+        sink = next((s for _, _, s in batch if s is not None), None)
+
+        self.calls += 1
+        try:
+            resp = await self._get_client().complete_json(
+                prompt=build_combined_prompt(items),
+                schema_hint={"results": [{"id": "", **{s: {} for s in _SECTION_KEYS}}]},
+                tool_event_sink=sink,
+            )
+            parsed = parse_combined_response(resp, keys)
+        except Exception:
+            # Fail closed: agents fall back to their heuristics.
+            parsed = {k: {} for k in keys}
+
+        for item, fut, _ in batch:
+            if not fut.done():
+                fut.set_result(parsed.get(item.key) or {})
@@ -8,6 +8,7 @@ import time
 import httpx
 
 from app.agents.llm.base import LLMClient
+from app.core.request_profiler import SPAN_HTTP, profile_span
 from app.agents.llm.tool_events import ToolEventSink
 
 
@@ -68,16 +69,18 @@ class OllamaClient(LLMClient):
 
         try:
             if sem is None:
-                async with httpx.AsyncClient(timeout=self._timeout) as client:
-                    r = await client.post(f"{self._base_url}/api/generate", json=payload)
-                    r.raise_for_status()
-                    data = r.json()
-            else:
-                async with sem:
+                with profile_span(SPAN_HTTP):
                     async with httpx.AsyncClient(timeout=self._timeout) as client:
                         r = await client.post(f"{self._base_url}/api/generate", json=payload)
                         r.raise_for_status()
                         data = r.json()
+            else:
+                async with sem:
+                    with profile_span(SPAN_HTTP):
+                        async with httpx.AsyncClient(timeout=self._timeout) as client:
+                            r = await client.post(f"{self._base_url}/api/generate", json=payload)
+                            r.raise_for_status()
+                            data = r.json()
         except (httpx.HTTPError, OSError, ValueError):
             if tool_event_sink is not None:
                 try:
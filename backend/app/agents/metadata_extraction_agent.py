@@ -122,19 +122,24 @@ class MetadataExtractionAgent(BaseAgent):
         if strategy == "heuristic" or not content:
             outputs = self._heuristic(content=content)
         else:
-            prompt = (
-                "You are an enterprise metadata extraction engine for a memory system. Output JSON only.\n\n"
-                "Extract tags and entities from the content. Do not hallucinate; if unknown, omit.\n\n"
-                f"CONTENT:\n{content}\n\n"
-                "Return JSON with keys: tags (string[]), entities (object), summary (string), confidence (0..1), rationale"
-            )
-            client = create_ollama_client(
-                base_url=str(getattr(settings, "OLLAMA_BASE_URL", "http://localhost:11434")),
-                model=str(getattr(settings, "OLLAMA_MODEL", "llama3.1:8b")),
-                timeout_seconds=float(getattr(settings, "OLLAMA_TIMEOUT_SECONDS", 5.0)),
-                max_concurrency=int(getattr(settings, "OLLAMA_MAX_CONCURRENCY", 2)),
-            )
-            resp = await client.complete_json(prompt=prompt, schema_hint={}, tool_event_sink=context.get("tool_event_sink"))
+            combined = context.get("combined_enrichment")
+            if isinstance(combined, dict):
+                # Section of the combined multi-task prompt, prefetched by AgentRunner.
+                resp = combined.get("metadata")
+            else:
+                prompt = (
+                    "You are an enterprise metadata extraction engine for a memory system. Output JSON only.\n\n"
+                    "Extract tags and entities from the content. Do not hallucinate; if unknown, omit.\n\n"
+                    f"CONTENT:\n{content}\n\n"
+                    "Return JSON with keys: tags (string[]), entities (object), summary (string), confidence (0..1), rationale"
+                )
+                client = create_ollama_client(
+                    base_url=str(getattr(settings, "OLLAMA_BASE_URL", "http://localhost:11434")),
+                    model=str(getattr(settings, "OLLAMA_MODEL", "llama3.1:8b")),
+                    timeout_seconds=float(getattr(settings, "OLLAMA_TIMEOUT_SECONDS", 5.0)),
+                    max_concurrency=int(getattr(settings, "OLLAMA_MAX_CONCURRENCY", 2)),
+                )
+                resp = await client.complete_json(prompt=prompt, schema_hint={}, tool_event_sink=context.get("tool_event_sink"))
             if isinstance(resp, dict) and isinstance(resp.get("tags"), list) and isinstance(resp.get("entities"), dict):
                 resp["tags"] = _uniq_sorted([str(t) for t in resp.get("tags") or []])
                 outputs = resp
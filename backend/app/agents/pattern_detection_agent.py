@@ -106,22 +106,27 @@ class PatternDetectionAgent(BaseAgent):
         if strategy == "heuristic" or not content:
             outputs = self._heuristic(content=content, enrichment=enrichment if isinstance(enrichment, dict) else None)
         else:
-            prompt = (
-                "You are a pattern detection engine for an enterprise memory system. Output JSON only.\n\n"
-                "Given a single memory (and optional enrichment), identify any reusable patterns or templates. "
-                "Be conservative; do not hallucinate.\n\n"
-                f"ENRICHMENT: {enrichment or {}}\n\n"
-                f"CONTENT:\n{content}\n\n"
-                "Return JSON with keys: patterns (array of {pattern,type,confidence,evidence}), confidence (0..1), rationale"
-            )
-            client = create_ollama_client(
-                base_url=str(getattr(settings, "OLLAMA_BASE_URL", "http://localhost:11434")),
-                model=str(getattr(settings, "OLLAMA_MODEL", "llama3.1:8b")),
-                timeout_seconds=float(getattr(settings, "OLLAMA_TIMEOUT_SECONDS", 5.0)),
-                max_concurrency=int(getattr(settings, "OLLAMA_MAX_CONCURRENCY", 2)),
-                use_circuit_breaker=True,
-            )
-            resp = await client.complete_json(prompt=prompt, schema_hint={}, tool_event_sink=context.get("tool_event_sink"))
+            combined = context.get("combined_enrichment")
+            if isinstance(combined, dict):
+                # Section of the combined multi-task prompt, prefetched by AgentRunner.
+                resp = combined.get("patterns")
+            else:
+                prompt = (
+                    "You are a pattern detection engine for an enterprise memory system. Output JSON only.\n\n"
+                    "Given a single memory (and optional enrichment), identify any reusable patterns or templates. "
+                    "Be conservative; do not hallucinate.\n\n"
+                    f"ENRICHMENT: {enrichment or {}}\n\n"
+                    f"CONTENT:\n{content}\n\n"
+                    "Return JSON with keys: patterns (array of {pattern,type,confidence,evidence}), confidence (0..1), rationale"
+                )
+                client = create_ollama_client(
+                    base_url=str(getattr(settings, "OLLAMA_BASE_URL", "http://localhost:11434")),
+                    model=str(getattr(settings, "OLLAMA_MODEL", "llama3.1:8b")),
+                    timeout_seconds=float(getattr(settings, "OLLAMA_TIMEOUT_SECONDS", 5.0)),
+                    max_concurrency=int(getattr(settings, "OLLAMA_MAX_CONCURRENCY", 2)),
+                    use_circuit_breaker=True,
+                )
+                resp = await client.complete_json(prompt=prompt, schema_hint={}, tool_event_sink=context.get("tool_event_sink"))
             if isinstance(resp, dict) and isinstance(resp.get("patterns"), list):
                 outputs = resp
             else:
@@ -112,22 +112,27 @@ class TopicModelingAgent(BaseAgent):
         if strategy == "heuristic" or not content:
             outputs = self._heuristic(content=content, tags=tags)
         else:
-            prompt = (
-                "You are a topic modeling engine for an enterprise memory system. Output JSON only.\n\n"
-                "Given the content (and optional tags), produce a few coarse topics suitable for routing and discovery.\n"
-                "Be conservative: do not hallucinate.\n\n"
-                f"TAGS: {tags or []}\n\n"
-                f"CONTENT:\n{content}\n\n"
-                "Return JSON with keys: topics (string[]), primary_topic (string), confidence (0..1), rationale"
-            )
-            client = create_ollama_client(
-                base_url=str(getattr(settings, "OLLAMA_BASE_URL", "http://localhost:11434")),
-                model=str(getattr(settings, "OLLAMA_MODEL", "llama3.1:8b")),
-                timeout_seconds=float(getattr(settings, "OLLAMA_TIMEOUT_SECONDS", 5.0)),
-                max_concurrency=int(getattr(settings, "OLLAMA_MAX_CONCURRENCY", 2)),
-                use_circuit_breaker=True,
-            )
-            resp = await client.complete_json(prompt=prompt, schema_hint={}, tool_event_sink=context.get("tool_event_sink"))
+            combined = context.get("combined_enrichment")
+            if isinstance(combined, dict):
+                # Section of the combined multi-task prompt, prefetched by AgentRunner.
+                resp = combined.get("topics")
+            else:
+                prompt = (
+                    "You are a topic modeling engine for an enterprise memory system. Output JSON only.\n\n"
+                    "Given the content (and optional tags), produce a few coarse topics suitable for routing and discovery.\n"
+                    "Be conservative: do not hallucinate.\n\n"
+                    f"TAGS: {tags or []}\n\n"
+                    f"CONTENT:\n{content}\n\n"
+                    "Return JSON with keys: topics (string[]), primary_topic (string), confidence (0..1), rationale"
+                )
+                client = create_ollama_client(
+                    base_url=str(getattr(settings, "OLLAMA_BASE_URL", "http://localhost:11434")),
+                    model=str(getattr(settings, "OLLAMA_MODEL", "llama3.1:8b")),
+                    timeout_seconds=float(getattr(settings, "OLLAMA_TIMEOUT_SECONDS", 5.0)),
+                    max_concurrency=int(getattr(settings, "OLLAMA_MAX_CONCURRENCY", 2)),
+                    use_circuit_breaker=True,
+                )
+                resp = await client.complete_json(prompt=prompt, schema_hint={}, tool_event_sink=context.get("tool_event_sink"))
             if isinstance(resp, dict) and isinstance(resp.get("topics"), list) and isinstance(resp.get("primary_topic"), str):
                 resp["topics"] = [str(t) for t in resp.get("topics") if str(t).strip()]
                 outputs = resp
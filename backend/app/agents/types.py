@@ -54,6 +54,8 @@ class AgentContext(TypedDict, total=False):
     memory: AgentContextMemory
     runtime: AgentContextRuntime
     config: AgentContextConfig
+    # Sections from the combined enrichment prompt (see app.agents.llm.combined_enrichment).
+    combined_enrichment: dict
 
 
 class AgentResult(BaseModel):
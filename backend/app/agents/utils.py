@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 import hashlib
+import re
+import unicodedata
 from typing import Iterable
 
 
@@ -20,6 +22,36 @@ def compute_inputs_hash(parts: Iterable[str]) -> str:
     return h.hexdigest()
 
 
+# Lines that carry no meaning for enrichment. Deliberately narrow: anything that
+# could affect classification (disclaimers, quoted text) is kept.
+_BOILERPLATE_LINE_RES = [
+    re.compile(r"^sent from my \w+.*$"),
+    re.compile(r"^get outlook for \w+.*$"),
+    re.compile(r"^\[?external( email)?\]?:?$"),
+    re.compile(r"^(unsubscribe|view (this email )?in (your )?browser)\b.*$"),
+    re.compile(r"^[-_=*~#]{3,}$"),
+]
+_INVISIBLE_RE = re.compile(r"[\u200b-\u200f\u2060\ufeff]")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def normalize_content_for_cache(content: str) -> str:
+    """Canonical form of ``content`` for near-duplicate cache keys.
+
+    Folds Unicode compatibility forms, casing and whitespace, and drops
+    boilerplate lines (mobile signatures, banners, separator rules).
+    """
+    text = unicodedata.normalize("NFKC", content or "")
+    text = _INVISIBLE_RE.sub("", text).casefold()
+    lines: list[str] = []
+    for line in text.splitlines():
+        line = _SPACE_RE.sub(" ", line).strip()
+        if not line or any(r.match(line) for r in _BOILERPLATE_LINE_RES):
+            continue
+        lines.append(line)
+    return " ".join(lines)
+
+
 def max_classification(a: str | None, b: str | None) -> str:
     aa = (a or "internal").lower()
     bb = (b or "internal").lower()
@@ -17,10 +17,10 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import get_db
 from app.middleware.tenant_context import TenantContext, get_tenant_context
 from app.services.memory_service import MemoryService
+from app.services.filtered_search import FilteredSearchService, SearchPlan
 from app.services.search_query_parser import (
     parse_search_query,
     validate_query,
-    query_to_filters,
 )
 from app.schemas.base import BaseSchema
 
@@ -80,11 +80,24 @@ def get_memory_service(
     )
 
 
+def get_filtered_search_service(
+    tenant: TenantContext = Depends(get_tenant_context),
+    db: AsyncSession = Depends(get_db),
+) -> FilteredSearchService:
+    """Get configured filtered search service."""
+    return FilteredSearchService(
+        session=db,
+        org_id=tenant.org_id,
+        user_id=tenant.user_id,
+        clearance_level=tenant.clearance_level,
+    )
+
+
 @router.post("/advanced-search", response_model=AdvancedSearchResponse)
 async def advanced_search(
     request: AdvancedSearchRequest,
     tenant: TenantContext = Depends(get_tenant_context),
-    service: MemoryService = Depends(get_memory_service),
+    service: FilteredSearchService = Depends(get_filtered_search_service),
 ) -> AdvancedSearchResponse:
     """
     Advanced search with query operators.
@@ -129,24 +142,17 @@ async def advanced_search(
             detail=f"Invalid query: {error}"
         )
     
-    # Convert to filters
-    filters = query_to_filters(parsed)
+    # Compile operators into Qdrant payload filters + Postgres predicates
+    plan = SearchPlan.from_parsed(parsed)
     
     try:
-        # Perform search with filters
-        # This would integrate with MemoryService.search with additional filters
-        
-        results = []  # Would populate from service
-        total = 0  # Would get from service
+        results, total = await service.search(
+            plan, limit=request.limit, offset=request.offset
+        )
         
         facets = None
-        if parsed.faceted:
-            facets = {
-                'tags': {},
-                'status': {},
-                'scope': {},
-                'dates': {},
-            }
+        if parsed.faceted or request.return_facets:
+            facets, _ = await service.facets(plan)
         
         query_time_ms = int((time.time() - start_time) * 1000)
         
@@ -179,7 +185,7 @@ async def faceted_search(
     facet_field: Optional[str] = Query(None, description="Specific facet field"),
     limit: int = Query(50),
     tenant: TenantContext = Depends(get_tenant_context),
-    service: MemoryService = Depends(get_memory_service),
+    service: FilteredSearchService = Depends(get_filtered_search_service),
 ) -> Dict[str, Any]:
     """
     Get faceted breakdown of search results.
@@ -192,21 +198,20 @@ async def faceted_search(
     - `dates`: Temporal distribution (by week)
     - `memory_types`: Memory type distribution
     """
+    parsed = parse_search_query(query)
+    is_valid, error = validate_query(parsed)
+    if not is_valid:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid query: {error}"
+        )
+    
     try:
-        facets = {
-            'tags': {},
-            'status': {},
-            'scope': {},
-            'authors': {},
-            'dates': {},
-            'memory_types': {},
-        }
-        
-        # Would aggregate from search results
+        facets, total = await service.facets(SearchPlan.from_parsed(parsed))
         
         return {
             'query': query,
-            'total_results': 0,
+            'total_results': total,
             'facets': facets if not facet_field else facets.get(facet_field, {}),
             'facet_field': facet_field,
         }
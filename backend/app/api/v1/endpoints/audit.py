@@ -13,6 +13,7 @@ from sqlalchemy import select, and_, func, desc
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db, set_tenant_context
+from app.core.pagination import CountMode, InvalidCursorError, count_rows, keyset_page
 from app.middleware.tenant_context import (
     TenantContext,
     get_tenant_context,
@@ -114,6 +115,8 @@ class AuditStatsResponse(BaseModel):
 async def list_audit_events(
     page: int = Query(1, ge=1),
     page_size: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    count: CountMode = Query("exact", description="Total: exact, estimate or none"),
     event_type: Optional[str] = None,
     actor_id: Optional[str] = None,
     resource_type: Optional[str] = None,
@@ -125,10 +128,13 @@ async def list_audit_events(
     db: AsyncSession = Depends(get_db),
 ):
     """
-    List audit events with filtering.
+    List audit events with filtering, newest first.
     
     **Required role:** org_admin, security_admin, or system_admin
     
+    Pass the returned `next_cursor` as `cursor` to page in constant time;
+    `count=estimate` or `count=none` skips the exact total.
+    
     Common event types:
     - auth.login, auth.logout, auth.failed_login
     - memory.create, memory.read, memory.update, memory.delete
@@ -139,56 +145,49 @@ async def list_audit_events(
     query = select(AuditEvent).where(
         AuditEvent.organization_id == tenant.org_id
     )
-    count_query = select(func.count(AuditEvent.id)).where(
-        AuditEvent.organization_id == tenant.org_id
-    )
     
     # Apply filters
     if event_type:
         query = query.where(AuditEvent.event_type == event_type)
-        count_query = count_query.where(AuditEvent.event_type == event_type)
     
     if actor_id:
         query = query.where(AuditEvent.actor_id == actor_id)
-        count_query = count_query.where(AuditEvent.actor_id == actor_id)
     
     if resource_type:
         query = query.where(AuditEvent.resource_type == resource_type)
-        count_query = count_query.where(AuditEvent.resource_type == resource_type)
     
     if resource_id:
         query = query.where(AuditEvent.resource_id == resource_id)
-        count_query = count_query.where(AuditEvent.resource_id == resource_id)
     
     if action:
         query = query.where(AuditEvent.action == action)
-        count_query = count_query.where(AuditEvent.action == action)
     
     if start_date:
         query = query.where(AuditEvent.timestamp >= start_date)
-        count_query = count_query.where(AuditEvent.timestamp >= start_date)
     
     if end_date:
         query = query.where(AuditEvent.timestamp <= end_date)
-        count_query = count_query.where(AuditEvent.timestamp <= end_date)
-    
-    # Get total count
-    total_result = await db.execute(count_query)
-    total = total_result.scalar()
     
-    # Apply pagination
-    offset = (page - 1) * page_size
-    query = query.offset(offset).limit(page_size).order_by(desc(AuditEvent.timestamp))
-    
-    result = await db.execute(query)
-    events = result.scalars().all()
+    try:
+        result = await keyset_page(
+            db,
+            query,
+            AuditEvent.timestamp,
+            AuditEvent.id,
+            limit=page_size,
+            cursor=cursor,
+            offset=(page - 1) * page_size,
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    total = await count_rows(db, query, count)
     
-    return PaginatedResponse(
-        items=[AuditEventResponse.model_validate(e) for e in events],
+    return PaginatedResponse.create(
+        items=[AuditEventResponse.model_validate(e) for e in result.items],
         total=total,
         page=page,
         page_size=page_size,
-        pages=(total + page_size - 1) // page_size if total > 0 else 0,
+        next_cursor=result.next_cursor,
     )
 
 
@@ -90,6 +90,13 @@ async def get_consolidation_suggestions(
     memory_id: Optional[str] = Query(None, description="Specific memory to check"),
     similarity_threshold: float = Query(0.85, ge=0.0, le=1.0),
     scope: Optional[str] = Query(None, description="Filter by memory scope"),
+    since: Optional[datetime] = Query(
+        None, description="Incremental mode: only check memories indexed after this time"
+    ),
+    vector_threshold: Optional[float] = Query(
+        None, ge=0.0, le=1.0, description="Also require embedding cosine similarity"
+    ),
+    limit: int = Query(200, ge=1, le=1000, description="Maximum number of groups"),
     tenant: TenantContext = Depends(get_tenant_context),
     db: AsyncSession = Depends(get_db),
 ) -> FindCandidatesResponse:
@@ -106,6 +113,9 @@ async def get_consolidation_suggestions(
         memory_id=memory_id,
         similarity_threshold=similarity_threshold,
         scope=scope,
+        limit=limit,
+        since=since,
+        vector_threshold=vector_threshold,
     )
         
     formatted_candidates: List[ConsolidationCandidate] = []
@@ -13,6 +13,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
+from app.core.pagination import CountMode, InvalidCursorError
 from app.middleware.tenant_context import get_tenant_context, TenantContext, get_db_with_tenant
 from app.services.event_publishing_service import EventPublishingService
 from app.services.batch_operations_service import BatchOperationsService
@@ -352,20 +353,28 @@ async def list_snapshots(
     resource_type: Optional[str] = Query(None),
     limit: int = Query(100, ge=1, le=1000),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    count: CountMode = Query("exact", description="Total: exact, estimate or none"),
 ):
-    """List snapshots for the organization."""
+    """List snapshots for the organization, newest first."""
     svc = ExportAndSnapshotService(db, tenant.org_id)
-    snapshots, total = await svc.list_snapshots(
-        resource_type=resource_type,
-        limit=limit,
-        offset=offset,
-    )
+    try:
+        snapshots, total, next_cursor = await svc.list_snapshots(
+            resource_type=resource_type,
+            limit=limit,
+            offset=offset,
+            cursor=cursor,
+            count=count,
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     return SnapshotListResponse(
         snapshots=[SnapshotResponse.from_orm(s) for s in snapshots],
         total=total,
         limit=limit,
         offset=offset,
+        next_cursor=next_cursor,
     )
 
 
@@ -6,6 +6,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db, set_tenant_context
+from app.core.pagination import CountMode, InvalidCursorError
 from app.middleware.tenant_context import TenantContext, get_tenant_context
 from app.schemas.goal import (
     GoalActivityLogResponse,
@@ -186,6 +187,8 @@ async def list_goals(
     page: int = Query(1, ge=1),
     page_size: int = Query(50, ge=1, le=100),
     status_filter: str | None = Query(default=None, alias="status"),
+    cursor: str | None = Query(default=None, description="next_cursor of the previous page"),
+    count: CountMode = Query(default="exact", description="Total: exact, estimate or none"),
     tenant: TenantContext = Depends(get_tenant_context),
     db: AsyncSession = Depends(get_db),
 ):
@@ -199,7 +202,17 @@ async def list_goals(
         )
 
         service = GoalService(db)
-        page_data = await service.list_goals(org_id=tenant.org_id, page=page, page_size=page_size, status_filter=status_filter)
+        try:
+            page_data = await service.list_goals(
+                org_id=tenant.org_id,
+                page=page,
+                page_size=page_size,
+                status_filter=status_filter,
+                cursor=cursor,
+                count=count,
+            )
+        except InvalidCursorError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
         return PaginatedResponse(
             items=[GoalResponse.model_validate(g) for g in page_data.items],
@@ -207,6 +220,7 @@ async def list_goals(
             page=page_data.page,
             page_size=page_data.page_size,
             pages=page_data.pages,
+            next_cursor=page_data.next_cursor,
         )
 
 
@@ -158,6 +158,7 @@ async def create_synthesis_report(
     tags: Optional[str] = Query(None, description="Comma-separated tags to filter"),
     days_back: int = Query(30, ge=1, le=365),
     title: Optional[str] = Query(None),
+    refresh: bool = Query(False, description="Rebuild the synthesis aggregates first"),
     db: AsyncSession = Depends(get_db),
     user: User = Depends(get_current_user),
 ):
@@ -173,9 +174,15 @@ async def create_synthesis_report(
     - `tags`: Filter by comma-separated tags (e.g., "ai,performance")
     - `days_back`: Include memories from last N days (default: 30)
     - `title`: Custom report title
+    - `refresh`: Recompute the org's pre-aggregated counts before reporting
+    
+    Untagged reports are served from incrementally maintained aggregates.
     
     Returns: Synthesis report with clusters, trends, and insights
     """
+    if org_id and str(user.organization_id) != org_id:
+        raise HTTPException(status_code=403, detail="Not authorized")
+
     try:
         from app.services.knowledge_synthesis_service import KnowledgeSynthesisService
         
@@ -183,11 +190,12 @@ async def create_synthesis_report(
         if tags:
             tag_list = [t.strip() for t in tags.split(",")]
         
-        service = KnowledgeSynthesisService(session=db)
+        service = KnowledgeSynthesisService(session=db, org_id=str(user.organization_id))
         report = await service.create_synthesis_report(
             tags=tag_list,
             days_back=days_back,
             title=title or f"Synthesis Report - {user.email}",
+            refresh=refresh,
         )
         
         return report.to_dict()
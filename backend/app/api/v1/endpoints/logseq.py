@@ -186,12 +186,13 @@ async def export_markdown(
         if page_size == 0:
             export_items = []
         else:
-            items, _total, _has_more = await memory_service.list_memories(
+            items, _total, _has_more, _cursor = await memory_service.list_memories(
                 scope=body.scope,
                 tags=None,
                 memory_type=None,
                 page=1,
                 page_size=page_size,
+                count="none",
             )
             export_items = [_to_exportable_from_ltm(m) for m in items]
 
@@ -230,12 +231,13 @@ async def graph_data(
     else:
         page_size = max(0, body.limit)
         if page_size:
-            items, _total, _has_more = await memory_service.list_memories(
+            items, _total, _has_more, _cursor = await memory_service.list_memories(
                 scope=body.scope,
                 tags=None,
                 memory_type=None,
                 page=1,
                 page_size=page_size,
+                count="none",
             )
             export_items = [_to_exportable_from_ltm(m) for m in items]
 
@@ -277,12 +279,13 @@ async def write_export_to_disk(
     else:
         page_size = max(0, body.limit)
         if page_size:
-            items, _total, _has_more = await memory_service.list_memories(
+            items, _total, _has_more, _cursor = await memory_service.list_memories(
                 scope=body.scope,
                 tags=None,
                 memory_type=None,
                 page=1,
                 page_size=page_size,
+                count="none",
             )
             export_items = [_to_exportable_from_ltm(m) for m in items]
 
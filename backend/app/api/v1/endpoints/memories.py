@@ -5,16 +5,18 @@ Memory Endpoints
 CRUD operations for memories with search and sharing.
 """
 
+import json
 import time
-from typing import List, Optional
+from typing import Any, AsyncIterator, List, Optional
 from datetime import datetime
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, UploadFile, File
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Query, Request, UploadFile, File
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
 from app.core.database import get_db, set_tenant_context
+from app.core.file_response import file_response
+from app.core.pagination import CountMode, InvalidCursorError
 from app.middleware.tenant_context import TenantContext, get_tenant_context
 from app.services.webhook_service import WebhookService
 from app.schemas.memory import (
@@ -39,10 +41,14 @@ from app.schemas.memory_batch import (
     MemoryBatchUpdateResult,
     MemoryBatchResult,
     MemoryBatchShareResult,
+    MemoryBulkIngestResponse,
+    MemoryBulkIngestResult,
 )
+from app.services.memory_bulk_ingest import InvalidItem, MemoryBulkIngestService
 from app.services.memory_service import MemoryService
 from app.services.embedding_service import EmbeddingService
 from app.tasks.memory_pipeline import enqueue_memory_pipeline
+from app.tasks.attachment_indexing import enqueue_attachment_indexing, index_attachment_now
 from app.services.memory_attachment_service import (
     MemoryAttachmentService,
     AttachmentNotFoundError,
@@ -189,24 +195,37 @@ async def list_memories(
     memory_type: Optional[str] = Query(None),
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    count: CountMode = Query("exact", description="Total: exact, estimate or none"),
     tenant: TenantContext = Depends(get_tenant_context),
     db: AsyncSession = Depends(get_db),
     service: MemoryService = Depends(get_memory_service),
 ):
     """
     List long-term memories with optional filters.
+
+    Pass the returned `next_cursor` as `cursor` to fetch the next page in
+    constant time; `page` is kept for existing clients. Use `count=estimate`
+    or `count=none` to skip the exact total on large organizations.
     """
     await set_tenant_context(
         db, tenant.user_id, tenant.org_id, tenant.roles_string, tenant.clearance_level
     )
 
-    items, total, has_more = await service.list_memories(
-        scope=scope,
-        tags=tags,
-        memory_type=memory_type,
-        page=page,
-        page_size=page_size,
-    )
+    try:
+        items, total, has_more, next_cursor = await service.list_memories(
+            scope=scope,
+            tags=tags,
+            memory_type=memory_type,
+            page=page,
+            page_size=page_size,
+            cursor=cursor,
+            count=count,
+            # Org admins at the top clearance level (4) see every memory.
+            org_wide_visibility=tenant.is_org_admin and tenant.clearance_level >= 4,
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
     return MemoryListResponse(
         items=[MemoryResponse.model_validate(m) for m in items],
@@ -214,6 +233,7 @@ async def list_memories(
         page=page,
         page_size=page_size,
         has_more=has_more,
+        next_cursor=next_cursor,
     )
 
 
@@ -222,6 +242,90 @@ async def list_memories(
 # =============================================================================
 
 
+async def _ndjson_items(request: Request) -> AsyncIterator[Any]:
+    """Yield one parsed item per NDJSON line as the body streams in."""
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield _parse_line(line)
+    if buffer.strip():
+        yield _parse_line(buffer)
+
+
+def _parse_line(line: bytes) -> Any:
+    try:
+        return json.loads(line)
+    except ValueError as e:
+        return InvalidItem(f"Invalid JSON: {e}")
+
+
+async def _iterate(items: List[Any]) -> AsyncIterator[Any]:
+    for item in items:
+        yield item
+
+
+@router.post("/bulk", response_model=MemoryBulkIngestResponse)
+async def bulk_ingest_memories(
+    request: Request,
+    run_pipeline: bool = Query(True, description="Enqueue the memory pipeline for created memories"),
+    tenant: TenantContext = Depends(get_tenant_context),
+    db: AsyncSession = Depends(get_db),
+):
+    """Bulk-create long-term memories (partial success allowed).
+
+    The body is either NDJSON (``application/x-ndjson``, one ``MemoryCreate``
+    per line, processed while it streams in) or a JSON array / ``{"items": [...]}``.
+    Items are deduplicated by content hash, embedded and written in batches;
+    each batch commits on its own and emits one ``memory.bulk_created`` event.
+
+    **Required permissions:** `memory:create:{scope}` for every scope used
+    """
+    await set_tenant_context(db, tenant.user_id, tenant.org_id, tenant.roles_string, tenant.clearance_level)
+    request_id = getattr(request.state, "request_id", None)
+
+    content_type = request.headers.get("content-type", "")
+    if "ndjson" in content_type or "jsonlines" in content_type:
+        items = _ndjson_items(request)
+    else:
+        try:
+            body = await request.json()
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid JSON body")
+        if isinstance(body, dict):
+            body = body.get("items")
+        if not isinstance(body, list):
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Expected a JSON array of memories or an object with 'items'",
+            )
+        items = _iterate(body)
+
+    service = MemoryBulkIngestService(
+        session=db,
+        user_id=tenant.user_id,
+        org_id=tenant.org_id,
+        clearance_level=tenant.clearance_level,
+        run_pipeline=run_pipeline,
+        roles=tenant.roles_string,
+    )
+    summary = await service.ingest(items, request_id=request_id)
+
+    return MemoryBulkIngestResponse(
+        trace_id=request_id,
+        created=summary.count("created"),
+        duplicates=summary.count("duplicate"),
+        failed=len(summary.results) - summary.count("created") - summary.count("duplicate"),
+        truncated=summary.truncated,
+        results=[
+            MemoryBulkIngestResult(index=r.index, status=r.status, memory_id=r.memory_id, error=r.error)
+            for r in summary.results
+        ],
+    )
+
+
 @router.post("/batch/update", response_model=MemoryBatchUpdateResponse)
 async def batch_update_memories(
     request: Request,
@@ -332,6 +436,8 @@ async def batch_share_memories(
 async def list_all_memories(
     request: Request,
     include_short_term: bool = Query(True, description="Include short-term memories from Redis"),
+    limit: int = Query(100, ge=1, le=1000, description="Long-term memories per page"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
     tenant: TenantContext = Depends(get_tenant_context),
     db: AsyncSession = Depends(get_db),
     service: MemoryService = Depends(get_memory_service),
@@ -341,14 +447,19 @@ async def list_all_memories(
     
     Returns memories grouped by storage type:
     - `short_term`: Memories in Redis (temporary, may expire)
-    - `long_term`: Memories in PostgreSQL (permanent)
+    - `long_term`: Memories in PostgreSQL (permanent), paged by `cursor`
     """
     # Set tenant context for RLS
     await set_tenant_context(
         db, tenant.user_id, tenant.org_id, tenant.roles_string, tenant.clearance_level
     )
     
-    result = await service.list_all_memories(include_short_term=include_short_term)
+    try:
+        result = await service.list_all_memories(
+            include_short_term=include_short_term, limit=limit, cursor=cursor
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     
     return {
         "short_term": [
@@ -378,6 +489,7 @@ async def list_all_memories(
             }
             for m in result["long_term"]
         ],
+        "next_cursor": result["next_cursor"],
         "summary": {
             "short_term_count": len(result["short_term"]),
             "long_term_count": len(result["long_term"]),
@@ -447,6 +559,7 @@ async def list_memory_attachments(
 async def upload_memory_attachment(
     request: Request,
     memory_id: str,
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     tenant: TenantContext = Depends(get_tenant_context),
     db: AsyncSession = Depends(get_db),
@@ -461,6 +574,15 @@ async def upload_memory_attachment(
     try:
         att = await service.create_attachment(memory_id=memory_id, file=file)
         await db.commit()
+        if att.index_status == "pending":
+            index_kwargs = {
+                "org_id": tenant.org_id,
+                "attachment_id": str(att.id),
+                "initiator_user_id": tenant.user_id,
+            }
+            # Without a Celery broker, index after the response is sent.
+            if enqueue_attachment_indexing(**index_kwargs) is None:
+                background_tasks.add_task(index_attachment_now, **index_kwargs)
         return MemoryAttachmentResponse.model_validate(att)
     except AttachmentTooLargeError as e:
         await db.rollback()
@@ -484,6 +606,7 @@ async def upload_memory_attachment(
     status_code=status.HTTP_200_OK,
 )
 async def download_memory_attachment(
+    request: Request,
     memory_id: str,
     attachment_id: str,
     tenant: TenantContext = Depends(get_tenant_context),
@@ -496,10 +619,12 @@ async def download_memory_attachment(
 
     try:
         att, path = await service.get_attachment(memory_id=memory_id, attachment_id=attachment_id)
-        return FileResponse(
-            path=str(path),
+        return file_response(
+            request,
+            path,
             media_type=att.content_type or "application/octet-stream",
             filename=att.file_name,
+            etag=att.sha256,
         )
     except AttachmentNotFoundError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
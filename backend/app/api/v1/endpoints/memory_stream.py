@@ -3,12 +3,15 @@
 This is a lightweight read-only event feed intended for UI realtime updates
 and simple integrations. It currently streams a curated subset of org-scoped
 `audit_events` (e.g. `memory.create`, `memory.update`).
+
+Events are pushed from the in-process MemoryEventHub (fed by a Redis stream),
+so connected clients hold no DB connection. When the hub is disabled or Redis
+is unavailable, each client polls `audit_events` instead.
 """
 
 from __future__ import annotations
 
 import asyncio
-import json
 from datetime import datetime, timezone
 
 from fastapi import APIRouter, Depends, Header, Query, Request
@@ -16,9 +19,16 @@ from fastapi.responses import StreamingResponse
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
 from app.core.database import get_db, set_tenant_context
 from app.middleware.tenant_context import TenantContext, get_tenant_context
 from app.models.audit import AuditEvent
+from app.services.memory_event_hub import (
+    STREAM_EVENT_TYPES,
+    audit_event_payload,
+    format_sse,
+    memory_event_hub,
+)
 
 
 router = APIRouter()
@@ -38,17 +48,28 @@ async def stream_memory_events(
 
     Notes:
     - Org-scoped via TenantContext and `organization_id` filtering.
-    - Uses DB polling (no extra infra). Intended as a "lite" stream.
+    - Resumes from `Last-Event-ID` (or `since`) out of the hub's bounded
+      replay buffer; older events are not replayed.
+    - `poll_interval_seconds` only applies to the DB polling fallback.
     - `max_events` is primarily for testing/debugging.
     """
 
+    headers = {
+        "Cache-Control": "no-cache",
+        "Connection": "keep-alive",
+    }
+
+    if await memory_event_hub.ensure_started():
+        # The session is never used here, so no pool connection is checked out.
+        return StreamingResponse(
+            _hub_event_generator(request, tenant.org_id, last_event_id, since, max_events),
+            media_type="text/event-stream",
+            headers=headers,
+        )
+
     await set_tenant_context(db, tenant.user_id, tenant.org_id, tenant.roles_string, tenant.clearance_level)
 
-    allowed_types = {
-        "memory.create",
-        "memory.update",
-        "knowledge.reviewed",
-    }
+    allowed_types = set(STREAM_EVENT_TYPES)
 
     start_ts = since or datetime.now(timezone.utc)
 
@@ -81,20 +102,7 @@ async def stream_memory_events(
                 if cursor_id and ev_id == cursor_id:
                     continue
 
-                payload = {
-                    "id": ev_id,
-                    "type": ev.event_type,
-                    "timestamp": ev.timestamp.isoformat() if ev.timestamp else None,
-                    "actor_id": ev.actor_id,
-                    "resource_type": ev.resource_type,
-                    "resource_id": ev.resource_id,
-                    "success": ev.success,
-                    "details": ev.details or {},
-                    "request_id": ev.request_id,
-                }
-
-                data = json.dumps(payload, separators=(",", ":"), default=str)
-                yield f"id: {ev_id}\nevent: {ev.event_type}\ndata: {data}\n\n".encode("utf-8")
+                yield format_sse(audit_event_payload(ev))
 
                 emitted_any = True
                 sent += 1
@@ -113,8 +121,43 @@ async def stream_memory_events(
     return StreamingResponse(
         _event_generator(),
         media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-        },
+        headers=headers,
     )
+
+
+async def _hub_event_generator(
+    request: Request,
+    org_id: str,
+    last_event_id: str | None,
+    since: datetime | None,
+    max_events: int | None,
+):
+    sub = memory_event_hub.subscribe(org_id, last_event_id=last_event_id, since=since)
+    heartbeat = float(settings.MEMORY_STREAM_HEARTBEAT_SECONDS)
+    sent = 0
+    try:
+        for frame in sub.backlog:
+            yield frame
+            sent += 1
+            if max_events is not None and sent >= max_events:
+                return
+
+        while True:
+            if sub.overflowed and sub.queue.empty():
+                # Too slow to keep up; the client reconnects with Last-Event-ID.
+                return
+            try:
+                frame = await asyncio.wait_for(sub.queue.get(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    return
+                # heartbeat keeps proxies from buffering forever
+                yield b": ping\n\n"
+                continue
+
+            yield frame
+            sent += 1
+            if max_events is not None and sent >= max_events:
+                return
+    finally:
+        memory_event_hub.unsubscribe(sub)
@@ -25,7 +25,7 @@ from app.api.v1.endpoints.auth import get_current_user
 from app.core.config import settings
 from app.core.database import get_db
 from app.models.user import User
-from app.services.recommendation_service import RecommendationService
+from app.services.recommendation_service import RecommendationService, invalidate_recommendations
 
 logger = logging.getLogger(__name__)
 
@@ -295,8 +295,8 @@ async def clear_recommendation_cache(
     if not current_user.is_admin:
         raise HTTPException(status_code=403, detail="Admin required")
     
-    # Note: Redis doesn't have native wildcard delete, would need to scan
-    # For now, just log the request
+    # Bumping the org generation orphans every cached entry (they expire via TTL)
+    await invalidate_recommendations(_get_sync_redis_client(), org_id)
     
     logger.info(f"Cache clear request for org {org_id}")
     
@@ -10,10 +10,11 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional, List
 
 from app.core.database import get_db
+from app.core.pagination import InvalidCursorError
 from app.api.v1.endpoints.auth import get_current_user
 from app.models.user import User
 from app.models.memory_snapshot import SnapshotType, SnapshotStatus
-from app.middleware.tenant_context import get_tenant_context, TenantContext
+from app.middleware.tenant_context import get_tenant_context, require_org_admin, TenantContext
 from app.services.snapshot_service import SnapshotService
 from pydantic import BaseModel, Field
 import logging
@@ -53,6 +54,9 @@ class ImportResult(BaseModel):
     skipped: int
     total: int
     errors: List[str]
+    updated: int = 0
+    vectors_restored: int = 0
+    vectors_embedded: int = 0
 
 
 @router.post("/", response_model=SnapshotResponse, status_code=status.HTTP_201_CREATED)
@@ -113,22 +117,31 @@ async def create_snapshot(
 
 @router.get("/", response_model=List[SnapshotResponse])
 async def list_snapshots(
+    response: Response,
     status_filter: Optional[SnapshotStatus] = None,
     limit: int = 50,
     offset: int = 0,
+    cursor: Optional[str] = None,
     db: AsyncSession = Depends(get_db),
     tenant: TenantContext = Depends(get_tenant_context),
     current_user: User = Depends(get_current_user),
 ):
-    """List all snapshots for the organization."""
+    """List all snapshots for the organization.
+    
+    The cursor of the next page is returned in the `X-Next-Cursor` header.
+    """
     try:
         service = SnapshotService(db, tenant.user_id, tenant.org_id)
         
-        snapshots = await service.list_snapshots(
+        page = await service.list_snapshots(
             status=status_filter,
             limit=limit,
-            offset=offset
+            offset=offset,
+            cursor=cursor,
         )
+        snapshots = page.items
+        if page.next_cursor:
+            response.headers["X-Next-Cursor"] = page.next_cursor
         
         return [
             SnapshotResponse(
@@ -149,6 +162,8 @@ async def list_snapshots(
             for s in snapshots
         ]
     
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         logger.error(f"Error listing snapshots: {e}")
         raise HTTPException(
@@ -276,28 +291,29 @@ async def import_snapshot(
     format: str = "json",
     overwrite: bool = False,
     db: AsyncSession = Depends(get_db),
-    tenant: TenantContext = Depends(get_tenant_context),
+    tenant: TenantContext = Depends(require_org_admin()),
     current_user: User = Depends(get_current_user),
 ):
     """
-    Import memories from snapshot file.
+    Import memories from snapshot file (org admins only).
     
     **Supported formats**: json, zip
     
-    **Overwrite**: If true, existing memories will be updated.
-    If false, existing memories are skipped.
+    **Overwrite**: If true, existing memories the caller can write are
+    updated. If false, existing memories are skipped.
+    
+    Imported memories are owned by the caller and checked like creates
+    (scope permission, classification and clearance validation).
     """
     try:
         service = SnapshotService(db, tenant.user_id, tenant.org_id)
         
-        # Read file content
-        content = await file.read()
-        
-        # Import
+        # Stream from the spooled upload instead of reading it into memory
         result = await service.import_snapshot(
-            content=content,
+            content=file.file,
             format=format,
-            overwrite=overwrite
+            overwrite=overwrite,
+            clearance_level=tenant.clearance_level,
         )
         
         return ImportResult(**result)
@@ -19,6 +19,7 @@ from app.middleware.tenant_context import (
     require_roles,
 )
 from app.models.team import Team, TeamMember
+from app.services.permission_checker import PermissionChecker
 from app.schemas.team import (
     TeamCreate,
     TeamUpdate,
@@ -158,11 +159,15 @@ async def update_team(
         team.description = body.description
     if body.settings is not None:
         team.settings = body.settings
+    active_changed = body.is_active is not None and body.is_active != team.is_active
     if body.is_active is not None:
         team.is_active = body.is_active
     
     await db.commit()
     await db.refresh(team)
+    if active_changed:
+        # Team grants are compiled into every member's access context
+        await PermissionChecker(db).invalidate_org_cache(tenant.org_id)
     
     return TeamResponse.model_validate(team)
 
@@ -194,6 +199,7 @@ async def delete_team(
     
     team.is_active = False
     await db.commit()
+    await PermissionChecker(db).invalidate_org_cache(tenant.org_id)
 
 
 # =============================================================================
@@ -294,6 +300,7 @@ async def add_team_member(
     db.add(member)
     await db.commit()
     await db.refresh(member)
+    await PermissionChecker(db).invalidate_user_cache(body.user_id, tenant.org_id)
     
     return TeamMemberResponse.model_validate(member)
 
@@ -328,3 +335,4 @@ async def remove_team_member(
     member.left_at = datetime.now(timezone.utc)
     
     await db.commit()
+    await PermissionChecker(db).invalidate_user_cache(user_id, tenant.org_id)
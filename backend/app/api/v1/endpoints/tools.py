@@ -41,7 +41,7 @@ def _build_registry(*, db: AsyncSession, tenant: TenantContext) -> ToolRegistry:
         org_id=tenant.org_id,
         clearance_level=int(tenant.clearance_level or 0),
     )
-    register_builtin_tools(registry=registry, memory_service=memory_service)
+    register_builtin_tools(registry=registry, memory_service=memory_service, roles=tenant.roles_string)
     return registry
 
 
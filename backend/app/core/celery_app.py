@@ -61,6 +61,7 @@ celery_app = Celery(
         "app.tasks.maintenance",
         "app.tasks.webhooks",
         "app.tasks.export_jobs",
+        "app.tasks.attachment_indexing",
         "app.tasks.cognitive_loop",
         "app.tasks.meta_agent",
         "app.tasks.goals",
@@ -93,8 +94,11 @@ celery_app.conf.update(
         Queue("q.webhooks"),
     ),
     task_routes={
+        "app.tasks.memory_pipeline.enrichment_task": {"queue": "q.agent_enrich"},
+        "app.tasks.memory_pipeline.enrichment_batch_task": {"queue": "q.agent_enrich"},
         "app.tasks.memory_pipeline.classification_task": {"queue": "q.agent_enrich"},
         "app.tasks.memory_pipeline.metadata_task": {"queue": "q.agent_enrich"},
+        "app.tasks.attachment_indexing.index_attachment_task": {"queue": "q.agent_enrich"},
         "app.tasks.memory_pipeline.topic_modeling_task": {"queue": "q.agent_topics"},
         "app.tasks.memory_pipeline.pattern_detection_task": {"queue": "q.agent_patterns"},
         "app.tasks.memory_pipeline.promotion_task": {"queue": "q.agent_patterns"},
@@ -103,6 +107,13 @@ celery_app.conf.update(
         "app.tasks.memory_pipeline.feedback_learning_task": {"queue": "q.agent_feedback"},
         "app.tasks.maintenance.nightly_logseq_export_task": {"queue": "q.maintenance"},
         "app.tasks.maintenance.cleanup_expired_snapshot_exports_task": {"queue": "q.maintenance"},
+        "app.tasks.maintenance.backfill_search_payload_task": {"queue": "q.maintenance"},
+        "app.tasks.maintenance.rebalance_vector_collections_task": {"queue": "q.maintenance"},
+        "app.tasks.maintenance.sweep_attachment_blobs_task": {"queue": "q.maintenance"},
+        "app.tasks.maintenance.backfill_near_duplicate_index_task": {"queue": "q.maintenance"},
+        "app.tasks.maintenance.reconcile_capability_usage_task": {"queue": "q.maintenance"},
+        "app.tasks.maintenance.prune_agent_result_cache_task": {"queue": "q.maintenance"},
+        "app.tasks.maintenance.prune_usage_rollups_task": {"queue": "q.maintenance"},
         "app.tasks.webhooks.dispatch_webhooks_task": {"queue": "q.webhooks"},
         "app.tasks.export_jobs.run_snapshot_export_job_task": {"queue": "q.maintenance"},
         "app.tasks.cognitive_loop.cognitive_loop_task": {"queue": "q.cognitive_loop"},
@@ -143,11 +154,43 @@ celery_app.conf.update(
             "schedule": crontab(minute=35, hour=2),
             "args": (),
         },
+        "sweep-attachment-blobs": {
+            "task": "app.tasks.maintenance.sweep_attachment_blobs_task",
+            "schedule": crontab(minute=50, hour=2),
+            "args": (),
+        },
+        # Indexes imported/legacy memories for consolidation suggestions.
+        "backfill-near-duplicate-index": {
+            "task": "app.tasks.maintenance.backfill_near_duplicate_index_task",
+            "schedule": crontab(minute="*/15"),
+            "args": (),
+        },
         "nightly-memory-decay-refresh": {
             "task": "app.services.memory_activation.tasks.nightly_decay_refresh_task",
             "schedule": crontab(minute=15, hour=2),
             "args": (),
         },
+        # Advances in-flight tenant collection moves step by step.
+        "rebalance-vector-collections": {
+            "task": "app.tasks.maintenance.rebalance_vector_collections_task",
+            "schedule": 300.0,
+            "args": (),
+        },
+        "reconcile-capability-usage": {
+            "task": "app.tasks.maintenance.reconcile_capability_usage_task",
+            "schedule": float(settings.CAPABILITY_USAGE_RECONCILE_INTERVAL_SECONDS),
+            "args": (),
+        },
+        "prune-agent-result-cache": {
+            "task": "app.tasks.maintenance.prune_agent_result_cache_task",
+            "schedule": crontab(minute=20),
+            "args": (),
+        },
+        "prune-usage-rollups": {
+            "task": "app.tasks.maintenance.prune_usage_rollups_task",
+            "schedule": crontab(minute=35),
+            "args": (),
+        },
         "dispatch-webhooks": {
             "task": "app.tasks.webhooks.dispatch_webhooks_task",
             "schedule": 30.0,
@@ -6,7 +6,7 @@ Centralized configuration using Pydantic Settings.
 All configuration is loaded from environment variables with sensible defaults.
 """
 
-from typing import List, Optional
+from typing import Dict, List, Optional
 from functools import lru_cache
 
 from pydantic import Field, field_validator, AliasChoices
@@ -164,6 +164,21 @@ class Settings(BaseSettings):
     QDRANT_PORT: int | None = None
     QDRANT_API_KEY: str | None = None
     QDRANT_COLLECTION_NAME: str = "memories"
+    # Route large tenants to dedicated collections (vector_collection_routes).
+    QDRANT_TENANT_ROUTING_ENABLED: bool = True
+    # How long each process trusts its copy of the routing table.
+    QDRANT_ROUTE_CACHE_TTL_SECONDS: int = 30
+    # Tenants with at least this many points in the shared collection are
+    # moved to a dedicated one by the rebalance task.
+    QDRANT_DEDICATED_MIN_POINTS: int = 500000
+    # Defaults for dedicated collections (overridable per tenant on the route).
+    QDRANT_DEDICATED_HNSW_M: int | None = 32
+    QDRANT_DEDICATED_HNSW_EF_CONSTRUCT: int | None = 200
+    QDRANT_DEDICATED_SEARCH_HNSW_EF: int | None = None
+    # "scalar" (int8) or unset for full-precision vectors.
+    QDRANT_DEDICATED_QUANTIZATION: str | None = "scalar"
+    # Points per scroll/upsert page when copying a tenant between collections.
+    QDRANT_MIGRATION_BATCH_SIZE: int = 256
 
     # -------------------------------------------------------------------------
     # Elasticsearch
@@ -238,14 +253,32 @@ class Settings(BaseSettings):
     AGENT_CACHE_ENABLED: bool = True
     # Optional TTL for cache entries (seconds). If unset/0, entries do not expire.
     AGENT_CACHE_TTL_SECONDS: int | None = None
+    # Hot tier in front of the Postgres cache: per-process LRU, then Redis.
+    AGENT_CACHE_LOCAL_SIZE: int = 2048
+    AGENT_CACHE_LOCAL_TTL_SECONDS: int = 300
+    AGENT_CACHE_REDIS_TTL_SECONDS: int = 7 * 24 * 3600
+    # Least recently used entries beyond this are evicted (Redis and Postgres).
+    AGENT_CACHE_MAX_ENTRIES_PER_ORG: int = 50000
 
     # Per-agent override (advanced): set to "heuristic" to disable LLM calls for metadata.
     METADATA_EXTRACTION_STRATEGY: str | None = None
 
+    # One LLM call returns classification, metadata, topics and patterns for a
+    # memory (pipeline runs the four agents as a single enrichment task).
+    AGENT_COMBINED_ENRICHMENT: bool = True
+    # Memories per combined request; 1 for models that handle only one at a time.
+    AGENT_COMBINED_BATCH_SIZE: int = 4
+    # How long a request waits for others to share its batch.
+    AGENT_COMBINED_BATCH_WAIT_MS: int = 25
+    # Combined prompts generate more output than single-agent ones.
+    AGENT_COMBINED_TIMEOUT_SECONDS: float = 20.0
+
     OPENAI_API_KEY: str | None = None
     ANTHROPIC_API_KEY: str | None = None
     EMBEDDING_MODEL: str = "text-embedding-3-small"
     EMBEDDING_DIMENSIONS: int = 1536
+    # Texts per embeddings request when embedding in bulk.
+    EMBEDDING_BATCH_SIZE: int = 128
 
     # -------------------------------------------------------------------------
     # Memory Attachments (Multimodal MVP)
@@ -256,12 +289,17 @@ class Settings(BaseSettings):
     MAX_ATTACHMENT_SIZE_BYTES: int | None = None
     # Enable extracted-text indexing into Qdrant.
     ATTACHMENT_INDEXING_ENABLED: bool | None = None
-    # Maximum characters to embed per attachment.
+    # Maximum extracted characters indexed per attachment (default 1M).
     ATTACHMENT_INDEX_MAX_CHARS: int | None = None
     # Maximum file size (bytes) eligible for extraction/indexing.
     ATTACHMENT_INDEX_MAX_FILE_BYTES: int | None = None
     # Read at most N bytes from head of file for indexing (default 2MB).
     ATTACHMENT_INDEX_READ_HEAD_BYTES: int | None = None
+    # Extracted text is split into overlapping chunks, one vector per chunk.
+    ATTACHMENT_CHUNK_CHARS: int = 1500
+    ATTACHMENT_CHUNK_OVERLAP_CHARS: int = 200
+    # Worker processes for text extraction / OCR (0 = run in a thread).
+    ATTACHMENT_EXTRACTION_WORKERS: int = 2
 
     # Optional OCR sidecar (HTTP API around tesseract)
     OCR_SERVICE_URL: str | None = None
@@ -293,6 +331,119 @@ class Settings(BaseSettings):
     SEARCH_FEEDBACK_RERANK_POSITIVE_MULTIPLIER: float = 1.15
     SEARCH_FEEDBACK_RERANK_NEGATIVE_MULTIPLIER: float = 0.5
 
+    # -------------------------------------------------------------------------
+    # Near-duplicate Detection (consolidation)
+    # -------------------------------------------------------------------------
+    # MinHash signature length; bands * rows must equal the permutation count.
+    # 16 bands x 8 rows puts the LSH candidate threshold near Jaccard 0.7.
+    NEAR_DUP_MINHASH_PERMUTATIONS: int = 128
+    NEAR_DUP_LSH_BANDS: int = 16
+    # Buckets larger than this (e.g. boilerplate text) are ignored when
+    # generating candidate pairs, keeping the pair join bounded.
+    NEAR_DUP_MAX_BUCKET_SIZE: int = 500
+    # Memories without a signature indexed per backfill transaction, and the
+    # number of such batches per org in one backfill task run.
+    NEAR_DUP_BACKFILL_BATCH_SIZE: int = 1000
+    NEAR_DUP_BACKFILL_MAX_BATCHES: int = 20
+
+    # -------------------------------------------------------------------------
+    # Filtered Search (advanced / faceted)
+    # -------------------------------------------------------------------------
+    # Vector hits fetched for a faceted text query; facets cover this set.
+    SEARCH_FACET_CANDIDATE_LIMIT: int = 1000
+    # Maximum distinct tags / authors returned per facet.
+    SEARCH_FACET_TOP_N: int = 50
+    # Points updated per request when backfilling filter/ACL payload fields.
+    SEARCH_PAYLOAD_BACKFILL_BATCH_SIZE: int = 500
+    # Encode the caller's access context into the Qdrant filter so the
+    # vector leg returns (mostly) authorized hits instead of over-fetching.
+    SEARCH_ACL_PREFILTER_ENABLED: bool = True
+    # Users with more active shares than this fall back to over-fetching.
+    SEARCH_ACL_PREFILTER_MAX_SHARED_IDS: int = 2000
+
+    # -------------------------------------------------------------------------
+    # Bulk Memory Ingest (POST /memories/bulk)
+    # -------------------------------------------------------------------------
+    # Items embedded, inserted and committed together (one outbox event each).
+    MEMORY_BULK_INGEST_BATCH_SIZE: int = 200
+    # Items accepted per request; the rest is reported as truncated.
+    MEMORY_BULK_INGEST_MAX_ITEMS: int = 50000
+
+    # -------------------------------------------------------------------------
+    # Memory Metadata Cache (read-through, in-process LRU + Redis)
+    # -------------------------------------------------------------------------
+    MEMORY_METADATA_CACHE_ENABLED: bool = True
+    # Entries kept in each process's LRU (across all tenants).
+    MEMORY_METADATA_CACHE_LOCAL_SIZE: int = 10000
+    # Upper bound on how long a local entry lives; freshness is checked
+    # against the Redis version stamp on every read regardless.
+    MEMORY_METADATA_CACHE_LOCAL_TTL_SECONDS: int = 300
+    # TTL of the shared Redis tier entries.
+    MEMORY_METADATA_CACHE_REDIS_TTL_SECONDS: int = 3600
+
+    # -------------------------------------------------------------------------
+    # Access Context Cache (compiled per-user teams/shares/scopes/clearance)
+    # -------------------------------------------------------------------------
+    ACCESS_CONTEXT_CACHE_ENABLED: bool = True
+    # Contexts kept in each process's LRU (one per active user and org).
+    ACCESS_CONTEXT_CACHE_LOCAL_SIZE: int = 5000
+    ACCESS_CONTEXT_CACHE_LOCAL_TTL_SECONDS: int = 300
+    # TTL of the shared Redis tier entries; bounds staleness if an
+    # invalidation is ever missed.
+    ACCESS_CONTEXT_CACHE_REDIS_TTL_SECONDS: int = 900
+
+    # -------------------------------------------------------------------------
+    # Capability Token Cache (memory syscall token verification)
+    # -------------------------------------------------------------------------
+    CAPABILITY_TOKEN_CACHE_ENABLED: bool = True
+    CAPABILITY_TOKEN_CACHE_LOCAL_SIZE: int = 5000
+    CAPABILITY_TOKEN_CACHE_LOCAL_TTL_SECONDS: int = 60
+    # Revocation invalidates entries immediately; the TTL bounds staleness
+    # (and how old the usage seed of an evicted Redis counter can be).
+    CAPABILITY_TOKEN_CACHE_REDIS_TTL_SECONDS: int = 600
+    # Seconds between reconciling Redis usage counters into Postgres.
+    CAPABILITY_USAGE_RECONCILE_INTERVAL_SECONDS: float = 60.0
+    CAPABILITY_USAGE_RECONCILE_BATCH_SIZE: int = 1000
+
+    # -------------------------------------------------------------------------
+    # Pipeline Scheduling
+    # -------------------------------------------------------------------------
+    # Tasks a worker claims per dequeue round-trip.
+    PIPELINE_CLAIM_BATCH_SIZE: int = 10
+    # Fair-share weight per organization id (unlisted organizations get 1).
+    PIPELINE_FAIR_SHARE_WEIGHTS: Dict[str, float] = Field(default_factory=dict)
+    # Unified pipeline backpressure and concurrency limits (per organization).
+    PIPELINE_MAX_QUEUE_DEPTH: int = 1000
+    PIPELINE_MAX_RUNNING_PER_ORG: int = 5
+
+    # -------------------------------------------------------------------------
+    # CognitiveLoop Execution
+    # -------------------------------------------------------------------------
+    # Plan steps executed at once (independent steps run concurrently).
+    COGNITIVE_EXECUTOR_MAX_PARALLEL_STEPS: int = 8
+    # Defaults for tools whose ToolSpec does not set its own limit/timeout.
+    COGNITIVE_TOOL_MAX_CONCURRENCY: int = 4
+    COGNITIVE_TOOL_TIMEOUT_SECONDS: float = 60.0
+    # Evidence is retrieved once per loop session and re-ranked per iteration.
+    COGNITIVE_EVIDENCE_SESSION_CACHE_ENABLED: bool = True
+    COGNITIVE_EVIDENCE_POOL_MULTIPLIER: int = 3
+    # Share of the re-rank score given to overlap with the latest critique.
+    COGNITIVE_EVIDENCE_CONTEXT_WEIGHT: float = 0.3
+    # Skip audit/explanation/activation writes when a session has to search again.
+    COGNITIVE_EVIDENCE_SUPPRESS_REPEAT_SIDE_EFFECTS: bool = True
+
+    # -------------------------------------------------------------------------
+    # Request Profiling
+    # -------------------------------------------------------------------------
+    # Track per-request DB statements and Redis/Qdrant/HTTP time.
+    REQUEST_PROFILING_ENABLED: bool = True
+    # Expose per-request totals to clients via the Server-Timing header.
+    REQUEST_PROFILE_SERVER_TIMING: bool = True
+    # Warn when one statement fingerprint runs this many times in a request (0 disables).
+    REQUEST_PROFILE_N_PLUS_ONE_THRESHOLD: int = 10
+    # Log a full statement profile for requests slower than this (unset disables).
+    REQUEST_PROFILE_SLOW_MS: float | None = None
+
     # -------------------------------------------------------------------------
     # Logseq Integration
     # -------------------------------------------------------------------------
@@ -309,6 +460,44 @@ class Settings(BaseSettings):
     # -------------------------------------------------------------------------
     # Directory for snapshot export bundles (zip artifacts). Defaults to exports/snapshots.
     SNAPSHOT_EXPORT_DIR: str | None = None
+    # Root of the local object store for streamed memory/knowledge exports.
+    EXPORT_OBJECT_STORE_DIR: str | None = None
+    # Rows fetched per server-side cursor round-trip (and per Parquet row group).
+    EXPORT_STREAM_BATCH_SIZE: int = 1000
+    # Rows per COPY/merge/Qdrant-upsert round when restoring a memory snapshot.
+    SNAPSHOT_IMPORT_BATCH_SIZE: int = 1000
+    # Concurrent embedding calls when re-embedding records without a stored vector.
+    SNAPSHOT_IMPORT_EMBED_CONCURRENCY: int = 8
+
+    # -------------------------------------------------------------------------
+    # Memory Event Stream (SSE)
+    # -------------------------------------------------------------------------
+    # Push memory events to SSE clients from a Redis stream (falls back to DB
+    # polling per client when Redis is unavailable).
+    MEMORY_STREAM_HUB_ENABLED: bool = True
+    MEMORY_STREAM_REDIS_KEY: str = "memstream:events"
+    # Approximate cap on the shared Redis stream (XADD MAXLEN ~).
+    MEMORY_STREAM_MAXLEN: int = 10000
+    # Events kept per org for Last-Event-ID / `since` replay.
+    MEMORY_STREAM_REPLAY_SIZE: int = 500
+    # Orgs with a replay buffer held in memory (idle orgs are dropped first).
+    MEMORY_STREAM_MAX_ORGS: int = 1000
+    # Pending events per client; a client that falls this far behind is
+    # disconnected and resumes with Last-Event-ID.
+    MEMORY_STREAM_QUEUE_SIZE: int = 256
+    MEMORY_STREAM_BLOCK_MS: int = 5000
+    MEMORY_STREAM_HEARTBEAT_SECONDS: float = 15.0
+
+    # -------------------------------------------------------------------------
+    # Usage Rollups
+    # -------------------------------------------------------------------------
+    # Request/token deltas are buffered in-process and upserted into
+    # usage_rollups at most this often per org...
+    USAGE_ROLLUP_FLUSH_SECONDS: float = 10.0
+    # ...or as soon as this many buckets are pending.
+    USAGE_ROLLUP_MAX_PENDING: int = 2000
+    USAGE_ROLLUP_MINUTE_RETENTION_HOURS: int = 48
+    USAGE_ROLLUP_HOUR_RETENTION_DAYS: int = 400
 
     # -------------------------------------------------------------------------
     # Helper Methods
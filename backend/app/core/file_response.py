@@ -0,0 +1,161 @@
+"""
+File Responses with Byte Ranges
+===============================
+
+``file_response`` serves a file from disk with HTTP Range support
+(Starlette's ``FileResponse`` always sends the whole file):
+
+- ``Range: bytes=a-b`` / ``a-`` / ``-n`` answers ``206`` with just that span;
+  multi-range requests get the whole file, unsatisfiable ones ``416``
+- ``If-Range`` and ``If-None-Match`` are checked against the caller's ETag
+  (attachments use their SHA-256, which never changes for a given URL)
+- when the ASGI server offers the ``http.response.zerocopysend`` extension the
+  body is handed to it as (file, offset, count) so the kernel copies it
+  (sendfile); otherwise it is streamed in chunks
+"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Optional, Tuple
+
+import anyio
+from starlette.requests import Request
+from starlette.responses import FileResponse, Response
+from starlette.types import Receive, Scope, Send
+
+ZEROCOPY_EXTENSION = "http.response.zerocopysend"
+
+
+class RangeNotSatisfiableError(ValueError):
+    pass
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range ``Range`` header into inclusive ``(start, end)``.
+
+    Returns None when the whole file should be sent (no header, another unit,
+    several ranges, or a malformed value).
+
+    Raises:
+        RangeNotSatisfiableError: If the range lies outside the file
+    """
+    if not header:
+        return None
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, sep, last = spec.strip().partition("-")
+    if not sep:
+        return None
+    try:
+        if first == "":
+            suffix = int(last)
+            if suffix <= 0:
+                raise RangeNotSatisfiableError(header)
+            return max(0, size - suffix), size - 1
+        start = int(first)
+        end = int(last) if last else size - 1
+    except ValueError:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiableError(header)
+    if start < 0 or end < start:
+        return None
+    return start, min(end, size - 1)
+
+
+class RangedFileResponse(FileResponse):
+    """``FileResponse`` for one byte span, using zero-copy send when offered."""
+
+    def __init__(self, path: Path, *, offset: int, count: int, **kwargs):
+        super().__init__(path, **kwargs)
+        self.offset = offset
+        self.count = count
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send(
+            {
+                "type": "http.response.start",
+                "status": self.status_code,
+                "headers": self.raw_headers,
+            }
+        )
+        if scope["method"].upper() == "HEAD" or self.count == 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        elif ZEROCOPY_EXTENSION in (scope.get("extensions") or {}):
+            with open(self.path, "rb") as file:
+                await send(
+                    {
+                        "type": ZEROCOPY_EXTENSION,
+                        "file": file,
+                        "offset": self.offset,
+                        "count": self.count,
+                        "more_body": False,
+                    }
+                )
+        else:
+            async with await anyio.open_file(self.path, mode="rb") as file:
+                await file.seek(self.offset)
+                remaining = self.count
+                while remaining > 0:
+                    chunk = await file.read(min(self.chunk_size, remaining))
+                    if not chunk:
+                        break
+                    remaining -= len(chunk)
+                    await send(
+                        {
+                            "type": "http.response.body",
+                            "body": chunk,
+                            "more_body": remaining > 0,
+                        }
+                    )
+                if remaining > 0:
+                    await send({"type": "http.response.body", "body": b"", "more_body": False})
+        if self.background is not None:
+            await self.background()
+
+
+def file_response(
+    request: Request,
+    path: Path,
+    *,
+    media_type: str,
+    filename: Optional[str] = None,
+    etag: Optional[str] = None,
+) -> Response:
+    """Serve ``path`` honouring ``Range``, ``If-Range`` and ``If-None-Match``."""
+    stat_result = os.stat(path)
+    size = stat_result.st_size
+    headers = {"accept-ranges": "bytes"}
+    if etag:
+        headers["etag"] = f'"{etag}"'
+        if request.headers.get("if-none-match") in (headers["etag"], "*"):
+            return Response(status_code=304, headers=headers)
+
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if if_range is not None and if_range != headers.get("etag"):
+        range_header = None  # representation changed: send it whole
+
+    try:
+        span = parse_range(range_header, size)
+    except RangeNotSatisfiableError:
+        return Response(status_code=416, headers={**headers, "content-range": f"bytes */{size}"})
+
+    start, end = span if span is not None else (0, size - 1)
+    headers["content-length"] = str(max(0, end - start + 1))
+    if span is not None:
+        headers["content-range"] = f"bytes {start}-{end}/{size}"
+    return RangedFileResponse(
+        path,
+        offset=start,
+        count=max(0, end - start + 1),
+        status_code=206 if span is not None else 200,
+        headers=headers,
+        media_type=media_type,
+        filename=filename,
+        stat_result=stat_result,
+    )
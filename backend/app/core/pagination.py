@@ -0,0 +1,141 @@
+"""
+Keyset Pagination
+=================
+
+Cursor-based paging over ``(sort_key, id)`` in descending order.
+
+OFFSET paging makes Postgres produce and discard every skipped row, so deep
+pages get linearly slower. A keyset page instead starts right after the last
+row of the previous page (``WHERE (sort_key, id) < (:last_key, :last_id)``).
+With an index on ``(organization_id, sort_key, id)`` every page costs the
+same. The ``id`` tie-breaker keeps rows with equal timestamps from being
+skipped or repeated.
+
+Cursors are opaque to clients: URL-safe base64 of the last row's key.
+
+Totals are optional (``CountMode``):
+
+- ``exact``: ``count(*)`` over the filtered query (a full scan of the matches)
+- ``estimate``: the planner's row estimate from ``EXPLAIN`` (no scan)
+- ``none``: no total
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Generic, List, Literal, Optional, Tuple, TypeVar
+
+from sqlalchemy import func, literal, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql import Select
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+T = TypeVar("T")
+
+CountMode = Literal["exact", "estimate", "none"]
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a cursor token cannot be decoded."""
+
+
+def encode_cursor(sort_value: datetime, row_id: Any) -> str:
+    raw = json.dumps([sort_value.isoformat(), str(row_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str) -> Tuple[datetime, str]:
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(sort_value), str(row_id)
+    except (ValueError, TypeError, UnicodeError) as e:
+        raise InvalidCursorError("Invalid pagination cursor") from e
+
+
+@dataclass
+class KeysetPage(Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None
+
+    @property
+    def has_more(self) -> bool:
+        return self.next_cursor is not None
+
+
+async def keyset_page(
+    session: AsyncSession,
+    stmt: Select,
+    sort_column: Any,
+    id_column: Any,
+    *,
+    limit: int,
+    cursor: Optional[str] = None,
+    offset: int = 0,
+) -> KeysetPage:
+    """
+    Fetch one page of ``stmt`` ordered by ``(sort_column, id_column)`` DESC.
+
+    ``stmt`` selects ORM entities that expose both columns as attributes.
+    Without a cursor, ``offset`` serves legacy page-number clients; their
+    page still carries a ``next_cursor`` so they can switch to keyset paging.
+
+    Raises:
+        InvalidCursorError: If ``cursor`` is malformed
+    """
+    page_stmt = stmt.order_by(None).order_by(sort_column.desc(), id_column.desc())
+    if cursor:
+        sort_value, row_id = decode_cursor(cursor)
+        # Bind with the column types: the cursor id is a string, and asyncpg
+        # would otherwise cast it to VARCHAR (there is no uuid < varchar).
+        page_stmt = page_stmt.where(
+            tuple_(sort_column, id_column)
+            < tuple_(literal(sort_value, sort_column.type), literal(row_id, id_column.type))
+        )
+    elif offset:
+        page_stmt = page_stmt.offset(offset)
+
+    rows = list((await session.execute(page_stmt.limit(limit + 1))).scalars().all())
+    if len(rows) <= limit:
+        return KeysetPage(items=rows)
+
+    rows = rows[:limit]
+    last = rows[-1]
+    return KeysetPage(
+        items=rows,
+        next_cursor=encode_cursor(getattr(last, sort_column.key), getattr(last, id_column.key)),
+    )
+
+
+class _Explain(Executable, ClauseElement):
+    inherit_cache = False
+
+    def __init__(self, statement: Select):
+        self.statement = statement
+
+
+@compiles(_Explain)
+def _compile_explain(element: _Explain, compiler, **kw) -> str:
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+async def estimate_rows(session: AsyncSession, stmt: Select) -> int:
+    """The planner's row estimate for ``stmt`` (statistics only, no scan)."""
+    plan = (await session.execute(_Explain(stmt.order_by(None)))).scalar()
+    if isinstance(plan, (str, bytes)):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def count_rows(session: AsyncSession, stmt: Select, mode: CountMode = "exact") -> Optional[int]:
+    """Total rows of ``stmt`` per ``mode`` (None for ``none``)."""
+    if mode == "none":
+        return None
+    if mode == "estimate":
+        return await estimate_rows(session, stmt)
+    count_stmt = select(func.count()).select_from(stmt.order_by(None).subquery())
+    return int((await session.execute(count_stmt)).scalar() or 0)
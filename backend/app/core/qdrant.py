@@ -4,9 +4,13 @@ Qdrant Vector Database Client
 
 Client for Qdrant vector database operations with built-in
 organization filtering for multi-tenant security.
+
+Each organization's points live in the collection(s) chosen by
+``CollectionRouter``: the shared collection for most tenants, a dedicated
+one for large tenants. Every operation takes the org id so it can be routed.
 """
 
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterable
 from uuid import UUID
 
 from qdrant_client import QdrantClient
@@ -14,14 +18,46 @@ from qdrant_client.http import models as qdrant_models
 from qdrant_client.http.models import (
     Filter,
     FieldCondition,
+    IsEmptyCondition,
+    MatchAny,
     MatchValue,
+    PayloadField,
+    PayloadSchemaType,
     Range,
     PointStruct,
     VectorParams,
     Distance,
+    HnswConfigDiff,
+    ScalarQuantization,
+    ScalarQuantizationConfig,
+    ScalarType,
+    SearchParams,
 )
 
 from app.core.config import settings
+from app.core.qdrant_routing import CollectionConfig, CollectionRouter
+from app.core.request_profiler import SPAN_QDRANT, profile_span
+
+
+# Payload fields that filtered search pushes down into Qdrant. Indexing them
+# lets Qdrant apply the filter during HNSW traversal instead of post-filtering.
+PAYLOAD_INDEXES: Dict[str, PayloadSchemaType] = {
+    "organization_id": PayloadSchemaType.KEYWORD,
+    "scope": PayloadSchemaType.KEYWORD,
+    "team_id": PayloadSchemaType.KEYWORD,
+    "owner_id": PayloadSchemaType.KEYWORD,
+    # ACL pre-filtering (see build_acl_filter).
+    "scope_id": PayloadSchemaType.KEYWORD,
+    "memory_id": PayloadSchemaType.KEYWORD,
+    "required_clearance": PayloadSchemaType.INTEGER,
+    # Attachment chunk points (re-index / delete by attachment).
+    "attachment_id": PayloadSchemaType.KEYWORD,
+    "tags": PayloadSchemaType.KEYWORD,
+    "memory_type": PayloadSchemaType.KEYWORD,
+    "classification": PayloadSchemaType.KEYWORD,
+    # Epoch seconds of created_at; range filters need a numeric field.
+    "created_ts": PayloadSchemaType.FLOAT,
+}
 
 
 class QdrantService:
@@ -35,6 +71,7 @@ class QdrantService:
     """
     
     _client: Optional[QdrantClient] = None
+    _ready_collections: set = set()
     
     @classmethod
     def get_client(cls) -> QdrantClient:
@@ -53,27 +90,63 @@ class QdrantService:
         return cls._client
     
     @classmethod
-    async def ensure_collection(cls) -> None:
+    async def ensure_collection(
+        cls,
+        collection_name: Optional[str] = None,
+        config: Optional[CollectionConfig] = None,
+    ) -> None:
         """
-        Ensure the memories collection exists with proper configuration.
+        Ensure a memories collection exists with proper configuration.
         
         Creates the collection if it doesn't exist with appropriate
-        vector dimensions and distance metric.
+        vector dimensions and distance metric (plus the tenant's HNSW and
+        quantization settings for dedicated collections), and creates the
+        payload indexes used by filtered search. Runs once per collection
+        per process.
         """
+        collection_name = collection_name or settings.QDRANT_COLLECTION_NAME
+        if collection_name in cls._ready_collections:
+            return
+
         client = cls.get_client()
-        collection_name = settings.QDRANT_COLLECTION_NAME
+        config = config or CollectionConfig()
         
         collections = client.get_collections()
         collection_names = [c.name for c in collections.collections]
         
         if collection_name not in collection_names:
+            hnsw_config = None
+            if config.hnsw_m or config.hnsw_ef_construct:
+                hnsw_config = HnswConfigDiff(m=config.hnsw_m, ef_construct=config.hnsw_ef_construct)
+            quantization_config = None
+            if config.quantization == "scalar":
+                quantization_config = ScalarQuantization(
+                    scalar=ScalarQuantizationConfig(type=ScalarType.INT8, always_ram=True)
+                )
             client.create_collection(
                 collection_name=collection_name,
                 vectors_config=VectorParams(
                     size=settings.EMBEDDING_DIMENSIONS,
                     distance=Distance.COSINE,
                 ),
+                hnsw_config=hnsw_config,
+                quantization_config=quantization_config,
             )
+
+        # Index creation is idempotent, so existing collections pick up
+        # indexes added after they were created.
+        for field_name, schema in PAYLOAD_INDEXES.items():
+            client.create_payload_index(
+                collection_name=collection_name,
+                field_name=field_name,
+                field_schema=schema,
+            )
+        cls._ready_collections.add(collection_name)
+
+    @classmethod
+    def forget_collection(cls, collection_name: str) -> None:
+        """Drop ``collection_name`` from the ready set after it was deleted."""
+        cls._ready_collections.discard(collection_name)
     
     @classmethod
     def build_org_filter(
@@ -113,6 +186,53 @@ class QdrantService:
             return Filter(must=must_conditions)
         return None
     
+    @classmethod
+    def build_acl_filter(
+        cls,
+        user_id: str,
+        clearance_level: int,
+        team_ids: Iterable[str] = (),
+        shared_memory_ids: Iterable[str] = (),
+    ) -> Filter:
+        """
+        Build a filter matching only points the user may read.
+
+        Mirrors the read rules of ``PermissionChecker``: clearance must be
+        met, and then any of ownership, org/global scope, membership of the
+        team scope, or a direct share grants access.
+        Results must still be verified against Postgres.
+
+        Returns:
+            Filter: To be ANDed with the org filter (see ``search``)
+        """
+        readable: List[Any] = [
+            FieldCondition(key="owner_id", match=MatchValue(value=user_id)),
+            FieldCondition(key="scope", match=MatchAny(any=["organization", "global"])),
+        ]
+        team_ids = sorted(team_ids)
+        if team_ids:
+            readable.append(
+                Filter(
+                    must=[
+                        FieldCondition(key="scope", match=MatchValue(value="team")),
+                        FieldCondition(key="scope_id", match=MatchAny(any=team_ids)),
+                    ]
+                )
+            )
+        shared = sorted(shared_memory_ids)
+        if shared:
+            readable.append(FieldCondition(key="memory_id", match=MatchAny(any=shared)))
+
+        clearance = Filter(
+            should=[
+                FieldCondition(key="required_clearance", range=Range(lte=clearance_level)),
+                # Points written before the field existed (until backfilled);
+                # Postgres still enforces clearance on them.
+                IsEmptyCondition(is_empty=PayloadField(key="required_clearance")),
+            ]
+        )
+        return Filter(must=[clearance], should=readable)
+
     @classmethod
     async def upsert_memory(
         cls,
@@ -133,24 +253,102 @@ class QdrantService:
         Returns:
             bool: True if operation successful
         """
-        await cls.ensure_collection()
+        layout = await CollectionRouter.layout(org_id)
         client = cls.get_client()
         
         # Always include organization_id in payload for filtering
         payload["organization_id"] = org_id
         
-        client.upsert(
-            collection_name=settings.QDRANT_COLLECTION_NAME,
-            points=[
-                PointStruct(
-                    id=memory_id,
-                    vector=vector,
-                    payload=payload,
-                ),
-            ],
-        )
+        for collection_name in layout.writes:
+            await cls.ensure_collection(collection_name, layout.config)
+            with profile_span(SPAN_QDRANT):
+                client.upsert(
+                    collection_name=collection_name,
+                    points=[
+                        PointStruct(
+                            id=memory_id,
+                            vector=vector,
+                            payload=payload,
+                        ),
+                    ],
+                )
         return True
-    
+
+    @classmethod
+    async def upsert_memories(
+        cls,
+        org_id: str,
+        points: List[Dict[str, Any]],
+    ) -> int:
+        """
+        Upsert many memory vectors in one request.
+
+        Args:
+            org_id: Organization UUID (stamped into every payload)
+            points: Dicts with ``id``, ``vector`` and ``payload`` keys
+
+        Returns:
+            int: Number of points written
+        """
+        if not points:
+            return 0
+
+        layout = await CollectionRouter.layout(org_id)
+        client = cls.get_client()
+
+        structs = []
+        for point in points:
+            payload = dict(point.get("payload") or {})
+            payload["organization_id"] = org_id
+            structs.append(
+                PointStruct(id=point["id"], vector=point["vector"], payload=payload)
+            )
+
+        for collection_name in layout.writes:
+            await cls.ensure_collection(collection_name, layout.config)
+            with profile_span(SPAN_QDRANT):
+                client.upsert(
+                    collection_name=collection_name,
+                    points=structs,
+                    wait=True,
+                )
+        return len(structs)
+
+    @classmethod
+    async def retrieve_vectors(
+        cls,
+        org_id: str,
+        point_ids: List[str],
+    ) -> Dict[str, List[float]]:
+        """
+        Fetch stored vectors for the given point ids.
+
+        Points belonging to another organization are ignored.
+
+        Returns:
+            Mapping of point id to vector (missing points are omitted)
+        """
+        if not point_ids:
+            return {}
+
+        layout = await CollectionRouter.layout(org_id)
+        client = cls.get_client()
+        with profile_span(SPAN_QDRANT):
+            records = client.retrieve(
+                collection_name=layout.read,
+                ids=point_ids,
+                with_payload=["organization_id"],
+                with_vectors=True,
+            )
+
+        vectors: Dict[str, List[float]] = {}
+        for record in records:
+            if (record.payload or {}).get("organization_id") != org_id:
+                continue
+            if record.vector is not None:
+                vectors[str(record.id)] = list(record.vector)
+        return vectors
+
     @classmethod
     async def search(
         cls,
@@ -161,6 +359,9 @@ class QdrantService:
         scope_filter: Optional[str] = None,
         team_id: Optional[str] = None,
         classification_max: Optional[str] = None,
+        conditions: Optional[List[FieldCondition]] = None,
+        acl_filter: Optional[Filter] = None,
+        group_by: Optional[str] = None,
     ) -> List[Dict[str, Any]]:
         """
         Search for similar memories with organization filtering.
@@ -176,14 +377,21 @@ class QdrantService:
             scope_filter: Optional scope filter (personal/team/org)
             team_id: Optional team filter
             classification_max: Optional max classification level
+            conditions: Extra payload conditions (ANDed with the rest)
+            acl_filter: Caller's access filter from ``build_acl_filter``
+            group_by: Payload key to collapse hits on (best hit per value),
+                e.g. ``memory_id`` so attachment chunks count once per memory
         
         Returns:
             List of search results with scores and payloads
         """
+        layout = await CollectionRouter.layout(org_id)
         client = cls.get_client()
         
         # Build filter conditions
-        filter_conditions = []
+        filter_conditions = list(conditions or [])
+        if acl_filter is not None:
+            filter_conditions.append(acl_filter)
         
         if scope_filter:
             filter_conditions.append(
@@ -205,13 +413,28 @@ class QdrantService:
         search_filter = cls.build_org_filter(org_id, filter_conditions)
         
         # Perform search
-        results = client.search(
-            collection_name=settings.QDRANT_COLLECTION_NAME,
-            query_vector=query_vector,
-            query_filter=search_filter,
-            limit=limit,
-            score_threshold=score_threshold,
-        )
+        with profile_span(SPAN_QDRANT):
+            if group_by:
+                groups = client.search_groups(
+                    collection_name=layout.read,
+                    query_vector=query_vector,
+                    group_by=group_by,
+                    query_filter=search_filter,
+                    search_params=cls._search_params(layout.config),
+                    limit=limit,
+                    group_size=1,
+                    score_threshold=score_threshold,
+                ).groups
+                results = [group.hits[0] for group in groups if group.hits]
+            else:
+                results = client.search(
+                    collection_name=layout.read,
+                    query_vector=query_vector,
+                    query_filter=search_filter,
+                    search_params=cls._search_params(layout.config),
+                    limit=limit,
+                    score_threshold=score_threshold,
+                )
         
         return [
             {
@@ -222,6 +445,48 @@ class QdrantService:
             for result in results
         ]
 
+    @classmethod
+    async def set_payloads(
+        cls,
+        org_id: str,
+        payloads: Dict[str, Dict[str, Any]],
+    ) -> int:
+        """
+        Merge payload fields into existing points, one batched request.
+
+        Used to backfill denormalized fields on points written before the
+        field existed. Callers pass point ids read from the org's own
+        Postgres rows, so no cross-tenant ids can reach this call.
+
+        Args:
+            org_id: Organization UUID
+            payloads: Mapping of point id to the payload keys to set
+
+        Returns:
+            int: Number of points updated
+        """
+        if not payloads:
+            return 0
+
+        layout = await CollectionRouter.layout(org_id)
+        client = cls.get_client()
+        operations = [
+            qdrant_models.SetPayloadOperation(
+                set_payload=qdrant_models.SetPayload(
+                    payload=payload,
+                    points=[point_id],
+                )
+            )
+            for point_id, payload in payloads.items()
+        ]
+        for collection_name in layout.writes:
+            with profile_span(SPAN_QDRANT):
+                client.batch_update_points(
+                    collection_name=collection_name,
+                    update_operations=operations,
+                )
+        return len(operations)
+
     @classmethod
     async def recommend_by_point_id(
         cls,
@@ -242,20 +507,23 @@ class QdrantService:
             score_threshold: Minimum similarity score
             with_payload: Include payload in results
         """
+        layout = await CollectionRouter.layout(org_id)
         client = cls.get_client()
 
         recommend_filter = cls.build_org_filter(org_id)
 
-        results = client.recommend(
-            collection_name=settings.QDRANT_COLLECTION_NAME,
-            positive=[positive_point_id],
-            negative=None,
-            query_filter=recommend_filter,
-            limit=limit,
-            score_threshold=score_threshold,
-            with_payload=with_payload,
-            with_vectors=False,
-        )
+        with profile_span(SPAN_QDRANT):
+            results = client.recommend(
+                collection_name=layout.read,
+                positive=[positive_point_id],
+                negative=None,
+                query_filter=recommend_filter,
+                search_params=cls._search_params(layout.config),
+                limit=limit,
+                score_threshold=score_threshold,
+                with_payload=with_payload,
+                with_vectors=False,
+            )
 
         return [
             {
@@ -282,15 +550,17 @@ class QdrantService:
         Returns:
             bool: True if deleted
         """
+        layout = await CollectionRouter.layout(org_id)
         client = cls.get_client()
         
-        # Delete with org filter for safety
-        client.delete(
-            collection_name=settings.QDRANT_COLLECTION_NAME,
-            points_selector=qdrant_models.PointIdsList(
-                points=[memory_id],
-            ),
-        )
+        for collection_name in layout.writes:
+            with profile_span(SPAN_QDRANT):
+                client.delete(
+                    collection_name=collection_name,
+                    points_selector=qdrant_models.PointIdsList(
+                        points=[memory_id],
+                    ),
+                )
         return True
     
     @classmethod
@@ -303,29 +573,70 @@ class QdrantService:
         Args:
             org_id: Organization UUID
         """
+        layout = await CollectionRouter.layout(org_id)
+        for collection_name in layout.writes:
+            await cls.delete_org_points(collection_name, org_id)
+        return True
+
+    @classmethod
+    async def delete_org_points(cls, collection_name: str, org_id: str) -> None:
+        """Delete an organization's points from one specific collection."""
         client = cls.get_client()
-        
-        client.delete(
-            collection_name=settings.QDRANT_COLLECTION_NAME,
-            points_selector=qdrant_models.FilterSelector(
-                filter=Filter(
-                    must=[
-                        FieldCondition(
-                            key="organization_id",
-                            match=MatchValue(value=org_id),
-                        ),
-                    ],
+        with profile_span(SPAN_QDRANT):
+            client.delete(
+                collection_name=collection_name,
+                points_selector=qdrant_models.FilterSelector(
+                    filter=Filter(
+                        must=[
+                            FieldCondition(
+                                key="organization_id",
+                                match=MatchValue(value=org_id),
+                            ),
+                        ],
+                    ),
                 ),
-            ),
-        )
-        return True
+            )
 
     @classmethod
-    async def delete_point(cls, point_id: str) -> bool:
+    async def delete_point(cls, point_id: str, org_id: str) -> bool:
         """Delete a single point by id (memory vector or attachment vector)."""
+        layout = await CollectionRouter.layout(org_id)
         client = cls.get_client()
-        client.delete(
-            collection_name=settings.QDRANT_COLLECTION_NAME,
-            points_selector=qdrant_models.PointIdsList(points=[point_id]),
-        )
+        for collection_name in layout.writes:
+            with profile_span(SPAN_QDRANT):
+                client.delete(
+                    collection_name=collection_name,
+                    points_selector=qdrant_models.PointIdsList(points=[point_id]),
+                )
         return True
+
+    @classmethod
+    async def delete_attachment_points(cls, org_id: str, attachment_id: str) -> None:
+        """Delete every point (chunk) indexed for one attachment."""
+        layout = await CollectionRouter.layout(org_id)
+        client = cls.get_client()
+        selector = qdrant_models.FilterSelector(
+            filter=cls.build_org_filter(
+                org_id,
+                [FieldCondition(key="attachment_id", match=MatchValue(value=str(attachment_id)))],
+            ),
+        )
+        for collection_name in layout.writes:
+            with profile_span(SPAN_QDRANT):
+                client.delete(collection_name=collection_name, points_selector=selector)
+
+    @classmethod
+    async def delete_points(cls, collection_name: str, point_ids: List[Any]) -> None:
+        """Delete points by id from one specific collection (migrations)."""
+        client = cls.get_client()
+        with profile_span(SPAN_QDRANT):
+            client.delete(
+                collection_name=collection_name,
+                points_selector=qdrant_models.PointIdsList(points=point_ids),
+            )
+
+    @staticmethod
+    def _search_params(config: CollectionConfig) -> Optional[SearchParams]:
+        if config.search_hnsw_ef is None:
+            return None
+        return SearchParams(hnsw_ef=config.search_hnsw_ef)
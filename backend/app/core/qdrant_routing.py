@@ -0,0 +1,124 @@
+"""
+Qdrant Collection Routing
+=========================
+
+Resolves which Qdrant collection(s) serve an organization.
+
+Organizations without a ``vector_collection_routes`` row live in the shared
+collection (``settings.QDRANT_COLLECTION_NAME``). Large tenants are moved to
+dedicated collections so their HNSW graphs no longer sit in the traversal
+path of every small tenant's search.
+
+Routes are loaded as one small table and kept in-process for
+``QDRANT_ROUTE_CACHE_TTL_SECONDS``. The migration protocol tolerates that
+staleness: every state change keeps dual writes on for at least one TTL
+before the next step relies on it.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import select
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CollectionConfig:
+    """Per-tenant collection settings (None = Qdrant defaults)."""
+
+    hnsw_m: Optional[int] = None
+    hnsw_ef_construct: Optional[int] = None
+    search_hnsw_ef: Optional[int] = None
+    quantization: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class CollectionLayout:
+    """Where one organization's vectors are read from and written to."""
+
+    read: str
+    writes: Tuple[str, ...]
+    config: CollectionConfig = CollectionConfig()
+
+
+def shared_collection() -> str:
+    return settings.QDRANT_COLLECTION_NAME
+
+
+def dedicated_collection_name(org_id: str) -> str:
+    """Name of an organization's dedicated collection."""
+    return f"{settings.QDRANT_COLLECTION_NAME}_org_{str(org_id).replace('-', '')}"
+
+
+class CollectionRouter:
+    """In-process view of ``vector_collection_routes``."""
+
+    _layouts: Dict[str, CollectionLayout] = {}
+    _loaded_at: float = float("-inf")
+    _lock: Optional[asyncio.Lock] = None
+
+    @classmethod
+    async def layout(cls, org_id: Optional[str]) -> CollectionLayout:
+        """Collections serving ``org_id`` (the shared one unless routed)."""
+        if org_id and settings.QDRANT_TENANT_ROUTING_ENABLED:
+            await cls._refresh_if_stale()
+            layout = cls._layouts.get(str(org_id))
+            if layout is not None:
+                return layout
+        shared = shared_collection()
+        return CollectionLayout(read=shared, writes=(shared,))
+
+    @classmethod
+    def invalidate(cls) -> None:
+        """Reload routes on next use (this process only; others follow the TTL)."""
+        cls._loaded_at = float("-inf")
+
+    @classmethod
+    async def _refresh_if_stale(cls) -> None:
+        ttl = settings.QDRANT_ROUTE_CACHE_TTL_SECONDS
+        if time.monotonic() - cls._loaded_at < ttl:
+            return
+        if cls._lock is None:
+            cls._lock = asyncio.Lock()
+        async with cls._lock:
+            if time.monotonic() - cls._loaded_at < ttl:
+                return
+            try:
+                cls._layouts = await cls._load()
+            except Exception as e:
+                # Keep serving the last known routes; retry after the TTL.
+                logger.warning("Qdrant route refresh failed: %s", e)
+            cls._loaded_at = time.monotonic()
+
+    @staticmethod
+    async def _load() -> Dict[str, CollectionLayout]:
+        from app.core.database import async_session_factory
+        from app.models.vector_collection import VectorCollectionRoute
+
+        async with async_session_factory() as session:
+            routes = (await session.execute(select(VectorCollectionRoute))).scalars().all()
+        return {str(r.organization_id): layout_for_route(r) for r in routes}
+
+
+def layout_for_route(route) -> CollectionLayout:
+    writes = [route.collection_name]
+    if route.secondary_collection and route.secondary_collection != route.collection_name:
+        writes.append(route.secondary_collection)
+    return CollectionLayout(
+        read=route.collection_name,
+        writes=tuple(writes),
+        config=CollectionConfig(
+            hnsw_m=route.hnsw_m,
+            hnsw_ef_construct=route.hnsw_ef_construct,
+            search_hnsw_ef=route.search_hnsw_ef,
+            quantization=route.quantization,
+        ),
+    )
@@ -13,6 +13,7 @@ import redis.asyncio as redis
 from redis.asyncio.connection import ConnectionPool
 
 from app.core.config import settings
+from app.core.request_profiler import SPAN_REDIS, profile_span
 
 
 class RedisClient:
@@ -67,7 +68,8 @@ class RedisClient:
             Cached value or None if not found
         """
         client = await cls.get_client()
-        return await client.get(key)
+        with profile_span(SPAN_REDIS):
+            return await client.get(key)
     
     @classmethod
     async def get_json(cls, key: str) -> Optional[Any]:
@@ -104,9 +106,10 @@ class RedisClient:
             bool: True if successful
         """
         client = await cls.get_client()
-        if ttl:
-            return await client.setex(key, ttl, value)
-        return await client.set(key, value)
+        with profile_span(SPAN_REDIS):
+            if ttl:
+                return await client.setex(key, ttl, value)
+            return await client.set(key, value)
     
     @classmethod
     async def set_json(
@@ -140,7 +143,8 @@ class RedisClient:
             bool: True if key was deleted
         """
         client = await cls.get_client()
-        return await client.delete(key) > 0
+        with profile_span(SPAN_REDIS):
+            return await client.delete(key) > 0
     
     @classmethod
     async def delete_pattern(cls, pattern: str) -> int:
@@ -155,11 +159,12 @@ class RedisClient:
         """
         client = await cls.get_client()
         keys = []
-        async for key in client.scan_iter(pattern):
-            keys.append(key)
-        
-        if keys:
-            return await client.delete(*keys)
+        with profile_span(SPAN_REDIS):
+            async for key in client.scan_iter(pattern):
+                keys.append(key)
+
+            if keys:
+                return await client.delete(*keys)
         return 0
     
     @classmethod
@@ -174,7 +179,8 @@ class RedisClient:
             bool: True if key exists
         """
         client = await cls.get_client()
-        return await client.exists(key) > 0
+        with profile_span(SPAN_REDIS):
+            return await client.exists(key) > 0
 
 
 # Convenience function for dependency injection
@@ -0,0 +1,233 @@
+"""
+Request Profiler
+================
+
+Request-scoped accounting of where latency goes: database statements,
+Redis, Qdrant and outbound HTTP calls.
+
+A ``RequestProfile`` is bound to a context variable by the observability
+middleware for the lifetime of a request. SQLAlchemy cursor events and
+``profile_span`` call sites add to whichever profile is active; outside a
+request (Celery, scripts) recording is a cheap no-op.
+
+Statements are grouped by *fingerprint* (literals and IN-lists stripped) so
+repeated per-row lookups - the classic N+1 pattern - show up as one
+fingerprint with a high count.
+
+This module deliberately imports nothing from ``app`` at module level so
+that low-level clients (Redis, Qdrant) can depend on it without cycles.
+"""
+
+import hashlib
+import logging
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Categories reported in Server-Timing, in display order.
+SPAN_DB = "db"
+SPAN_REDIS = "redis"
+SPAN_QDRANT = "qdrant"
+SPAN_HTTP = "http"
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_CAST = re.compile(r"::\w+(?:\[\])?")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_BIND_PARAM = re.compile(r"\$\d+|%\(\w+\)s|:\w+|\?")
+_IN_LIST = re.compile(r"\bIN\s*\((?:\s*\?\s*,?)+\)", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def fingerprint_statement(statement: str) -> str:
+    """
+    Normalise a SQL statement so structurally identical queries collide.
+
+    Literals and bind parameters become ``?`` and IN-lists of any length
+    collapse to ``IN (?)``.
+    """
+    normalized = _STRING_LITERAL.sub("?", statement)
+    normalized = _CAST.sub("", normalized)
+    normalized = _BIND_PARAM.sub("?", normalized)
+    normalized = _NUMBER_LITERAL.sub("?", normalized)
+    normalized = _IN_LIST.sub("IN (?)", normalized)
+    return _WHITESPACE.sub(" ", normalized).strip()
+
+
+@dataclass
+class StatementStats:
+    """Aggregated timings for one statement fingerprint."""
+
+    fingerprint: str
+    count: int = 0
+    total_seconds: float = 0.0
+
+    @property
+    def digest(self) -> str:
+        return hashlib.sha1(self.fingerprint.encode("utf-8")).hexdigest()[:12]
+
+
+@dataclass
+class SpanStats:
+    """Aggregated timings for one non-DB span category."""
+
+    count: int = 0
+    total_seconds: float = 0.0
+
+
+@dataclass
+class RequestProfile:
+    """Everything measured for a single request."""
+
+    started_at: float = field(default_factory=time.perf_counter)
+    db_count: int = 0
+    db_seconds: float = 0.0
+    statements: Dict[str, StatementStats] = field(default_factory=dict)
+    spans: Dict[str, SpanStats] = field(default_factory=dict)
+
+    def record_statement(self, statement: str, duration: float) -> None:
+        self.db_count += 1
+        self.db_seconds += duration
+        fp = fingerprint_statement(statement)
+        stats = self.statements.get(fp)
+        if stats is None:
+            stats = self.statements[fp] = StatementStats(fingerprint=fp)
+        stats.count += 1
+        stats.total_seconds += duration
+
+    def record_span(self, category: str, duration: float) -> None:
+        stats = self.spans.get(category)
+        if stats is None:
+            stats = self.spans[category] = SpanStats()
+        stats.count += 1
+        stats.total_seconds += duration
+
+    def repeated_statements(self, threshold: int) -> List[StatementStats]:
+        """Fingerprints executed at least ``threshold`` times (likely N+1)."""
+        if threshold <= 0:
+            return []
+        return sorted(
+            (s for s in self.statements.values() if s.count >= threshold),
+            key=lambda s: s.count,
+            reverse=True,
+        )
+
+    def top_statements(self, limit: int = 10) -> List[StatementStats]:
+        return sorted(self.statements.values(), key=lambda s: s.total_seconds, reverse=True)[:limit]
+
+    def server_timing(self, total_seconds: Optional[float] = None) -> str:
+        """Render the profile as a ``Server-Timing`` header value."""
+        parts = [f'{SPAN_DB};dur={self.db_seconds * 1000:.1f};desc="{self.db_count} queries"']
+        for category in (SPAN_REDIS, SPAN_QDRANT, SPAN_HTTP):
+            stats = self.spans.get(category)
+            if stats is not None:
+                parts.append(
+                    f'{category};dur={stats.total_seconds * 1000:.1f};desc="{stats.count} calls"'
+                )
+        if total_seconds is not None:
+            parts.append(f"app;dur={total_seconds * 1000:.1f}")
+        return ", ".join(parts)
+
+    def to_dict(self, top: int = 10) -> Dict[str, Any]:
+        """Serializable summary used for slow-request profile dumps."""
+        return {
+            "db_count": self.db_count,
+            "db_ms": round(self.db_seconds * 1000, 2),
+            "spans": {
+                name: {"count": s.count, "ms": round(s.total_seconds * 1000, 2)}
+                for name, s in self.spans.items()
+            },
+            "top_statements": [
+                {
+                    "digest": s.digest,
+                    "count": s.count,
+                    "ms": round(s.total_seconds * 1000, 2),
+                    "statement": s.fingerprint[:500],
+                }
+                for s in self.top_statements(top)
+            ],
+        }
+
+
+_current_profile: ContextVar[Optional[RequestProfile]] = ContextVar(
+    "ninai_request_profile", default=None
+)
+
+
+def start_request_profile() -> Tuple[RequestProfile, Token]:
+    """Bind a fresh profile to the current context; pass the token to ``end_request_profile``."""
+    profile = RequestProfile()
+    return profile, _current_profile.set(profile)
+
+
+def end_request_profile(token: Token) -> None:
+    _current_profile.reset(token)
+
+
+def current_profile() -> Optional[RequestProfile]:
+    return _current_profile.get()
+
+
+@contextmanager
+def profile_span(category: str) -> Iterator[None]:
+    """
+    Time a block against the active request profile (no-op outside requests).
+
+    Works for both sync and async code since it only measures wall time.
+    """
+    profile = _current_profile.get()
+    if profile is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.record_span(category, time.perf_counter() - start)
+
+
+# Stored on the per-execution context so failed statements leave nothing behind.
+_QUERY_START_ATTR = "_ninai_query_start"
+
+
+def install_query_instrumentation(engine: Any) -> None:
+    """
+    Attach cursor-execute listeners to a (sync) SQLAlchemy engine.
+
+    Every statement is observed in the ``db_query_duration_seconds``
+    histogram and, when a request is active, added to its profile.
+    Pass ``AsyncEngine.sync_engine`` for async engines. Idempotent.
+    """
+    from sqlalchemy import event
+
+    # Lazy import to avoid circular dependency
+    from app.middleware.prometheus import record_db_query
+
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        start = getattr(context, _QUERY_START_ATTR, None)
+        if start is None:
+            return
+        duration = time.perf_counter() - start
+        verb = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "UNKNOWN"
+        try:
+            record_db_query(verb, duration)
+        except Exception:
+            logger.debug("Failed to record db query metric", exc_info=True)
+        profile = _current_profile.get()
+        if profile is not None:
+            profile.record_statement(statement, duration)
+
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        setattr(context, _QUERY_START_ATTR, time.perf_counter())
@@ -0,0 +1,278 @@
+"""
+Versioned Two-Tier Cache
+========================
+
+Read-through cache with an in-process LRU in front of a shared Redis tier,
+kept coherent across processes by version stamps.
+
+Entries live under ``<prefix>:<partition>:<key>`` (the partition is the
+tenant, i.e. the organization). Each entry stores the stamp it was loaded
+under, built from a partition token and a per-key token held in Redis.
+Writers replace the tokens (``invalidate``) and readers compare stamps on
+every read, so an entry filled before a write is never served after it in
+any process. Tokens are random rather than counters: if Redis evicts or
+expires a token key, its replacement cannot collide with a stamp stored in an
+older entry. Token keys expire after twice the longest entry TTL, so tokens
+of keys nobody reads any more do not accumulate.
+
+When Redis is unavailable the cache is bypassed and every read goes to the
+loader.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Generic, Iterable, List, Optional, Tuple, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.redis import RedisClient
+from app.middleware.prometheus import record_cache_hit, record_cache_miss
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+Loader = Callable[[List[str]], Awaitable[Dict[str, T]]]
+
+# Post-commit invalidations scheduled from SQLAlchemy's sync commit hook.
+_background: set = set()
+
+
+class _LocalEntries(Generic[T]):
+    """Bounded in-process LRU of ``(partition, key) -> (stamp, expires_at, value)``."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[str, float, T]]" = OrderedDict()
+
+    def get(self, partition: str, key: str, stamp: str) -> Optional[T]:
+        entry = self._entries.get((partition, key))
+        if entry is None:
+            return None
+        entry_stamp, expires_at, value = entry
+        if entry_stamp != stamp or expires_at <= time.monotonic():
+            self._entries.pop((partition, key), None)
+            return None
+        self._entries.move_to_end((partition, key))
+        return value
+
+    def put(self, partition: str, key: str, stamp: str, value: T, ttl: float) -> None:
+        if self.max_size <= 0:
+            return
+        self._entries[(partition, key)] = (stamp, time.monotonic() + ttl, value)
+        self._entries.move_to_end((partition, key))
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def discard(self, partition: str, keys: Optional[Iterable[str]] = None) -> None:
+        if keys is None:
+            for entry_key in [k for k in self._entries if k[0] == partition]:
+                del self._entries[entry_key]
+            return
+        for key in keys:
+            self._entries.pop((partition, key), None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class VersionedCache(Generic[T]):
+    """
+    Two-tier versioned cache for values of one kind.
+
+    Sizing and TTLs are read from ``settings.<SETTINGS_PREFIX>_ENABLED``,
+    ``_LOCAL_SIZE``, ``_LOCAL_TTL_SECONDS`` and ``_REDIS_TTL_SECONDS``.
+    """
+
+    def __init__(
+        self,
+        prefix: str,
+        settings_prefix: str,
+        encode: Callable[[T], Any],
+        decode: Callable[[Any], T],
+    ):
+        self.prefix = prefix
+        self.settings_prefix = settings_prefix
+        self.encode = encode
+        self.decode = decode
+        self.local: _LocalEntries[T] = _LocalEntries(self._setting("LOCAL_SIZE"))
+
+    def _setting(self, name: str) -> Any:
+        return getattr(settings, f"{self.settings_prefix}_{name}")
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self._setting("ENABLED"))
+
+    def _token_ttl(self) -> int:
+        """Token lifetime: outlives every entry stamped with the token."""
+        longest = max(self._setting("REDIS_TTL_SECONDS"), self._setting("LOCAL_TTL_SECONDS"))
+        return max(1, int(2 * longest))
+
+    def _partition_token_key(self, partition: str) -> str:
+        return f"{self.prefix}:ver:{partition}"
+
+    def _token_key(self, partition: str, key: str) -> str:
+        return f"{self.prefix}:ver:{partition}:{key}"
+
+    def _entry_key(self, partition: str, key: str) -> str:
+        return f"{self.prefix}:{partition}:{key}"
+
+    async def get_many(self, partition: str, keys: Iterable[str], loader: Loader) -> Dict[str, T]:
+        """
+        Values for ``keys``; keys the loader does not return are omitted.
+
+        Local hits cost one Redis MGET for the version stamps; Redis hits add
+        one more MGET; the remainder goes to ``loader`` in a single call and is
+        written back to both tiers.
+        """
+        keys = list(dict.fromkeys(str(k) for k in keys))
+        if not keys:
+            return {}
+        if not self.enabled:
+            return await loader(keys)
+
+        try:
+            client = await RedisClient.get_client()
+            stamps = await self._stamps(client, partition, keys)
+        except Exception as e:
+            logger.debug("%s cache bypassed: %s", self.prefix, e)
+            return await loader(keys)
+
+        found: Dict[str, T] = {}
+        for key in keys:
+            value = self.local.get(partition, key, stamps[key])
+            if value is not None:
+                found[key] = value
+
+        missing = [k for k in keys if k not in found]
+        if missing:
+            try:
+                raw = await client.mget([self._entry_key(partition, k) for k in missing])
+            except Exception:
+                raw = [None] * len(missing)
+            local_ttl = self._setting("LOCAL_TTL_SECONDS")
+            for key, payload in zip(missing, raw):
+                if not payload:
+                    continue
+                entry = json.loads(payload)
+                if entry.get("v") != stamps[key]:
+                    continue
+                found[key] = self.decode(entry["d"])
+                self.local.put(partition, key, stamps[key], found[key], local_ttl)
+
+        missing = [k for k in keys if k not in found]
+        for _ in range(len(keys) - len(missing)):
+            record_cache_hit(self.prefix)
+        for _ in missing:
+            record_cache_miss(self.prefix)
+
+        if missing:
+            # Stamps were read before the load: a write racing with it
+            # replaces the tokens, so what we store here can never match.
+            loaded = await loader(missing)
+            found.update(loaded)
+            await self._store(client, partition, loaded, stamps)
+
+        return {k: found[k] for k in keys if k in found}
+
+    async def _stamps(self, client: Any, partition: str, keys: List[str]) -> Dict[str, str]:
+        token_keys = [self._partition_token_key(partition)] + [
+            self._token_key(partition, k) for k in keys
+        ]
+        tokens = await client.mget(token_keys)
+
+        absent = [tk for tk, token in zip(token_keys, tokens) if token is None]
+        if absent:
+            pipe = client.pipeline(transaction=False)
+            ttl = self._token_ttl()
+            for tk in absent:
+                pipe.set(tk, uuid.uuid4().hex, nx=True, ex=ttl)
+            await pipe.execute()
+            fresh = dict(zip(absent, await client.mget(absent)))
+            tokens = [fresh.get(tk, token) for tk, token in zip(token_keys, tokens)]
+
+        partition_token = tokens[0]
+        return {k: f"{partition_token}:{token}" for k, token in zip(keys, tokens[1:])}
+
+    async def _store(self, client: Any, partition: str, values: Dict[str, T], stamps: Dict[str, str]) -> None:
+        if not values:
+            return
+        try:
+            pipe = client.pipeline(transaction=False)
+            for key, value in values.items():
+                payload = json.dumps({"v": stamps[key], "d": self.encode(value)})
+                pipe.set(self._entry_key(partition, key), payload, ex=self._setting("REDIS_TTL_SECONDS"))
+            await pipe.execute()
+        except Exception as e:
+            logger.debug("%s cache write failed: %s", self.prefix, e)
+            return
+        local_ttl = self._setting("LOCAL_TTL_SECONDS")
+        for key, value in values.items():
+            self.local.put(partition, key, stamps[key], value, local_ttl)
+
+    async def invalidate(
+        self,
+        partition: str,
+        keys: Optional[Iterable[str]] = None,
+        session: Optional[AsyncSession] = None,
+    ) -> None:
+        """
+        Invalidate ``keys`` (or the whole partition) in every process.
+
+        With ``session`` the tokens are replaced again once it commits, so a
+        reader that re-cached the pre-commit state in between is invalidated too.
+        """
+        partition = str(partition)
+        key_list = None if keys is None else [str(k) for k in keys]
+        if key_list == []:
+            return
+        await self._replace_tokens(partition, key_list)
+
+        sync_session = getattr(session, "sync_session", None)
+        if isinstance(sync_session, Session):
+            event.listen(
+                sync_session,
+                "after_commit",
+                self._after_commit_hook(partition, key_list),
+                once=True,
+            )
+
+    async def _replace_tokens(self, partition: str, keys: Optional[List[str]]) -> None:
+        self.local.discard(partition, keys)
+        if not self.enabled:
+            return
+        try:
+            client = await RedisClient.get_client()
+            pipe = client.pipeline(transaction=False)
+            ttl = self._token_ttl()
+            if keys is None:
+                pipe.set(self._partition_token_key(partition), uuid.uuid4().hex, ex=ttl)
+            else:
+                for key in keys:
+                    pipe.set(self._token_key(partition, key), uuid.uuid4().hex, ex=ttl)
+                    pipe.delete(self._entry_key(partition, key))
+            await pipe.execute()
+        except Exception as e:
+            logger.warning("%s cache invalidation failed: %s", self.prefix, e)
+
+    def _after_commit_hook(self, partition: str, keys: Optional[List[str]]) -> Callable[[Any], None]:
+        def _after_commit(_session) -> None:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                return
+            task = loop.create_task(self._replace_tokens(partition, keys))
+            _background.add(task)
+            task.add_done_callback(_background.discard)
+
+        return _after_commit
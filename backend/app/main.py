@@ -21,11 +21,9 @@ from app.core.database import engine, create_db_and_tables, get_db
 from app.core.bootstrap import bootstrap_service, create_default_bootstrap_checks
 from app.core.feature_gate import CommunityFeatureGate, set_feature_gate
 from app.core.enterprise_loader import try_register_enterprise
-from app.middleware.audit_logger import AuditLoggerMiddleware
+from app.core.request_profiler import install_query_instrumentation
+from app.middleware.observability import ObservabilityMiddleware
 from app.middleware.rate_limiter import init_rate_limiter
-from app.middleware.request_id import RequestIdMiddleware
-from app.middleware.prometheus import PrometheusMiddleware, StructuredLoggingMiddleware
-import logging
 
 
 @asynccontextmanager
@@ -48,16 +46,25 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
         
         # Initialize rate limiter with Redis (optional)
         try:
-            from app.core.redis import get_redis_client
-            redis_client = await get_redis_client()
+            from app.core.redis import RedisClient
+            redis_client = await RedisClient.get_client()
             init_rate_limiter(redis_client)
         except Exception:
             pass  # Rate limiting is optional
+
+        from app.services.usage_rollups import usage_rollups
+        usage_rollups.start()
     
     yield
     
     # Shutdown
+    from app.services.attachment_indexer import shutdown_extraction_pool
+    shutdown_extraction_pool()
+    from app.services.memory_event_hub import memory_event_hub
+    await memory_event_hub.stop()
     if settings.APP_ENV != "test":
+        from app.services.usage_rollups import usage_rollups
+        await usage_rollups.stop()
         await engine.dispose()
 
 
@@ -97,18 +104,12 @@ def create_application() -> FastAPI:
         allow_headers=["*"],
     )
     
-    # Request ID middleware (adds unique ID to each request)
-    app.add_middleware(RequestIdMiddleware)
-    
-    # Audit logging middleware (logs request/response metadata)
-    app.add_middleware(AuditLoggerMiddleware)
-    
-    # Structured logging middleware (JSON logs with correlation IDs)
-    logger = logging.getLogger(__name__)
-    app.add_middleware(StructuredLoggingMiddleware, logger=logger)
-    
-    # Prometheus metrics middleware (collects request/response metrics)
-    app.add_middleware(PrometheusMiddleware)
+    # Per-query timing feeding db_query_duration_seconds and request profiles.
+    install_query_instrumentation(engine.sync_engine)
+
+    # Observability middleware (pure ASGI): request ID, structured request log,
+    # route-template Prometheus metrics and byte accounting in a single pass.
+    app.add_middleware(ObservabilityMiddleware)
 
     # ---------------------------------------------------------------------------
     # Routes
@@ -1,9 +1,7 @@
 """Middleware module initialization."""
 
-from app.middleware.audit_logger import AuditLoggerMiddleware
-from app.middleware.request_id import RequestIdMiddleware
+from app.middleware.observability import ObservabilityMiddleware
 
 __all__ = [
-    "AuditLoggerMiddleware",
-    "RequestIdMiddleware",
+    "ObservabilityMiddleware",
 ]
@@ -0,0 +1,296 @@
+"""
+Observability Middleware
+========================
+
+Single pure-ASGI middleware that replaces the former stack of
+``BaseHTTPMiddleware`` layers (request ID, audit log, structured log and
+Prometheus). Doing everything in one pass avoids a task + memory stream per
+layer and never buffers bodies, so streaming/SSE responses flow through
+untouched.
+
+Per request it:
+- assigns/propagates the request (trace) and correlation IDs
+- counts request and response bytes as they stream through ``receive``/``send``
+- records Prometheus metrics labelled by *route template*
+  (``/api/v1/memories/{memory_id}``), keeping series cardinality bounded
+- emits one structured ``request_completed`` log line
+- binds a ``RequestProfile`` (DB statements, Redis/Qdrant/HTTP time), reports
+  it as a ``Server-Timing`` header and histograms, flags repeated statement
+  fingerprints (N+1) and optionally dumps slow-request profiles
+"""
+
+import time
+import uuid
+from typing import Any, Optional
+
+import structlog
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.request_profiler import (
+    RequestProfile,
+    end_request_profile,
+    start_request_profile,
+)
+from app.middleware.prometheus import (
+    errors_total,
+    http_request_duration_seconds,
+    http_request_size_bytes,
+    http_requests_total,
+    http_response_size_bytes,
+    record_request_profile,
+)
+
+
+# Configure structured logger
+structlog.configure(
+    processors=[
+        structlog.stdlib.filter_by_level,
+        structlog.stdlib.add_logger_name,
+        structlog.stdlib.add_log_level,
+        structlog.stdlib.PositionalArgumentsFormatter(),
+        structlog.processors.TimeStamper(fmt="iso"),
+        structlog.processors.StackInfoRenderer(),
+        structlog.processors.format_exc_info,
+        structlog.processors.UnicodeDecoder(),
+        structlog.processors.JSONRenderer(),
+    ],
+    wrapper_class=structlog.stdlib.BoundLogger,
+    context_class=dict,
+    logger_factory=structlog.stdlib.LoggerFactory(),
+    cache_logger_on_first_use=True,
+)
+
+logger = structlog.get_logger("audit")
+
+# Label used for requests that did not match any route (404s, scanners, ...).
+UNMATCHED_ROUTE = "__unmatched__"
+
+
+def route_template(scope: Scope) -> str:
+    """
+    Return the matched route's path template for a finished request.
+
+    FastAPI stores the matched route on ``scope["route"]`` during routing;
+    unmatched requests collapse into a single label so arbitrary URLs can't
+    create new time series.
+    """
+    route = scope.get("route")
+    path = getattr(route, "path_format", None) or getattr(route, "path", None)
+    if not path:
+        return UNMATCHED_ROUTE
+    return scope.get("root_path", "") + path
+
+
+def _header(scope: Scope, name: bytes) -> Optional[str]:
+    for key, value in scope.get("headers") or []:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+class ObservabilityMiddleware:
+    """
+    Fused request ID, structured logging and metrics middleware.
+
+    The request ID is:
+    - Taken from X-Trace-ID, then X-Request-ID, or generated
+    - Stored in request.state (``request_id``/``trace_id``) for handlers
+    - Added to response headers (X-Request-ID, X-Trace-ID, X-Correlation-ID)
+    """
+
+    # Endpoints to skip for metrics (health checks, metrics endpoint, etc)
+    SKIP_METRICS_PREFIXES = ("/health", "/metrics", "/docs", "/openapi.json", "/redoc")
+
+    # Paths to exclude from logging (e.g., health checks)
+    EXCLUDED_LOG_PATHS = {"/health", "/metrics", "/docs", "/redoc", "/openapi.json"}
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        path = scope.get("path", "")
+        method = scope.get("method", "")
+
+        request_id = _header(scope, b"x-trace-id") or _header(scope, b"x-request-id") or str(uuid.uuid4())
+        correlation_id = _header(scope, b"x-correlation-id") or request_id
+
+        state = scope.setdefault("state", {})
+        state["request_id"] = request_id
+        # Alias for clarity in agent/pipeline code.
+        state["trace_id"] = request_id
+        state["correlation_id"] = correlation_id
+
+        trace_headers = [
+            (b"x-request-id", request_id.encode("latin-1")),
+            (b"x-trace-id", request_id.encode("latin-1")),
+            (b"x-correlation-id", correlation_id.encode("latin-1")),
+        ]
+
+        counters = {"request_bytes": 0, "response_bytes": 0, "status": 500}
+
+        profile: Optional[RequestProfile] = None
+        profile_token = None
+        if settings.REQUEST_PROFILING_ENABLED:
+            profile, profile_token = start_request_profile()
+
+        async def receive_wrapper() -> Message:
+            message = await receive()
+            if message["type"] == "http.request":
+                counters["request_bytes"] += len(message.get("body", b""))
+            return message
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                counters["status"] = message["status"]
+                elapsed = time.perf_counter() - start_time
+                headers = [
+                    *message.get("headers", []),
+                    *trace_headers,
+                    (b"x-response-time", f"{elapsed:.6f}".encode("latin-1")),
+                ]
+                if profile is not None and settings.REQUEST_PROFILE_SERVER_TIMING:
+                    headers.append(
+                        (b"server-timing", profile.server_timing(elapsed).encode("latin-1"))
+                    )
+                message["headers"] = headers
+            elif message["type"] == "http.response.body":
+                counters["response_bytes"] += len(message.get("body", b""))
+            await send(message)
+
+        error: Optional[BaseException] = None
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        except BaseException as exc:
+            error = exc
+            raise
+        finally:
+            duration = time.perf_counter() - start_time
+            template = route_template(scope)
+            if profile_token is not None:
+                end_request_profile(profile_token)
+            if not path.startswith(self.SKIP_METRICS_PREFIXES):
+                self._record_metrics(method, template, counters, duration, error)
+                if profile is not None:
+                    self._report_profile(scope, method, template, profile, duration)
+            if path not in self.EXCLUDED_LOG_PATHS:
+                self._log(scope, method, template, counters, duration, error)
+
+    @staticmethod
+    def _report_profile(
+        scope: Scope,
+        method: str,
+        endpoint: str,
+        profile: RequestProfile,
+        duration: float,
+    ) -> None:
+        repeated = profile.repeated_statements(settings.REQUEST_PROFILE_N_PLUS_ONE_THRESHOLD)
+        record_request_profile(endpoint, profile, repeated=len(repeated))
+
+        request_id = scope.get("state", {}).get("request_id")
+        if repeated:
+            worst = repeated[0]
+            logger.warning(
+                "repeated_statement_detected",
+                request_id=request_id,
+                method=method,
+                route=endpoint,
+                count=worst.count,
+                total_ms=round(worst.total_seconds * 1000, 2),
+                digest=worst.digest,
+                statement=worst.fingerprint[:500],
+            )
+
+        slow_ms = settings.REQUEST_PROFILE_SLOW_MS
+        if slow_ms is not None and duration * 1000 >= slow_ms:
+            logger.warning(
+                "slow_request_profile",
+                request_id=request_id,
+                method=method,
+                route=endpoint,
+                latency_ms=round(duration * 1000, 2),
+                profile=profile.to_dict(),
+            )
+
+    @staticmethod
+    def _record_metrics(
+        method: str,
+        endpoint: str,
+        counters: dict[str, int],
+        duration: float,
+        error: Optional[BaseException],
+    ) -> None:
+        status = counters["status"]
+        http_requests_total.labels(method=method, endpoint=endpoint, status=status).inc()
+        http_request_duration_seconds.labels(method=method, endpoint=endpoint).observe(duration)
+        http_request_size_bytes.labels(method=method, endpoint=endpoint).observe(
+            counters["request_bytes"]
+        )
+        http_response_size_bytes.labels(method=method, endpoint=endpoint, status=status).observe(
+            counters["response_bytes"]
+        )
+        if error is not None:
+            errors_total.labels(error_type=type(error).__name__, endpoint=endpoint).inc()
+
+    @staticmethod
+    def _log(
+        scope: Scope,
+        method: str,
+        endpoint: str,
+        counters: dict[str, int],
+        duration: float,
+        error: Optional[BaseException],
+    ) -> None:
+        state = scope.get("state", {})
+        status = counters["status"]
+        log_context: dict[str, Any] = {
+            "request_id": state.get("request_id"),
+            "correlation_id": state.get("correlation_id"),
+            "method": method,
+            "path": scope.get("path", ""),
+            "route": endpoint,
+            "query": scope.get("query_string", b"").decode("latin-1"),
+            "status_code": status,
+            "latency_ms": round(duration * 1000, 2),
+            "request_bytes": counters["request_bytes"],
+            "response_bytes": counters["response_bytes"],
+            "client_ip": _client_ip(scope),
+            "user_agent": _header(scope, b"user-agent") or "unknown",
+        }
+
+        # Add auth context if available
+        if state.get("user_id"):
+            log_context["user_id"] = state["user_id"]
+        if state.get("org_id"):
+            log_context["org_id"] = state["org_id"]
+
+        if error is not None:
+            log_context["error_type"] = type(error).__name__
+            logger.error("request_failed", **log_context)
+        elif status >= 500:
+            logger.error("request_completed", **log_context)
+        elif status >= 400:
+            logger.warning("request_completed", **log_context)
+        else:
+            logger.info("request_completed", **log_context)
+
+
+def _client_ip(scope: Scope) -> str:
+    """
+    Extract client IP, honouring X-Forwarded-For for proxied requests.
+    """
+    forwarded_for = _header(scope, b"x-forwarded-for")
+    if forwarded_for:
+        # Take the first IP (original client)
+        return forwarded_for.split(",")[0].strip()
+
+    client = scope.get("client")
+    if client:
+        return client[0]
+
+    return "unknown"
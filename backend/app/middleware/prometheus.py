@@ -1,17 +1,10 @@
 """
-Prometheus Metrics Middleware
-Collects metrics on HTTP requests, responses, and custom application metrics
+Prometheus Metrics
+Metric definitions for HTTP requests, responses, and custom application metrics.
+HTTP metrics are recorded by ``app.middleware.observability.ObservabilityMiddleware``.
 """
 
-import time
-import json
-from typing import Callable
-from datetime import datetime
-import logging
-
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
-from prometheus_client import Counter, Histogram, Gauge, generate_latest, CONTENT_TYPE_LATEST
+from prometheus_client import Counter, Histogram, Gauge
 from prometheus_client import CollectorRegistry
 
 # Create a global registry for metrics
@@ -69,6 +62,38 @@ db_query_duration_seconds = Histogram(
     registry=metrics_registry
 )
 
+# Per-request dependency accounting (fed by app.core.request_profiler)
+http_request_db_queries = Histogram(
+    'http_request_db_queries',
+    'Database statements executed per HTTP request',
+    ['endpoint'],
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 200, 500),
+    registry=metrics_registry
+)
+
+http_request_db_seconds = Histogram(
+    'http_request_db_seconds',
+    'Total database time per HTTP request in seconds',
+    ['endpoint'],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+    registry=metrics_registry
+)
+
+http_request_dependency_seconds = Histogram(
+    'http_request_dependency_seconds',
+    'Total time per HTTP request spent in a dependency (redis, qdrant, http)',
+    ['endpoint', 'dependency'],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+    registry=metrics_registry
+)
+
+db_repeated_statements_total = Counter(
+    'db_repeated_statements_total',
+    'Requests where one statement fingerprint repeated past the N+1 threshold',
+    ['endpoint'],
+    registry=metrics_registry
+)
+
 # Cache Metrics
 cache_hits_total = Counter(
     'cache_hits_total',
@@ -84,6 +109,34 @@ cache_misses_total = Counter(
     registry=metrics_registry
 )
 
+agent_result_cache_hits_total = Counter(
+    'agent_result_cache_hits_total',
+    'Agent result cache hits by serving tier (local|redis|db)',
+    ['agent', 'tier'],
+    registry=metrics_registry
+)
+
+agent_result_cache_misses_total = Counter(
+    'agent_result_cache_misses_total',
+    'Agent result cache misses (agent had to run)',
+    ['agent'],
+    registry=metrics_registry
+)
+
+agent_result_cache_bytes_total = Counter(
+    'agent_result_cache_bytes_total',
+    'Bytes of cached agent results read from or written to Redis',
+    ['direction'],
+    registry=metrics_registry
+)
+
+agent_result_cache_evictions_total = Counter(
+    'agent_result_cache_evictions_total',
+    'Agent result cache entries evicted by tier (local|redis|db)',
+    ['tier'],
+    registry=metrics_registry
+)
+
 # Error Metrics
 errors_total = Counter(
     'errors_total',
@@ -120,6 +173,27 @@ websocket_connections_active = Gauge(
     registry=metrics_registry
 )
 
+# Memory event stream (SSE) metrics
+memory_stream_subscribers = Gauge(
+    'memory_stream_subscribers',
+    'Connected memory stream SSE clients in this process',
+    registry=metrics_registry
+)
+
+memory_stream_events_total = Counter(
+    'memory_stream_events_total',
+    'Memory stream events fanned out to SSE clients',
+    ['outcome'],
+    registry=metrics_registry
+)
+
+memory_stream_replays_total = Counter(
+    'memory_stream_replays_total',
+    'Memory stream resumptions served from the replay buffer',
+    ['result'],
+    registry=metrics_registry
+)
+
 # Job Metrics
 celery_tasks_total = Counter(
     'celery_tasks_total',
@@ -136,184 +210,6 @@ celery_task_duration_seconds = Histogram(
 )
 
 
-class PrometheusMiddleware(BaseHTTPMiddleware):
-    """
-    Middleware to collect Prometheus metrics for HTTP requests
-    """
-    
-    # Endpoints to skip (health checks, metrics endpoint, etc)
-    SKIP_ENDPOINTS = ['/health', '/metrics', '/docs', '/openapi.json', '/redoc']
-    
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        """
-        Process request and collect metrics
-        """
-        # Skip metrics collection for certain endpoints
-        if any(request.url.path.startswith(skip) for skip in self.SKIP_ENDPOINTS):
-            return await call_next(request)
-        
-        # Record start time
-        start_time = time.time()
-        
-        # Get request info
-        method = request.method
-        endpoint = request.url.path
-        
-        # Try to get request body size
-        request_body_size = 0
-        try:
-            if hasattr(request, '_body'):
-                request_body_size = len(request._body)
-        except Exception:
-            pass
-        
-        try:
-            # Call the next middleware/endpoint
-            response = await call_next(request)
-            
-            # Record metrics
-            status_code = response.status_code
-            
-            # Calculate duration
-            duration = time.time() - start_time
-            
-            # Get response body size (approximation)
-            response_body_size = 0
-            try:
-                if hasattr(response, 'body'):
-                    response_body_size = len(response.body)
-            except Exception:
-                pass
-            
-            # Record metrics
-            http_requests_total.labels(
-                method=method,
-                endpoint=endpoint,
-                status=status_code
-            ).inc()
-            
-            http_request_duration_seconds.labels(
-                method=method,
-                endpoint=endpoint
-            ).observe(duration)
-            
-            http_request_size_bytes.labels(
-                method=method,
-                endpoint=endpoint
-            ).observe(request_body_size)
-            
-            http_response_size_bytes.labels(
-                method=method,
-                endpoint=endpoint,
-                status=status_code
-            ).observe(response_body_size)
-            
-            # Add custom headers for tracing
-            response.headers["X-Response-Time"] = str(duration)
-            
-            return response
-            
-        except Exception as exc:
-            # Record error
-            duration = time.time() - start_time
-            
-            # Record in error metrics
-            errors_total.labels(
-                error_type=type(exc).__name__,
-                endpoint=endpoint
-            ).inc()
-            
-            http_request_duration_seconds.labels(
-                method=method,
-                endpoint=endpoint
-            ).observe(duration)
-            
-            raise
-
-
-class StructuredLoggingMiddleware(BaseHTTPMiddleware):
-    """
-    Middleware for structured JSON logging with correlation IDs
-    """
-    
-    def __init__(self, app, logger: logging.Logger):
-        super().__init__(app)
-        self.logger = logger
-    
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        """
-        Log request/response in structured JSON format
-        """
-        # Get correlation ID from header or generate new one
-        correlation_id = request.headers.get('X-Correlation-ID', self._generate_correlation_id())
-        
-        # Store correlation ID in request state
-        request.state.correlation_id = correlation_id
-        
-        # Record start time
-        start_time = time.time()
-        
-        # Log request
-        request_log = {
-            "timestamp": datetime.utcnow().isoformat(),
-            "correlation_id": correlation_id,
-            "event": "http_request_start",
-            "method": request.method,
-            "path": request.url.path,
-            "query_params": dict(request.query_params) if request.query_params else {},
-            "client_ip": request.client.host if request.client else None,
-            "user_agent": request.headers.get('user-agent'),
-        }
-        
-        self.logger.info(json.dumps(request_log))
-        
-        try:
-            # Process request
-            response = await call_next(request)
-            
-            # Record duration
-            duration = time.time() - start_time
-            
-            # Log response
-            response_log = {
-                "timestamp": datetime.utcnow().isoformat(),
-                "correlation_id": correlation_id,
-                "event": "http_request_complete",
-                "method": request.method,
-                "path": request.url.path,
-                "status_code": response.status_code,
-                "duration_seconds": duration,
-            }
-            
-            self.logger.info(json.dumps(response_log))
-            
-            # Add correlation ID to response headers
-            response.headers["X-Correlation-ID"] = correlation_id
-            
-            return response
-            
-        except Exception as exc:
-            # Log error
-            error_log = {
-                "timestamp": datetime.utcnow().isoformat(),
-                "correlation_id": correlation_id,
-                "event": "http_request_error",
-                "method": request.method,
-                "path": request.url.path,
-                "error_type": type(exc).__name__,
-                "error_message": str(exc),
-            }
-            
-            self.logger.error(json.dumps(error_log))
-            raise
-    
-    @staticmethod
-    def _generate_correlation_id() -> str:
-        """Generate a unique correlation ID"""
-        import uuid
-        return str(uuid.uuid4())
-
-
 # Metric update functions for application events
 
 def record_auth_attempt(method: str, success: bool) -> None:
@@ -342,6 +238,38 @@ def record_cache_miss(cache_name: str) -> None:
     cache_misses_total.labels(cache_name=cache_name).inc()
 
 
+def record_agent_cache_hit(agent: str, tier: str) -> None:
+    """Record an agent result cache hit served from ``tier``"""
+    agent_result_cache_hits_total.labels(agent=agent, tier=tier).inc()
+    cache_hits_total.labels(cache_name="agent_result").inc()
+
+
+def record_agent_cache_miss(agent: str) -> None:
+    """Record an agent result cache miss"""
+    agent_result_cache_misses_total.labels(agent=agent).inc()
+    cache_misses_total.labels(cache_name="agent_result").inc()
+
+
+def record_agent_cache_bytes(direction: str, size: int) -> None:
+    """Record bytes read from / written to the agent result hot tier"""
+    agent_result_cache_bytes_total.labels(direction=direction).inc(size)
+
+
+def record_agent_cache_eviction(tier: str, count: int = 1) -> None:
+    """Record agent result cache evictions"""
+    agent_result_cache_evictions_total.labels(tier=tier).inc(count)
+
+
+def record_memory_stream_event(outcome: str, count: int = 1) -> None:
+    """Record memory stream fan-out (delivered / dropped)"""
+    memory_stream_events_total.labels(outcome=outcome).inc(count)
+
+
+def record_memory_stream_replay(result: str) -> None:
+    """Record a Last-Event-ID / since replay (hit / miss)"""
+    memory_stream_replays_total.labels(result=result).inc()
+
+
 def record_celery_task(task_name: str, success: bool, duration: float) -> None:
     """Record a Celery task execution"""
     status = "success" if success else "failure"
@@ -367,3 +295,15 @@ def update_db_connections(count: int) -> None:
 def record_db_query(query_type: str, duration: float) -> None:
     """Record a database query"""
     db_query_duration_seconds.labels(query_type=query_type).observe(duration)
+
+
+def record_request_profile(endpoint: str, profile, repeated: int = 0) -> None:
+    """Record per-request DB and dependency totals from a RequestProfile"""
+    http_request_db_queries.labels(endpoint=endpoint).observe(profile.db_count)
+    http_request_db_seconds.labels(endpoint=endpoint).observe(profile.db_seconds)
+    for dependency, stats in profile.spans.items():
+        http_request_dependency_seconds.labels(
+            endpoint=endpoint, dependency=dependency
+        ).observe(stats.total_seconds)
+    if repeated:
+        db_repeated_statements_total.labels(endpoint=endpoint).inc()
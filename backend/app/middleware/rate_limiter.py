@@ -1,4 +1,9 @@
-"""Rate limiting for admin endpoints."""
+"""Rate limiting for admin endpoints.
+
+The decorator delegates to the async, Lua-scripted engine in
+``app.services.rate_limiter`` so admission never blocks the event loop and
+costs a single Redis round-trip.
+"""
 
 from functools import wraps
 from typing import Callable
@@ -6,29 +11,40 @@ import time
 import asyncio
 
 from fastapi import HTTPException, Request, status
-from redis import Redis
+from redis.asyncio import Redis
 
 from app.core.config import settings
+from app.services.rate_limiter import (
+    RateLimiter as RateLimitEngine,
+    RateLimitExceeded,
+    rate_limiter as default_engine,
+)
 
 
 class RateLimiter:
     """Redis-backed rate limiter for admin endpoints."""
 
-    def __init__(self, redis_client: Redis | None = None):
-        self.redis = redis_client
+    def __init__(self, redis_client: Redis | None = None, engine: RateLimitEngine | None = None):
+        self.engine: RateLimitEngine | None = None
         # In production we prefer Redis. In tests we enable an in-memory limiter
         # so integration tests can validate 429 behavior without requiring Redis.
         self._memory: dict[str, tuple[int, float]] | None = None
         self._memory_lock: asyncio.Lock | None = None
+        self.enabled = False
 
-        if redis_client is not None:
-            self.enabled = True
+        if engine is not None or redis_client is not None:
+            self.attach(engine or RateLimitEngine(redis_client=redis_client))
         elif settings.APP_ENV == "test":
             self.enabled = True
             self._memory = {}
             self._memory_lock = asyncio.Lock()
-        else:
-            self.enabled = False
+
+    def attach(self, engine: RateLimitEngine) -> None:
+        """Switch this limiter (and every endpoint already decorated by it) to a Redis engine."""
+        self.engine = engine
+        self.enabled = True
+        self._memory = None
+        self._memory_lock = None
 
     def limit(
         self,
@@ -85,25 +101,16 @@ class RateLimiter:
 
                 # Check rate limit
                 try:
-                    if self.redis is not None:
-                        current = self.redis.incr(rate_key)
-                        if current == 1:
-                            self.redis.expire(rate_key, window_seconds)
-
-                        if current > max_requests:
-                            ttl = None
-                            try:
-                                ttl_val = self.redis.ttl(rate_key)
-                                if isinstance(ttl_val, int) and ttl_val > 0:
-                                    ttl = ttl_val
-                            except Exception:
-                                ttl = None
-
-                            headers = {"Retry-After": str(ttl)} if ttl is not None else None
+                    if self.engine is not None:
+                        try:
+                            await self.engine.check_rate_limit(
+                                rate_key, limit=max_requests, window=window_seconds
+                            )
+                        except RateLimitExceeded as e:
                             raise HTTPException(
                                 status_code=status.HTTP_429_TOO_MANY_REQUESTS,
                                 detail=f"Rate limit exceeded. Max {max_requests} requests per {window_seconds}s.",
-                                headers=headers,
+                                headers={"Retry-After": str(e.retry_after)},
                             )
 
                     # In-memory fallback (tests)
@@ -144,6 +151,6 @@ rate_limiter = RateLimiter()
 
 
 def init_rate_limiter(redis_client: Redis) -> None:
-    """Initialize global rate limiter with Redis client."""
-    global rate_limiter
-    rate_limiter = RateLimiter(redis_client)
+    """Bind the global rate limiting engine and decorator to the shared async Redis client."""
+    default_engine.use_redis(redis_client)
+    rate_limiter.attach(default_engine)
@@ -32,6 +32,7 @@ from app.models.memory import (
     MemorySharing,
 )
 from app.models.memory_attachment import MemoryAttachment
+from app.models.attachment_blob import AttachmentBlob
 from app.models.audit import (
     AuditEvent,
     MemoryAccessLog,
@@ -88,6 +89,10 @@ from app.models.backup import (
     BackupRestore,
 )
 from app.models.memory_consolidation import MemoryConsolidation
+from app.models.memory_minhash import MemoryMinHash
+from app.models.knowledge_synthesis import KnowledgeTagStat, KnowledgeTagPair, KnowledgeTagWeek
+from app.models.vector_collection import VectorCollectionRoute
+from app.models.usage_rollup import UsageRollup
 
 __all__ = [
     # Base
@@ -112,6 +117,7 @@ __all__ = [
     "MemoryMetadata",
     "MemorySharing",
     "MemoryAttachment",
+    "AttachmentBlob",
     # Audit
     "AuditEvent",
     "MemoryAccessLog",
@@ -203,4 +209,13 @@ __all__ = [
     "BackupRestore",
     # Consolidations
     "MemoryConsolidation",
+    "MemoryMinHash",
+    # Knowledge synthesis aggregates
+    "KnowledgeTagStat",
+    "KnowledgeTagPair",
+    "KnowledgeTagWeek",
+    # Vector collection routing
+    "VectorCollectionRoute",
+    # Usage rollups
+    "UsageRollup",
 ]
@@ -0,0 +1,36 @@
+"""Content-addressed attachment blobs.
+
+Attachment bytes are stored once per organization and SHA-256 digest
+(``blobs/<org>/<aa>/<digest>`` under MEMORY_ATTACHMENTS_DIR). ``ref_count``
+is the number of ``memory_attachments`` rows pointing at the blob; the file
+is removed when the last reference is deleted. See
+``app.services.attachment_blob_store``.
+"""
+
+from __future__ import annotations
+
+from sqlalchemy import BigInteger, ForeignKey, Integer, String
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base, TimestampMixin
+
+
+class AttachmentBlob(Base, TimestampMixin):
+    __tablename__ = "attachment_blobs"
+
+    organization_id: Mapped[str] = mapped_column(
+        UUID(as_uuid=False),
+        ForeignKey("organizations.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    sha256: Mapped[str] = mapped_column(String(64), primary_key=True)
+
+    size_bytes: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    ref_count: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
+
+    storage_path: Mapped[str] = mapped_column(
+        String(1024),
+        nullable=False,
+        doc="Relative path under MEMORY_ATTACHMENTS_DIR",
+    )
@@ -148,8 +148,8 @@ class AuditEvent(Base, UUIDMixin):
     )
     
     __table_args__ = (
-        # Composite index for common query patterns
-        Index("ix_audit_org_time", "organization_id", "timestamp"),
+        # Composite index for common query patterns (and keyset pagination)
+        Index("ix_audit_org_time_id", "organization_id", "timestamp", "id"),
         Index("ix_audit_actor_time", "actor_id", "timestamp"),
         Index("ix_audit_resource", "resource_type", "resource_id"),
         # GIN index for details searches
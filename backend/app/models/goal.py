@@ -14,7 +14,7 @@ from __future__ import annotations
 
 from datetime import datetime
 
-from sqlalchemy import DateTime, Float, ForeignKey, Integer, String, Text, UniqueConstraint, func
+from sqlalchemy import DateTime, Float, ForeignKey, Index, Integer, String, Text, UniqueConstraint, func
 from sqlalchemy.dialects.postgresql import ARRAY, JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -24,6 +24,11 @@ from app.models.base import Base, TimestampMixin, UUIDMixin
 class Goal(Base, UUIDMixin):
     __tablename__ = "goals"
 
+    __table_args__ = (
+        # Keyset pagination by most recent update
+        Index("ix_goals_org_updated_id", "organization_id", "updated_at", "id"),
+    )
+
     organization_id: Mapped[str] = mapped_column(
         UUID(as_uuid=False),
         ForeignKey("organizations.id", ondelete="CASCADE"),
@@ -0,0 +1,65 @@
+"""Materialized aggregates behind knowledge synthesis reports.
+
+Per-org counters maintained incrementally as memories are created, re-tagged
+and deleted (see ``app.services.synthesis_aggregates``):
+
+- ``knowledge_tag_stats``: active memories per tag, plus graph relationships
+  whose two endpoints both carry the tag (cluster cohesion).
+- ``knowledge_tag_pairs``: tag co-occurrence counts (``tag_a < tag_b``).
+- ``knowledge_tag_weeks``: weekly creation histogram per tag.
+"""
+
+from __future__ import annotations
+
+from datetime import date
+
+from sqlalchemy import Date, ForeignKey, Index, Integer, String
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base, TimestampMixin
+
+def _org_column() -> Mapped[str]:
+    return mapped_column(
+        UUID(as_uuid=False),
+        ForeignKey("organizations.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+
+
+class KnowledgeTagStat(Base, TimestampMixin):
+    __tablename__ = "knowledge_tag_stats"
+
+    organization_id: Mapped[str] = _org_column()
+    tag: Mapped[str] = mapped_column(String, primary_key=True)
+
+    memory_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    relationship_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        Index("ix_knowledge_tag_stats_org_count", "organization_id", "memory_count"),
+    )
+
+
+class KnowledgeTagPair(Base, TimestampMixin):
+    __tablename__ = "knowledge_tag_pairs"
+
+    organization_id: Mapped[str] = _org_column()
+    tag_a: Mapped[str] = mapped_column(String, primary_key=True)
+    tag_b: Mapped[str] = mapped_column(String, primary_key=True)
+
+    memory_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class KnowledgeTagWeek(Base, TimestampMixin):
+    __tablename__ = "knowledge_tag_weeks"
+
+    organization_id: Mapped[str] = _org_column()
+    tag: Mapped[str] = mapped_column(String, primary_key=True)
+    week_start: Mapped[date] = mapped_column(Date, primary_key=True)
+
+    memory_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        Index("ix_knowledge_tag_weeks_org_week", "organization_id", "week_start"),
+    )
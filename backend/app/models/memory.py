@@ -11,7 +11,7 @@ from datetime import datetime
 
 from sqlalchemy import (
     String, Text, Boolean, Integer, Float,
-    ForeignKey, Index, CheckConstraint,
+    ForeignKey, Index, CheckConstraint, text,
 )
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.dialects.postgresql import UUID, JSONB, ARRAY, TSVECTOR
@@ -228,6 +228,14 @@ class MemoryMetadata(Base, UUIDMixin, TimestampMixin):
         Index("ix_memory_org_scope", "organization_id", "scope", "scope_id"),
         # Index for owner queries
         Index("ix_memory_owner", "organization_id", "owner_id"),
+        # Keyset pagination of active memories (newest first)
+        Index(
+            "ix_memory_org_created_id",
+            "organization_id",
+            "created_at",
+            "id",
+            postgresql_where=text("is_active"),
+        ),
         # Index for tag searches (GIN)
         Index("ix_memory_tags", "tags", postgresql_using="gin"),
         # Index for entity searches (GIN)
@@ -5,8 +5,8 @@ Memory Attachment Model
 Stores metadata for files attached to a long-term memory.
 Actual bytes are stored on disk under a configured attachments directory.
 
-NOTE: This is an MVP "multimodal" layer (images/docs/etc). Later we can add
-text extraction + embedding for retrieval.
+Extracted text is indexed in the background as overlapping chunks, one
+Qdrant point per chunk (see ``app.services.attachment_indexer``).
 """
 
 from __future__ import annotations
@@ -14,7 +14,7 @@ from __future__ import annotations
 from typing import Optional, TYPE_CHECKING
 from datetime import datetime
 
-from sqlalchemy import String, ForeignKey, BigInteger, Index, Text
+from sqlalchemy import String, ForeignKey, BigInteger, Index, Integer, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.dialects.postgresql import UUID
 
@@ -57,9 +57,21 @@ class MemoryAttachment(Base, UUIDMixin, TimestampMixin):
     storage_path: Mapped[str] = mapped_column(
         String(1024),
         nullable=False,
-        doc="Relative path under MEMORY_ATTACHMENTS_DIR",
+        doc="Relative path under MEMORY_ATTACHMENTS_DIR (shared blob for new uploads)",
     )
 
+    index_status: Mapped[str] = mapped_column(
+        String(20),
+        nullable=False,
+        default="pending",
+        server_default="pending",
+        doc="pending | indexed | empty | failed | skipped",
+    )
+    chunk_count: Mapped[Optional[int]] = mapped_column(
+        Integer,
+        nullable=True,
+        doc="Number of indexed text chunks",
+    )
     indexed_at: Mapped[Optional[datetime]] = mapped_column(
         nullable=True,
         doc="When extracted text was embedded and indexed",
@@ -82,4 +94,9 @@ class MemoryAttachment(Base, UUIDMixin, TimestampMixin):
             "organization_id",
             "memory_id",
         ),
+        Index(
+            "ix_memory_attachments_org_sha256",
+            "organization_id",
+            "sha256",
+        ),
     )
@@ -0,0 +1,39 @@
+"""Near-duplicate index rows for memories.
+
+One row per memory holding its MinHash signature and the LSH band keys
+derived from it. Candidate pairs are found with an indexed array-overlap
+(``band_keys && ...``) lookup instead of comparing every pair of memories.
+See ``app.services.near_duplicate_index``.
+"""
+
+from __future__ import annotations
+
+from typing import List
+
+from sqlalchemy import BigInteger, ForeignKey, Index, Integer, LargeBinary
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base, TenantMixin, TimestampMixin
+
+
+class MemoryMinHash(Base, TimestampMixin, TenantMixin):
+    __tablename__ = "memory_minhash_signatures"
+
+    memory_id: Mapped[str] = mapped_column(
+        UUID(as_uuid=False),
+        ForeignKey("memory_metadata.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+
+    # num_perm little-endian uint32 minimums (128 perms -> 512 bytes).
+    signature: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    num_perm: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    # One signed 64-bit key per LSH band; the band index is mixed into the hash.
+    band_keys: Mapped[List[int]] = mapped_column(ARRAY(BigInteger), nullable=False)
+
+    __table_args__ = (
+        Index("ix_memory_minhash_band_keys", "band_keys", postgresql_using="gin"),
+        Index("ix_memory_minhash_org_created_at", "organization_id", "created_at"),
+    )
@@ -113,6 +113,7 @@ class MemorySnapshot(Base, UUIDMixin, TimestampMixin, TenantMixin):
         Index("ix_memory_snapshots_org_type", "organization_id", "snapshot_type"),
         Index("ix_memory_snapshots_parent", "parent_snapshot_id"),
         Index("ix_memory_snapshots_expires", "expires_at"),
+        Index("ix_memory_snapshots_org_created_id", "organization_id", "created_at", "id"),
     )
 
     @property
@@ -74,6 +74,7 @@ class Snapshot(Base):
         Index("idx_snapshot_org", "organization_id"),
         Index("idx_snapshot_status", "status"),
         Index("idx_snapshot_created", "created_at"),
+        Index("idx_snapshot_org_created_id", "organization_id", "created_at", "id"),
     )
 
     def __repr__(self):
@@ -0,0 +1,50 @@
+"""Pre-aggregated request and token usage buckets.
+
+One row per (org, granularity, bucket, metric, dimension, sub_dimension),
+maintained incrementally by ``app.services.usage_rollups``:
+
+- ``metric="request"``: dimension is the endpoint, sub_dimension the HTTP
+  method. ``value_sum``/``value_max`` are in milliseconds and ``sketch``
+  holds a mergeable latency histogram (``LatencySketch`` bucket counts).
+- ``metric="tokens"``: dimension is the model, sub_dimension the operation,
+  and ``value_sum`` the token count.
+
+Every event lands in both a ``minute`` and an ``hour`` bucket; windows are
+answered from hour rows plus minute rows for the partial hours at the edges.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import BigInteger, DateTime, Float, ForeignKey, Index, Integer, String
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base, TimestampMixin
+
+
+class UsageRollup(Base, TimestampMixin):
+    __tablename__ = "usage_rollups"
+
+    organization_id: Mapped[str] = mapped_column(
+        UUID(as_uuid=False),
+        ForeignKey("organizations.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    granularity: Mapped[str] = mapped_column(String(8), primary_key=True)
+    bucket_start: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    metric: Mapped[str] = mapped_column(String(16), primary_key=True)
+    dimension: Mapped[str] = mapped_column(String(255), primary_key=True)
+    sub_dimension: Mapped[str] = mapped_column(String(64), primary_key=True, default="")
+
+    count: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    error_count: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    value_sum: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    value_max: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    sketch: Mapped[Optional[List[int]]] = mapped_column(ARRAY(Integer), nullable=True)
+
+    __table_args__ = (
+        Index("ix_usage_rollups_org_metric_bucket", "organization_id", "metric", "granularity", "bucket_start"),
+    )
@@ -0,0 +1,56 @@
+"""Qdrant collection routing per organization.
+
+Small organizations share ``settings.QDRANT_COLLECTION_NAME``; large ones get
+a dedicated collection with their own HNSW/quantization settings. A row
+exists only for organizations that are not (only) in the shared collection.
+
+This is a platform-level table (no RLS): ``QdrantService`` resolves routes
+before any tenant context exists.
+
+Moving a tenant between collections is online (see
+``app.services.vector_collection_migration``):
+
+- ``copying``: reads use ``collection_name``; writes also go to
+  ``secondary_collection`` (the target) while existing points are copied.
+- ``draining``: reads switched to the target (``collection_name``); writes
+  still also go to the old collection (``secondary_collection``) so
+  processes with a stale route keep seeing every write.
+- ``active``: migration done, ``secondary_collection`` is empty.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import DateTime, ForeignKey, Integer, String
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base, TimestampMixin
+
+ROUTE_STATES = ("copying", "draining", "active")
+
+
+class VectorCollectionRoute(Base, TimestampMixin):
+    __tablename__ = "vector_collection_routes"
+
+    organization_id: Mapped[str] = mapped_column(
+        UUID(as_uuid=False),
+        ForeignKey("organizations.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    # Collection serving reads.
+    collection_name: Mapped[str] = mapped_column(String(255), nullable=False)
+    # Collection that also receives writes while a migration is in flight.
+    secondary_collection: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    state: Mapped[str] = mapped_column(String(20), nullable=False, default="active")
+    state_changed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+    # Per-tenant collection config (None = settings defaults).
+    hnsw_m: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    hnsw_ef_construct: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    search_hnsw_ef: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    quantization: Mapped[Optional[str]] = mapped_column(String(20), nullable=True)
+
+    points_copied: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
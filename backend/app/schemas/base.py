@@ -46,34 +46,40 @@ class PaginatedResponse(BaseSchema, Generic[T]):
     
     Attributes:
         items: List of items for this page
-        total: Total number of items
+        total: Total number of items (None when the count was skipped)
         page: Current page number (1-indexed)
         page_size: Number of items per page
-        pages: Total number of pages
+        pages: Total number of pages (None when the count was skipped)
+        next_cursor: Opaque cursor of the next page (None on the last page)
     """
     
     items: List[T]
-    total: int
+    total: Optional[int] = None
     page: int
     page_size: int
-    pages: int
+    pages: Optional[int] = None
+    next_cursor: Optional[str] = None
     
     @classmethod
     def create(
         cls,
         items: List[T],
-        total: int,
+        total: Optional[int],
         page: int,
         page_size: int,
+        next_cursor: Optional[str] = None,
     ) -> "PaginatedResponse[T]":
         """Create a paginated response from items."""
-        pages = (total + page_size - 1) // page_size if page_size > 0 else 0
+        pages = None
+        if total is not None:
+            pages = (total + page_size - 1) // page_size if page_size > 0 else 0
         return cls(
             items=items,
             total=total,
             page=page,
             page_size=page_size,
             pages=pages,
+            next_cursor=next_cursor,
         )
 
 
@@ -23,6 +23,9 @@ class PlannerStep(BaseSchema):
     expected_output: str
     success_criteria: list[str]
     risk_notes: list[str] = Field(default_factory=list)
+    # Steps that must finish first. Input values of the form "${S1}" or
+    # "${S1.results}" also add a dependency and are filled from that output.
+    depends_on: list[str] = Field(default_factory=list)
 
 
 class PlannerOutput(BaseSchema):
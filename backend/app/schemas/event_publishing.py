@@ -177,7 +177,7 @@ class BatchDeleteKnowledgeRequest(BaseModel):
 class SnapshotCreateRequest(BaseModel):
     """Create a snapshot/export."""
     resource_type: str = Field(..., pattern="^(memory|knowledge)$")
-    format: str = Field(default="json", pattern="^(json|csv|jsonl|pdf|parquet)$")
+    format: str = Field(default="json", pattern="^(json|csv|jsonl|parquet)$")
     name: Optional[str] = None
     filters: Optional[dict] = None
     include_deleted: bool = False
@@ -216,9 +216,10 @@ class SnapshotResponse(BaseModel):
 class SnapshotListResponse(BaseModel):
     """List of snapshots."""
     snapshots: List[SnapshotResponse]
-    total: int
+    total: Optional[int] = None
     limit: int
     offset: int
+    next_cursor: Optional[str] = None
 
 
 class SnapshotDownloadResponse(BaseModel):
@@ -181,10 +181,11 @@ class MemoryListResponse(BaseSchema):
     """Response schema for memory list."""
 
     items: List[MemoryResponse]
-    total: int
+    total: Optional[int] = None
     page: int
     page_size: int
     has_more: bool
+    next_cursor: Optional[str] = None
 
 
 # =============================================================================
@@ -22,6 +22,8 @@ class MemoryAttachmentResponse(BaseSchema):
     size_bytes: int = Field(..., ge=0)
     sha256: str
 
+    index_status: Optional[str] = None
+    chunk_count: Optional[int] = None
     indexed_at: Optional[datetime] = None
 
     created_at: datetime
@@ -55,3 +55,19 @@ class MemoryBatchShareResult(MemoryBatchResult):
 class MemoryBatchShareResponse(BaseSchema):
     trace_id: Optional[str] = None
     results: List[MemoryBatchShareResult]
+
+
+class MemoryBulkIngestResult(BaseSchema):
+    index: int
+    status: str  # created | duplicate | invalid | forbidden | failed
+    memory_id: Optional[str] = None
+    error: Optional[str] = None
+
+
+class MemoryBulkIngestResponse(BaseSchema):
+    trace_id: Optional[str] = None
+    created: int = 0
+    duplicates: int = 0
+    failed: int = 0
+    truncated: bool = False
+    results: List[MemoryBulkIngestResult]
@@ -0,0 +1,192 @@
+"""backend.app.services.access_context
+
+Compiled per-user ACL context.
+
+Everything an access decision needs about the *user* (rather than the
+memory) is loaded once and cached: active team memberships with roles,
+active direct shares keyed by memory, and clearance. ``PermissionChecker``
+answers team and share checks from it with set/dict lookups, and search paths
+use it to build vector-store pre-filters.
+
+Contexts live in a ``VersionedCache`` partitioned by organization and keyed
+by user (``aclctx:<org>:<user>``). Membership and sharing writers invalidate
+the user (``PermissionChecker.invalidate_user_cache``) or the whole org.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional
+
+from sqlalchemy import and_, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.versioned_cache import VersionedCache
+from app.models.memory import MemorySharing
+from app.models.team import Team, TeamMember
+from app.models.user import User
+
+KEY_PREFIX = "aclctx"
+
+_SHARE_RANK = {"read": 1, "comment": 2, "edit": 3}
+
+
+@dataclass(frozen=True)
+class CachedShare:
+    """An active direct user share of one memory."""
+
+    permission: str
+    shared_by: str
+    expires_at: Optional[datetime]
+
+    def is_live(self, now: datetime) -> bool:
+        return self.expires_at is None or self.expires_at > now
+
+
+@dataclass(frozen=True)
+class AccessContext:
+    """The user-side inputs of every memory access decision."""
+
+    user_id: str
+    org_id: str
+    clearance_level: int = 0
+    team_roles: Dict[str, str] = field(default_factory=dict)
+    shares: Dict[str, CachedShare] = field(default_factory=dict)
+
+    @property
+    def team_ids(self) -> FrozenSet[str]:
+        return frozenset(self.team_roles)
+
+    def share_for(self, memory_id: str) -> Optional[CachedShare]:
+        """The user's live share of ``memory_id`` (expiry checked at read time)."""
+        share = self.shares.get(str(memory_id))
+        if share is None or not share.is_live(datetime.now(timezone.utc)):
+            return None
+        return share
+
+    def shared_memory_ids(self) -> List[str]:
+        now = datetime.now(timezone.utc)
+        return [mid for mid, share in self.shares.items() if share.is_live(now)]
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            "user_id": self.user_id,
+            "org_id": self.org_id,
+            "clearance_level": self.clearance_level,
+            "team_roles": self.team_roles,
+            "shares": {
+                mid: [s.permission, s.shared_by, s.expires_at.isoformat() if s.expires_at else None]
+                for mid, s in self.shares.items()
+            },
+        }
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "AccessContext":
+        return cls(
+            user_id=data["user_id"],
+            org_id=data["org_id"],
+            clearance_level=int(data.get("clearance_level") or 0),
+            team_roles=dict(data.get("team_roles") or {}),
+            shares={
+                mid: CachedShare(
+                    permission=permission,
+                    shared_by=shared_by,
+                    expires_at=datetime.fromisoformat(expires_at) if expires_at else None,
+                )
+                for mid, (permission, shared_by, expires_at) in (data.get("shares") or {}).items()
+            },
+        )
+
+
+_cache: VersionedCache[AccessContext] = VersionedCache(
+    prefix=KEY_PREFIX,
+    settings_prefix="ACCESS_CONTEXT_CACHE",
+    encode=AccessContext.to_json,
+    decode=AccessContext.from_json,
+)
+
+
+async def get_access_context(session: AsyncSession, user_id: str, org_id: str) -> AccessContext:
+    """The user's compiled access context (read-through cache)."""
+    user_id, org_id = str(user_id), str(org_id)
+
+    async def _load(user_ids: List[str]) -> Dict[str, AccessContext]:
+        return {uid: await compile_access_context(session, uid, org_id) for uid in user_ids}
+
+    return (await _cache.get_many(org_id, [user_id], _load))[user_id]
+
+
+async def compile_access_context(session: AsyncSession, user_id: str, org_id: str) -> AccessContext:
+    """Build a user's access context from the database (three small queries)."""
+    member_rows = (
+        await session.execute(
+            select(TeamMember.team_id, TeamMember.role)
+            .join(Team, Team.id == TeamMember.team_id)
+            .where(
+                and_(
+                    TeamMember.user_id == user_id,
+                    TeamMember.organization_id == org_id,
+                    TeamMember.is_active == True,
+                    Team.is_active == True,
+                )
+            )
+        )
+    ).all()
+    team_roles = {str(team_id): str(role) for team_id, role in member_rows}
+
+    now = datetime.now(timezone.utc)
+    share_rows = (
+        await session.execute(
+            select(
+                MemorySharing.memory_id,
+                MemorySharing.permission,
+                MemorySharing.shared_by,
+                MemorySharing.expires_at,
+            ).where(
+                and_(
+                    MemorySharing.share_type == "user",
+                    MemorySharing.target_id == user_id,
+                    MemorySharing.organization_id == org_id,
+                    MemorySharing.is_active == True,
+                    or_(
+                        MemorySharing.expires_at.is_(None),
+                        MemorySharing.expires_at > now,
+                    ),
+                )
+            )
+        )
+    ).all()
+    shares: Dict[str, CachedShare] = {}
+    for memory_id, permission, shared_by, expires_at in share_rows:
+        share = CachedShare(str(permission), str(shared_by), expires_at)
+        current = shares.get(str(memory_id))
+        # Several active shares of one memory: keep the most permissive.
+        if current is None or _SHARE_RANK.get(share.permission, 0) > _SHARE_RANK.get(current.permission, 0):
+            shares[str(memory_id)] = share
+
+    clearance = (
+        await session.execute(select(User.clearance_level).where(User.id == user_id))
+    ).scalar_one_or_none()
+
+    return AccessContext(
+        user_id=user_id,
+        org_id=org_id,
+        clearance_level=int(clearance or 0),
+        team_roles=team_roles,
+        shares=shares,
+    )
+
+
+async def invalidate_users(
+    org_id: str,
+    user_ids: Iterable[str],
+    session: Optional[AsyncSession] = None,
+) -> None:
+    """Drop the cached contexts of ``user_ids`` in every process."""
+    await _cache.invalidate(str(org_id), list(user_ids), session=session)
+
+
+async def invalidate_org(org_id: str, session: Optional[AsyncSession] = None) -> None:
+    """Drop every cached context of the org (team changes)."""
+    await _cache.invalidate(str(org_id), None, session=session)
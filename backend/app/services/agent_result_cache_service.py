@@ -1,11 +1,21 @@
 """Agent result cache service.
 
-Provides a Postgres-backed cache for agent outputs, keyed by a stable
-content/enrichment hash (intentionally excluding memory_id).
+Provides a two-tier cache for agent outputs, keyed by a stable
+content/enrichment hash (intentionally excluding memory_id):
+
+- Hot tier: a per-process LRU in front of Redis (AGENT_CACHE_LOCAL_*,
+  AGENT_CACHE_REDIS_TTL_SECONDS). Redis keeps a per-org access index and
+  evicts the least recently used entries past AGENT_CACHE_MAX_ENTRIES_PER_ORG.
+- Durable tier: Postgres rows, trimmed per org to the same size by
+  ``prune`` (scheduled maintenance) once expired or least recently used.
+
+Entries are content-addressed and never change under a key, so the hot tier
+needs no invalidation; it only expires.
 
 Tenant safety:
 - Rows are isolated by organization_id and protected by RLS.
 - Callers must run inside a tenant-context transaction.
+- Hot-tier keys are namespaced by organization_id.
 
 Notes:
 - This cache is best-effort. Failures should not break the pipeline.
@@ -13,21 +23,157 @@ Notes:
 
 from __future__ import annotations
 
+import json
+import logging
+import time
+from collections import OrderedDict
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from typing import Any, Optional
 
-from sqlalchemy import select
+from sqlalchemy import delete, func, or_, select
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.agents.utils import compute_inputs_hash
+from app.core.config import settings
+from app.core.redis import RedisClient
+from app.middleware.prometheus import (
+    record_agent_cache_bytes,
+    record_agent_cache_eviction,
+    record_agent_cache_hit,
+    record_agent_cache_miss,
+)
 from app.models.agent_result_cache import AgentResultCache
 
+logger = logging.getLogger(__name__)
+
+# KEYS[1] = entry key, KEYS[2] = per-org access index (zset of entry keys)
+# ARGV = payload, ttl seconds, now (seconds), max entries per org
+# Stores the entry, drops index members older than the TTL and evicts the
+# least recently used entries beyond the per-org limit. Returns evicted count.
+STORE_SCRIPT = """
+redis.call('SET', KEYS[1], ARGV[1], 'EX', tonumber(ARGV[2]))
+redis.call('ZADD', KEYS[2], tonumber(ARGV[3]), KEYS[1])
+redis.call('ZREMRANGEBYSCORE', KEYS[2], '-inf', tonumber(ARGV[3]) - tonumber(ARGV[2]))
+local evicted = 0
+local overflow = redis.call('ZCARD', KEYS[2]) - tonumber(ARGV[4])
+if overflow > 0 then
+  local victims = redis.call('ZRANGE', KEYS[2], 0, overflow - 1)
+  for _, key in ipairs(victims) do
+    redis.call('DEL', key)
+  end
+  redis.call('ZREM', KEYS[2], unpack(victims))
+  evicted = #victims
+end
+redis.call('EXPIRE', KEYS[2], tonumber(ARGV[2]))
+return evicted
+"""
+
 
 @dataclass(frozen=True)
 class CachedAgentResult:
     outputs: dict[str, Any]
     confidence: float
+    tier: str = "db"
+
+
+def _encode(result: CachedAgentResult) -> str:
+    return json.dumps({"o": result.outputs, "c": result.confidence}, separators=(",", ":"))
+
+
+class AgentResultHotCache:
+    """Per-process LRU + Redis front for AgentResultCacheService."""
+
+    def __init__(self) -> None:
+        self._local: "OrderedDict[str, tuple[float, CachedAgentResult]]" = OrderedDict()
+
+    @staticmethod
+    def entry_key(organization_id: str, parts: list[str]) -> str:
+        return f"agentcache:{organization_id}:{compute_inputs_hash(parts)}"
+
+    @staticmethod
+    def index_key(organization_id: str) -> str:
+        return f"agentcache:{organization_id}:lru"
+
+    @staticmethod
+    def _redis_ttl(ttl_seconds: int | None) -> int:
+        ttl = int(settings.AGENT_CACHE_REDIS_TTL_SECONDS)
+        if ttl_seconds:
+            ttl = min(ttl, int(ttl_seconds))
+        return max(1, ttl)
+
+    def clear_local(self) -> None:
+        self._local.clear()
+
+    async def get(self, organization_id: str, key: str) -> Optional[CachedAgentResult]:
+        entry = self._local.get(key)
+        if entry is not None:
+            if entry[0] > time.monotonic():
+                self._local.move_to_end(key)
+                return entry[1]
+            self._local.pop(key, None)
+
+        try:
+            client = await RedisClient.get_client()
+            pipe = client.pipeline(transaction=False)
+            pipe.get(key)
+            # Refresh recency only for members that still exist.
+            pipe.zadd(self.index_key(organization_id), {key: time.time()}, xx=True)
+            payload, _ = await pipe.execute()
+        except Exception as e:
+            logger.debug("Agent result hot cache unavailable: %s", e)
+            return None
+        if not payload:
+            return None
+
+        data = json.loads(payload)
+        record_agent_cache_bytes("read", len(payload))
+        result = CachedAgentResult(outputs=data.get("o") or {}, confidence=float(data.get("c") or 0.0), tier="redis")
+        self._put_local(key, result)
+        return result
+
+    async def put(
+        self,
+        organization_id: str,
+        key: str,
+        result: CachedAgentResult,
+        *,
+        ttl_seconds: int | None = None,
+    ) -> None:
+        self._put_local(key, result)
+        payload = _encode(result)
+        try:
+            client = await RedisClient.get_client()
+            evicted = await client.register_script(STORE_SCRIPT)(
+                keys=[key, self.index_key(organization_id)],
+                args=[
+                    payload,
+                    self._redis_ttl(ttl_seconds),
+                    time.time(),
+                    int(settings.AGENT_CACHE_MAX_ENTRIES_PER_ORG),
+                ],
+            )
+        except Exception as e:
+            logger.debug("Agent result hot cache write failed: %s", e)
+            return
+        record_agent_cache_bytes("write", len(payload))
+        if evicted:
+            record_agent_cache_eviction("redis", int(evicted))
+
+    def _put_local(self, key: str, result: CachedAgentResult) -> None:
+        size = int(settings.AGENT_CACHE_LOCAL_SIZE)
+        if size <= 0:
+            return
+        ttl = float(settings.AGENT_CACHE_LOCAL_TTL_SECONDS)
+        self._local[key] = (time.monotonic() + ttl, CachedAgentResult(result.outputs, result.confidence, "local"))
+        self._local.move_to_end(key)
+        while len(self._local) > size:
+            self._local.popitem(last=False)
+            record_agent_cache_eviction("local", 1)
+
+
+hot_cache = AgentResultHotCache()
 
 
 class AgentResultCacheService:
@@ -47,6 +193,12 @@ class AgentResultCacheService:
     ) -> Optional[CachedAgentResult]:
         now = now or datetime.now(timezone.utc)
 
+        hot_key = hot_cache.entry_key(organization_id, [agent_name, agent_version, strategy, model, cache_key])
+        hot = await hot_cache.get(organization_id, hot_key)
+        if hot is not None:
+            record_agent_cache_hit(agent_name, hot.tier)
+            return hot
+
         stmt = (
             select(AgentResultCache)
             .where(
@@ -62,15 +214,20 @@ class AgentResultCacheService:
 
         res = await self.session.execute(stmt)
         row = res.scalar_one_or_none()
-        if row is None:
-            return None
-
-        if row.expires_at is not None and row.expires_at <= now:
+        if row is None or (row.expires_at is not None and row.expires_at <= now):
+            record_agent_cache_miss(agent_name)
             return None
 
         row.last_accessed_at = now
         await self.session.flush()
-        return CachedAgentResult(outputs=row.outputs or {}, confidence=float(row.confidence or 0.0))
+        result = CachedAgentResult(outputs=row.outputs or {}, confidence=float(row.confidence or 0.0))
+        record_agent_cache_hit(agent_name, "db")
+
+        remaining = None
+        if row.expires_at is not None:
+            remaining = max(1, int((row.expires_at - now).total_seconds()))
+        await hot_cache.put(organization_id, hot_key, result, ttl_seconds=remaining)
+        return result
 
     async def upsert(
         self,
@@ -130,3 +287,41 @@ class AgentResultCacheService:
 
         await self.session.execute(stmt)
         await self.session.flush()
+
+        await hot_cache.put(
+            organization_id,
+            hot_cache.entry_key(organization_id, [agent_name, agent_version, strategy, model, cache_key]),
+            CachedAgentResult(outputs=outputs or {}, confidence=float(confidence or 0.0)),
+            ttl_seconds=ttl_int if expires_at is not None else None,
+        )
+
+    async def prune(
+        self,
+        *,
+        organization_id: str,
+        max_entries: int | None = None,
+        now: Optional[datetime] = None,
+    ) -> int:
+        """Delete expired rows and the least recently used rows beyond ``max_entries``."""
+        now = now or datetime.now(timezone.utc)
+        max_entries = int(max_entries if max_entries is not None else settings.AGENT_CACHE_MAX_ENTRIES_PER_ORG)
+
+        recency = func.coalesce(AgentResultCache.last_accessed_at, AgentResultCache.updated_at)
+        keep = (
+            select(AgentResultCache.id)
+            .where(
+                AgentResultCache.organization_id == organization_id,
+                or_(AgentResultCache.expires_at.is_(None), AgentResultCache.expires_at > now),
+            )
+            .order_by(recency.desc())
+            .limit(max(0, max_entries))
+        )
+        stmt = delete(AgentResultCache).where(
+            AgentResultCache.organization_id == organization_id,
+            AgentResultCache.id.not_in(keep.scalar_subquery()),
+        )
+        res = await self.session.execute(stmt)
+        deleted = int(res.rowcount or 0)
+        if deleted:
+            record_agent_cache_eviction("db", deleted)
+        return deleted
@@ -12,6 +12,7 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from datetime import datetime, timezone
+import asyncio
 import contextlib
 import contextvars
 import json
@@ -24,19 +25,25 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.agents.registry import get_agent
 from app.agents.types import AgentResult
-from app.agents.utils import compute_inputs_hash
+from app.agents.utils import compute_inputs_hash, normalize_content_for_cache
+from app.agents.llm.combined_enrichment import (
+    ENRICHMENT_SECTIONS,
+    CombinedEnrichmentBatcher,
+    EnrichmentItem,
+    combined_enrichment_enabled,
+)
 from app.agents.llm.tool_events import ToolEvent, ToolEventSink
 from app.core.config import settings
 from app.core.database import get_tenant_session
 from app.models.agent_run import AgentRun
 from app.models.agent_run_event import AgentRunEvent
-from app.models.memory import MemoryMetadata
 from app.models.memory_feedback import MemoryFeedback
 from app.services.agent_result_cache_service import AgentResultCacheService
 from app.services.audit_service import AuditService
 from app.services.feedback_learning_config_service import FeedbackLearningConfigService
 from app.services.graph_edge_service import GraphEdgeService
 from app.services.logseq_export_persistence_service import LogseqExportPersistenceService
+from app.services.memory_metadata_cache import MemoryMetadataCache
 from app.services.short_term_memory import ShortTermMemoryService
 from app.services.topic_service import TopicService
 from app.services.pattern_service import PatternService
@@ -74,8 +81,13 @@ class PipelineContext:
 
 
 class AgentRunner:
-    def __init__(self, *, service_user_id: Optional[str] = None):
+    def __init__(self, *, service_user_id: Optional[str] = None, combined_enrichment: bool = False):
         self.service_user_id = service_user_id
+        # Combined mode: one multi-task LLM call per memory feeds all four
+        # enrichment agents, micro-batched across memories run concurrently.
+        self.combined_enrichment = combined_enrichment
+        self._batcher: CombinedEnrichmentBatcher | None = None
+        self._combined: dict[str, asyncio.Future] = {}
 
     @staticmethod
     def _stable_json(v: object) -> str:
@@ -122,7 +134,8 @@ class AgentRunner:
         enrichment: dict,
         pending_feedback_fingerprint: str,
     ) -> str:
-        # Intentionally excludes memory_id to enable cross-memory reuse.
+        # Intentionally excludes memory_id to enable cross-memory reuse, and
+        # keys on normalized content so near-duplicates share an entry.
         return compute_inputs_hash(
             [
                 agent_name,
@@ -131,7 +144,7 @@ class AgentRunner:
                 model,
                 ctx.org_id,
                 ctx.storage,
-                content,
+                normalize_content_for_cache(content),
                 existing_classification or "",
                 scope or "",
                 scope_id or "",
@@ -436,6 +449,7 @@ class AgentRunner:
                 # Cross-memory cache lookup (best-effort).
                 cache_hit: Optional[dict] = None
                 cache_confidence: float = 0.0
+                cache_key: Optional[str] = None
                 strategy = self._cache_strategy(agent.name)
                 model = self._cache_model()
                 if (
@@ -497,6 +511,7 @@ class AgentRunner:
                                 "agent": agent.name,
                                 "ok": True,
                                 "cache_hit": cached is not None,
+                                "tier": getattr(cached, "tier", None),
                                 "duration_ms": round(duration_ms, 3),
                             },
                         )
@@ -544,6 +559,20 @@ class AgentRunner:
                     await self._persist_result(session, run_row, cached_result, inputs_hash)
                     return cached_result
 
+                combined: Optional[dict] = None
+                if (
+                    self.combined_enrichment
+                    and agent.name in ENRICHMENT_SECTIONS
+                    and content
+                    and combined_enrichment_enabled()
+                ):
+                    combined = await self._combined_sections(
+                        ctx=ctx,
+                        content=content,
+                        existing_classification=existing_classification,
+                        tool_event_sink=tool_event_sink,
+                    )
+
                 agent_ctx = {
                     "tenant": {"org_id": ctx.org_id, "org_slug": None},
                     "actor": {"user_id": ctx.initiator_user_id or "", "roles": []},
@@ -563,6 +592,8 @@ class AgentRunner:
                     },
                     "tool_event_sink": tool_event_sink,
                 }
+                if combined is not None:
+                    agent_ctx["combined_enrichment"] = combined
 
                 try:
                     result = await agent.run(ctx.memory_id, agent_ctx)
@@ -588,29 +619,20 @@ class AgentRunner:
                         and content
                     ):
                         try:
-                            cache_key = self._compute_cache_key(
-                                agent_name=agent.name,
-                                agent_version=agent.version,
-                                strategy=strategy,
-                                model=model,
-                                ctx=ctx,
-                                content=content,
-                                existing_classification=existing_classification,
-                                scope=scope or "personal",
-                                scope_id=scope_id,
-                                enrichment=enrichment or {},
-                                pending_feedback_fingerprint=pending_feedback_fingerprint,
-                            )
-                            await _emit_tool_event_local(
-                                event_type="tool_call",
-                                summary_text="AgentRunner._compute_cache_key computed",
-                                payload={
-                                    "tool": "AgentRunner._compute_cache_key",
-                                    "agent": agent.name,
-                                    "inputs_hash_len": len(inputs_hash),
-                                    "cache_key_len": len(cache_key),
-                                },
-                            )
+                            if cache_key is None:
+                                cache_key = self._compute_cache_key(
+                                    agent_name=agent.name,
+                                    agent_version=agent.version,
+                                    strategy=strategy,
+                                    model=model,
+                                    ctx=ctx,
+                                    content=content,
+                                    existing_classification=existing_classification,
+                                    scope=scope or "personal",
+                                    scope_id=scope_id,
+                                    enrichment=enrichment or {},
+                                    pending_feedback_fingerprint=pending_feedback_fingerprint,
+                                )
                             cache_svc = AgentResultCacheService(session)
                             await _emit_tool_event_local(
                                 event_type="tool_call",
@@ -794,6 +816,68 @@ class AgentRunner:
             except Exception:
                 pass
 
+    async def run_enrichment(
+        self,
+        *,
+        ctx: PipelineContext,
+        attempt: int = 1,
+        max_attempts: int = 5,
+    ) -> list[AgentResult]:
+        """Run the four enrichment agents in order for one memory."""
+        results: list[AgentResult] = []
+        for agent_name in ("classification", "metadata", "topics", "patterns"):
+            results.append(
+                await self.run_agent(ctx=ctx, agent_name=agent_name, attempt=attempt, max_attempts=max_attempts)
+            )
+        return results
+
+    async def run_enrichment_many(
+        self,
+        *,
+        ctxs: list[PipelineContext],
+        attempt: int = 1,
+        max_attempts: int = 5,
+    ) -> list[list[AgentResult] | Exception]:
+        """Enrich several memories concurrently so their LLM requests share batches.
+
+        Returns one entry per context: the memory's results, or the exception
+        its enrichment raised. One failing memory does not fail the others.
+        """
+        outcomes = await asyncio.gather(
+            *(self.run_enrichment(ctx=c, attempt=attempt, max_attempts=max_attempts) for c in ctxs),
+            return_exceptions=True,
+        )
+        for outcome in outcomes:
+            if isinstance(outcome, BaseException) and not isinstance(outcome, Exception):
+                raise outcome
+        return list(outcomes)
+
+    async def _combined_sections(
+        self,
+        *,
+        ctx: PipelineContext,
+        content: str,
+        existing_classification: Optional[str],
+        tool_event_sink: ToolEventSink,
+    ) -> dict:
+        """Combined-prompt sections for a memory, fetched at most once per runner."""
+        fut = self._combined.get(ctx.memory_id)
+        if fut is None:
+            if self._batcher is None:
+                self._batcher = CombinedEnrichmentBatcher()
+            fut = asyncio.ensure_future(
+                self._batcher.enrich(
+                    EnrichmentItem(
+                        key=ctx.memory_id,
+                        content=content,
+                        existing_classification=existing_classification,
+                    ),
+                    tool_event_sink=tool_event_sink,
+                )
+            )
+            self._combined[ctx.memory_id] = fut
+        return await asyncio.shield(fut)
+
     async def _materialize_side_effects(
         self,
         *,
@@ -1152,7 +1236,7 @@ class AgentRunner:
         )
         start = time.perf_counter()
         try:
-            memory = await session.get(MemoryMetadata, ctx.memory_id)
+            memory = await MemoryMetadataCache(session, ctx.org_id).get(ctx.memory_id)
             duration_ms = (time.perf_counter() - start) * 1000.0
             await _emit_tool_event(
                 event_type="tool_result",
@@ -0,0 +1,257 @@
+"""backend.app.services.attachment_blob_store
+
+Content-addressed, reference-counted storage for attachment bytes.
+
+Uploads are streamed to a temporary file while hashing; the finished file is
+then keyed by (organization, SHA-256). The first reference moves it into
+``blobs/<org>/<aa>/<digest>``; later identical uploads just bump
+``attachment_blobs.ref_count`` and drop their temporary copy. Deleting the
+last reference removes the blob.
+
+``acquire``/``release`` go through the blob row (``INSERT .. ON CONFLICT``
+and ``UPDATE .. RETURNING``), so concurrent uploads and deletes of the same
+digest are serialized by its row lock. Files are placed while that lock is
+held and removed again if the transaction rolls back. A released blob's file
+is moved aside under the lock and deleted only once the transaction commits;
+a rollback puts it back.
+
+Attachments removed without ``release`` (cascading memory deletes) leave
+orphaned blobs behind; ``sweep_orphans`` (nightly maintenance) reclaims them.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+from uuid import uuid4
+
+from fastapi import UploadFile
+from sqlalchemy import delete, event, exists, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.attachment_blob import AttachmentBlob
+from app.models.memory_attachment import MemoryAttachment
+
+BLOB_PREFIX = "blobs"
+
+# ``Session.info`` key: (moved-aside file or None for a newly placed blob, blob
+# path) pairs awaiting the outcome, in the order they happened.
+_PENDING_KEY = "attachment_blob_store.pending"
+
+
+class BlobTooLargeError(ValueError):
+    pass
+
+
+@dataclass
+class StagedBlob:
+    temp_path: Path
+    sha256: str
+    size_bytes: int
+
+
+def blob_relpath(org_id: str, sha256: str) -> str:
+    return str(Path(BLOB_PREFIX) / str(org_id) / sha256[:2] / sha256)
+
+
+def is_blob_path(relpath: str) -> bool:
+    return Path(relpath).parts[:1] == (BLOB_PREFIX,)
+
+
+def _set_aside(target: Path) -> Path | None:
+    aside = target.with_name(f"{target.name}.{uuid4().hex}.released")
+    try:
+        os.replace(target, aside)
+    except FileNotFoundError:
+        return None
+    return aside
+
+
+def _commit_pending(sync_session: Session) -> None:
+    pending = sync_session.info.get(_PENDING_KEY) or []
+    for aside, _target in pending:
+        if aside is None:
+            continue
+        try:
+            aside.unlink(missing_ok=True)
+        except OSError:
+            # Best-effort; DB is source of truth.
+            pass
+    pending.clear()
+
+
+def _undo_pending(sync_session: Session, _transaction: Any = None) -> None:
+    # Newest first, so a blob placed and released in one transaction ends up
+    # removed, and one released and re-placed ends up restored.
+    pending = sync_session.info.get(_PENDING_KEY) or []
+    for aside, target in reversed(pending):
+        try:
+            if aside is None:
+                target.unlink(missing_ok=True)
+            else:
+                os.replace(aside, target)
+        except OSError:
+            pass
+    pending.clear()
+
+
+def _undo_pending_on_close(sync_session: Session, transaction: Any) -> None:
+    # Runs after ``after_commit`` (nothing left) and on close() without a
+    # commit, which emits no rollback event.
+    if not transaction.nested:
+        _undo_pending(sync_session)
+
+
+def _place(temp_path: Path, target: Path) -> bool:
+    """Move ``temp_path`` to ``target``; False if the blob was already there."""
+    if target.exists():
+        temp_path.unlink(missing_ok=True)
+        return False
+    target.parent.mkdir(parents=True, exist_ok=True)
+    os.replace(temp_path, target)
+    return True
+
+
+class AttachmentBlobStore:
+    """Blob operations for one organization; ``root`` is the attachments dir."""
+
+    def __init__(self, session: AsyncSession, org_id: str, root: Path):
+        self.session = session
+        self.org_id = org_id
+        self.root = root
+
+    def path(self, relpath: str) -> Path:
+        root = self.root.resolve()
+        target = (root / relpath).resolve()
+        if root not in target.parents:
+            raise ValueError("Invalid attachment path")
+        return target
+
+    async def stage(self, file: UploadFile, max_bytes: int) -> StagedBlob:
+        """Stream ``file`` to a temporary file, hashing as it goes."""
+        tmp_dir = self.root / "tmp"
+        await asyncio.to_thread(tmp_dir.mkdir, parents=True, exist_ok=True)
+        temp_path = tmp_dir / str(uuid4())
+
+        hasher = hashlib.sha256()
+        total = 0
+        try:
+            out = await asyncio.to_thread(open, temp_path, "wb")
+            try:
+                while True:
+                    chunk = await file.read(1024 * 1024)
+                    if not chunk:
+                        break
+                    total += len(chunk)
+                    if total > max_bytes:
+                        raise BlobTooLargeError(f"Attachment too large (max {max_bytes} bytes)")
+                    hasher.update(chunk)
+                    await asyncio.to_thread(out.write, chunk)
+            finally:
+                await asyncio.to_thread(out.close)
+        except BaseException:
+            await self.discard(temp_path)
+            raise
+        return StagedBlob(temp_path=temp_path, sha256=hasher.hexdigest(), size_bytes=total)
+
+    async def discard(self, temp_path: Path) -> None:
+        try:
+            await asyncio.to_thread(temp_path.unlink, missing_ok=True)
+        except OSError:
+            pass
+
+    async def acquire(self, staged: StagedBlob) -> str:
+        """Add a reference to the staged digest; returns the blob's relpath."""
+        relpath = blob_relpath(self.org_id, staged.sha256)
+        stmt = insert(AttachmentBlob).values(
+            organization_id=self.org_id,
+            sha256=staged.sha256,
+            size_bytes=staged.size_bytes,
+            ref_count=1,
+            storage_path=relpath,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[AttachmentBlob.organization_id, AttachmentBlob.sha256],
+            set_={"ref_count": AttachmentBlob.ref_count + 1},
+        )
+        await self.session.execute(stmt)
+        target = self.path(relpath)
+        try:
+            placed = await asyncio.to_thread(_place, staged.temp_path, target)
+        except BaseException:
+            await self.discard(staged.temp_path)
+            raise
+        if placed:
+            # A rollback drops the row, so the file must go with it.
+            self._track(None, target)
+        return relpath
+
+    async def release(self, sha256: str) -> bool:
+        """Drop one reference; deletes the blob at zero. Returns True if deleted."""
+        row = (
+            await self.session.execute(
+                update(AttachmentBlob)
+                .where(AttachmentBlob.organization_id == self.org_id)
+                .where(AttachmentBlob.sha256 == sha256)
+                .values(ref_count=AttachmentBlob.ref_count - 1)
+                .returning(AttachmentBlob.ref_count, AttachmentBlob.storage_path)
+            )
+        ).first()
+        if row is None or row[0] > 0:
+            return False
+
+        await self.session.execute(
+            delete(AttachmentBlob)
+            .where(AttachmentBlob.organization_id == self.org_id)
+            .where(AttachmentBlob.sha256 == sha256)
+        )
+        await self._delete_on_commit(row[1])
+        return True
+
+    async def _delete_on_commit(self, relpath: str) -> None:
+        """Move the blob file aside; it is deleted on commit and restored on rollback."""
+        target = self.path(relpath)
+        try:
+            aside = await asyncio.to_thread(_set_aside, target)
+        except OSError:
+            return
+        if aside is None:
+            return
+        self._track(aside, target)
+
+    def _track(self, aside: Path | None, target: Path) -> None:
+        sync_session = self.session.sync_session
+        pending = sync_session.info.get(_PENDING_KEY)
+        if pending is None:
+            pending = sync_session.info[_PENDING_KEY] = []
+            event.listen(sync_session, "after_commit", _commit_pending)
+            event.listen(sync_session, "after_soft_rollback", _undo_pending)
+            event.listen(sync_session, "after_transaction_end", _undo_pending_on_close)
+        pending.append((aside, target))
+
+    async def sweep_orphans(self, limit: int = 500) -> int:
+        """Delete blobs no attachment row references any more."""
+        orphans = (
+            await self.session.execute(
+                select(AttachmentBlob)
+                .where(AttachmentBlob.organization_id == self.org_id)
+                .where(
+                    ~exists().where(
+                        MemoryAttachment.organization_id == AttachmentBlob.organization_id,
+                        MemoryAttachment.storage_path == AttachmentBlob.storage_path,
+                    )
+                )
+                .limit(int(limit))
+                .with_for_update(skip_locked=True)
+            )
+        ).scalars().all()
+        for blob in orphans:
+            await self.session.delete(blob)
+            await self._delete_on_commit(blob.storage_path)
+        return len(orphans)
@@ -0,0 +1,232 @@
+"""backend.app.services.attachment_indexer
+
+Background indexing of attachment text.
+
+Uploads only store bytes; this module does the expensive part afterwards:
+
+1. text extraction (PDF/DOCX parsing, OCR) in a process pool, so it neither
+   blocks the event loop nor holds the GIL of the serving process;
+2. splitting the text into overlapping chunks;
+3. embedding the chunks in batches (``EmbeddingService.embed_many``);
+4. one bulk Qdrant upsert, one point per chunk.
+
+Chunk points carry the parent memory's payload (scope, owner, clearance,
+tags, created_ts) plus ``attachment_id``/``chunk_index``, so the normal
+memory filters apply and search collapses chunk hits back onto the memory
+by grouping on ``memory_id``.
+
+Point ids are derived from the attachment id and chunk index, so re-indexing
+overwrites rather than duplicates; stale points from a longer previous
+version are deleted first.
+
+Results are reused per digest: when another attachment in the organization
+with the same SHA-256 (and content type) is already indexed, its chunk
+vectors are copied under the new attachment's ids and payload instead of
+extracting and embedding the same bytes again.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import logging
+import multiprocessing
+import uuid
+from concurrent.futures import Executor, ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.qdrant import QdrantService
+from app.models.memory import MemoryMetadata
+from app.models.memory_attachment import MemoryAttachment
+from app.services.attachment_text_extractor import extract_text_for_indexing_from_file
+from app.services.embedding_service import EmbeddingService
+from app.services.memory_attachment_service import resolve_attachment_path
+from app.services.memory_service import MemoryService
+
+logger = logging.getLogger(__name__)
+
+_extraction_pool: Optional[Executor] = None
+
+
+def _get_extraction_pool() -> Optional[Executor]:
+    """Shared extraction process pool (None when disabled: use a thread)."""
+    global _extraction_pool
+    workers = int(settings.ATTACHMENT_EXTRACTION_WORKERS or 0)
+    if workers <= 0:
+        return None
+    if _extraction_pool is None:
+        # spawn: forking a process with live event loops and sockets is unsafe.
+        _extraction_pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _extraction_pool
+
+
+def shutdown_extraction_pool() -> None:
+    global _extraction_pool
+    if _extraction_pool is not None:
+        _extraction_pool.shutdown(wait=False, cancel_futures=True)
+        _extraction_pool = None
+
+
+async def extract_attachment_text(att: MemoryAttachment, path: Path) -> str:
+    """Extract indexable text from a stored attachment off the event loop."""
+    call = functools.partial(
+        extract_text_for_indexing_from_file,
+        content_type=att.content_type,
+        filename=att.file_name,
+        file_path=path,
+        max_chars=int(settings.ATTACHMENT_INDEX_MAX_CHARS or 1_000_000),
+        max_bytes=int(settings.ATTACHMENT_INDEX_MAX_FILE_BYTES or 10 * 1024 * 1024),
+        ocr_service_url=getattr(settings, "OCR_SERVICE_URL", None),
+        ocr_timeout_seconds=float(getattr(settings, "OCR_SERVICE_TIMEOUT_SECONDS", 5.0) or 5.0),
+    )
+    pool = _get_extraction_pool()
+    if pool is None:
+        return await asyncio.to_thread(call)
+    return await asyncio.get_running_loop().run_in_executor(pool, call)
+
+
+def chunk_text(text: str, size: int, overlap: int) -> List[str]:
+    """
+    Split ``text`` into chunks of at most ``size`` characters.
+
+    Consecutive chunks share about ``overlap`` characters so a passage cut at a
+    boundary is still whole in one of them. Cuts prefer whitespace in the last
+    fifth of a window so words are not split.
+    """
+    text = text.strip()
+    if not text:
+        return []
+    size = max(1, size)
+    overlap = max(0, min(overlap, size // 2))
+
+    chunks: List[str] = []
+    start = 0
+    while start < len(text):
+        end = min(len(text), start + size)
+        if end < len(text):
+            cut = text.rfind(" ", start + size - size // 5, end)
+            cut = max(cut, text.rfind("\n", start + size - size // 5, end))
+            if cut > start:
+                end = cut
+        chunk = text[start:end].strip()
+        if chunk:
+            chunks.append(chunk)
+        if end >= len(text):
+            break
+        start = max(end - overlap, start + 1)
+    return chunks
+
+
+def chunk_point_id(attachment_id: str, index: int) -> str:
+    return str(uuid.uuid5(uuid.UUID(str(attachment_id)), str(index)))
+
+
+class AttachmentIndexer:
+    """Extracts, chunks, embeds and indexes one attachment."""
+
+    def __init__(self, session: AsyncSession, org_id: str):
+        self.session = session
+        self.org_id = org_id
+
+    async def index(self, attachment_id: str) -> Optional[MemoryAttachment]:
+        """
+        (Re-)index ``attachment_id``; records the outcome on the row.
+
+        Returns the attachment, or None if it (or its memory) no longer exists.
+        The caller commits.
+        """
+        att = await self.session.get(MemoryAttachment, attachment_id)
+        if att is None or str(att.organization_id) != str(self.org_id):
+            return None
+        memory = await self.session.get(MemoryMetadata, att.memory_id)
+        if memory is None:
+            return None
+
+        try:
+            twin = await self._indexed_twin(att)
+            if twin is not None and await self._reuse(twin, att, memory):
+                return att
+
+            text = await extract_attachment_text(att, resolve_attachment_path(att.storage_path))
+            chunks = chunk_text(
+                text or "",
+                int(settings.ATTACHMENT_CHUNK_CHARS),
+                int(settings.ATTACHMENT_CHUNK_OVERLAP_CHARS),
+            )
+            await QdrantService.delete_attachment_points(org_id=self.org_id, attachment_id=att.id)
+            if not chunks:
+                self._record(att, "empty", 0, error="no_indexable_text")
+                return att
+
+            vectors = await EmbeddingService.embed_many(chunks)
+            await QdrantService.upsert_memories(self.org_id, self._points(att, memory, vectors))
+            self._record(att, "indexed", len(vectors))
+        except Exception as e:
+            logger.warning("Attachment %s indexing failed: %s", attachment_id, e)
+            self._record(att, "failed", None, error=str(e)[:500])
+        return att
+
+    async def _indexed_twin(self, att: MemoryAttachment) -> Optional[MemoryAttachment]:
+        """Another attachment with the same bytes whose indexing finished."""
+        stmt = (
+            select(MemoryAttachment)
+            .where(MemoryAttachment.organization_id == self.org_id)
+            .where(MemoryAttachment.sha256 == att.sha256)
+            .where(MemoryAttachment.id != att.id)
+            .where(MemoryAttachment.content_type.is_not_distinct_from(att.content_type))
+            .where(MemoryAttachment.index_status.in_(("indexed", "empty")))
+            .order_by(MemoryAttachment.indexed_at.desc().nulls_last())
+            .limit(1)
+        )
+        return (await self.session.execute(stmt)).scalars().first()
+
+    async def _reuse(self, twin: MemoryAttachment, att: MemoryAttachment, memory: MemoryMetadata) -> bool:
+        """Copy ``twin``'s chunk vectors onto ``att``; False if they are incomplete."""
+        if twin.index_status == "empty":
+            await QdrantService.delete_attachment_points(org_id=self.org_id, attachment_id=att.id)
+            self._record(att, "empty", 0, error="no_indexable_text")
+            return True
+
+        ids = [chunk_point_id(twin.id, i) for i in range(int(twin.chunk_count or 0))]
+        stored = await QdrantService.retrieve_vectors(self.org_id, ids)
+        if not ids or len(stored) != len(ids):
+            return False
+
+        await QdrantService.delete_attachment_points(org_id=self.org_id, attachment_id=att.id)
+        await QdrantService.upsert_memories(self.org_id, self._points(att, memory, [stored[i] for i in ids]))
+        self._record(att, "indexed", len(ids))
+        return True
+
+    @staticmethod
+    def _points(att: MemoryAttachment, memory: MemoryMetadata, vectors: List[List[float]]) -> List[dict]:
+        base = MemoryService._vector_payload(memory, memory.created_at)
+        return [
+            {
+                "id": chunk_point_id(att.id, i),
+                "vector": vector,
+                "payload": {
+                    **base,
+                    "kind": "attachment_chunk",
+                    "attachment_id": str(att.id),
+                    "chunk_index": i,
+                    "file_name": att.file_name,
+                    "content_type": att.content_type,
+                },
+            }
+            for i, vector in enumerate(vectors)
+        ]
+
+    @staticmethod
+    def _record(att: MemoryAttachment, status: str, chunk_count: Optional[int], error: Optional[str] = None) -> None:
+        att.index_status = status
+        att.chunk_count = chunk_count
+        att.index_error = error
+        att.indexed_at = EmbeddingService.utcnow().replace(tzinfo=None) if status == "indexed" else None
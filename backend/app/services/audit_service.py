@@ -14,6 +14,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
 from app.models.audit import AuditEvent, MemoryAccessLog
+from app.services.memory_event_hub import STREAM_EVENT_TYPES, audit_event_payload, memory_event_hub
 
 
 class AuditService:
@@ -133,6 +134,15 @@ class AuditService:
             except Exception:
                 # Webhook emission must never break request paths.
                 pass
+
+        # Push to SSE memory stream clients once the transaction commits.
+        if (
+            organization_id
+            and event_type in STREAM_EVENT_TYPES
+            and isinstance(self.session, AsyncSession)
+            and not isinstance(self.session, Mock)
+        ):
+            memory_event_hub.publish_after_commit(self.session, organization_id, audit_event_payload(event))
         
         return event
     
@@ -165,15 +165,13 @@ class BackupRestoreService:
             if not snapshot_path.exists():
                 raise FileNotFoundError(f"Backup file not found: {snapshot_path}")
             
+            # Perform restore (streamed from disk)
             with open(snapshot_path, "rb") as f:
-                content = f.read()
-            
-            # Perform restore
-            result = await self.snapshot_service.import_snapshot(
-                content=content,
-                format=snapshot.format,
-                overwrite=overwrite
-            )
+                result = await self.snapshot_service.import_snapshot(
+                    content=f,
+                    format=snapshot.format,
+                    overwrite=overwrite
+                )
             
             # Log restore event
             from app.models.audit import AuditEvent
@@ -190,8 +188,8 @@ class BackupRestoreService:
                     "restored_at": datetime.utcnow().isoformat(),
                     "point_in_time": point_in_time.isoformat() if point_in_time else None,
                     "overwrite": overwrite,
-                    "memories_restored": result.get("imported_count", 0),
-                    "memories_skipped": result.get("skipped_count", 0)
+                    "memories_restored": result.get("imported", 0) + result.get("updated", 0),
+                    "memories_skipped": result.get("skipped", 0)
                 }
             )
             
@@ -200,14 +198,15 @@ class BackupRestoreService:
             
             logger.info(
                 f"Restored backup {backup_id}: "
-                f"{result.get('imported_count', 0)} memories"
+                f"{result.get('imported', 0) + result.get('updated', 0)} memories"
             )
             
             return {
                 "backup_id": backup_id,
                 "restored_at": datetime.utcnow().isoformat(),
-                "memories_restored": result.get("imported_count", 0),
-                "memories_skipped": result.get("skipped_count", 0),
+                "memories_restored": result.get("imported", 0) + result.get("updated", 0),
+                "memories_skipped": result.get("skipped", 0),
+                "vectors_embedded": result.get("vectors_embedded", 0),
                 "overwrite": overwrite
             }
         
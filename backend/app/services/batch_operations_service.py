@@ -13,6 +13,7 @@ from uuid import UUID
 from app.models.memory import MemoryMetadata
 from app.models.knowledge_item import KnowledgeItem
 from app.services.audit_service import AuditService
+from app.services.memory_metadata_cache import MemoryMetadataCache
 
 
 class BatchOperation:
@@ -61,6 +62,7 @@ class BatchOperationsService:
         """
         operation = BatchOperation("update", "memory")
         operation.total_items = len(memory_ids)
+        changed_ids: List[str] = []
         
         for memory_id in memory_ids:
             try:
@@ -92,11 +94,14 @@ class BatchOperationsService:
                 
                 await self.db.flush()
                 operation.successful += 1
+                changed_ids.append(memory_id)
                 
             except Exception as e:
                 operation.errors[memory_id] = str(e)
                 operation.failed += 1
         
+        await MemoryMetadataCache.invalidate(self.organization_id, changed_ids, session=self.db)
+        
         # Audit batch operation
         await self.audit_svc.log_event(
             event_type="memory.bulk_update",
@@ -133,6 +138,7 @@ class BatchOperationsService:
         """
         operation = BatchOperation("delete", "memory")
         operation.total_items = len(memory_ids)
+        changed_ids: List[str] = []
         
         for memory_id in memory_ids:
             try:
@@ -162,11 +168,14 @@ class BatchOperationsService:
                     await self.db.flush()
                 
                 operation.successful += 1
+                changed_ids.append(memory_id)
                 
             except Exception as e:
                 operation.errors[memory_id] = str(e)
                 operation.failed += 1
         
+        await MemoryMetadataCache.invalidate(self.organization_id, changed_ids, session=self.db)
+        
         # Audit batch operation
         await self.audit_svc.log_event(
             event_type="memory.bulk_delete",
@@ -0,0 +1,299 @@
+"""backend.app.services.capability_token_cache
+
+Hot-path support for memory syscalls: cached token verification and
+Redis-backed usage metering.
+
+Verification: tokens are looked up in a ``VersionedCache`` keyed by the
+SHA-256 of the token value (``captok:<org>:<digest>``; the bearer value itself
+never reaches Redis). Revocation and quota changes invalidate the entry in
+every process (``CapabilityTokenCache.invalidate``).
+
+Metering: per-token usage totals (``capusage:<token>`` hash) and a per-minute
+request counter (``caprate:<token>:<minute>``) are updated with atomic
+increments, so agents sharing a token no longer serialize on its Postgres
+row. Totals are seeded from the row on first use; ``reconcile_usage`` (a
+periodic task) writes them back to ``capability_tokens``. When Redis is
+unavailable both fall back to Postgres: the token is loaded per call and
+usage is recorded with a single atomic ``UPDATE``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import case, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.redis import RedisClient
+from app.core.versioned_cache import VersionedCache
+from app.models.capability_token import CapabilityToken
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "captok"
+USAGE_PREFIX = "capusage"
+RATE_PREFIX = "caprate"
+DIRTY_KEY = f"{USAGE_PREFIX}:dirty"
+# Idle usage hashes expire; they are re-seeded from the (reconciled) row.
+USAGE_TTL_SECONDS = 7 * 24 * 3600
+
+
+def token_digest(token_value: str) -> str:
+    return hashlib.sha256(token_value.encode("utf-8")).hexdigest()
+
+
+@dataclass(frozen=True)
+class CachedToken:
+    """Verification fields of a capability token plus usage as of loading."""
+
+    id: str
+    organization_id: str
+    scopes: str
+    quota_tokens_per_month: int
+    quota_storage_bytes: int
+    quota_requests_per_minute: int
+    tokens_used_this_month: int
+    storage_used_bytes: int
+    active: bool
+    revoked_at: Optional[datetime]
+    revocation_reason: Optional[str]
+    expires_at: Optional[datetime]
+
+    @classmethod
+    def from_row(cls, t: CapabilityToken) -> "CachedToken":
+        return cls(
+            id=str(t.id),
+            organization_id=str(t.organization_id),
+            scopes=t.scopes or "",
+            quota_tokens_per_month=int(t.quota_tokens_per_month or 0),
+            quota_storage_bytes=int(t.quota_storage_bytes or 0),
+            quota_requests_per_minute=int(t.quota_requests_per_minute or 0),
+            tokens_used_this_month=int(t.tokens_used_this_month or 0),
+            storage_used_bytes=int(t.storage_used_bytes or 0),
+            active=bool(t.active),
+            revoked_at=t.revoked_at,
+            revocation_reason=t.revocation_reason,
+            expires_at=t.expires_at,
+        )
+
+    def to_json(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["revoked_at"] = _iso(self.revoked_at)
+        data["expires_at"] = _iso(self.expires_at)
+        return data
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "CachedToken":
+        data = dict(data)
+        data["revoked_at"] = _parse_dt(data.get("revoked_at"))
+        data["expires_at"] = _parse_dt(data.get("expires_at"))
+        return cls(**data)
+
+    def has_scope(self, scope: str) -> bool:
+        return scope in [s.strip() for s in self.scopes.split(",") if s.strip()]
+
+    @property
+    def max_tokens_per_month(self) -> int:
+        return self.quota_tokens_per_month
+
+    @property
+    def max_storage_bytes(self) -> int:
+        return self.quota_storage_bytes
+
+    @property
+    def max_requests_per_minute(self) -> int:
+        return self.quota_requests_per_minute
+
+
+@dataclass
+class TokenUsage:
+    tokens_used: int
+    storage_used_bytes: int
+    requests_this_minute: int
+
+
+def _iso(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value is not None else None
+
+
+def _parse_dt(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+
+_cache: VersionedCache[CachedToken] = VersionedCache(
+    prefix=KEY_PREFIX,
+    settings_prefix="CAPABILITY_TOKEN_CACHE",
+    encode=CachedToken.to_json,
+    decode=CachedToken.from_json,
+)
+
+
+class CapabilityTokenCache:
+    """Read-through token verification cache for one organization."""
+
+    def __init__(self, session: AsyncSession, org_id: str):
+        self.session = session
+        self.org_id = str(org_id)
+
+    async def get(self, token_value: str) -> Optional[CachedToken]:
+        digest = token_digest(token_value)
+
+        async def _load(_keys: List[str]) -> Dict[str, CachedToken]:
+            row = (
+                await self.session.execute(
+                    select(CapabilityToken).where(
+                        CapabilityToken.token == token_value,
+                        CapabilityToken.organization_id == self.org_id,
+                    )
+                )
+            ).scalar_one_or_none()
+            return {digest: CachedToken.from_row(row)} if row is not None else {}
+
+        return (await _cache.get_many(self.org_id, [digest], _load)).get(digest)
+
+    @staticmethod
+    async def invalidate(
+        org_id: str,
+        token_values: Iterable[str],
+        session: Optional[AsyncSession] = None,
+    ) -> None:
+        """Drop cached verification state for ``token_values`` in every process."""
+        await _cache.invalidate(str(org_id), [token_digest(t) for t in token_values], session=session)
+
+
+def _usage_key(token_id: str) -> str:
+    return f"{USAGE_PREFIX}:{token_id}"
+
+
+def _rate_key(token_id: str, now: float) -> str:
+    return f"{RATE_PREFIX}:{token_id}:{int(now // 60)}"
+
+
+class TokenUsageMeter:
+    """Atomic Redis usage counters; methods return None/False when Redis is down."""
+
+    async def current(self, token: CachedToken) -> Optional[TokenUsage]:
+        try:
+            client = await RedisClient.get_client()
+            pipe = client.pipeline(transaction=False)
+            key = _usage_key(token.id)
+            pipe.hsetnx(key, "tokens", token.tokens_used_this_month)
+            pipe.hsetnx(key, "storage", token.storage_used_bytes)
+            pipe.hmget(key, ["tokens", "storage"])
+            pipe.get(_rate_key(token.id, time.time()))
+            *_, totals, requests = await pipe.execute()
+        except Exception as e:
+            logger.debug("Token usage meter unavailable: %s", e)
+            return None
+        return TokenUsage(
+            tokens_used=int(totals[0] or 0),
+            storage_used_bytes=int(totals[1] or 0),
+            requests_this_minute=int(requests or 0),
+        )
+
+    async def record(self, token: CachedToken, tokens_used: int = 0, storage_bytes: int = 0) -> bool:
+        now = time.time()
+        try:
+            client = await RedisClient.get_client()
+            pipe = client.pipeline(transaction=False)
+            key = _usage_key(token.id)
+            rate_key = _rate_key(token.id, now)
+            pipe.hincrby(key, "tokens", int(tokens_used))
+            pipe.hincrby(key, "storage", int(storage_bytes))
+            pipe.hset(key, "last_used", repr(now))
+            pipe.expire(key, USAGE_TTL_SECONDS)
+            pipe.incr(rate_key)
+            pipe.expire(rate_key, 120)
+            pipe.sadd(DIRTY_KEY, f"{token.organization_id}:{token.id}")
+            await pipe.execute()
+            return True
+        except Exception as e:
+            logger.debug("Token usage meter unavailable: %s", e)
+            return False
+
+
+async def record_usage_in_db(
+    session: AsyncSession,
+    token_id: str,
+    tokens_used: int = 0,
+    storage_bytes: int = 0,
+) -> None:
+    """Fallback metering: one atomic UPDATE instead of read-modify-write."""
+    now = datetime.utcnow()
+    window_open = CapabilityToken.last_request_at.is_not(None) & (
+        CapabilityToken.last_request_at > now - timedelta(seconds=60)
+    )
+    await session.execute(
+        update(CapabilityToken)
+        .where(CapabilityToken.id == token_id)
+        .values(
+            tokens_used_this_month=CapabilityToken.tokens_used_this_month + int(tokens_used),
+            storage_used_bytes=CapabilityToken.storage_used_bytes + int(storage_bytes),
+            requests_this_minute=case(
+                (window_open, CapabilityToken.requests_this_minute + 1),
+                else_=1,
+            ),
+            last_request_at=case((window_open, CapabilityToken.last_request_at), else_=now),
+            last_used_at=now,
+        )
+    )
+
+
+async def pop_dirty_tokens(batch_size: int) -> Dict[str, Dict[str, Dict[str, int]]]:
+    """
+    Take up to ``batch_size`` tokens with unreconciled usage.
+
+    Returns ``{org_id: {token_id: {"tokens": n, "storage": n, "last_used": ts}}}``.
+    """
+    client = await RedisClient.get_client()
+    members = await client.spop(DIRTY_KEY, int(batch_size)) or []
+    pairs = [m.decode() if isinstance(m, bytes) else str(m) for m in members]
+    if not pairs:
+        return {}
+    pipe = client.pipeline(transaction=False)
+    for pair in pairs:
+        pipe.hmget(_usage_key(pair.split(":", 1)[1]), ["tokens", "storage", "last_used"])
+    totals = await pipe.execute()
+
+    out: Dict[str, Dict[str, Dict[str, int]]] = {}
+    for pair, (tokens, storage, last_used) in zip(pairs, totals):
+        org_id, token_id = pair.split(":", 1)
+        if tokens is None and storage is None:
+            continue
+        out.setdefault(org_id, {})[token_id] = {
+            "tokens": int(tokens or 0),
+            "storage": int(storage or 0),
+            "last_used": float(last_used or 0),
+        }
+    return out
+
+
+async def mark_tokens_dirty(org_id: str, token_ids: Iterable[str]) -> None:
+    """Queue tokens for reconciliation again (after a failed write-back)."""
+    members = [f"{org_id}:{token_id}" for token_id in token_ids]
+    if members:
+        client = await RedisClient.get_client()
+        await client.sadd(DIRTY_KEY, *members)
+
+
+async def reconcile_usage(session: AsyncSession, usage: Dict[str, Dict[str, int]]) -> int:
+    """
+    Write Redis usage totals for one organization's tokens to Postgres.
+
+    Totals are absolute, so applying them twice is harmless; ``GREATEST``
+    keeps a row that is already ahead (e.g. fallback writes) from going back.
+    """
+    for token_id, totals in usage.items():
+        values: Dict[str, Any] = {
+            "tokens_used_this_month": func.greatest(CapabilityToken.tokens_used_this_month, totals["tokens"]),
+            "storage_used_bytes": func.greatest(CapabilityToken.storage_used_bytes, totals["storage"]),
+        }
+        if totals.get("last_used"):
+            values["last_used_at"] = datetime.utcfromtimestamp(totals["last_used"])
+        await session.execute(update(CapabilityToken).where(CapabilityToken.id == token_id).values(**values))
+    return len(usage)
@@ -16,6 +16,7 @@ import logging
 from app.models.capability_token import CapabilityToken, CapabilityScope
 from app.models.user import User
 from app.services.audit_service import AuditService
+from app.services.capability_token_cache import CapabilityTokenCache
 
 logger = logging.getLogger(__name__)
 
@@ -131,6 +132,7 @@ class CapabilityTokenService:
         token.revoked_at = datetime.utcnow()
         token.revocation_reason = reason
         await self.db.flush()
+        await CapabilityTokenCache.invalidate(token.organization_id, [token.token], session=self.db)
 
         # Audit log
         audit_svc = AuditService(self.db)
@@ -206,6 +208,7 @@ class CapabilityTokenService:
             token.max_requests_per_minute = max_requests_per_minute
 
         await self.db.flush()
+        await CapabilityTokenCache.invalidate(token.organization_id, [token.token], session=self.db)
 
         # Audit log
         audit_svc = AuditService(self.db)
@@ -1,4 +1,4 @@
-from app.services.cognitive_loop.evidence_service import CognitiveEvidenceService
+from app.services.cognitive_loop.evidence_service import CognitiveEvidenceService, EvidenceSession
 from app.services.cognitive_loop.planner_agent import PlannerAgent
 from app.services.cognitive_loop.executor_agent import ExecutorAgent
 from app.services.cognitive_loop.critic_agent import CriticAgent
@@ -8,6 +8,7 @@ from app.services.cognitive_loop.evaluation_report_service import EvaluationRepo
 
 __all__ = [
     "CognitiveEvidenceService",
+    "EvidenceSession",
     "PlannerAgent",
     "ExecutorAgent",
     "CriticAgent",
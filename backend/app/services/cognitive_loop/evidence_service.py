@@ -4,21 +4,87 @@ This service is RLS-safe by construction: it relies on MemoryService.search_memo
 which re-validates Qdrant results through Postgres (RLS) and PermissionChecker.
 
 Evidence is returned as summary-only cards; raw sensitive content is not included.
+
+Within one loop session the goal does not change, so an ``EvidenceSession``
+embeds it and runs the search once, keeping an over-fetched candidate pool
+(COGNITIVE_EVIDENCE_POOL_MULTIPLIER x limit). Later iterations re-rank that
+pool against the latest context (e.g. critic issues) instead of searching again;
+a 10-iteration loop makes one vector search, not ten. If a session does have to
+search again (different parameters, larger limit), the repeat search skips the
+access audit and activation updates of memories the session already returned;
+new results are recorded as usual. COGNITIVE_EVIDENCE_SUPPRESS_REPEAT_SIDE_EFFECTS
+turns this off.
 """
 
 from __future__ import annotations
 
+import re
+from dataclasses import dataclass, field
 from typing import Any
 
+from app.core.config import settings
 from app.schemas.memory import MemorySearchRequest
 from app.services.embedding_service import EmbeddingService
 from app.services.memory_service import MemoryService
 
+_TERM = re.compile(r"[a-z0-9]{3,}")
+
+
+def _terms(text: str) -> set[str]:
+    return set(_TERM.findall((text or "").lower()))
+
+
+@dataclass
+class EvidenceSession:
+    """Candidate pool cached for the lifetime of one CognitiveLoop session."""
+
+    suppress_repeat_side_effects: bool = True
+    key: tuple | None = None
+    pool_limit: int = 0
+    pool: list[dict[str, Any]] = field(default_factory=list)
+    embedded_goal: str | None = None
+    query_embedding: list[float] | None = None
+    recorded_ids: set[str] = field(default_factory=set)
+
+
+def rerank_cards(
+    cards: list[dict[str, Any]],
+    context: list[str] | None,
+    *,
+    weight: float,
+) -> list[dict[str, Any]]:
+    """Blend each card's retrieval score with its term overlap against ``context``.
+
+    Without context (or weight), the original retrieval order is kept.
+    """
+    wanted: set[str] = set()
+    for text in context or []:
+        wanted |= _terms(text)
+    weight = max(0.0, min(1.0, float(weight)))
+    if not wanted or weight <= 0.0 or not cards:
+        return list(cards)
+
+    max_score = max((float(c.get("score") or 0.0) for c in cards), default=0.0)
+
+    def _blended(card: dict[str, Any]) -> float:
+        base = float(card.get("score") or 0.0) / max_score if max_score > 0 else 0.0
+        text = " ".join([str(card.get("title") or ""), str(card.get("summary") or ""), *map(str, card.get("tags") or [])])
+        overlap = len(wanted & _terms(text)) / len(wanted)
+        return (1.0 - weight) * base + weight * overlap
+
+    # sorted() is stable: ties keep retrieval order.
+    return sorted(cards, key=_blended, reverse=True)
+
 
 class CognitiveEvidenceService:
     def __init__(self, memory_service: MemoryService):
         self.memory_service = memory_service
 
+    def open_session(self) -> EvidenceSession:
+        return EvidenceSession(
+            suppress_repeat_side_effects=bool(settings.COGNITIVE_EVIDENCE_SUPPRESS_REPEAT_SIDE_EFFECTS),
+        )
+
     async def retrieve_evidence(
         self,
         *,
@@ -27,8 +93,47 @@ class CognitiveEvidenceService:
         team_id: str | None = None,
         limit: int = 10,
         hybrid: bool = True,
+        session: EvidenceSession | None = None,
+        context: list[str] | None = None,
+    ) -> list[dict[str, Any]]:
+        if session is None:
+            query_embedding = await EmbeddingService.embed(goal)
+            return await self._search(query_embedding, goal, scope, team_id, limit, hybrid)
+
+        key = (goal, scope, team_id, bool(hybrid))
+        if session.key != key or limit > session.pool_limit:
+            if session.embedded_goal != goal or session.query_embedding is None:
+                session.query_embedding = await EmbeddingService.embed(goal)
+                session.embedded_goal = goal
+            multiplier = max(1, int(settings.COGNITIVE_EVIDENCE_POOL_MULTIPLIER or 1))
+            pool_limit = max(limit, min(50, limit * multiplier))
+            session.pool = await self._search(
+                session.query_embedding,
+                goal,
+                scope,
+                team_id,
+                pool_limit,
+                hybrid,
+                recorded_ids=session.recorded_ids if session.suppress_repeat_side_effects else None,
+            )
+            session.recorded_ids.update(c["id"] for c in session.pool)
+            session.key = key
+            session.pool_limit = pool_limit
+
+        ranked = rerank_cards(session.pool, context, weight=settings.COGNITIVE_EVIDENCE_CONTEXT_WEIGHT)
+        return [dict(c) for c in ranked[:limit]]
+
+    async def _search(
+        self,
+        query_embedding: list[float],
+        goal: str,
+        scope: str | None,
+        team_id: str | None,
+        limit: int,
+        hybrid: bool,
+        *,
+        recorded_ids: set[str] | None = None,
     ) -> list[dict[str, Any]]:
-        query_embedding = await EmbeddingService.embed(goal)
         req = MemorySearchRequest(
             query=goal,
             scope=scope,
@@ -36,8 +141,9 @@ class CognitiveEvidenceService:
             limit=limit,
             hybrid=hybrid,
         )
-
-        memories = await self.memory_service.search_memories(query_embedding, req)
+        memories = await self.memory_service.search_memories(
+            query_embedding, req, recorded_ids=recorded_ids
+        )
 
         cards: list[dict[str, Any]] = []
         for m in memories:
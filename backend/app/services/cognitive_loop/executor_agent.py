@@ -1,30 +1,111 @@
 """ExecutorAgent for CognitiveLoop.
 
 Executes a PlannerOutput deterministically:
-- For each step: if tool is provided, call ToolInvoker (PolicyGuard enforced)
-- Writes tool_call_logs via ToolInvoker
+- For each step: if tool is provided, call the tool through ToolInvoker (PolicyGuard enforced)
+- Writes tool_call_logs via ToolInvoker, one batch per iteration
 - Produces strict ExecutorOutput (safe summaries; no sensitive raw outputs)
 
+Steps form a dependency graph: ``PlannerStep.depends_on`` plus any
+``tool_input_hint`` value of the form ``"${S1}"`` / ``"${S1.path}"``, which is
+replaced by (part of) that step's output. Independent steps run concurrently,
+bounded by COGNITIVE_EXECUTOR_MAX_PARALLEL_STEPS overall and by each tool's
+``max_concurrency`` / ``timeout_seconds`` (or the COGNITIVE_TOOL_* defaults),
+so a plan takes its critical-path time rather than the sum of its steps.
+Authorization runs for all steps up front, serially, since it shares the
+caller's DB session.
+
 Design notes:
 - Denied tools do not crash execution; step status becomes "denied".
-- Tool failures do not crash by default (swallow_exceptions=True) and are surfaced in output.
+- Tool failures do not crash by default and are surfaced in output.
+- A step whose dependency was denied/failed (or is part of a cycle) is not run.
+- Results and errors are reported in plan order, regardless of completion order.
 """
 
 from __future__ import annotations
 
+import asyncio
+import re
 from typing import Any
 
-from app.schemas.cognitive import ExecutorOutput, ExecutorStepResult, PlannerOutput
+from app.core.config import settings
+from app.schemas.cognitive import ExecutorOutput, ExecutorStepResult, PlannerOutput, PlannerStep
 from app.services.cognitive_tooling.policy_guard import ToolContext
-from app.services.cognitive_tooling.tool_invoker import ToolInvoker
+from app.services.cognitive_tooling.tool_invoker import PendingToolCall, ToolInvocationResult, ToolInvoker
+
+_STEP_REF = re.compile(r"^\$\{([^.}]+)((?:\.[^.}]+)*)\}$")
+
+
+def _iter_refs(value: Any):
+    if isinstance(value, str):
+        match = _STEP_REF.match(value.strip())
+        if match:
+            yield match.group(1), [p for p in match.group(2).split(".") if p]
+    elif isinstance(value, dict):
+        for v in value.values():
+            yield from _iter_refs(v)
+    elif isinstance(value, list):
+        for v in value:
+            yield from _iter_refs(v)
+
+
+def step_dependencies(steps: list[PlannerStep]) -> dict[str, set[str]]:
+    """Dependencies of each step (explicit and via input references) on other known steps."""
+    known = {s.step_id for s in steps}
+    deps: dict[str, set[str]] = {}
+    for step in steps:
+        wanted = set(step.depends_on or []) | {ref for ref, _ in _iter_refs(step.tool_input_hint or {})}
+        deps[step.step_id] = {d for d in wanted if d in known and d != step.step_id}
+    return deps
+
+
+def _cyclic_steps(deps: dict[str, set[str]]) -> set[str]:
+    """Steps that can never become ready (on or behind a dependency cycle)."""
+    remaining = {k: set(v) for k, v in deps.items()}
+    ready = [k for k, v in remaining.items() if not v]
+    while ready:
+        done = ready.pop()
+        remaining.pop(done, None)
+        for k, v in remaining.items():
+            if done in v:
+                v.discard(done)
+                if not v:
+                    ready.append(k)
+    return set(remaining)
+
+
+def _lookup(output: Any, path: list[str]) -> Any:
+    for part in path:
+        if isinstance(output, dict):
+            output = output.get(part)
+        elif isinstance(output, list) and part.isdigit() and int(part) < len(output):
+            output = output[int(part)]
+        else:
+            return None
+    return output
+
+
+def _resolve(value: Any, outputs: dict[str, dict[str, Any]]) -> Any:
+    if isinstance(value, str):
+        match = _STEP_REF.match(value.strip())
+        if match and match.group(1) in outputs:
+            return _lookup(outputs[match.group(1)], [p for p in match.group(2).split(".") if p])
+        return value
+    if isinstance(value, dict):
+        return {k: _resolve(v, outputs) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_resolve(v, outputs) for v in value]
+    return value
 
 
 class ExecutorAgent:
     name = "executor_agent"
     version = "v1"
 
-    def __init__(self, *, tool_invoker: ToolInvoker):
+    def __init__(self, *, tool_invoker: ToolInvoker, max_parallel_steps: int | None = None):
         self.tool_invoker = tool_invoker
+        self.max_parallel_steps = max(
+            1, int(max_parallel_steps or settings.COGNITIVE_EXECUTOR_MAX_PARALLEL_STEPS or 1)
+        )
 
     @staticmethod
     def _compute_overall_status(step_results: list[ExecutorStepResult]) -> str:
@@ -45,88 +126,170 @@ class ExecutorAgent:
         plan: PlannerOutput,
         ctx: ToolContext,
     ) -> ExecutorOutput:
-        step_results: list[ExecutorStepResult] = []
-        errors: list[str] = []
+        steps = list(plan.steps)
+        deps = step_dependencies(steps)
+        cyclic = _cyclic_steps(deps)
 
-        for step in plan.steps:
-            tool_name = step.tool
-            if not tool_name:
-                step_results.append(
-                    ExecutorStepResult(
-                        step_id=step.step_id,
-                        status="skipped",
-                        tool_name=None,
-                        tool_call_id=None,
-                        summary="No tool for step; skipped.",
-                        artifacts={},
-                    )
-                )
+        # Phase 1: authorize every tool step (serial: PolicyGuard uses the DB session).
+        calls: dict[str, PendingToolCall] = {}
+        raised: dict[str, str] = {}
+        for step in steps:
+            if not step.tool or step.step_id in cyclic:
                 continue
-
-            tool_input_hint: dict[str, Any] = dict(step.tool_input_hint or {})
-
             try:
-                result = await self.tool_invoker.invoke(
-                    session_id=session_id,
-                    iteration_id=iteration_id,
-                    tool_name=tool_name,
-                    tool_input=tool_input_hint,
+                calls[step.step_id] = await self.tool_invoker.authorize(
+                    tool_name=step.tool,
+                    tool_input=dict(step.tool_input_hint or {}),
                     ctx=ctx,
-                    swallow_exceptions=True,
                 )
             except Exception as e:
-                # Should be rare since swallow_exceptions=True, but be defensive.
-                msg = f"Tool '{tool_name}' raised: {type(e).__name__}: {e}"
-                errors.append(msg)
-                step_results.append(
-                    ExecutorStepResult(
-                        step_id=step.step_id,
-                        status="failed",
-                        tool_name=tool_name,
-                        tool_call_id=None,
-                        summary=msg,
-                        artifacts={},
-                    )
-                )
-                continue
+                raised[step.step_id] = f"Tool '{step.tool}' raised: {type(e).__name__}: {e}"
 
-            if result.status == "success":
-                step_results.append(
-                    ExecutorStepResult(
-                        step_id=step.step_id,
-                        status="success",
-                        tool_name=tool_name,
-                        tool_call_id=result.tool_call_id,
-                        summary=f"Tool '{tool_name}' succeeded.",
-                        artifacts={},
-                    )
-                )
-            elif result.status == "denied":
-                step_results.append(
-                    ExecutorStepResult(
-                        step_id=step.step_id,
-                        status="denied",
-                        tool_name=tool_name,
-                        tool_call_id=result.tool_call_id,
-                        summary=f"Tool '{tool_name}' denied: {result.denial_reason or 'denied'}",
-                        artifacts={},
-                    )
-                )
-                if result.denial_reason:
-                    errors.append(f"{tool_name} denied: {result.denial_reason}")
-            else:
-                step_results.append(
-                    ExecutorStepResult(
-                        step_id=step.step_id,
-                        status="failed",
-                        tool_name=tool_name,
-                        tool_call_id=result.tool_call_id,
-                        summary=f"Tool '{tool_name}' failed: {result.error or 'failed'}",
-                        artifacts={},
-                    )
+        # Phase 2: run authorized calls as their dependencies complete.
+        blocked: dict[str, str] = {}
+        await self._run_graph(steps, deps, cyclic, calls, raised, blocked)
+
+        # Phase 3: one batch of tool_call_logs rows for the iteration.
+        finished = [
+            (step_id, call)
+            for step_id, call in ((s.step_id, calls.get(s.step_id)) for s in steps)
+            if call is not None and call.status in ("success", "denied", "failed")
+        ]
+        results = await self.tool_invoker.log_calls(
+            session_id=session_id,
+            iteration_id=iteration_id,
+            calls=[call for _, call in finished],
+        )
+        by_step = {step_id: result for (step_id, _), result in zip(finished, results)}
+
+        step_results: list[ExecutorStepResult] = []
+        errors: list[str] = []
+        for step in steps:
+            step_results.append(
+                self._step_result(
+                    step,
+                    by_step.get(step.step_id),
+                    raised=raised.get(step.step_id),
+                    blocked=blocked.get(step.step_id),
+                    errors=errors,
                 )
-                if result.error:
-                    errors.append(f"{tool_name} failed: {result.error}")
+            )
 
         overall_status = self._compute_overall_status(step_results)
         return ExecutorOutput(step_results=step_results, overall_status=overall_status, errors=errors)
+
+    async def _run_graph(
+        self,
+        steps: list[PlannerStep],
+        deps: dict[str, set[str]],
+        cyclic: set[str],
+        calls: dict[str, PendingToolCall],
+        raised: dict[str, str],
+        blocked: dict[str, str],
+    ) -> None:
+        step_slots = asyncio.Semaphore(self.max_parallel_steps)
+        tool_slots: dict[str, asyncio.Semaphore] = {}
+        outputs: dict[str, dict[str, Any]] = {}
+        # True when a step finished in a way its dependents may build on.
+        done: dict[str, asyncio.Future] = {s.step_id: asyncio.get_running_loop().create_future() for s in steps}
+
+        for step_id in cyclic:
+            blocked[step_id] = "Dependency cycle; step not executed."
+            done[step_id].set_result(False)
+
+        async def _run_step(step: PlannerStep) -> None:
+            ok = False
+            try:
+                waits = [done[d] for d in sorted(deps[step.step_id])]
+                if waits and not all(await asyncio.gather(*waits)):
+                    failed = sorted(d for d in deps[step.step_id] if not done[d].result())
+                    blocked[step.step_id] = f"Dependency {', '.join(failed)} did not succeed; step not executed."
+                    return
+
+                call = calls.get(step.step_id)
+                if call is None:
+                    # No tool (nothing to wait for) or authorization raised.
+                    ok = step.step_id not in raised
+                    return
+                if call.status != "authorized":
+                    return
+
+                spec = call.spec
+                limit = spec.max_concurrency or settings.COGNITIVE_TOOL_MAX_CONCURRENCY
+                slot = tool_slots.setdefault(call.tool_name, asyncio.Semaphore(max(1, int(limit))))
+                tool_input = _resolve(dict(step.tool_input_hint or {}), outputs)
+                async with step_slots, slot:
+                    await self.tool_invoker.run(
+                        call,
+                        tool_input,
+                        timeout_seconds=spec.timeout_seconds or settings.COGNITIVE_TOOL_TIMEOUT_SECONDS,
+                    )
+                if call.status == "success":
+                    outputs[step.step_id] = call.output or {}
+                    ok = True
+            finally:
+                if not done[step.step_id].done():
+                    done[step.step_id].set_result(ok)
+
+        await asyncio.gather(*(_run_step(s) for s in steps if s.step_id not in cyclic))
+
+    @staticmethod
+    def _step_result(
+        step: PlannerStep,
+        result: ToolInvocationResult | None,
+        *,
+        raised: str | None,
+        blocked: str | None,
+        errors: list[str],
+    ) -> ExecutorStepResult:
+        tool_name = step.tool
+        if raised is not None:
+            # Should be rare (e.g. unknown tool), but be defensive.
+            errors.append(raised)
+            return ExecutorStepResult(
+                step_id=step.step_id,
+                status="failed",
+                tool_name=tool_name,
+                tool_call_id=None,
+                summary=raised,
+                artifacts={},
+            )
+        if result is None:
+            return ExecutorStepResult(
+                step_id=step.step_id,
+                status="skipped",
+                tool_name=tool_name if blocked is not None else None,
+                tool_call_id=None,
+                summary=blocked or "No tool for step; skipped.",
+                artifacts={},
+            )
+        if result.status == "success":
+            return ExecutorStepResult(
+                step_id=step.step_id,
+                status="success",
+                tool_name=tool_name,
+                tool_call_id=result.tool_call_id,
+                summary=f"Tool '{tool_name}' succeeded.",
+                artifacts={},
+            )
+        if result.status == "denied":
+            if result.denial_reason:
+                errors.append(f"{tool_name} denied: {result.denial_reason}")
+            return ExecutorStepResult(
+                step_id=step.step_id,
+                status="denied",
+                tool_name=tool_name,
+                tool_call_id=result.tool_call_id,
+                summary=f"Tool '{tool_name}' denied: {result.denial_reason or 'denied'}",
+                artifacts={},
+            )
+        if result.error:
+            errors.append(f"{tool_name} failed: {result.error}")
+        return ExecutorStepResult(
+            step_id=step.step_id,
+            status="failed",
+            tool_name=tool_name,
+            tool_call_id=result.tool_call_id,
+            summary=f"Tool '{tool_name}' failed: {result.error or 'failed'}",
+            artifacts={},
+        )
@@ -18,6 +18,7 @@ from dataclasses import dataclass
 from datetime import datetime, timezone
 from typing import Any
 
+from app.core.config import settings
 from app.schemas.cognitive import ExecutorOutput, PlannerOutput, CriticOutput
 from app.services.cognitive_loop.repository import CognitiveLoopRepository
 from app.services.cognitive_loop.evidence_service import CognitiveEvidenceService
@@ -141,6 +142,12 @@ class LoopOrchestrator:
 
         final_status = "failed"
 
+        # One candidate pool per session; iterations re-rank it with the last critique.
+        evidence_session = None
+        if settings.COGNITIVE_EVIDENCE_SESSION_CACHE_ENABLED:
+            evidence_session = self.evidence.open_session()
+        evidence_context: list[str] = []
+
         for iteration_num in range(1, int(self.config.max_iterations) + 1):
             t0 = datetime.now(timezone.utc)
 
@@ -166,7 +173,16 @@ class LoopOrchestrator:
             multiplier = max(1, min(3, multiplier))
             evidence_limit = max(1, min(30, base_limit * multiplier))
 
-            evidence_cards = await self.evidence.retrieve_evidence(goal=goal, limit=evidence_limit, hybrid=True)
+            if evidence_session is not None:
+                evidence_cards = await self.evidence.retrieve_evidence(
+                    goal=goal,
+                    limit=evidence_limit,
+                    hybrid=True,
+                    session=evidence_session,
+                    context=evidence_context,
+                )
+            else:
+                evidence_cards = await self.evidence.retrieve_evidence(goal=goal, limit=evidence_limit, hybrid=True)
 
             plan: PlannerOutput = await self.planner.plan(
                 goal=goal,
@@ -210,6 +226,10 @@ class LoopOrchestrator:
             )
 
             evaluation = critique.evaluation
+            evidence_context = [
+                *(f"{i.description} {i.recommended_fix}" for i in critique.issues or []),
+                *(critique.followup_questions or []),
+            ]
 
             t1 = datetime.now(timezone.utc)
             metrics: dict[str, Any] = {
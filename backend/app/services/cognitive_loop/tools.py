@@ -15,6 +15,7 @@ from typing import Any
 
 from pydantic import BaseModel, Field
 
+from app.core.database import get_tenant_session
 from app.services.cognitive_tooling.tool_registry import ToolRegistry, ToolSpec, ToolSensitivity
 from app.services.embedding_service import EmbeddingService
 from app.services.memory_service import MemoryService
@@ -29,7 +30,13 @@ class MemorySearchToolInput(BaseModel):
     hybrid: bool = True
 
 
-def register_builtin_tools(*, registry: ToolRegistry, memory_service: MemoryService) -> None:
+def register_builtin_tools(*, registry: ToolRegistry, memory_service: MemoryService, roles: str = "") -> None:
+    """Register the built-in tools for ``memory_service``'s user and org.
+
+    ``roles`` is the caller's comma-separated role list, applied to the
+    tenant sessions tools open for themselves.
+    """
+
     async def _memory_search(inp: dict[str, Any]) -> dict[str, Any]:
         validated = MemorySearchToolInput.model_validate(inp)
         emb = await EmbeddingService.embed(validated.query)
@@ -40,7 +47,22 @@ def register_builtin_tools(*, registry: ToolRegistry, memory_service: MemoryServ
             limit=validated.limit,
             hybrid=validated.hybrid,
         )
-        rows = await memory_service.search_memories(emb, req)
+        # Own tenant session: the executor cancels a call that exceeds its
+        # timeout, and a query cancelled mid-flight would leave the caller's
+        # session unusable for the tool_call_logs flush.
+        async with get_tenant_session(
+            user_id=str(memory_service.user_id),
+            org_id=str(memory_service.org_id),
+            roles=roles,
+            clearance_level=int(memory_service.clearance_level or 0),
+            justification="cognitive_tool:memory.search",
+        ) as session:
+            rows = await MemoryService(
+                session,
+                user_id=memory_service.user_id,
+                org_id=memory_service.org_id,
+                clearance_level=memory_service.clearance_level,
+            ).search_memories(emb, req)
         # Summary-only results
         results: list[dict[str, Any]] = []
         for m in rows:
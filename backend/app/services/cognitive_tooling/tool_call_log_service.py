@@ -30,6 +30,44 @@ class ToolCallLogService:
         warnings: list[str] | None = None,
         started_at: datetime | None = None,
         finished_at: datetime | None = None,
+    ) -> ToolCallLog:
+        row = self._build_row(
+            session_id=session_id,
+            iteration_id=iteration_id,
+            tool_name=tool_name,
+            tool_input=tool_input,
+            tool_output_summary=tool_output_summary,
+            status=status,
+            denial_reason=denial_reason,
+            warnings=warnings,
+            started_at=started_at,
+            finished_at=finished_at,
+        )
+        self.session.add(row)
+        await self.session.flush()
+        return row
+
+    async def create_many(self, entries: list[dict]) -> list[ToolCallLog]:
+        """Persist several tool calls with one flush; ``entries`` take ``create``'s kwargs."""
+        rows = [self._build_row(**entry) for entry in entries]
+        if rows:
+            self.session.add_all(rows)
+            await self.session.flush()
+        return rows
+
+    @staticmethod
+    def _build_row(
+        *,
+        session_id: str,
+        iteration_id: str,
+        tool_name: str,
+        tool_input: dict,
+        tool_output_summary: dict,
+        status: str,
+        denial_reason: str | None = None,
+        warnings: list[str] | None = None,
+        started_at: datetime | None = None,
+        finished_at: datetime | None = None,
     ) -> ToolCallLog:
         started_at = started_at or datetime.now(timezone.utc)
         finished_at = finished_at or started_at
@@ -40,7 +78,7 @@ class ToolCallLogService:
             # Avoid adding a dedicated DB column/migration for now.
             safe_output_summary["warnings"] = list(warnings)
 
-        row = ToolCallLog(
+        return ToolCallLog(
             session_id=session_id,
             iteration_id=iteration_id,
             tool_name=tool_name,
@@ -51,6 +89,3 @@ class ToolCallLogService:
             started_at=started_at,
             finished_at=finished_at,
         )
-        self.session.add(row)
-        await self.session.flush()
-        return row
@@ -7,6 +7,10 @@ Flow:
 - Invoke the tool via ToolRegistry
 - Persist success/failure outcome
 
+``invoke`` does all of this for one call. ExecutorAgent uses the phases
+separately (``authorize`` -> ``run`` -> ``log_calls``) so tool calls can run
+concurrently while authorization and logging stay serial and batched.
+
 Security defaults:
 - Inputs/outputs are NOT persisted by default.
 - Only length/count metadata is persisted unless ToolSensitivity permits.
@@ -14,6 +18,7 @@ Security defaults:
 
 from __future__ import annotations
 
+import asyncio
 import json
 from dataclasses import dataclass
 from datetime import datetime, timezone
@@ -77,6 +82,51 @@ class ToolInvocationResult:
     warnings: list[str] | None = None  # SelfModel reliability warnings, etc.
 
 
+@dataclass
+class PendingToolCall:
+    """One authorized (or denied) tool call whose log row is not written yet."""
+
+    tool_name: str
+    spec: ToolSpec
+    started_at: datetime
+    safe_input: dict[str, Any]
+    warnings: list[str]
+    status: str = "authorized"  # authorized|denied|success|failed
+    denial_reason: str | None = None
+    output: dict[str, Any] | None = None
+    output_summary: dict[str, Any] | None = None
+    error: str | None = None
+    exception: BaseException | None = None
+    finished_at: datetime | None = None
+
+    def log_entry(self, *, session_id: str, iteration_id: str) -> dict[str, Any]:
+        return {
+            "session_id": session_id,
+            "iteration_id": iteration_id,
+            "tool_name": self.tool_name,
+            "tool_input": self.safe_input,
+            "tool_output_summary": self.output_summary or {},
+            "status": self.status,
+            "denial_reason": self.denial_reason,
+            "started_at": self.started_at,
+            # Warnings are persisted for successful calls only.
+            "warnings": (self.warnings or None) if self.status == "success" else None,
+            "finished_at": self.finished_at,
+        }
+
+    def result(self, row: Any) -> ToolInvocationResult:
+        return ToolInvocationResult(
+            status=self.status,
+            success=self.status == "success",
+            tool_name=self.tool_name,
+            tool_call_id=str(getattr(row, "id", "")) or None,
+            output=self.output,
+            denial_reason=self.denial_reason,
+            error=self.error,
+            warnings=self.warnings if self.warnings else None,
+        )
+
+
 class ToolInvoker:
     def __init__(
         self,
@@ -99,17 +149,33 @@ class ToolInvoker:
         ctx: ToolContext,
         swallow_exceptions: bool = False,
     ) -> ToolInvocationResult:
+        call = await self.authorize(tool_name=tool_name, tool_input=tool_input, ctx=ctx)
+        if call.status == "authorized":
+            await self.run(call, tool_input)
+
+        row = await self.log_service.create(**call.log_entry(session_id=session_id, iteration_id=iteration_id))
+        if call.status == "failed" and not swallow_exceptions and call.exception is not None:
+            raise call.exception
+        return call.result(row)
+
+    async def authorize(
+        self,
+        *,
+        tool_name: str,
+        tool_input: dict[str, Any] | None,
+        ctx: ToolContext,
+    ) -> PendingToolCall:
+        """
+        Run PolicyGuard for a call without invoking the tool or logging it.
+
+        Raises:
+            KeyError: If the tool is not registered
+        """
         started_at = datetime.now(timezone.utc)
 
         spec: ToolSpec = self.registry.get_spec(tool_name)
         decision = await self.guard.authorize(tool=spec, ctx=ctx)
 
-        safe_input = _summarize_payload(
-            tool_input,
-            allow_persist=spec.sensitivity.allow_persist_input,
-            redacted_fields=spec.sensitivity.redacted_input_fields,
-        )
-
         # Extract reliability warnings from decision details
         warnings: list[str] = []
         if decision.details and isinstance(decision.details, dict):
@@ -117,79 +183,75 @@ class ToolInvoker:
             if reliability_warning:
                 warnings.append(str(reliability_warning))
 
+        call = PendingToolCall(
+            tool_name=tool_name,
+            spec=spec,
+            started_at=started_at,
+            safe_input=self._safe_input(spec, tool_input),
+            warnings=warnings,
+        )
         if not decision.allowed:
-            finished_at = datetime.now(timezone.utc)
-            row = await self.log_service.create(
-                session_id=session_id,
-                iteration_id=iteration_id,
-                tool_name=tool_name,
-                tool_input=safe_input,
-                tool_output_summary={"mode": "denied", "reason": _truncate(decision.reason)},
-                status="denied",
-                denial_reason=_truncate(decision.reason),
-                started_at=started_at,
-                finished_at=finished_at,
-            )
-            return ToolInvocationResult(
-                status="denied",
-                success=False,
-                tool_name=tool_name,
-                tool_call_id=str(getattr(row, "id", "")) or None,
-                output=None,
-                denial_reason=_truncate(decision.reason),
-                warnings=warnings if warnings else None,
-            )
+            call.status = "denied"
+            call.denial_reason = _truncate(decision.reason)
+            call.output_summary = {"mode": "denied", "reason": call.denial_reason}
+            call.finished_at = datetime.now(timezone.utc)
+        return call
+
+    async def run(
+        self,
+        call: PendingToolCall,
+        tool_input: dict[str, Any] | None,
+        *,
+        timeout_seconds: float | None = None,
+    ) -> PendingToolCall:
+        """Invoke an authorized call; failures are recorded on ``call``, not raised."""
+        if call.status != "authorized":
+            raise ValueError(f"Tool call is not runnable (status={call.status})")
 
+        spec = call.spec
+        call.safe_input = self._safe_input(spec, tool_input)
         try:
-            output = await self.registry.invoke(tool_name, tool_input or {})
-            safe_output = _summarize_payload(
+            invocation = self.registry.invoke(call.tool_name, tool_input or {})
+            if timeout_seconds is not None:
+                output = await asyncio.wait_for(invocation, timeout=timeout_seconds)
+            else:
+                output = await invocation
+            call.output_summary = _summarize_payload(
                 output,
                 allow_persist=spec.sensitivity.allow_persist_output,
                 redacted_fields=spec.sensitivity.redacted_output_fields,
             )
-            finished_at = datetime.now(timezone.utc)
-            row = await self.log_service.create(
-                session_id=session_id,
-                iteration_id=iteration_id,
-                tool_name=tool_name,
-                tool_input=safe_input,
-                tool_output_summary=safe_output,
-                status="success",
-                denial_reason=None,
-                started_at=started_at,
-                warnings=warnings if warnings else None,
-                finished_at=finished_at,
-            )
-            return ToolInvocationResult(
-                status="success",
-                success=True,
-                tool_name=tool_name,
-                tool_call_id=str(getattr(row, "id", "")) or None,
-                output=output,
-                warnings=warnings if warnings else None,
-            )
+            call.output = output
+            call.status = "success"
         except Exception as e:
-            finished_at = datetime.now(timezone.utc)
-            err = _truncate(f"{type(e).__name__}: {e}")
-            row = await self.log_service.create(
-                session_id=session_id,
-                iteration_id=iteration_id,
-                tool_name=tool_name,
-                tool_input=safe_input,
-                tool_output_summary={"mode": "failed", "error": err},
-                status="failed",
-                denial_reason=None,
-                started_at=started_at,
-                finished_at=finished_at,
-            )
-            if swallow_exceptions:
-                return ToolInvocationResult(
-                    status="failed",
-                    success=False,
-                    tool_name=tool_name,
-                    tool_call_id=str(getattr(row, "id", "")) or None,
-                    output=None,
-                    error=err,
-                    warnings=warnings if warnings else None,
-                )
-            raise
+            if isinstance(e, asyncio.TimeoutError):
+                err = _truncate(f"TimeoutError: tool exceeded {timeout_seconds}s")
+            else:
+                err = _truncate(f"{type(e).__name__}: {e}")
+            call.status = "failed"
+            call.error = err
+            call.exception = e
+            call.output_summary = {"mode": "failed", "error": err}
+        call.finished_at = datetime.now(timezone.utc)
+        return call
+
+    async def log_calls(
+        self,
+        *,
+        session_id: str,
+        iteration_id: str,
+        calls: list[PendingToolCall],
+    ) -> list[ToolInvocationResult]:
+        """Write log rows for finished calls in one batch; results keep ``calls`` order."""
+        rows = await self.log_service.create_many(
+            [call.log_entry(session_id=session_id, iteration_id=iteration_id) for call in calls]
+        )
+        return [call.result(row) for call, row in zip(calls, rows)]
+
+    @staticmethod
+    def _safe_input(spec: ToolSpec, tool_input: dict[str, Any] | None) -> dict[str, Any]:
+        return _summarize_payload(
+            tool_input,
+            allow_persist=spec.sensitivity.allow_persist_input,
+            redacted_fields=spec.sensitivity.redacted_input_fields,
+        )
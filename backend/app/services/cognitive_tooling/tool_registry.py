@@ -5,10 +5,17 @@ Registry is in-memory and designed for deterministic tool invocation:
 - Track tool metadata: permissions, version, sensitivity
 
 No network calls happen here; handlers implement the tool.
+
+Tool steps may run concurrently (see ExecutorAgent). Handlers that use the
+caller's AsyncSession must hold ``registry.session_lock`` around that work,
+since a session does not support concurrent operations. A call that exceeds
+its timeout is cancelled, possibly mid-query, so handlers whose DB work can
+run long use a tenant session of their own instead.
 """
 
 from __future__ import annotations
 
+import asyncio
 from dataclasses import dataclass, field
 from typing import Any, Awaitable, Callable
 
@@ -39,11 +46,16 @@ class ToolSpec:
     require_justification: bool = False
     min_clearance_level: int = 0
     sensitivity: ToolSensitivity = field(default_factory=ToolSensitivity)
+    # Concurrent invocations allowed per execution (None: executor default).
+    max_concurrency: int | None = None
+    # Per-invocation timeout (None: executor default).
+    timeout_seconds: float | None = None
 
 
 class ToolRegistry:
     def __init__(self) -> None:
         self._tools: dict[str, tuple[ToolSpec, ToolHandler]] = {}
+        self.session_lock = asyncio.Lock()
 
     def register(self, spec: ToolSpec, handler: ToolHandler) -> None:
         key = spec.name.strip()
@@ -2,23 +2,31 @@
 
 This service is used by the Memory OS consolidation endpoints and tests.
 
-The full production implementation may incorporate vector search via Qdrant.
-For the test suite (and as a safe fallback), this module implements a
-database-only + text-similarity approach.
+Candidate detection uses the MinHash/LSH near-duplicate index
+(``app.services.near_duplicate_index``) with optional Qdrant vector
+confirmation.
 """
 
 from __future__ import annotations
 
-import re
+import math
 import uuid
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Sequence
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
 
 from sqlalchemy import and_, func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.qdrant import QdrantService
 from app.models.graph_relationship import GraphRelationship
 from app.models.memory import MemoryMetadata
+from app.services.memory_metadata_cache import MemoryMetadataCache
+from app.services.near_duplicate_index import (
+    NearDuplicateIndex,
+    estimate_similarity,
+    lsh_band_keys,
+    minhash_signature,
+)
 
 
 class ConsolidationService:
@@ -36,6 +44,8 @@ class ConsolidationService:
         similarity_threshold: float = SIMILARITY_THRESHOLD,
         scope: Optional[str] = None,
         limit: int = 200,
+        since: Optional[datetime] = None,
+        vector_threshold: Optional[float] = None,
     ) -> List[Dict[str, Any]]:
         """Find candidate groups for consolidation.
 
@@ -46,64 +56,159 @@ class ConsolidationService:
           "similarity_scores": List[float]
         }
 
-        Note: This is a conservative, DB-only implementation. If vector search
-        is available, production code can be extended to incorporate it.
+        Candidates come from the MinHash/LSH index (``NearDuplicateIndex``)
+        rather than an all-pairs scan; scores are MinHash estimates of token
+        Jaccard similarity. ``since`` switches to incremental mode (only
+        memories indexed after that time are checked against the index),
+        ``vector_threshold`` additionally requires Qdrant cosine similarity
+        and ``limit`` caps the number of groups returned. Memories without a
+        signature yet are indexed by ``backfill_near_duplicate_index_task``.
         """
 
-        stmt = select(MemoryMetadata).where(MemoryMetadata.organization_id == self.organization_id)
-        if scope:
-            stmt = stmt.where(MemoryMetadata.scope == scope)
+        index = NearDuplicateIndex(self.db, self.organization_id)
+
         if memory_id:
-            stmt = stmt.where(MemoryMetadata.id == memory_id)
+            return await self._candidates_for_memory(
+                index, memory_id, similarity_threshold, scope, vector_threshold
+            )
 
-        # Keep this bounded; tests only validate structure/type.
-        primary_rows = (await self.db.execute(stmt.limit(1))).scalars().all()
-        if memory_id and not primary_rows:
+        pairs = await index.candidate_pairs(scope=scope, since=since)
+        if not pairs:
             return []
 
-        all_stmt = select(MemoryMetadata).where(MemoryMetadata.organization_id == self.organization_id)
-        if scope:
-            all_stmt = all_stmt.where(MemoryMetadata.scope == scope)
-        all_memories = (await self.db.execute(all_stmt.limit(limit))).scalars().all()
-        if not all_memories:
+        signatures = await index.signatures_for({mid for pair in pairs for mid in pair})
+
+        parent: Dict[str, str] = {}
+
+        def find(x: str) -> str:
+            parent.setdefault(x, x)
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        for a, b in pairs:
+            if a in signatures and b in signatures:
+                if estimate_similarity(signatures[a], signatures[b]) >= similarity_threshold:
+                    parent[find(a)] = find(b)
+
+        components: Dict[str, List[str]] = {}
+        for mid in parent:
+            components.setdefault(find(mid), []).append(mid)
+        members = [mid for group in components.values() if len(group) > 1 for mid in group]
+        if not members:
             return []
 
-        if memory_id:
-            primary = primary_rows[0]
-            duplicates: List[MemoryMetadata] = []
-            scores: List[float] = []
-            for other in all_memories:
-                if other.id == primary.id:
-                    continue
-                score = self._calculate_text_similarity(primary.content_preview, other.content_preview)
-                if score >= similarity_threshold:
-                    duplicates.append(other)
-                    scores.append(score)
-            if not duplicates:
-                return []
-            return [{"primary": primary, "duplicates": duplicates, "similarity_scores": scores}]
-
-        # Basic grouping: pick each memory as primary and attach later items above threshold.
+        memories = await self._load_memories(members)
         results: List[Dict[str, Any]] = []
-        used_ids: set[str] = set()
-        for i, primary in enumerate(all_memories):
-            if primary.id in used_ids:
+        for group in components.values():
+            rows = sorted(
+                (memories[mid] for mid in group if mid in memories),
+                key=lambda m: (m.created_at or datetime.min, str(m.id)),
+            )
+            if len(rows) < 2:
                 continue
-            duplicates: List[MemoryMetadata] = []
-            scores: List[float] = []
-            for other in all_memories[i + 1 :]:
-                if other.id in used_ids:
-                    continue
-                score = self._calculate_text_similarity(primary.content_preview, other.content_preview)
-                if score >= similarity_threshold:
-                    duplicates.append(other)
-                    scores.append(score)
+            primary = rows[0]
+            scored = [
+                (estimate_similarity(signatures[str(primary.id)], signatures[str(m.id)]), m)
+                for m in rows[1:]
+            ]
+            scored = [(score, m) for score, m in scored if score >= similarity_threshold]
+            if vector_threshold is not None:
+                scored = await self._confirm_with_vectors(primary, scored, vector_threshold)
+            if scored:
+                scored.sort(key=lambda item: item[0], reverse=True)
+                results.append(
+                    {
+                        "primary": primary,
+                        "duplicates": [m for _, m in scored],
+                        "similarity_scores": [score for score, _ in scored],
+                    }
+                )
+
+        results.sort(key=lambda g: (g["primary"].created_at or datetime.min, str(g["primary"].id)))
+        return results[:limit]
+
+    async def _candidates_for_memory(
+        self,
+        index: NearDuplicateIndex,
+        memory_id: str,
+        similarity_threshold: float,
+        scope: Optional[str],
+        vector_threshold: Optional[float],
+    ) -> List[Dict[str, Any]]:
+        stmt = select(MemoryMetadata).where(
+            and_(
+                MemoryMetadata.organization_id == self.organization_id,
+                MemoryMetadata.id == memory_id,
+            )
+        )
+        if scope:
+            stmt = stmt.where(MemoryMetadata.scope == scope)
+        primary = (await self.db.execute(stmt)).scalar_one_or_none()
+        if primary is None:
+            return []
+
+        signature = (await index.signatures_for([primary.id])).get(str(primary.id))
+        if signature is None:
+            signature = minhash_signature(primary.content_preview)
+
+        candidates = await index.candidates_for(primary.id, lsh_band_keys(signature), scope=scope)
+        scores = {
+            mid: estimate_similarity(signature, sig)
+            for mid, sig in candidates.items()
+        }
+        scores = {mid: score for mid, score in scores.items() if score >= similarity_threshold}
+        if not scores:
+            return []
 
-            if duplicates:
-                used_ids.add(primary.id)
-                used_ids.update(d.id for d in duplicates)
-                results.append({"primary": primary, "duplicates": duplicates, "similarity_scores": scores})
-        return results
+        memories = await self._load_memories(scores)
+        scored = [(scores[mid], memories[mid]) for mid in scores if mid in memories]
+        if vector_threshold is not None:
+            scored = await self._confirm_with_vectors(primary, scored, vector_threshold)
+        if not scored:
+            return []
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return [
+            {
+                "primary": primary,
+                "duplicates": [m for _, m in scored],
+                "similarity_scores": [score for score, _ in scored],
+            }
+        ]
+
+    async def _load_memories(self, memory_ids: Iterable[str]) -> Dict[str, MemoryMetadata]:
+        stmt = select(MemoryMetadata).where(
+            and_(
+                MemoryMetadata.organization_id == self.organization_id,
+                MemoryMetadata.id.in_([str(m) for m in memory_ids]),
+            )
+        )
+        return {str(m.id): m for m in (await self.db.execute(stmt)).scalars().all()}
+
+    async def _confirm_with_vectors(
+        self,
+        primary: MemoryMetadata,
+        scored: List[Tuple[float, MemoryMetadata]],
+        vector_threshold: float,
+    ) -> List[Tuple[float, MemoryMetadata]]:
+        """Keep only candidates whose stored embedding is close to the primary's."""
+        vector_ids = [primary.vector_id] + [m.vector_id for _, m in scored]
+        vectors = await QdrantService.retrieve_vectors(self.organization_id, vector_ids)
+        base = vectors.get(primary.vector_id)
+        if base is None:
+            return scored
+        return [
+            (score, m)
+            for score, m in scored
+            if m.vector_id in vectors and self._cosine(base, vectors[m.vector_id]) >= vector_threshold
+        ]
+
+    @staticmethod
+    def _cosine(a: Sequence[float], b: Sequence[float]) -> float:
+        dot = sum(x * y for x, y in zip(a, b))
+        norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+        return dot / norm if norm else 0.0
 
     async def consolidate(
         self,
@@ -189,6 +294,9 @@ class ConsolidationService:
                 relationships_updated += int(res.rowcount)
 
         await self.db.commit()
+        await MemoryMetadataCache.invalidate(
+            self.organization_id, [str(primary_id), *dup_ids_str]
+        )
 
         return {
             "primary_id": primary_id,
@@ -237,25 +345,6 @@ class ConsolidationService:
             "relationships_count": relationships_count,
         }
 
-    def _calculate_text_similarity(self, text1: str, text2: str) -> float:
-        """Simple token-based Jaccard similarity for text previews."""
-
-        tokens1 = self._tokenize(text1)
-        tokens2 = self._tokenize(text2)
-        if not tokens1 and not tokens2:
-            return 1.0
-        if not tokens1 or not tokens2:
-            return 0.0
-        intersection = tokens1.intersection(tokens2)
-        union = tokens1.union(tokens2)
-        if not union:
-            return 0.0
-        return len(intersection) / len(union)
-
-    @staticmethod
-    def _tokenize(text: str) -> set[str]:
-        return set(re.findall(r"[a-z0-9]+", (text or "").lower()))
-
     @staticmethod
     def _merge_tags(primary: MemoryMetadata, duplicates: Sequence[MemoryMetadata]) -> List[str]:
         tags: List[str] = []
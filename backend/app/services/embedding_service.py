@@ -13,6 +13,7 @@ import httpx
 from openai import AsyncOpenAI
 
 from app.core.config import settings
+from app.core.request_profiler import SPAN_HTTP, profile_span
 
 
 class EmbeddingService:
@@ -41,10 +42,11 @@ class EmbeddingService:
         payload: dict[str, Any] = {"model": model, "prompt": text}
 
         async with cls._ollama_semaphore():
-            async with httpx.AsyncClient(timeout=timeout) as client:
-                resp = await client.post(f"{base_url}/api/embeddings", json=payload)
-                resp.raise_for_status()
-                data = resp.json()
+            with profile_span(SPAN_HTTP):
+                async with httpx.AsyncClient(timeout=timeout) as client:
+                    resp = await client.post(f"{base_url}/api/embeddings", json=payload)
+                    resp.raise_for_status()
+                    data = resp.json()
 
         emb = data.get("embedding") if isinstance(data, dict) else None
         if not isinstance(emb, list) or not emb:
@@ -59,12 +61,60 @@ class EmbeddingService:
             return cls._zeros()
 
         client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
-        resp = await client.embeddings.create(
-            model=settings.EMBEDDING_MODEL,
-            input=text,
-        )
+        with profile_span(SPAN_HTTP):
+            resp = await client.embeddings.create(
+                model=settings.EMBEDDING_MODEL,
+                input=text,
+            )
         return resp.data[0].embedding
 
+    @classmethod
+    async def _embed_openai_many(cls, texts: list[str]) -> list[list[float]]:
+        client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+        with profile_span(SPAN_HTTP):
+            resp = await client.embeddings.create(
+                model=settings.EMBEDDING_MODEL,
+                input=texts,
+            )
+        by_index = {d.index: d.embedding for d in resp.data}
+        return [by_index[i] for i in range(len(texts))]
+
+    @classmethod
+    async def embed_many(cls, texts: list[str]) -> list[list[float]]:
+        """Embed many texts, in order.
+
+        With OpenAI, texts are sent ``EMBEDDING_BATCH_SIZE`` per request; a
+        failed request falls back to per-text ``embed`` (and its provider
+        fallbacks). Ollama has no batch endpoint, so texts are embedded
+        concurrently under the Ollama semaphore.
+        """
+        cleaned = [(t or "").strip() for t in texts]
+        out: list[list[float]] = [cls._zeros() for _ in cleaned]
+        todo = [i for i, t in enumerate(cleaned) if t]
+        if not todo:
+            return out
+
+        provider = str(getattr(settings, "EMBEDDING_PROVIDER", "auto") or "auto").lower()
+        if provider == "auto":
+            provider = "openai" if bool(settings.OPENAI_API_KEY) else "ollama"
+
+        if provider == "openai" and settings.OPENAI_API_KEY:
+            size = max(1, int(settings.EMBEDDING_BATCH_SIZE))
+            for start in range(0, len(todo), size):
+                chunk = todo[start:start + size]
+                try:
+                    vectors = await cls._embed_openai_many([cleaned[i] for i in chunk])
+                except Exception:
+                    vectors = await asyncio.gather(*(cls.embed(cleaned[i]) for i in chunk))
+                for i, vector in zip(chunk, vectors):
+                    out[i] = vector
+            return out
+
+        vectors = await asyncio.gather(*(cls.embed(cleaned[i]) for i in todo))
+        for i, vector in zip(todo, vectors):
+            out[i] = vector
+        return out
+
     @classmethod
     async def embed(cls, text: str) -> list[float]:
         # Safety: never embed empty text.
@@ -1,21 +1,68 @@
 """
 Export and Snapshot Service - Multi-format exports for compliance
 
-Handles creating snapshots/exports in JSON, CSV, PDF formats.
+Handles creating snapshots/exports in JSON, JSONL, CSV and Parquet formats.
+
+Exports stream: rows come from an async server-side cursor
+(``stream_scalars`` + ``yield_per``), are encoded batch by batch by an
+incremental writer, hashed with a rolling SHA-256 and written in chunks to
+the object store. Memory use is bounded by the batch size, not the org size.
 """
 
-import json
-import csv
-import io
-from typing import Optional, List, Literal
-from datetime import datetime
+import secrets
+from typing import Any, Dict, Optional, List, Literal, Sequence, Tuple
+from datetime import datetime, timedelta
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
+from app.core.config import settings
+from app.core.pagination import CountMode, count_rows, keyset_page
 from app.models.snapshot import Snapshot
 from app.models.memory import MemoryMetadata
 from app.models.knowledge_item import KnowledgeItem
 from app.services.audit_service import AuditService
+from app.services.export_writers import (
+    BOOL,
+    JSON,
+    STRING,
+    STRING_LIST,
+    TIMESTAMP,
+    ColumnSpec,
+    get_export_writer,
+)
+from app.services.object_store import LocalObjectStore
+
+
+MEMORY_EXPORT_COLUMNS: ColumnSpec = (
+    ("id", STRING),
+    ("title", STRING),
+    ("content_preview", STRING),
+    ("scope", STRING),
+    ("memory_type", STRING),
+    ("classification", STRING),
+    ("tags", STRING_LIST),
+    ("entities", JSON),
+    ("extra_metadata", JSON),
+    ("source_type", STRING),
+    ("source_id", STRING),
+    ("is_active", BOOL),
+    ("created_at", TIMESTAMP),
+    ("updated_at", TIMESTAMP),
+)
+
+KNOWLEDGE_EXPORT_COLUMNS: ColumnSpec = (
+    ("id", STRING),
+    ("title", STRING),
+    ("key", STRING),
+    ("is_published", BOOL),
+    ("published_version_id", STRING),
+    ("published_at", TIMESTAMP),
+    ("created_at", TIMESTAMP),
+    ("updated_at", TIMESTAMP),
+)
+
+# Encoded bytes buffered before each object-store write.
+EXPORT_WRITE_CHUNK_BYTES = 1024 * 1024
 
 
 class ExportAndSnapshotService:
@@ -25,21 +72,28 @@ class ExportAndSnapshotService:
     Supports:
     - JSON export (full structure, queryable)
     - CSV export (tabular, spreadsheet compatible)
-    - PDF export (human readable, signed)
     - JSONL export (streaming, large datasets)
-    - Parquet export (analytics)
+    - Parquet export (analytics, Arrow record batches)
     - Automatic expiration
     - Signed download tokens
     """
 
-    def __init__(self, db: AsyncSession, organization_id: str):
+    def __init__(
+        self,
+        db: AsyncSession,
+        organization_id: str,
+        object_store: Optional[LocalObjectStore] = None,
+        batch_size: Optional[int] = None,
+    ):
         self.db = db
         self.organization_id = organization_id
         self.audit_svc = AuditService(db)
+        self.object_store = object_store or LocalObjectStore()
+        self.batch_size = int(batch_size or settings.EXPORT_STREAM_BATCH_SIZE or 1000)
 
     async def create_memory_export(
         self,
-        format: Literal["json", "csv", "jsonl", "pdf", "parquet"] = "json",
+        format: Literal["json", "csv", "jsonl", "parquet"] = "json",
         name: Optional[str] = None,
         filters: Optional[dict] = None,
         include_deleted: bool = False,
@@ -52,8 +106,8 @@ class ExportAndSnapshotService:
         Args:
             format: Export format
             name: Display name for the export
-            filters: Query filters (date range, tags, status, etc.)
-            include_deleted: Include soft-deleted items
+            filters: Query filters (created_after/created_before, tags, scope, memory_type)
+            include_deleted: Include soft-deleted (inactive) items
             user_id: User creating the export
             expires_in_days: Auto-delete after N days
         
@@ -68,6 +122,7 @@ class ExportAndSnapshotService:
             resource_type="memory",
             filters=filters or {},
             status="processing",
+            storage_path="",
             created_by_user_id=user_id,
         )
         
@@ -75,53 +130,9 @@ class ExportAndSnapshotService:
         await self.db.flush()
         
         try:
-            # Query memory items
-            query = select(MemoryMetadata).where(
-                MemoryMetadata.organization_id == self.organization_id
-            )
-            
-            if not include_deleted:
-                query = query.where(MemoryMetadata.is_deleted == False)
-            
-            # Apply filters
-            if filters:
-                if filters.get("created_after"):
-                    query = query.where(MemoryMetadata.created_at >= filters["created_after"])
-                if filters.get("tags"):
-                    # Simplified - actual implementation may use array operators
-                    pass
-                if filters.get("status"):
-                    query = query.where(MemoryMetadata.status == filters["status"])
-            
-            result = await self.db.execute(query)
-            memories = result.scalars().all()
-            
-            # Generate export content
-            content = await self._generate_memory_export(memories, format)
-            
-            # Store export (in production, use S3/GCS)
-            storage_path = f"s3://exports/{self.organization_id}/{snapshot.id}.{format}"
-            # In real implementation: upload content to storage
-            
-            # Update snapshot
-            snapshot.status = "completed"
-            snapshot.storage_path = storage_path
-            snapshot.item_count = len(memories)
-            snapshot.size_bytes = len(content)
-            snapshot.completed_at = datetime.utcnow()
-            
-            # Generate download token
-            import secrets
-            snapshot.download_token = secrets.token_urlsafe(32)
-            
-            # Calculate checksum
-            import hashlib
-            snapshot.checksum = hashlib.sha256(content).hexdigest()
-            
-            # Set expiration
-            from datetime import timedelta
-            snapshot.expires_at = datetime.utcnow() + timedelta(days=expires_in_days)
-            
+            query = self._memory_export_query(filters, include_deleted)
+            item_count = await self._stream_export(snapshot, query, MEMORY_EXPORT_COLUMNS)
+            self._complete_snapshot(snapshot, item_count, expires_in_days)
             await self.db.flush()
             
             # Audit
@@ -134,14 +145,14 @@ class ExportAndSnapshotService:
                 success=True,
                 details={
                     "format": format,
-                    "item_count": len(memories),
-                    "size_bytes": len(content),
+                    "item_count": snapshot.item_count,
+                    "size_bytes": snapshot.size_bytes,
                 }
             )
             
         except Exception as e:
             snapshot.status = "failed"
-            snapshot.error_message = str(e)
+            snapshot.error_message = str(e)[:512]
             await self.db.flush()
             
             await self.audit_svc.log_event(
@@ -160,7 +171,7 @@ class ExportAndSnapshotService:
 
     async def create_knowledge_export(
         self,
-        format: Literal["json", "csv", "jsonl", "pdf"] = "json",
+        format: Literal["json", "csv", "jsonl", "parquet"] = "json",
         name: Optional[str] = None,
         filters: Optional[dict] = None,
         include_unpublished: bool = False,
@@ -175,6 +186,7 @@ class ExportAndSnapshotService:
             resource_type="knowledge",
             filters=filters or {},
             status="processing",
+            storage_path="",
             created_by_user_id=user_id,
         )
         
@@ -182,147 +194,90 @@ class ExportAndSnapshotService:
         await self.db.flush()
         
         try:
-            # Query knowledge items
             query = select(KnowledgeItem).where(
                 KnowledgeItem.organization_id == self.organization_id
             )
             
             if not include_unpublished:
                 query = query.where(KnowledgeItem.is_published == True)
+
+            query = query.order_by(KnowledgeItem.created_at.asc(), KnowledgeItem.id.asc())
             
-            result = await self.db.execute(query)
-            items = result.scalars().all()
-            
-            # Generate export
-            content = await self._generate_knowledge_export(items, format)
-            
-            # Store
-            storage_path = f"s3://exports/{self.organization_id}/{snapshot.id}.{format}"
-            
-            snapshot.status = "completed"
-            snapshot.storage_path = storage_path
-            snapshot.item_count = len(items)
-            snapshot.size_bytes = len(content)
-            snapshot.completed_at = datetime.utcnow()
-            
-            import secrets
-            snapshot.download_token = secrets.token_urlsafe(32)
-            
-            import hashlib
-            snapshot.checksum = hashlib.sha256(content).hexdigest()
-            
-            from datetime import timedelta
-            snapshot.expires_at = datetime.utcnow() + timedelta(days=expires_in_days)
-            
+            item_count = await self._stream_export(snapshot, query, KNOWLEDGE_EXPORT_COLUMNS)
+            self._complete_snapshot(snapshot, item_count, expires_in_days)
             await self.db.flush()
             
         except Exception as e:
             snapshot.status = "failed"
-            snapshot.error_message = str(e)
+            snapshot.error_message = str(e)[:512]
             await self.db.flush()
             raise
         
         return snapshot
 
-    async def _generate_memory_export(self, memories: List[MemoryMetadata], format: str) -> bytes:
-        """Generate export content in specified format."""
-        if format == "json":
-            data = [
-                {
-                    "id": str(m.id),
-                    "content": m.content,
-                    "tags": m.tags,
-                    "created_at": m.created_at.isoformat(),
-                    "updated_at": m.updated_at.isoformat(),
-                    "metadata": m.metadata,
-                }
-                for m in memories
-            ]
-            return json.dumps(data, indent=2).encode()
-        
-        elif format == "csv":
-            output = io.StringIO()
-            if memories:
-                writer = csv.DictWriter(
-                    output,
-                    fieldnames=["id", "content", "tags", "created_at", "updated_at"]
-                )
-                writer.writeheader()
-                for m in memories:
-                    writer.writerow({
-                        "id": str(m.id),
-                        "content": m.content,
-                        "tags": ",".join(m.tags or []),
-                        "created_at": m.created_at.isoformat(),
-                        "updated_at": m.updated_at.isoformat(),
-                    })
-            return output.getvalue().encode()
+    def _memory_export_query(self, filters: Optional[dict], include_deleted: bool):
+        query = select(MemoryMetadata).where(
+            MemoryMetadata.organization_id == self.organization_id
+        )
         
-        elif format == "jsonl":
-            lines = []
-            for m in memories:
-                line = json.dumps({
-                    "id": str(m.id),
-                    "content": m.content,
-                    "tags": m.tags,
-                    "created_at": m.created_at.isoformat(),
-                    "updated_at": m.updated_at.isoformat(),
-                    "metadata": m.metadata,
-                })
-                lines.append(line)
-            return "\n".join(lines).encode()
+        if not include_deleted:
+            query = query.where(MemoryMetadata.is_active == True)
         
-        else:
-            raise ValueError(f"Unsupported format: {format}")
+        # Apply filters
+        if filters:
+            if filters.get("created_after"):
+                query = query.where(MemoryMetadata.created_at >= filters["created_after"])
+            if filters.get("created_before"):
+                query = query.where(MemoryMetadata.created_at < filters["created_before"])
+            if filters.get("tags"):
+                query = query.where(MemoryMetadata.tags.overlap(list(filters["tags"])))
+            if filters.get("scope"):
+                query = query.where(MemoryMetadata.scope == filters["scope"])
+            if filters.get("memory_type"):
+                query = query.where(MemoryMetadata.memory_type == filters["memory_type"])
 
-    async def _generate_knowledge_export(self, items: List[KnowledgeItem], format: str) -> bytes:
-        """Generate knowledge export in specified format."""
-        if format == "json":
-            data = [
-                {
-                    "id": str(i.id),
-                    "content": i.content,
-                    "is_published": i.is_published,
-                    "review_status": i.review_status,
-                    "created_at": i.created_at.isoformat(),
-                    "metadata": i.metadata,
-                }
-                for i in items
-            ]
-            return json.dumps(data, indent=2).encode()
-        
-        elif format == "csv":
-            output = io.StringIO()
-            if items:
-                writer = csv.DictWriter(
-                    output,
-                    fieldnames=["id", "content", "is_published", "review_status", "created_at"]
-                )
-                writer.writeheader()
-                for i in items:
-                    writer.writerow({
-                        "id": str(i.id),
-                        "content": i.content,
-                        "is_published": i.is_published,
-                        "review_status": i.review_status,
-                        "created_at": i.created_at.isoformat(),
-                    })
-            return output.getvalue().encode()
-        
-        elif format == "jsonl":
-            lines = []
-            for i in items:
-                line = json.dumps({
-                    "id": str(i.id),
-                    "content": i.content,
-                    "is_published": i.is_published,
-                    "created_at": i.created_at.isoformat(),
-                })
-                lines.append(line)
-            return "\n".join(lines).encode()
-        
-        else:
-            raise ValueError(f"Unsupported format: {format}")
+        # Stable order so repeated exports of unchanged data hash identically.
+        return query.order_by(MemoryMetadata.created_at.asc(), MemoryMetadata.id.asc())
+
+    async def _stream_export(self, snapshot: Snapshot, query, columns: ColumnSpec) -> int:
+        """
+        Stream ``query`` through the snapshot's format writer into the object store.
+
+        Sets ``storage_path``, ``size_bytes`` and ``checksum`` on the snapshot
+        and returns the number of exported rows.
+        """
+        writer = get_export_writer(snapshot.format, columns)
+        key = f"{self.organization_id}/{snapshot.id}.{snapshot.format}"
+        item_count = 0
+
+        async with self.object_store.open_writer(key) as out:
+            pending = bytearray(writer.begin())
+            result = await self.db.stream_scalars(
+                query.execution_options(yield_per=self.batch_size)
+            )
+            async for batch in result.partitions():
+                rows = [_export_row(obj, columns) for obj in batch]
+                item_count += len(rows)
+                pending += writer.write_batch(rows)
+                if len(pending) >= EXPORT_WRITE_CHUNK_BYTES:
+                    await out.write(bytes(pending))
+                    pending.clear()
+            pending += writer.finish()
+            await out.write(bytes(pending))
+
+        snapshot.storage_path = self.object_store.uri(key)
+        snapshot.size_bytes = out.size_bytes
+        snapshot.checksum = out.sha256
+        return item_count
+
+    @staticmethod
+    def _complete_snapshot(snapshot: Snapshot, item_count: int, expires_in_days: int) -> None:
+        snapshot.status = "completed"
+        snapshot.progress_percent = 100
+        snapshot.item_count = item_count
+        snapshot.completed_at = datetime.utcnow()
+        snapshot.download_token = secrets.token_urlsafe(32)
+        snapshot.expires_at = datetime.utcnow() + timedelta(days=expires_in_days)
 
     async def get_snapshot(self, snapshot_id: str) -> Snapshot:
         """Get snapshot by ID."""
@@ -339,8 +294,10 @@ class ExportAndSnapshotService:
         resource_type: Optional[str] = None,
         limit: int = 100,
         offset: int = 0,
-    ) -> tuple[List[Snapshot], int]:
-        """List snapshots for the organization."""
+        cursor: Optional[str] = None,
+        count: CountMode = "exact",
+    ) -> tuple[List[Snapshot], Optional[int], Optional[str]]:
+        """List snapshots for the organization: (snapshots, total, next_cursor)."""
         query = select(Snapshot).where(
             Snapshot.organization_id == self.organization_id
         )
@@ -348,18 +305,18 @@ class ExportAndSnapshotService:
         if resource_type:
             query = query.where(Snapshot.resource_type == resource_type)
         
-        # Get count
-        count_result = await self.db.execute(
-            select(len(query.distinct(Snapshot.id)))
+        page = await keyset_page(
+            self.db,
+            query,
+            Snapshot.created_at,
+            Snapshot.id,
+            limit=limit,
+            cursor=cursor,
+            offset=offset,
         )
-        total = count_result.scalar() or 0
-        
-        # Get paginated results
-        query = query.order_by(Snapshot.created_at.desc()).limit(limit).offset(offset)
-        result = await self.db.execute(query)
-        snapshots = result.scalars().all()
+        total = await count_rows(self.db, query, count)
         
-        return snapshots, total
+        return page.items, total, page.next_cursor
 
     async def delete_snapshot(self, snapshot_id: str) -> None:
         """Delete a snapshot."""
@@ -372,5 +329,12 @@ class ExportAndSnapshotService:
         snapshot = result.scalar_one_or_none()
         
         if snapshot:
+            await self.object_store.delete(
+                f"{self.organization_id}/{snapshot.id}.{snapshot.format}"
+            )
             await self.db.delete(snapshot)
             await self.db.flush()
+
+
+def _export_row(obj: Any, columns: Sequence[Tuple[str, str]]) -> Dict[str, Any]:
+    return {name: getattr(obj, name, None) for name, _ in columns}
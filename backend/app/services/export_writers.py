@@ -0,0 +1,226 @@
+"""Incremental export encoders.
+
+Each writer turns batches of row dicts into bytes that can be appended to an
+object as they are produced (``begin`` / ``write_batch`` / ``finish``), so an
+export's memory footprint is bounded by the batch size rather than the
+dataset size.
+
+Parquet output uses Apache Arrow record batches (one row group per batch) and
+requires the optional ``pyarrow`` package.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Sequence, Tuple
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+
+# Column kinds understood by every writer.
+STRING = "string"
+INT = "int"
+BOOL = "bool"
+TIMESTAMP = "timestamp"
+STRING_LIST = "string_list"
+JSON = "json"
+
+ColumnSpec = Sequence[Tuple[str, str]]
+
+
+def _iso(value: Any) -> Any:
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.isoformat()
+    return value
+
+
+def _json_default(obj: Any) -> Any:
+    if isinstance(obj, datetime):
+        return _iso(obj)
+    return str(obj)
+
+
+class ExportWriter:
+    """Base class: encode row batches into byte chunks."""
+
+    content_type = "application/octet-stream"
+
+    def __init__(self, columns: ColumnSpec):
+        self.columns = list(columns)
+
+    def begin(self) -> bytes:
+        return b""
+
+    def write_batch(self, rows: List[Dict[str, Any]]) -> bytes:
+        raise NotImplementedError
+
+    def finish(self) -> bytes:
+        return b""
+
+    def _json_row(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        return {name: _iso(row.get(name)) for name, _ in self.columns}
+
+
+class JsonlExportWriter(ExportWriter):
+    content_type = "application/x-ndjson"
+
+    def write_batch(self, rows: List[Dict[str, Any]]) -> bytes:
+        return "".join(
+            json.dumps(self._json_row(r), ensure_ascii=False, default=_json_default) + "\n"
+            for r in rows
+        ).encode("utf-8")
+
+
+class JsonArrayExportWriter(ExportWriter):
+    """Streams a single JSON array without holding it in memory."""
+
+    content_type = "application/json"
+
+    def __init__(self, columns: ColumnSpec):
+        super().__init__(columns)
+        self._first = True
+
+    def begin(self) -> bytes:
+        return b"["
+
+    def write_batch(self, rows: List[Dict[str, Any]]) -> bytes:
+        parts = []
+        for r in rows:
+            prefix = "\n" if self._first else ",\n"
+            self._first = False
+            parts.append(prefix + json.dumps(self._json_row(r), ensure_ascii=False, default=_json_default))
+        return "".join(parts).encode("utf-8")
+
+    def finish(self) -> bytes:
+        return b"]\n" if self._first else b"\n]\n"
+
+
+class CsvExportWriter(ExportWriter):
+    content_type = "text/csv"
+
+    def _encode(self, writer_fn) -> bytes:
+        buf = io.StringIO()
+        writer_fn(csv.writer(buf))
+        return buf.getvalue().encode("utf-8")
+
+    def begin(self) -> bytes:
+        return self._encode(lambda w: w.writerow([name for name, _ in self.columns]))
+
+    def write_batch(self, rows: List[Dict[str, Any]]) -> bytes:
+        def _cell(value: Any, kind: str) -> Any:
+            if value is None:
+                return ""
+            if kind == STRING_LIST:
+                return ",".join(str(v) for v in value)
+            if kind == JSON:
+                return json.dumps(value, ensure_ascii=False, default=_json_default)
+            return _iso(value)
+
+        return self._encode(
+            lambda w: w.writerows(
+                [_cell(r.get(name), kind) for name, kind in self.columns] for r in rows
+            )
+        )
+
+
+class _ChunkSink(io.RawIOBase):
+    """File-like sink that collects whatever pyarrow writes until drained."""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks: List[bytes] = []
+        self._pos = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        data = bytes(b)
+        self._chunks.append(data)
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class ParquetExportWriter(ExportWriter):
+    """Columnar export: each batch becomes one Arrow record batch / row group."""
+
+    content_type = "application/vnd.apache.parquet"
+
+    def __init__(self, columns: ColumnSpec):
+        if not PYARROW_AVAILABLE:
+            raise ValueError("Parquet export requires the 'pyarrow' package")
+        super().__init__(columns)
+        self._schema = pa.schema([(name, self._arrow_type(kind)) for name, kind in self.columns])
+        self._sink = _ChunkSink()
+        self._writer = pq.ParquetWriter(self._sink, self._schema, compression="zstd")
+
+    @staticmethod
+    def _arrow_type(kind: str):
+        return {
+            STRING: pa.string(),
+            INT: pa.int64(),
+            BOOL: pa.bool_(),
+            TIMESTAMP: pa.timestamp("us", tz="UTC"),
+            STRING_LIST: pa.list_(pa.string()),
+            JSON: pa.string(),
+        }[kind]
+
+    def write_batch(self, rows: List[Dict[str, Any]]) -> bytes:
+        if not rows:
+            return b""
+        arrays = []
+        for name, kind in self.columns:
+            values = [r.get(name) for r in rows]
+            if kind == JSON:
+                values = [
+                    None if v is None else json.dumps(v, ensure_ascii=False, default=_json_default)
+                    for v in values
+                ]
+            elif kind == TIMESTAMP:
+                values = [
+                    v.replace(tzinfo=timezone.utc) if isinstance(v, datetime) and v.tzinfo is None else v
+                    for v in values
+                ]
+            elif kind == STRING:
+                values = [None if v is None else str(v) for v in values]
+            arrays.append(pa.array(values, type=self._arrow_type(kind)))
+        self._writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=self._schema))
+        return self._sink.drain()
+
+    def finish(self) -> bytes:
+        self._writer.close()
+        return self._sink.drain()
+
+
+_WRITERS = {
+    "json": JsonArrayExportWriter,
+    "jsonl": JsonlExportWriter,
+    "csv": CsvExportWriter,
+    "parquet": ParquetExportWriter,
+}
+
+
+def get_export_writer(format: str, columns: ColumnSpec) -> ExportWriter:
+    """Return an incremental writer for ``format`` (json, jsonl, csv, parquet)."""
+    writer_cls = _WRITERS.get(format)
+    if writer_cls is None:
+        raise ValueError(f"Unsupported format: {format}")
+    return writer_cls(columns)
@@ -0,0 +1,436 @@
+"""backend.app.services.filtered_search
+
+Query planner behind ``/advanced-search`` and ``/faceted-search``.
+
+The ``tag:``, ``before:``/``after:``/``within:``, ``scope:``, ``author:`` and
+``status:`` operators are compiled once into a :class:`SearchPlan`, which
+renders them both as Qdrant payload conditions (applied inside the vector
+search, backed by the payload indexes ``QdrantService.ensure_collection``
+creates) and as Postgres predicates (applied to the candidate fetch, the
+full-text leg and the facet aggregate). No operator is evaluated in Python
+after the fetch.
+
+Access control: predicate listings and facets add the caller's read
+predicate (``PermissionChecker.build_sql_read_filter``) to the SQL, so pages
+are filled, and totals and facet counts cover only readable memories.
+Vector hits are verified per memory after the fetch.
+
+Plan selection:
+
+- text + ``status:active`` (the default): vector search with pushed-down
+  filters, verified against Postgres.
+- text + archived/deleted: those memories have no vectors, so the lexical
+  (``search_vector``) leg is used instead.
+- no text: a pure predicate listing, newest first.
+
+Facets come from one ``GROUPING SETS`` aggregate over the filtered rows.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from qdrant_client.http.models import FieldCondition, MatchAny, MatchValue, Range
+from sqlalchemy import and_, exists, func, literal_column, select, true, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.qdrant import QdrantService
+from app.models.memory import MemoryMetadata, MemorySharing
+from app.models.user import User
+from app.services.embedding_service import EmbeddingService
+from app.services.permission_checker import PermissionChecker
+from app.services.search_query_parser import ParsedQuery, query_to_filters
+
+
+# Scopes stored on the memory row (and in the Qdrant payload). "shared" is
+# derived from memory_sharing and can only be evaluated in Postgres.
+_STORED_SCOPES = {"personal", "team", "department", "division", "organization", "global"}
+
+# Facet name -> position in the GROUPING SETS column list.
+FACET_COLUMNS = ("scope", "memory_types", "status", "authors", "dates", "tags")
+
+
+def _utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is None:
+        return None
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+@dataclass
+class SearchPlan:
+    """Filters of one advanced query, renderable for Qdrant and Postgres."""
+
+    text: str = ""
+    tags: List[str] = field(default_factory=list)
+    created_after: Optional[datetime] = None
+    created_before: Optional[datetime] = None
+    scope: Optional[str] = None
+    author: Optional[str] = None
+    status: str = "active"
+    # Resolved from ``author`` by FilteredSearchService.resolve_authors().
+    owner_ids: Optional[List[str]] = None
+
+    @classmethod
+    def from_parsed(cls, parsed: ParsedQuery) -> "SearchPlan":
+        filters = query_to_filters(parsed)
+        return cls(
+            text=(parsed.text or "").strip(),
+            tags=list(dict.fromkeys(filters.get("tags") or [])),
+            created_after=_utc(filters.get("after_date")),
+            created_before=_utc(filters.get("before_date")),
+            scope=filters.get("scope"),
+            author=filters.get("created_by"),
+            status=filters.get("status") or "active",
+        )
+
+    @property
+    def active_only(self) -> bool:
+        return self.status == "active"
+
+    @property
+    def uses_vectors(self) -> bool:
+        """Vector search applies only to live memories (others have no points)."""
+        return bool(self.text) and self.active_only
+
+    @property
+    def fully_pushed_down(self) -> bool:
+        """False when Postgres must drop some vector hits (``scope:shared``)."""
+        return self.scope is None or self.scope in _STORED_SCOPES
+
+    def qdrant_conditions(self) -> List[FieldCondition]:
+        conditions: List[FieldCondition] = [
+            FieldCondition(key="tags", match=MatchValue(value=tag)) for tag in self.tags
+        ]
+        if self.created_after or self.created_before:
+            conditions.append(
+                FieldCondition(
+                    key="created_ts",
+                    range=Range(
+                        gte=self.created_after.timestamp() if self.created_after else None,
+                        lt=self.created_before.timestamp() if self.created_before else None,
+                    ),
+                )
+            )
+        if self.scope in _STORED_SCOPES:
+            conditions.append(FieldCondition(key="scope", match=MatchValue(value=self.scope)))
+        if self.owner_ids is not None:
+            conditions.append(FieldCondition(key="owner_id", match=MatchAny(any=self.owner_ids)))
+        return conditions
+
+    def sql_predicates(self, org_id: str) -> List[Any]:
+        predicates: List[Any] = [
+            MemoryMetadata.organization_id == org_id,
+            MemoryMetadata.is_active.is_(self.active_only),
+        ]
+        if self.tags:
+            predicates.append(MemoryMetadata.tags.contains(self.tags))
+        if self.created_after:
+            predicates.append(MemoryMetadata.created_at >= self.created_after)
+        if self.created_before:
+            predicates.append(MemoryMetadata.created_at < self.created_before)
+        if self.scope in _STORED_SCOPES:
+            predicates.append(MemoryMetadata.scope == self.scope)
+        elif self.scope == "shared":
+            predicates.append(
+                exists().where(
+                    and_(
+                        MemorySharing.memory_id == MemoryMetadata.id,
+                        MemorySharing.is_active.is_(True),
+                    )
+                )
+            )
+        if self.owner_ids is not None:
+            predicates.append(MemoryMetadata.owner_id.in_(self.owner_ids))
+        return predicates
+
+
+def _memory_to_result(memory: MemoryMetadata, score: Optional[float]) -> Dict[str, Any]:
+    return {
+        "id": str(memory.id),
+        "title": memory.title,
+        "content_preview": memory.content_preview,
+        "scope": memory.scope,
+        "scope_id": memory.scope_id,
+        "memory_type": memory.memory_type,
+        "classification": memory.classification,
+        "tags": list(memory.tags or []),
+        "owner_id": str(memory.owner_id) if memory.owner_id else None,
+        "status": "active" if memory.is_active else "archived",
+        "created_at": memory.created_at.isoformat() if memory.created_at else None,
+        "score": score,
+    }
+
+
+class FilteredSearchService:
+    """Executes :class:`SearchPlan` queries for one user within one organization."""
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        org_id: str,
+        user_id: str,
+        clearance_level: int = 0,
+    ):
+        self.session = session
+        self.org_id = str(org_id)
+        self.user_id = str(user_id)
+        self.clearance_level = clearance_level
+        self.permission_checker = PermissionChecker(session)
+        self._read_filter = None
+
+    async def resolve_authors(self, plan: SearchPlan) -> None:
+        """Turn ``author:<name>`` into owner ids (email local part, case-insensitive)."""
+        if not plan.author or plan.owner_ids is not None:
+            return
+        author = plan.author.lower()
+        stmt = select(User.id).where(
+            func.lower(func.split_part(User.email, "@", 1)) == author
+        )
+        plan.owner_ids = [str(uid) for uid in (await self.session.execute(stmt)).scalars().all()]
+
+    async def read_filter(self) -> Any:
+        """The caller's SQL read predicate (built once per service)."""
+        if self._read_filter is None:
+            self._read_filter = await self.permission_checker.build_sql_read_filter(
+                self.user_id, self.org_id, self.clearance_level
+            )
+        return self._read_filter
+
+    async def search(
+        self,
+        plan: SearchPlan,
+        limit: int = 50,
+        offset: int = 0,
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Run ``plan`` and return one page of authorized results plus a total.
+
+        For vector plans the total is the number of authorized hits in the
+        fetched window; otherwise it is the number of readable matching rows.
+        """
+        await self.resolve_authors(plan)
+        if plan.owner_ids == []:
+            return [], 0
+
+        if plan.uses_vectors:
+            return await self._vector_search(plan, limit, offset)
+        return await self._predicate_search(plan, limit, offset)
+
+    async def _vector_hits(self, plan: SearchPlan, limit: int) -> Dict[str, float]:
+        vector = await EmbeddingService.embed(plan.text)
+        acl_filter = await self.permission_checker.build_vector_acl_filter(
+            self.user_id, self.org_id, self.clearance_level
+        )
+        hits = await QdrantService.search(
+            org_id=self.org_id,
+            query_vector=vector,
+            limit=limit,
+            conditions=plan.qdrant_conditions(),
+            acl_filter=acl_filter,
+            group_by="memory_id",
+        )
+        scores: Dict[str, float] = {}
+        for h in hits:
+            memory_id = (h.get("payload") or {}).get("memory_id")
+            if memory_id:
+                scores[str(memory_id)] = max(scores.get(str(memory_id), 0.0), float(h.get("score") or 0.0))
+        return scores
+
+    async def _vector_search(
+        self, plan: SearchPlan, limit: int, offset: int
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        window = offset + limit
+        if not plan.fully_pushed_down:
+            window *= 2  # Postgres will drop hits that Qdrant could not filter
+        scores = await self._vector_hits(plan, window)
+        if not scores:
+            return [], 0
+
+        stmt = select(MemoryMetadata).where(
+            MemoryMetadata.id.in_(list(scores)),
+            *plan.sql_predicates(self.org_id),
+        )
+        memories = (await self.session.execute(stmt)).scalars().all()
+        authorized = await self._authorized(memories)
+        authorized.sort(key=lambda m: scores.get(str(m.id), 0.0), reverse=True)
+
+        page = authorized[offset:offset + limit]
+        return [_memory_to_result(m, scores.get(str(m.id))) for m in page], len(authorized)
+
+    async def _predicate_search(
+        self, plan: SearchPlan, limit: int, offset: int
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        total = func.count().over().label("total")
+        stmt = select(MemoryMetadata, total).where(
+            *plan.sql_predicates(self.org_id), await self.read_filter()
+        )
+
+        rank = None
+        if plan.text:
+            tsq = func.plainto_tsquery("simple", plan.text)
+            rank = func.ts_rank_cd(
+                "{0.1, 0.2, 0.4, 1.0}", MemoryMetadata.search_vector, tsq, 1
+            ).label("rank")
+            stmt = (
+                stmt.add_columns(rank)
+                .where(MemoryMetadata.search_vector.op("@@")(tsq))
+                .order_by(rank.desc(), MemoryMetadata.created_at.desc())
+            )
+        else:
+            stmt = stmt.order_by(MemoryMetadata.created_at.desc(), MemoryMetadata.id.desc())
+
+        rows = (await self.session.execute(stmt.offset(offset).limit(limit))).all()
+        if not rows:
+            return [], 0
+
+        return (
+            [_memory_to_result(row[0], float(row[2]) if rank is not None else None) for row in rows],
+            int(rows[0][1]),
+        )
+
+    async def _authorized(self, memories: List[MemoryMetadata]) -> List[MemoryMetadata]:
+        allowed = []
+        for memory in memories:
+            access = await self.permission_checker.check_memory_access(
+                self.user_id, self.org_id, memory.id, "read", self.clearance_level
+            )
+            if access.allowed:
+                allowed.append(memory)
+        return allowed
+
+    async def facets(self, plan: SearchPlan) -> Tuple[Dict[str, Dict[str, int]], int]:
+        """
+        Facet counts over the readable memories ``plan`` matches, in one aggregate query.
+
+        Text plans restrict the aggregate to the top
+        ``SEARCH_FACET_CANDIDATE_LIMIT`` vector hits (or to full-text matches
+        for non-active statuses). Returns ``(facets, total)``.
+        """
+        facets: Dict[str, Dict[str, int]] = {name: {} for name in FACET_COLUMNS}
+        await self.resolve_authors(plan)
+        if plan.owner_ids == []:
+            return facets, 0
+
+        predicates = plan.sql_predicates(self.org_id)
+        predicates.append(await self.read_filter())
+        if plan.uses_vectors:
+            scores = await self._vector_hits(plan, settings.SEARCH_FACET_CANDIDATE_LIMIT)
+            if not scores:
+                return facets, 0
+            predicates.append(MemoryMetadata.id.in_(list(scores)))
+        elif plan.text:
+            tsq = func.plainto_tsquery("simple", plan.text)
+            predicates.append(MemoryMetadata.search_vector.op("@@")(tsq))
+
+        rows = (await self.session.execute(self.facet_query(predicates))).all()
+
+        total = 0
+        full_mask = (1 << len(FACET_COLUMNS)) - 1
+        positions = {
+            full_mask ^ (1 << (len(FACET_COLUMNS) - 1 - i)): i for i in range(len(FACET_COLUMNS))
+        }
+        for row in rows:
+            mask, count = row[-2], int(row[-1])
+            if mask == full_mask:
+                total = count
+                continue
+            index = positions.get(mask)
+            value = row[index] if index is not None else None
+            if value is None:
+                continue
+            if isinstance(value, bool):
+                value = "active" if value else "archived"
+            elif isinstance(value, datetime):
+                value = value.date().isoformat()
+            facets[FACET_COLUMNS[index]][str(value)] = count
+
+        for name in ("tags", "authors"):
+            top = sorted(facets[name].items(), key=lambda kv: (-kv[1], kv[0]))
+            facets[name] = dict(top[: settings.SEARCH_FACET_TOP_N])
+        return facets, total
+
+    @staticmethod
+    def facet_query(predicates: List[Any]):
+        """
+        ``GROUPING SETS`` aggregate: one set per facet plus a grand total.
+
+        Tags are unnested with a lateral join, so counts use
+        ``count(DISTINCT id)`` to stay per-memory for the other facets.
+        """
+        tag_rows = (
+            func.unnest(MemoryMetadata.tags).table_valued("tag").render_derived(name="t").lateral()
+        )
+        # Literal (not bound) arguments so GROUP BY matches the select list.
+        columns = (
+            MemoryMetadata.scope,
+            MemoryMetadata.memory_type,
+            MemoryMetadata.is_active,
+            MemoryMetadata.owner_id,
+            func.date_trunc(literal_column("'week'"), MemoryMetadata.created_at),
+            tag_rows.c.tag,
+        )
+        return (
+            select(
+                *columns,
+                func.grouping(*columns).label("grouping_mask"),
+                func.count(MemoryMetadata.id.distinct()).label("count"),
+            )
+            .select_from(MemoryMetadata)
+            .outerjoin(tag_rows, true())
+            .where(*predicates)
+            .group_by(func.grouping_sets(*[tuple_(c) for c in columns], tuple_()))
+        )
+
+    async def backfill_qdrant_payload(self, batch_size: Optional[int] = None) -> int:
+        """
+        Stamp filter and ACL payload fields on points written before they existed.
+
+        Sets ``created_ts`` (date ranges) and ``required_clearance``,
+        ``owner_id``, ``scope`` and ``scope_id`` (ACL pre-filtering) from the
+        Postgres row. Walks the org's live memories by id in batches; safe to
+        re-run.
+        """
+        batch_size = batch_size or settings.SEARCH_PAYLOAD_BACKFILL_BATCH_SIZE
+        updated = 0
+        last_id: Optional[str] = None
+        while True:
+            stmt = (
+                select(
+                    MemoryMetadata.id,
+                    MemoryMetadata.vector_id,
+                    MemoryMetadata.created_at,
+                    MemoryMetadata.owner_id,
+                    MemoryMetadata.scope,
+                    MemoryMetadata.scope_id,
+                    MemoryMetadata.required_clearance,
+                )
+                .where(
+                    MemoryMetadata.organization_id == self.org_id,
+                    MemoryMetadata.is_active.is_(True),
+                )
+                .order_by(MemoryMetadata.id)
+                .limit(batch_size)
+            )
+            if last_id is not None:
+                stmt = stmt.where(MemoryMetadata.id > last_id)
+            rows = (await self.session.execute(stmt)).all()
+            if not rows:
+                return updated
+            updated += await QdrantService.set_payloads(
+                self.org_id,
+                {
+                    str(vector_id): {
+                        "created_ts": _utc(created_at).timestamp(),
+                        "owner_id": str(owner_id),
+                        "scope": scope,
+                        "scope_id": str(scope_id) if scope_id is not None else None,
+                        "required_clearance": int(required_clearance or 0),
+                    }
+                    for _, vector_id, created_at, owner_id, scope, scope_id, required_clearance in rows
+                    if vector_id and created_at
+                },
+            )
+            last_id = rows[-1][0]
@@ -11,10 +11,11 @@ from datetime import datetime, timezone
 from typing import Any
 
 from fastapi import HTTPException, status
-from sqlalchemy import and_, desc, func, select
+from sqlalchemy import and_, desc, select
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.pagination import CountMode, count_rows, keyset_page
 from app.models.goal import Goal, GoalActivityLog, GoalEdge, GoalMemoryLink, GoalNode
 from app.models.memory import MemoryMetadata
 from app.schemas.base import PaginatedResponse
@@ -181,21 +182,32 @@ class GoalService:
         page: int,
         page_size: int,
         status_filter: str | None = None,
+        cursor: str | None = None,
+        count: CountMode = "exact",
     ) -> PaginatedResponse[Goal]:
+        """Goals by most recent update; ``cursor`` pages by ``(updated_at, id)``."""
         query = select(Goal).where(Goal.organization_id == org_id)
-        count_query = select(func.count(Goal.id)).where(Goal.organization_id == org_id)
 
         if status_filter:
             query = query.where(Goal.status == status_filter)
-            count_query = count_query.where(Goal.status == status_filter)
 
-        total = (await self.session.execute(count_query)).scalar() or 0
-
-        offset = (page - 1) * page_size
-        query = query.order_by(desc(Goal.updated_at)).offset(offset).limit(page_size)
-
-        goals = (await self.session.execute(query)).scalars().all()
-        return PaginatedResponse.create(items=goals, total=int(total), page=page, page_size=page_size)
+        result = await keyset_page(
+            self.session,
+            query,
+            Goal.updated_at,
+            Goal.id,
+            limit=page_size,
+            cursor=cursor,
+            offset=(page - 1) * page_size,
+        )
+        total = await count_rows(self.session, query, count)
+        return PaginatedResponse.create(
+            items=result.items,
+            total=total,
+            page=page,
+            page_size=page_size,
+            next_cursor=result.next_cursor,
+        )
 
     async def update_goal(
         self,
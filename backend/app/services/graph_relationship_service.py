@@ -19,6 +19,8 @@ from app.models.memory import MemoryMetadata
 from app.models.graph_relationship import GraphRelationship
 from app.core.config import settings
 from app.core.qdrant import QdrantService
+from app.services.recommendation_service import invalidate_recommendations
+from app.services.synthesis_aggregates import SynthesisAggregates
 
 logger = logging.getLogger(__name__)
 
@@ -295,8 +297,12 @@ class GraphRelationshipService:
         ])
 
         result = await self.db.execute(stmt)
+        await SynthesisAggregates(self.db, org_id).refresh_relationship_counts()
         await self.db.commit()
 
+        # The org's relationship set was replaced wholesale
+        await invalidate_recommendations(self.redis, org_id)
+
         logger.info(f"Stored {result.rowcount} relationships in PostgreSQL")
         return result.rowcount
 
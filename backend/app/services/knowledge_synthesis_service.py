@@ -9,19 +9,19 @@ Synthesizes insights from memories and relationships:
 - PDF/Markdown export
 """
 
-from typing import Optional, List, Dict, Any
-from datetime import datetime, timedelta
+from typing import Optional, List, Dict, Any, Set, Tuple
+from datetime import date, datetime, time, timedelta, timezone
 from dataclasses import dataclass
 from enum import Enum
 import json
 from abc import ABC, abstractmethod
 
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.memory import Memory
+from app.models.memory import Memory, MemoryMetadata
 from app.models.graph_relationship import GraphRelationship
-from app.core.config import settings
+from app.services.synthesis_aggregates import SynthesisAggregates, cluster_strength, week_start
 
 
 class InsightType(str, Enum):
@@ -104,6 +104,23 @@ class SynthesisReport:
         }
 
 
+def _week_datetime(week: Optional[date]) -> Optional[datetime]:
+    if week is None:
+        return None
+    return datetime.combine(week, time.min, tzinfo=timezone.utc)
+
+
+def _memory_summary(m: Any) -> Dict[str, Any]:
+    content = m.content_preview or ""
+    return {
+        'id': str(m.id),
+        'title': m.title,
+        'content': content[:100] + "..." if len(content) > 100 else content,
+        'created_at': m.created_at.isoformat() if m.created_at else None,
+        'tags': list(m.tags or []),
+    }
+
+
 class LLMSynthesizer(ABC):
     """Abstract base for LLM-based synthesis."""
     
@@ -133,18 +150,33 @@ class KnowledgeSynthesisService:
     - Relationship strength analysis
     - LLM-powered insight generation
     - Multi-format export (JSON, Markdown, PDF)
+    
+    Org-wide reports are served from the incrementally maintained
+    aggregates in ``SynthesisAggregates``; reports over an explicit memory
+    subset (``memory_ids`` / ``tags``) are computed from the raw rows.
     """
     
-    def __init__(self, session: Session, llm_synthesizer: Optional[LLMSynthesizer] = None):
+    SAMPLE_MEMORIES_PER_CLUSTER = 10
+    MAX_CLUSTERS = 10
+    
+    def __init__(
+        self,
+        session: AsyncSession,
+        llm_synthesizer: Optional[LLMSynthesizer] = None,
+        org_id: Optional[str] = None,
+    ):
         """
         Initialize synthesis service.
         
         Args:
             session: Database session
             llm_synthesizer: Optional LLM synthesizer for enhanced insights
+            org_id: Organization whose memories are synthesized
         """
         self.session = session
         self.llm_synthesizer = llm_synthesizer
+        self.org_id = str(org_id) if org_id else None
+        self.aggregates = SynthesisAggregates(session, self.org_id) if self.org_id else None
     
     async def create_synthesis_report(
         self,
@@ -152,6 +184,7 @@ class KnowledgeSynthesisService:
         tags: Optional[List[str]] = None,
         days_back: int = 30,
         title: Optional[str] = None,
+        refresh: bool = False,
     ) -> SynthesisReport:
         """
         Create a comprehensive synthesis report.
@@ -161,14 +194,22 @@ class KnowledgeSynthesisService:
             tags: Filter by tags
             days_back: How many days of history to include
             title: Optional custom title
+            refresh: Rebuild the org's aggregates before reading them
             
         Returns:
             SynthesisReport with clusters, trends, and insights
         """
-        # Get memories
-        memories = await self._get_memories(memory_ids, tags, days_back)
+        if refresh and self.aggregates is not None:
+            await self.aggregates.refresh()
+        
+        if self.aggregates is not None and not memory_ids and not tags:
+            clusters, trends, relationships, memory_count = await self._from_aggregates(days_back)
+        else:
+            clusters, trends, relationships, memory_count = await self._from_memories(
+                memory_ids, tags, days_back
+            )
         
-        if not memories:
+        if not memory_count:
             return SynthesisReport(
                 title=title or "Empty Report",
                 summary="No memories found for synthesis",
@@ -180,15 +221,6 @@ class KnowledgeSynthesisService:
                 memory_count=0,
             )
         
-        # Create clusters
-        clusters = await self._create_concept_clusters(memories)
-        
-        # Detect trends
-        trends = await self._detect_trends(memories)
-        
-        # Analyze relationships
-        relationships = await self._analyze_relationships(memories)
-        
         # Generate insights
         key_insights = await self._generate_insights(clusters, trends)
         
@@ -203,11 +235,123 @@ class KnowledgeSynthesisService:
             key_insights=key_insights,
             relationships=relationships,
             generated_at=datetime.utcnow(),
-            memory_count=len(memories),
+            memory_count=memory_count,
         )
         
         return report
     
+    # ------------------------------------------------------------------
+    # Aggregate path (org-wide reports)
+    # ------------------------------------------------------------------
+    
+    async def _from_aggregates(self, days_back: int):
+        """Build clusters and trends from pre-aggregated rows (fixed query count)."""
+        # Aggregates are weekly, so the window starts at the week boundary.
+        if days_back > 0:
+            since = week_start(datetime.now(timezone.utc) - timedelta(days=days_back))
+        else:
+            since = date.min
+
+        weeks = await self.aggregates.weekly_totals(since)
+        memory_count = sum(count for _, count in weeks)
+        if not memory_count:
+            return [], [], {}, 0
+        
+        top = await self.aggregates.top_clusters(since, limit=self.MAX_CLUSTERS)
+        concepts = [row["tag"] for row in top]
+        related = await self.aggregates.cooccurring(concepts)
+        samples = await self._sample_memories(concepts, since)
+        
+        clusters = [
+            ConceptCluster(
+                concept=row["tag"],
+                memories=samples.get(row["tag"], []),
+                strength=float(row["strength"]),
+                tags=[row["tag"], *related.get(row["tag"], [])],
+                relationships_count=int(row["relationship_count"]),
+                date_range=(_week_datetime(row["first_week"]), _week_datetime(row["last_week"])),
+            )
+            for row in top
+        ]
+        
+        sample_ids = {m["id"] for mems in samples.values() for m in mems}
+        relationships = await self._analyze_relationships(sample_ids)
+        trends = self._activity_trends(weeks)
+        return clusters, trends, relationships, memory_count
+    
+    async def _sample_memories(self, concepts: List[str], since: date) -> Dict[str, List[Dict[str, Any]]]:
+        """Most recent memories for each concept, in a single windowed query."""
+        if not concepts:
+            return {}
+        tag = func.unnest(MemoryMetadata.tags).label("tag")
+        tagged = (
+            select(
+                MemoryMetadata.id,
+                MemoryMetadata.title,
+                MemoryMetadata.content_preview,
+                MemoryMetadata.created_at,
+                MemoryMetadata.tags,
+                tag,
+            )
+            .where(
+                and_(
+                    MemoryMetadata.organization_id == self.org_id,
+                    MemoryMetadata.is_active.is_(True),
+                    MemoryMetadata.tags.overlap(concepts),
+                    MemoryMetadata.created_at >= _week_datetime(since),
+                )
+            )
+            .subquery()
+        )
+        ranked = (
+            select(
+                tagged,
+                func.row_number()
+                .over(partition_by=tagged.c.tag, order_by=tagged.c.created_at.desc())
+                .label("rank"),
+            )
+            .where(tagged.c.tag.in_(concepts))
+            .subquery()
+        )
+        stmt = select(ranked).where(ranked.c.rank <= self.SAMPLE_MEMORIES_PER_CLUSTER)
+        
+        samples: Dict[str, List[Dict[str, Any]]] = {}
+        for row in (await self.session.execute(stmt)).all():
+            samples.setdefault(row.tag, []).append(_memory_summary(row))
+        return samples
+    
+    # ------------------------------------------------------------------
+    # Raw path (explicit memory subsets)
+    # ------------------------------------------------------------------
+    
+    async def _from_memories(
+        self,
+        memory_ids: Optional[List[str]],
+        tags: Optional[List[str]],
+        days_back: int,
+    ):
+        memories = await self._get_memories(memory_ids, tags, days_back)
+        if not memories:
+            return [], [], {}, 0
+        
+        member_ids = {str(m.id) for m in memories}
+        edges = await self._load_relationships(member_ids)
+        clusters = self._create_concept_clusters(memories, edges)
+        
+        week_counts: Dict[date, int] = {}
+        for memory in memories:
+            if memory.created_at:
+                week = week_start(memory.created_at)
+                week_counts[week] = week_counts.get(week, 0) + 1
+        trends = self._activity_trends(sorted(week_counts.items()))
+        
+        relationships: Dict[str, List[str]] = {}
+        for rel in edges:
+            relationships.setdefault(rel.from_memory_id, []).append(
+                f"{rel.relationship_type}:{rel.to_memory_id}"
+            )
+        return clusters, trends, relationships, len(memories)
+    
     async def _get_memories(
         self,
         memory_ids: Optional[List[str]],
@@ -215,169 +359,118 @@ class KnowledgeSynthesisService:
         days_back: int,
     ) -> List[Memory]:
         """Get memories for synthesis."""
-        query = select(Memory)
+        query = select(Memory).where(Memory.is_active.is_(True))
+        
+        if self.org_id:
+            query = query.where(Memory.organization_id == self.org_id)
         
         if memory_ids:
             query = query.where(Memory.id.in_(memory_ids))
         
         if tags:
-            # Filter by tags
-            for tag in tags:
-                query = query.where(Memory.tags.contains([tag]))
+            query = query.where(Memory.tags.contains(list(tags)))
         
         if days_back > 0:
-            start_date = datetime.utcnow() - timedelta(days=days_back)
+            start_date = datetime.now(timezone.utc) - timedelta(days=days_back)
             query = query.where(Memory.created_at >= start_date)
         
-        result = self.session.execute(query)
-        return result.scalars().all()
+        result = await self.session.execute(query)
+        return list(result.scalars().all())
+    
+    async def _load_relationships(self, member_ids: Set[str]) -> List[GraphRelationship]:
+        """All relationships leaving ``member_ids`` (one query for the whole report)."""
+        if not member_ids:
+            return []
+        query = select(GraphRelationship).where(
+            GraphRelationship.from_memory_id.in_(member_ids),
+        )
+        if self.org_id:
+            query = query.where(GraphRelationship.organization_id == self.org_id)
+        result = await self.session.execute(query)
+        return list(result.scalars().all())
     
-    async def _create_concept_clusters(
+    def _create_concept_clusters(
         self,
         memories: List[Memory],
+        edges: List[GraphRelationship],
     ) -> List[ConceptCluster]:
         """
         Create concept clusters from memories.
         
-        Groups memories by common tags and relationships.
+        Groups memories by common tags; cluster relationship counts come
+        from the already loaded ``edges``.
         """
         clusters: Dict[str, List[Memory]] = {}
-        
-        # Group by tags
         for memory in memories:
-            if memory.tags:
-                for tag in memory.tags:
-                    if tag not in clusters:
-                        clusters[tag] = []
-                    clusters[tag].append(memory)
+            for tag in set(memory.tags or []):
+                clusters.setdefault(tag, []).append(memory)
         
-        # Create cluster objects
         concept_clusters = []
         for concept, mems in clusters.items():
-            # Calculate strength based on relationship density
-            strength = await self._calculate_cluster_strength(mems)
+            member_ids = {str(m.id) for m in mems}
+            rel_count = sum(
+                1 for e in edges if e.from_memory_id in member_ids and e.to_memory_id in member_ids
+            )
             
-            # Get all tags in cluster
             all_tags = set()
             for mem in mems:
-                if mem.tags:
-                    all_tags.update(mem.tags)
-            
-            # Count relationships
-            rel_count = await self._count_relationships(mems)
+                all_tags.update(mem.tags or [])
             
-            # Get date range
             dates = [m.created_at for m in mems if m.created_at]
             date_range = (min(dates), max(dates)) if dates else (None, None)
             
-            cluster = ConceptCluster(
-                concept=concept,
-                memories=[{
-                    'id': m.id,
-                    'title': m.title,
-                    'content': m.content[:100] + "..." if len(m.content) > 100 else m.content,
-                    'created_at': m.created_at.isoformat() if m.created_at else None,
-                    'tags': m.tags or [],
-                } for m in mems[:10]],  # Top 10 memories
-                strength=strength,
-                tags=list(all_tags),
-                relationships_count=rel_count,
-                date_range=date_range,
+            concept_clusters.append(
+                ConceptCluster(
+                    concept=concept,
+                    memories=[_memory_summary(m) for m in mems[: self.SAMPLE_MEMORIES_PER_CLUSTER]],
+                    strength=cluster_strength(len(mems), rel_count),
+                    tags=list(all_tags),
+                    relationships_count=rel_count,
+                    date_range=date_range,
+                )
             )
-            concept_clusters.append(cluster)
         
-        # Sort by strength
         concept_clusters.sort(key=lambda c: c.strength, reverse=True)
-        return concept_clusters[:10]  # Top 10 clusters
-    
-    async def _calculate_cluster_strength(self, memories: List[Memory]) -> float:
-        """Calculate how cohesive a cluster is (0-1)."""
-        if len(memories) < 2:
-            return 0.5
-        
-        # Count relationships between cluster members
-        member_ids = {m.id for m in memories}
-        query = select(GraphRelationship).where(
-            GraphRelationship.from_memory_id.in_(member_ids),
-            GraphRelationship.to_memory_id.in_(member_ids),
-        )
-        result = self.session.execute(query)
-        relationships = result.scalars().all()
-        
-        # Strength = relationship density
-        max_possible = len(memories) * (len(memories) - 1)
-        if max_possible == 0:
-            return 0.5
-        
-        return min(1.0, len(relationships) / max_possible * 2)
+        return concept_clusters[: self.MAX_CLUSTERS]
     
-    async def _count_relationships(self, memories: List[Memory]) -> int:
-        """Count relationships within a group of memories."""
-        member_ids = {m.id for m in memories}
-        query = select(GraphRelationship).where(
-            GraphRelationship.from_memory_id.in_(member_ids),
-            GraphRelationship.to_memory_id.in_(member_ids),
-        )
-        result = self.session.execute(query)
-        return len(result.scalars().all())
+    # ------------------------------------------------------------------
+    # Shared
+    # ------------------------------------------------------------------
     
-    async def _detect_trends(self, memories: List[Memory]) -> List[Trend]:
-        """Detect trends in memory data over time."""
-        if not memories:
+    @staticmethod
+    def _activity_trends(week_counts: List[Tuple[date, int]]) -> List[Trend]:
+        """Detect growth trends from ascending (week_start, count) pairs."""
+        if len(week_counts) < 3:
             return []
         
-        # Group memories by week
-        weeks: Dict[str, List[Memory]] = {}
-        for memory in memories:
-            if memory.created_at:
-                week_key = memory.created_at.strftime('%Y-W%U')
-                if week_key not in weeks:
-                    weeks[week_key] = []
-                weeks[week_key].append(memory)
-        
-        # Detect trends (simplified: just growth trends)
-        trends = []
-        week_counts = sorted([(k, len(v)) for k, v in weeks.items()])
-        
-        if len(week_counts) >= 3:
-            # Check if growing
-            counts = [c for _, c in week_counts[-3:]]
-            if counts[-1] > counts[0]:
-                trajectory = 'increasing'
-                strength = min(1.0, (counts[-1] - counts[0]) / max(counts[0], 1))
-            else:
-                trajectory = 'decreasing'
-                strength = min(1.0, (counts[0] - counts[-1]) / max(counts[0], 1))
-            
-            trend = Trend(
+        counts = [c for _, c in week_counts[-3:]]
+        if counts[-1] > counts[0]:
+            trajectory = 'increasing'
+            strength = min(1.0, (counts[-1] - counts[0]) / max(counts[0], 1))
+        else:
+            trajectory = 'decreasing'
+            strength = min(1.0, (counts[0] - counts[-1]) / max(counts[0], 1))
+        
+        return [
+            Trend(
                 topic="Memory Activity",
                 description=f"Memory creation is {trajectory}",
-                start_date=memories[0].created_at or datetime.utcnow(),
-                end_date=memories[-1].created_at or datetime.utcnow(),
-                memory_count=len(memories),
+                start_date=_week_datetime(week_counts[0][0]),
+                end_date=_week_datetime(week_counts[-1][0]),
+                memory_count=sum(c for _, c in week_counts),
                 trajectory=trajectory,
                 strength=strength,
                 related_concepts=[],
             )
-            trends.append(trend)
-        
-        return trends
+        ]
     
-    async def _analyze_relationships(self, memories: List[Memory]) -> Dict[str, List[str]]:
+    async def _analyze_relationships(self, member_ids: Set[str]) -> Dict[str, List[str]]:
         """Analyze relationships between memories."""
-        member_ids = {m.id for m in memories}
-        query = select(GraphRelationship).where(
-            GraphRelationship.from_memory_id.in_(member_ids),
-        )
-        result = self.session.execute(query)
-        relationships = result.scalars().all()
-        
-        analysis = {}
-        for rel in relationships:
-            if rel.from_memory_id not in analysis:
-                analysis[rel.from_memory_id] = []
-            analysis[rel.from_memory_id].append(f"{rel.relationship_type}:{rel.to_memory_id}")
-        
+        analysis: Dict[str, List[str]] = {}
+        for rel in await self._load_relationships(member_ids):
+            analysis.setdefault(rel.from_memory_id, []).append(
+                f"{rel.relationship_type}:{rel.to_memory_id}"
+            )
         return analysis
     
     async def _generate_insights(
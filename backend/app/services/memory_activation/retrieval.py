@@ -20,7 +20,7 @@ from app.models.memory_activation import (
     MemoryCoactivationEdge,
     CausalHypothesis,
 )
-from app.models.memory import MemoryMetadata
+from app.services.memory_metadata_cache import MemoryMetadataCache
 from app.services.memory_activation.scoring import (
     ActivationScorer,
     ActivationComponents,
@@ -297,20 +297,18 @@ class MemoryRetrievalService:
         return states
 
     async def _load_memory_metadata(self, memory_ids: List[str]) -> Dict[str, Dict[str, Any]]:
-        """Load memory metadata."""
-        stmt = select(MemoryMetadata).where(MemoryMetadata.id.in_(memory_ids))
-        result = await self.session.execute(stmt)
-        metadata = {}
-
-        for mem in result.scalars().all():
-            metadata[str(mem.id)] = {
+        """Load memory metadata (read-through metadata cache)."""
+        cached = await MemoryMetadataCache(self.session, self.org_id).get_many(memory_ids)
+        return {
+            mem_id: {
                 "title": mem.title,
                 "scope": mem.scope,
                 "created_at": mem.created_at,
-                "episode_id": mem.episode_id,
+                # Memories are not linked to episodes in the metadata table.
+                "episode_id": None,
             }
-
-        return metadata
+            for mem_id, mem in cached.items()
+        }
 
     async def _load_evidence_link_counts(self, memory_ids: List[str]) -> Dict[str, int]:
         """Load evidence link counts (simplified - count by relationships).
@@ -1,11 +1,14 @@
 """Memory attachment service.
 
-MVP: store bytes on local disk and metadata in Postgres.
+Stores bytes on local disk, deduplicated per organization by SHA-256 (see
+``app.services.attachment_blob_store``), and metadata in Postgres. Text
+extraction and vector indexing run after the upload commits (see
+``app.services.attachment_indexer``), so uploads never wait on parsing,
+OCR or embedding.
 """
 
 from __future__ import annotations
 
-import hashlib
 from pathlib import Path
 from typing import Optional
 from uuid import uuid4
@@ -18,10 +21,9 @@ from app.core.config import settings
 from app.core.qdrant import QdrantService
 from app.models.memory import MemoryMetadata
 from app.models.memory_attachment import MemoryAttachment
+from app.services.attachment_blob_store import AttachmentBlobStore, BlobTooLargeError, is_blob_path
 from app.services.audit_service import AuditService
 from app.services.permission_checker import PermissionChecker
-from app.services.attachment_text_extractor import extract_text_for_indexing_from_file
-from app.services.embedding_service import EmbeddingService
 
 
 class AttachmentTooLargeError(ValueError):
@@ -36,6 +38,40 @@ class AttachmentStorageError(RuntimeError):
     pass
 
 
+def attachments_root() -> Path:
+    primary = Path(settings.MEMORY_ATTACHMENTS_DIR or "data/memory_attachments")
+    fallback = Path("/tmp/ninai_memory_attachments")
+
+    for candidate in (primary, fallback):
+        try:
+            candidate.mkdir(parents=True, exist_ok=True)
+            probe = candidate / ".ninai_write_probe"
+            with open(probe, "wb") as f:
+                f.write(b"1")
+            try:
+                probe.unlink()
+            except Exception:
+                pass
+            return candidate
+        except Exception:
+            continue
+
+    return primary
+
+
+def resolve_attachment_path(relpath: str) -> Path:
+    root = attachments_root().resolve()
+    target = (root / relpath).resolve()
+    if root not in target.parents and target != root:
+        raise ValueError("Invalid attachment path")
+    return target
+
+
+def attachment_indexing_enabled() -> bool:
+    enabled = settings.ATTACHMENT_INDEXING_ENABLED
+    return True if enabled is None else bool(enabled)
+
+
 class MemoryAttachmentService:
     def __init__(
         self,
@@ -53,35 +89,13 @@ class MemoryAttachmentService:
         self.audit_service = AuditService(session)
 
     def _attachments_root(self) -> Path:
-        primary = Path(settings.MEMORY_ATTACHMENTS_DIR or "data/memory_attachments")
-        fallback = Path("/tmp/ninai_memory_attachments")
-
-        for candidate in (primary, fallback):
-            try:
-                candidate.mkdir(parents=True, exist_ok=True)
-                probe = candidate / ".ninai_write_probe"
-                with open(probe, "wb") as f:
-                    f.write(b"1")
-                try:
-                    probe.unlink()
-                except Exception:
-                    pass
-                return candidate
-            except Exception:
-                continue
-
-        return primary
+        return attachments_root()
 
-    def _attachment_relpath(self, memory_id: str, attachment_id: str) -> str:
-        # Keep it deterministic and path-traversal safe.
-        return str(Path(self.org_id) / memory_id / attachment_id)
+    def _blob_store(self) -> AttachmentBlobStore:
+        return AttachmentBlobStore(self.session, self.org_id, self._attachments_root())
 
     def _attachment_abspath(self, relpath: str) -> Path:
-        root = self._attachments_root().resolve()
-        target = (root / relpath).resolve()
-        if root not in target.parents and target != root:
-            raise ValueError("Invalid attachment path")
-        return target
+        return resolve_attachment_path(relpath)
 
     async def _require_memory_access(self, memory_id: str, action: str) -> MemoryMetadata:
         access = await self.permission_checker.check_memory_access(
@@ -121,52 +135,28 @@ class MemoryAttachmentService:
         return list(res.scalars().all())
 
     async def create_attachment(self, memory_id: str, file: UploadFile) -> MemoryAttachment:
-        memory = await self._require_memory_access(memory_id, "write")
+        await self._require_memory_access(memory_id, "write")
 
         if file.filename is None or file.filename.strip() == "":
             raise ValueError("File must have a filename")
 
         attachment_id = str(uuid4())
-
-        relpath = self._attachment_relpath(memory_id=memory_id, attachment_id=attachment_id)
-        abspath = self._attachment_abspath(relpath)
-        try:
-            abspath.parent.mkdir(parents=True, exist_ok=True)
-        except PermissionError as e:
-            raise AttachmentStorageError(
-                f"Attachment storage not writable at {self._attachments_root()}"
-            ) from e
-
-        hasher = hashlib.sha256()
-        total = 0
         max_bytes = int(settings.MAX_ATTACHMENT_SIZE_BYTES or 25 * 1024 * 1024)
+        store = self._blob_store()
 
+        # Identical bytes are stored once per organization (see attachment_blob_store).
         try:
-            with open(abspath, "wb") as out:
-                while True:
-                    chunk = await file.read(1024 * 1024)
-                    if not chunk:
-                        break
-                    total += len(chunk)
-                    if total > max_bytes:
-                        raise AttachmentTooLargeError(
-                            f"Attachment too large (max {max_bytes} bytes)"
-                        )
-                    hasher.update(chunk)
-                    out.write(chunk)
+            try:
+                staged = await store.stage(file, max_bytes)
+            finally:
+                await file.close()
+            relpath = await store.acquire(staged)
+        except BlobTooLargeError as e:
+            raise AttachmentTooLargeError(str(e)) from e
         except PermissionError as e:
             raise AttachmentStorageError(
                 f"Attachment storage not writable at {self._attachments_root()}"
             ) from e
-        except Exception:
-            if abspath.exists():
-                try:
-                    abspath.unlink()
-                except Exception:
-                    pass
-            raise
-        finally:
-            await file.close()
 
         att = MemoryAttachment(
             id=attachment_id,
@@ -175,9 +165,10 @@ class MemoryAttachmentService:
             uploaded_by=self.user_id,
             file_name=file.filename[:255],
             content_type=(file.content_type[:255] if file.content_type else None),
-            size_bytes=total,
-            sha256=hasher.hexdigest(),
+            size_bytes=staged.size_bytes,
+            sha256=staged.sha256,
             storage_path=relpath,
+            index_status="pending" if attachment_indexing_enabled() else "skipped",
         )
 
         self.session.add(att)
@@ -197,48 +188,6 @@ class MemoryAttachmentService:
             },
         )
 
-        # Best-effort indexing into Qdrant using extracted text.
-        if bool(settings.ATTACHMENT_INDEXING_ENABLED if settings.ATTACHMENT_INDEXING_ENABLED is not None else True):
-            try:
-                max_chars = int(settings.ATTACHMENT_INDEX_MAX_CHARS or 20000)
-                max_file_bytes = int(settings.ATTACHMENT_INDEX_MAX_FILE_BYTES or 10 * 1024 * 1024)
-                text = extract_text_for_indexing_from_file(
-                    content_type=att.content_type,
-                    filename=att.file_name,
-                    file_path=abspath,
-                    max_chars=max_chars,
-                    max_bytes=max_file_bytes,
-                    ocr_service_url=getattr(settings, "OCR_SERVICE_URL", None),
-                    ocr_timeout_seconds=float(getattr(settings, "OCR_SERVICE_TIMEOUT_SECONDS", 5.0) or 5.0),
-                )
-
-                if text and text.strip():
-                    vector = await EmbeddingService.embed(text)
-                    await QdrantService.upsert_memory(
-                        memory_id=att.id,  # Qdrant point id
-                        org_id=self.org_id,
-                        vector=vector,
-                        payload={
-                            "kind": "attachment",
-                            "memory_id": memory_id,
-                            "attachment_id": att.id,
-                            "file_name": att.file_name,
-                            "content_type": att.content_type,
-                            "scope": memory.scope,
-                            "scope_id": memory.scope_id,
-                            "owner_id": memory.owner_id,
-                            "classification": memory.classification,
-                        },
-                    )
-                    att.indexed_at = EmbeddingService.utcnow().replace(tzinfo=None)
-                    att.index_error = None
-                else:
-                    att.indexed_at = None
-                    att.index_error = "no_indexable_text"
-            except Exception as e:
-                att.indexed_at = None
-                att.index_error = str(e)[:500]
-
         return att
 
     async def get_attachment(self, memory_id: str, attachment_id: str) -> tuple[MemoryAttachment, Path]:
@@ -261,20 +210,25 @@ class MemoryAttachmentService:
         if att is None or att.organization_id != self.org_id or att.memory_id != memory_id:
             raise AttachmentNotFoundError("Attachment not found")
 
-        abspath = self._attachment_abspath(att.storage_path)
+        storage_path = att.storage_path
+        sha256 = att.sha256
 
         await self.session.delete(att)
         await self.session.flush()
 
-        # Best-effort delete from Qdrant.
+        # Best-effort delete of the attachment's chunk points.
         try:
-            await QdrantService.delete_point(point_id=attachment_id)
+            await QdrantService.delete_attachment_points(org_id=self.org_id, attachment_id=attachment_id)
         except Exception:
             pass
 
-        if abspath.exists():
+        if is_blob_path(storage_path):
+            # Shared blob: removed only with its last reference.
+            await self._blob_store().release(sha256)
+        else:
+            # Pre-dedup per-attachment file.
             try:
-                abspath.unlink()
+                self._attachment_abspath(storage_path).unlink(missing_ok=True)
             except Exception:
                 # Best-effort; DB is source of truth.
                 pass
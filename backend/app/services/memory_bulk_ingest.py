@@ -0,0 +1,247 @@
+"""backend.app.services.memory_bulk_ingest
+
+Bulk memory ingest (``POST /memories/bulk``).
+
+Items arrive as a stream (NDJSON lines or a JSON array) and are processed in
+batches of ``MEMORY_BULK_INGEST_BATCH_SIZE``. Each batch is:
+
+1. validated against ``MemoryCreate`` and the user's create permission per scope;
+2. deduplicated by ``content_hash``, both within the request and against the
+   organization's active memories;
+3. embedded with one batched embeddings call;
+4. written with ``MemoryService.create_memories`` (multi-row inserts, one
+   Qdrant upsert, one audit event);
+5. announced with one ``memory.bulk_created`` outbox event and committed.
+
+Memory pipelines are enqueued after each commit. A batch that fails is rolled
+back and its items are reported as ``failed``; later batches still run.
+Tenant context is ``SET LOCAL`` and ends with each transaction, so it is
+re-applied after every commit or rollback.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+from dataclasses import dataclass
+from typing import Any, AsyncIterable, Dict, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import and_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import set_tenant_context
+from app.models.memory import MemoryMetadata
+from app.schemas.memory import MemoryCreate
+from app.services.embedding_service import EmbeddingService
+from app.services.memory_service import MemoryService
+from app.services.webhook_service import WebhookService
+from app.tasks.memory_pipeline import enqueue_memory_pipelines
+
+logger = logging.getLogger(__name__)
+
+
+class InvalidItem:
+    """Placeholder for an input item that could not be parsed."""
+
+    def __init__(self, error: str):
+        self.error = error
+
+
+@dataclass
+class BulkItemResult:
+    index: int
+    status: str  # created | duplicate | invalid | forbidden | failed
+    memory_id: Optional[str] = None
+    error: Optional[str] = None
+
+
+@dataclass
+class BulkIngestSummary:
+    results: List[BulkItemResult]
+    truncated: bool = False
+
+    def count(self, status: str) -> int:
+        return sum(1 for r in self.results if r.status == status)
+
+
+def content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+class MemoryBulkIngestService:
+    """Streams items into long-term memories batch by batch (commits per batch)."""
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        user_id: str,
+        org_id: str,
+        clearance_level: int = 0,
+        batch_size: Optional[int] = None,
+        run_pipeline: bool = True,
+        roles: str = "",
+    ):
+        self.session = session
+        self.user_id = user_id
+        self.org_id = org_id
+        self.roles = roles
+        self.clearance_level = clearance_level
+        self.memory_service = MemoryService(session, user_id, org_id, clearance_level)
+        self.batch_size = max(1, int(batch_size or settings.MEMORY_BULK_INGEST_BATCH_SIZE))
+        self.run_pipeline = run_pipeline
+        self._scope_allowed: Dict[str, Optional[str]] = {}
+        self._seen: Dict[str, str] = {}
+
+    async def ingest(
+        self,
+        items: AsyncIterable[Any],
+        request_id: Optional[str] = None,
+    ) -> BulkIngestSummary:
+        """Ingest ``items`` (dicts or ``InvalidItem``) and report per-item status."""
+        summary = BulkIngestSummary(results=[])
+        max_items = int(settings.MEMORY_BULK_INGEST_MAX_ITEMS)
+        batch: List[Tuple[int, Any]] = []
+        index = 0
+        async for item in items:
+            if index >= max_items:
+                summary.truncated = True
+                break
+            batch.append((index, item))
+            index += 1
+            if len(batch) >= self.batch_size:
+                summary.results.extend(await self._process(batch, request_id))
+                batch = []
+        if batch:
+            summary.results.extend(await self._process(batch, request_id))
+        return summary
+
+    async def _process(
+        self,
+        batch: List[Tuple[int, Any]],
+        request_id: Optional[str],
+    ) -> List[BulkItemResult]:
+        results: Dict[int, BulkItemResult] = {}
+        valid: List[Tuple[int, MemoryCreate, str]] = []
+
+        for index, raw in batch:
+            if isinstance(raw, InvalidItem):
+                results[index] = BulkItemResult(index, "invalid", error=raw.error)
+                continue
+            try:
+                data = MemoryCreate.model_validate(raw)
+            except ValidationError as e:
+                results[index] = BulkItemResult(index, "invalid", error=str(e))
+                continue
+            denied = await self._scope_denied(data.scope)
+            if denied is not None:
+                results[index] = BulkItemResult(index, "forbidden", error=denied)
+                continue
+            valid.append((index, data, content_hash(data.content)))
+
+        existing = await self._existing_hashes([h for _, _, h in valid if h not in self._seen])
+        self._seen.update(existing)
+
+        to_create: List[Tuple[int, MemoryCreate, str]] = []
+        first_index: Dict[str, int] = {}
+        repeats: List[Tuple[int, int]] = []
+        for index, data, digest in valid:
+            if digest in self._seen:
+                results[index] = BulkItemResult(index, "duplicate", memory_id=self._seen[digest])
+            elif digest in first_index:
+                repeats.append((index, first_index[digest]))
+            else:
+                first_index[digest] = index
+                to_create.append((index, data, digest))
+
+        if to_create:
+            outcome = await self._create(to_create, request_id)
+            for (index, _data, digest), created in zip(to_create, outcome):
+                if isinstance(created, BulkItemResult):
+                    results[index] = created
+                else:
+                    self._seen[digest] = created
+                    results[index] = BulkItemResult(index, "created", memory_id=created)
+
+        # Repeats within the batch share the outcome of the first occurrence.
+        for index, original in repeats:
+            first = results[original]
+            if first.status == "created":
+                results[index] = BulkItemResult(index, "duplicate", memory_id=first.memory_id)
+            else:
+                results[index] = BulkItemResult(index, first.status, error=first.error)
+
+        return [results[index] for index, _ in batch]
+
+    async def _create(
+        self,
+        items: List[Tuple[int, MemoryCreate, str]],
+        request_id: Optional[str],
+    ) -> List[Any]:
+        """Create one deduplicated batch; returns memory ids (or failures)."""
+        try:
+            embeddings = await EmbeddingService.embed_many([data.content for _, data, _ in items])
+            rows = await self.memory_service.create_memories(
+                [(data, embedding) for (_, data, _), embedding in zip(items, embeddings)],
+                request_id=request_id,
+            )
+            memory_ids = [str(row["id"]) for row in rows]
+            await WebhookService(self.session).emit_event(
+                organization_id=self.org_id,
+                event_type="memory.bulk_created",
+                payload={
+                    "memory_ids": memory_ids,
+                    "count": len(memory_ids),
+                    "user_id": self.user_id,
+                    "trace_id": request_id,
+                },
+            )
+            await self.session.commit()
+        except Exception as e:
+            logger.exception("Bulk ingest batch of %d items failed", len(items))
+            await self.session.rollback()
+            await self._restore_tenant_context()
+            return [BulkItemResult(index, "failed", error=str(e)) for index, _, _ in items]
+        await self._restore_tenant_context()
+
+        if self.run_pipeline:
+            enqueue_memory_pipelines(
+                org_id=self.org_id,
+                memory_ids=memory_ids,
+                initiator_user_id=self.user_id,
+                trace_id=request_id,
+                storage="long_term",
+            )
+        return memory_ids
+
+    async def _restore_tenant_context(self) -> None:
+        """Re-apply the RLS context for the next batch's transaction."""
+        await set_tenant_context(
+            self.session, self.user_id, self.org_id, self.roles, self.clearance_level
+        )
+
+    async def _scope_denied(self, scope: str) -> Optional[str]:
+        """Denial reason for creating in ``scope`` (None when allowed)."""
+        if scope not in self._scope_allowed:
+            decision = await self.memory_service.permission_checker.check_permission(
+                self.user_id, self.org_id, f"memory:create:{scope}"
+            )
+            self._scope_allowed[scope] = None if decision.allowed else (decision.reason or "Forbidden")
+        return self._scope_allowed[scope]
+
+    async def _existing_hashes(self, hashes: List[str]) -> Dict[str, str]:
+        if not hashes:
+            return {}
+        rows = (
+            await self.session.execute(
+                select(MemoryMetadata.content_hash, MemoryMetadata.id).where(
+                    and_(
+                        MemoryMetadata.organization_id == self.org_id,
+                        MemoryMetadata.is_active == True,
+                        MemoryMetadata.content_hash.in_(sorted(set(hashes))),
+                    )
+                )
+            )
+        ).all()
+        return {str(digest): str(memory_id) for digest, memory_id in rows}
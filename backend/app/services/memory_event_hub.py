@@ -0,0 +1,375 @@
+"""
+Memory Event Hub
+================
+
+Push-based fan-out for the SSE memory stream (``GET /memories/stream``).
+
+Audit events of the streamed types are appended to one shared Redis stream
+once their transaction commits. Each API process runs a single reader that
+tails the stream (``XREAD BLOCK``) and fans events out to per-org subscriber
+queues, so connected clients cost no DB connections or queries at steady
+state, however many dashboards are open.
+
+- Backpressure: every subscriber has a bounded queue. The reader never waits
+  on a client; one that falls ``MEMORY_STREAM_QUEUE_SIZE`` events behind is
+  disconnected and resumes with ``Last-Event-ID``.
+- Replay: the last ``MEMORY_STREAM_REPLAY_SIZE`` events per org are kept in
+  memory (seeded from the Redis stream on start), so a reconnect with
+  ``Last-Event-ID`` or ``since`` picks up where the client left off. Events
+  older than the buffer are not replayed.
+
+When Redis is unavailable ``ensure_started`` returns False and the endpoint
+falls back to polling ``audit_events``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Optional, Set
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.redis import RedisClient
+from app.middleware.prometheus import (
+    memory_stream_subscribers,
+    record_memory_stream_event,
+    record_memory_stream_replay,
+)
+
+logger = logging.getLogger(__name__)
+
+# Audit event types streamed to SSE clients.
+STREAM_EVENT_TYPES = frozenset({"memory.create", "memory.update", "knowledge.reviewed"})
+
+# Seconds to wait before retrying Redis after a failed start.
+_RETRY_SECONDS = 5.0
+
+# Post-commit publishes scheduled from SQLAlchemy's sync commit hook.
+_background: set = set()
+
+# ``Session.info`` key holding the events a session will publish on commit.
+_PENDING_KEY = "memory_event_hub.pending"
+
+
+def _drop_pending(sync_session: Session, _transaction: Any = None) -> None:
+    pending = sync_session.info.get(_PENDING_KEY)
+    if pending:
+        pending.clear()
+
+
+def _drop_pending_on_close(sync_session: Session, transaction: Any) -> None:
+    # Fires after ``after_commit`` (already drained) and on close() without a
+    # commit, which emits no rollback event.
+    if not transaction.nested:
+        _drop_pending(sync_session)
+
+
+def audit_event_payload(ev: Any) -> Dict[str, Any]:
+    """SSE payload for an AuditEvent (shared by the hub and the polling fallback)."""
+    return {
+        "id": str(ev.id),
+        "type": ev.event_type,
+        "timestamp": ev.timestamp.isoformat() if ev.timestamp else None,
+        "actor_id": ev.actor_id,
+        "resource_type": ev.resource_type,
+        "resource_id": ev.resource_id,
+        "success": ev.success,
+        "details": ev.details or {},
+        "request_id": ev.request_id,
+    }
+
+
+def format_sse(payload: Dict[str, Any]) -> bytes:
+    data = json.dumps(payload, separators=(",", ":"), default=str)
+    return f"id: {payload['id']}\nevent: {payload['type']}\ndata: {data}\n\n".encode("utf-8")
+
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is None:
+        return None
+    # Audit timestamps are stored naive (UTC).
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+def _parse_ts(value: Any) -> Optional[datetime]:
+    try:
+        return _as_utc(datetime.fromisoformat(str(value)))
+    except (TypeError, ValueError):
+        return None
+
+
+def _stream_id(entry_id: str) -> tuple:
+    ms, _, seq = str(entry_id).partition("-")
+    return int(ms or 0), int(seq or 0)
+
+
+@dataclass
+class _Buffered:
+    event_id: str
+    timestamp: Optional[datetime]
+    frame: bytes
+
+
+@dataclass(eq=False)
+class Subscription:
+    """One SSE client: replayed frames first, then live frames from ``queue``."""
+
+    org_id: str
+    queue: "asyncio.Queue[bytes]"
+    backlog: List[bytes] = field(default_factory=list)
+    # Set when the client fell too far behind; the stream should end.
+    overflowed: bool = False
+
+
+class MemoryEventHub:
+    def __init__(
+        self,
+        *,
+        stream_key: Optional[str] = None,
+        maxlen: Optional[int] = None,
+        replay_size: Optional[int] = None,
+        max_orgs: Optional[int] = None,
+        queue_size: Optional[int] = None,
+        block_ms: Optional[int] = None,
+    ) -> None:
+        self.stream_key = stream_key or settings.MEMORY_STREAM_REDIS_KEY
+        self.maxlen = int(maxlen or settings.MEMORY_STREAM_MAXLEN)
+        self.replay_size = int(replay_size or settings.MEMORY_STREAM_REPLAY_SIZE)
+        self.max_orgs = int(max_orgs or settings.MEMORY_STREAM_MAX_ORGS)
+        self.queue_size = int(queue_size or settings.MEMORY_STREAM_QUEUE_SIZE)
+        self.block_ms = int(block_ms or settings.MEMORY_STREAM_BLOCK_MS)
+
+        self._replay: "OrderedDict[str, Deque[_Buffered]]" = OrderedDict()
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        self._last_id = "0-0"
+        self._task: Optional[asyncio.Task] = None
+        self._retry_at = 0.0
+        self._start_lock: Optional[asyncio.Lock] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(settings.MEMORY_STREAM_HUB_ENABLED)
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    # ------------------------------------------------------------------
+    # Publishing
+    # ------------------------------------------------------------------
+
+    async def publish(self, org_id: str, payload: Dict[str, Any]) -> None:
+        """Append an event to the shared stream (best-effort)."""
+        try:
+            client = await RedisClient.get_client()
+            await client.xadd(
+                self.stream_key,
+                {"org": str(org_id), "payload": json.dumps(payload, separators=(",", ":"), default=str)},
+                maxlen=self.maxlen,
+                approximate=True,
+            )
+        except Exception as e:
+            logger.debug("memory stream publish failed: %s", e)
+
+    def publish_after_commit(self, session: AsyncSession, org_id: str, payload: Dict[str, Any]) -> None:
+        """Publish once ``session`` commits; rolled-back events are never streamed.
+
+        Events wait in ``session.info`` until the commit. A rollback (including
+        a savepoint's) or closing the session without committing drops them.
+        """
+        if not self.enabled:
+            return
+        sync_session = getattr(session, "sync_session", None)
+        if not isinstance(sync_session, Session):
+            return
+
+        pending = sync_session.info.get(_PENDING_KEY)
+        if pending is None:
+            pending = sync_session.info[_PENDING_KEY] = []
+            event.listen(sync_session, "after_commit", self._publish_pending)
+            event.listen(sync_session, "after_soft_rollback", _drop_pending)
+            event.listen(sync_session, "after_transaction_end", _drop_pending_on_close)
+        pending.append((str(org_id), payload))
+
+    def _publish_pending(self, sync_session: Session) -> None:
+        pending = sync_session.info.get(_PENDING_KEY)
+        if not pending:
+            return
+        events, pending[:] = list(pending), []
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        for org_id, payload in events:
+            task = loop.create_task(self.publish(org_id, payload))
+            _background.add(task)
+            task.add_done_callback(_background.discard)
+
+    # ------------------------------------------------------------------
+    # Reader
+    # ------------------------------------------------------------------
+
+    async def ensure_started(self) -> bool:
+        """Start the stream reader if needed; False when the hub cannot serve."""
+        if not self.enabled:
+            return False
+        if self.running:
+            return True
+        if time.monotonic() < self._retry_at:
+            return False
+        if self._start_lock is None:
+            self._start_lock = asyncio.Lock()
+        async with self._start_lock:
+            if self.running:
+                return True
+            try:
+                client = await RedisClient.get_client()
+                entries = await client.xrevrange(self.stream_key, count=self.maxlen)
+            except Exception as e:
+                logger.warning("memory stream hub unavailable, falling back to polling: %s", e)
+                self._retry_at = time.monotonic() + _RETRY_SECONDS
+                return False
+
+            # Seed replay buffers so reconnects right after a restart still resume.
+            for entry_id, fields in reversed(entries or []):
+                if _stream_id(entry_id) > _stream_id(self._last_id):
+                    self._dispatch(entry_id, fields)
+            self._task = asyncio.create_task(self._run())
+            return True
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+
+    async def _run(self) -> None:
+        backoff = 0.5
+        while True:
+            try:
+                client = await RedisClient.get_client()
+                response = await client.xread({self.stream_key: self._last_id}, count=100, block=self.block_ms)
+                backoff = 0.5
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("memory stream read failed: %s", e)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+                continue
+
+            for _stream, entries in response or []:
+                for entry_id, fields in entries:
+                    self._dispatch(entry_id, fields)
+
+    def _dispatch(self, entry_id: str, fields: Dict[str, Any]) -> None:
+        self._last_id = entry_id
+        try:
+            org_id = str(fields["org"])
+            payload = json.loads(fields["payload"])
+        except (KeyError, TypeError, ValueError):
+            return
+
+        item = _Buffered(
+            event_id=str(payload.get("id")),
+            timestamp=_parse_ts(payload.get("timestamp")),
+            frame=format_sse(payload),
+        )
+        self._buffer_for(org_id).append(item)
+
+        subscribers = self._subscribers.get(org_id)
+        if not subscribers:
+            return
+        delivered = 0
+        for sub in list(subscribers):
+            try:
+                sub.queue.put_nowait(item.frame)
+                delivered += 1
+            except asyncio.QueueFull:
+                # Never let one slow client hold up the others.
+                sub.overflowed = True
+                self._remove(sub)
+                record_memory_stream_event("dropped")
+        if delivered:
+            record_memory_stream_event("delivered", delivered)
+
+    def _buffer_for(self, org_id: str) -> Deque[_Buffered]:
+        buf = self._replay.get(org_id)
+        if buf is not None:
+            self._replay.move_to_end(org_id)
+            return buf
+        buf = deque(maxlen=self.replay_size)
+        self._replay[org_id] = buf
+        if len(self._replay) > self.max_orgs:
+            for idle in [o for o in self._replay if o not in self._subscribers]:
+                if len(self._replay) <= self.max_orgs:
+                    break
+                del self._replay[idle]
+        return buf
+
+    # ------------------------------------------------------------------
+    # Subscribers
+    # ------------------------------------------------------------------
+
+    def subscribe(
+        self,
+        org_id: str,
+        *,
+        last_event_id: Optional[str] = None,
+        since: Optional[datetime] = None,
+    ) -> Subscription:
+        """Register a client, with any buffered events after ``last_event_id``/``since``.
+
+        Registration and the replay snapshot happen without yielding to the
+        loop, so nothing is missed or repeated between them.
+        """
+        org_id = str(org_id)
+        sub = Subscription(org_id=org_id, queue=asyncio.Queue(maxsize=self.queue_size))
+        buffered = list(self._replay.get(org_id) or ())
+
+        if last_event_id:
+            ids = [b.event_id for b in buffered]
+            if last_event_id in ids:
+                sub.backlog = [b.frame for b in buffered[ids.index(last_event_id) + 1 :]]
+                record_memory_stream_replay("hit")
+            else:
+                record_memory_stream_replay("miss")
+        elif since is not None:
+            since = _as_utc(since)
+            sub.backlog = [b.frame for b in buffered if b.timestamp is not None and b.timestamp >= since]
+
+        self._subscribers.setdefault(org_id, set()).add(sub)
+        memory_stream_subscribers.inc()
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        self._remove(sub)
+
+    def _remove(self, sub: Subscription) -> None:
+        subscribers = self._subscribers.get(sub.org_id)
+        if subscribers is None or sub not in subscribers:
+            return
+        subscribers.discard(sub)
+        if not subscribers:
+            del self._subscribers[sub.org_id]
+        memory_stream_subscribers.dec()
+
+    def subscriber_count(self, org_id: Optional[str] = None) -> int:
+        if org_id is not None:
+            return len(self._subscribers.get(str(org_id), ()))
+        return sum(len(s) for s in self._subscribers.values())
+
+
+memory_event_hub = MemoryEventHub()
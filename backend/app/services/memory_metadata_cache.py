@@ -0,0 +1,141 @@
+"""backend.app.services.memory_metadata_cache
+
+Tenant-partitioned read-through cache for hot ``MemoryMetadata`` rows.
+
+Entries live in a ``VersionedCache`` (in-process LRU plus a shared Redis
+tier, ``memmeta:<org>:<memory>``) and are stamped with per-org and
+per-memory version tokens, so a write invalidates them in every process.
+
+Only the fields needed by access checks and light readers are cached (no
+counters such as ``access_count``). Per-user ACL state (teams, shares) lives
+in ``app.services.access_context``.
+"""
+
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import and_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.versioned_cache import VersionedCache
+from app.models.memory import MemoryMetadata
+
+KEY_PREFIX = "memmeta"
+
+
+@dataclass(frozen=True)
+class CachedMemory:
+    """ACL-relevant and display fields of a memory, as served from the cache."""
+
+    id: str
+    organization_id: str
+    owner_id: str
+    scope: str
+    scope_id: Optional[str]
+    memory_type: Optional[str]
+    classification: Optional[str]
+    required_clearance: int
+    title: Optional[str]
+    content_preview: Optional[str]
+    tags: Tuple[str, ...]
+    vector_id: Optional[str]
+    is_active: bool
+    legal_hold: bool
+    created_at: Optional[datetime]
+
+    @classmethod
+    def from_row(cls, m: MemoryMetadata) -> "CachedMemory":
+        return cls(
+            id=str(m.id),
+            organization_id=str(m.organization_id),
+            owner_id=str(m.owner_id) if m.owner_id is not None else "",
+            scope=str(m.scope or ""),
+            scope_id=str(m.scope_id) if m.scope_id is not None else None,
+            memory_type=m.memory_type,
+            classification=m.classification,
+            required_clearance=int(m.required_clearance or 0),
+            title=m.title,
+            content_preview=m.content_preview,
+            tags=tuple(m.tags or ()),
+            vector_id=str(m.vector_id) if m.vector_id is not None else None,
+            is_active=bool(m.is_active),
+            legal_hold=bool(m.legal_hold),
+            created_at=m.created_at,
+        )
+
+    def to_json(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["created_at"] = _iso(self.created_at)
+        return data
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "CachedMemory":
+        data = dict(data)
+        data["created_at"] = _parse_dt(data.get("created_at"))
+        data["tags"] = tuple(data.get("tags") or ())
+        return cls(**data)
+
+
+def _iso(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value is not None else None
+
+
+def _parse_dt(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+
+_cache: VersionedCache[CachedMemory] = VersionedCache(
+    prefix=KEY_PREFIX,
+    settings_prefix="MEMORY_METADATA_CACHE",
+    encode=CachedMemory.to_json,
+    decode=CachedMemory.from_json,
+)
+
+
+class MemoryMetadataCache:
+    """Read-through access to cached memory metadata for one organization."""
+
+    def __init__(self, session: AsyncSession, org_id: str):
+        self.session = session
+        self.org_id = str(org_id)
+
+    async def get(self, memory_id: str) -> Optional[CachedMemory]:
+        return (await self.get_many([memory_id])).get(str(memory_id))
+
+    async def get_many(self, memory_ids: Iterable[str]) -> Dict[str, CachedMemory]:
+        """Cached metadata for ``memory_ids`` (missing/other-org ids are omitted)."""
+        return await _cache.get_many(self.org_id, memory_ids, self._load)
+
+    async def _load(self, ids: List[str]) -> Dict[str, CachedMemory]:
+        rows = (
+            await self.session.execute(
+                select(MemoryMetadata).where(
+                    and_(
+                        MemoryMetadata.id.in_(ids),
+                        MemoryMetadata.organization_id == self.org_id,
+                    )
+                )
+            )
+        ).scalars().all()
+        return {str(r.id): CachedMemory.from_row(r) for r in rows}
+
+    @staticmethod
+    async def invalidate(
+        org_id: str,
+        memory_ids: Iterable[str],
+        session: Optional[AsyncSession] = None,
+    ) -> None:
+        """
+        Invalidate cached metadata for ``memory_ids`` in every process.
+
+        With ``session`` the versions are bumped again once it commits.
+        """
+        await _cache.invalidate(str(org_id), list(memory_ids), session=session)
+
+    @staticmethod
+    async def invalidate_org(org_id: str, session: Optional[AsyncSession] = None) -> None:
+        """Invalidate every cached memory of the org (bulk writers)."""
+        await _cache.invalidate(str(org_id), None, session=session)
@@ -27,6 +27,7 @@ from app.models.memory import MemoryMetadata
 from app.models.memory_promotion_history import MemoryPromotionHistory
 from app.services.short_term_memory import ShortTermMemory, ShortTermMemoryService
 from app.services.audit_service import AuditService
+from app.services.memory_metadata_cache import MemoryMetadataCache
 from app.services.simulation_service import SimulationService
 
 
@@ -179,6 +180,7 @@ class MemoryPromoter:
         # Save to PostgreSQL
         self.session.add(memory)
         await self.session.flush()
+        await MemoryMetadataCache.invalidate(self.org_id, [memory_id], session=self.session)
 
         # Record promotion history (required for observability/provenance).
         # Idempotency is enforced by a unique index on (organization_id, from_stm_id).
@@ -215,6 +217,7 @@ class MemoryPromoter:
                 "owner_id": self.user_id,
                 "tags": stm.tags,
                 "classification": "internal",
+                "required_clearance": 0,
                 "memory_type": "long_term",
                 "promoted": True,
                 "created_at": datetime.now(timezone.utc).isoformat(),
@@ -14,21 +14,27 @@ HYBRID MEMORY ARCHITECTURE:
 
 import hashlib
 import math
-from typing import Optional, List, Union
+from types import SimpleNamespace
+from typing import Collection, Optional, List, Tuple, Union
 from datetime import datetime, timezone, timedelta
 from uuid import uuid4
 
-from sqlalchemy import select, and_, or_, func, desc
+from sqlalchemy import select, insert, and_, or_, func, desc
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
+from app.core.pagination import CountMode, count_rows, keyset_page
 from app.core.qdrant import QdrantService
 from app.models.memory import MemoryMetadata, MemorySharing
 from app.models.memory_feedback import MemoryFeedback
+from app.models.memory_minhash import MemoryMinHash
 from app.services.permission_checker import PermissionChecker, AccessDecision
 from app.services.audit_service import AuditService
 from app.services.short_term_memory import ShortTermMemory, ShortTermMemoryService
 from app.services.memory_promoter import MemoryPromoter
+from app.services.near_duplicate_index import NearDuplicateIndex
+from app.services.memory_metadata_cache import MemoryMetadataCache
+from app.services.synthesis_aggregates import SynthesisAggregates
 from app.schemas.memory import (
     MemoryCreate,
     MemoryUpdate,
@@ -119,59 +125,25 @@ class MemoryService:
             )
             raise PermissionError(permission_check.reason)
         
-        # Generate IDs
         memory_id = str(uuid4())
-        vector_id = str(uuid4())
+        memory = MemoryMetadata(**self._new_memory_values(data, memory_id))
         
-        # Compute content hash for deduplication
-        content_hash = hashlib.sha256(
-            data.content.encode("utf-8")
-        ).hexdigest()
-        
-        # Create metadata record
-        memory = MemoryMetadata(
-            id=memory_id,
-            organization_id=self.org_id,
-            owner_id=self.user_id,
-            scope=data.scope,
-            scope_id=data.scope_id,
-            memory_type=data.memory_type,
-            classification=data.classification,
-            required_clearance=data.required_clearance or 0,
-            title=data.title,
-            content_preview=data.content[:500],
-            content_hash=content_hash,
-            tags=data.tags or [],
-            entities=data.entities or {},
-            extra_metadata=data.extra_metadata or {},
-            source_type=data.source_type,
-            source_id=data.source_id,
-            vector_id=vector_id,
-            embedding_model=settings.EMBEDDING_MODEL or "text-embedding-3-small",
-            retention_days=data.retention_days,
-        )
-        
-        # Save to Postgres
+        # Save to Postgres (with its near-duplicate signature)
         self.session.add(memory)
+        self.session.add(NearDuplicateIndex.build_row(memory_id, self.org_id, memory.content_preview))
         await self.session.flush()
         
+        created_at = datetime.now(timezone.utc)
+        await SynthesisAggregates(self.session, self.org_id).apply_memory_change(
+            memory_id, None, memory.tags, memory.created_at or created_at
+        )
+        
         # Save to Qdrant
         await QdrantService.upsert_memory(
-            memory_id=vector_id,
+            memory_id=memory.vector_id,
             org_id=self.org_id,
             vector=embedding,
-            payload={
-                "memory_id": memory_id,
-                "scope": data.scope,
-                "scope_id": data.scope_id,
-                # Denormalized for Qdrant filtering convenience
-                "team_id": data.scope_id if str(data.scope) == "team" else None,
-                "owner_id": self.user_id,
-                "tags": data.tags or [],
-                "classification": data.classification,
-                "memory_type": data.memory_type,
-                "created_at": datetime.now(timezone.utc).isoformat(),
-            },
+            payload=self._vector_payload(memory, created_at),
         )
         
         # Audit log
@@ -189,6 +161,124 @@ class MemoryService:
         
         return memory
     
+    async def create_memories(
+        self,
+        items: List[Tuple[MemoryCreate, List[float]]],
+        request_id: Optional[str] = None,
+    ) -> List[dict]:
+        """
+        Create many long-term memories with set-based writes.
+        
+        Same result as ``create_memory`` per item, but rows are written with
+        one multi-row INSERT per table, vectors with one Qdrant upsert,
+        aggregates with one upsert per table, and a single audit event
+        covers the batch. Nothing is committed.
+        
+        Args:
+            items: ``(data, embedding)`` pairs
+            request_id: Request ID for audit correlation
+        
+        Returns:
+            Column values of the created memories, in input order
+        
+        Raises:
+            PermissionError: If the user may not create in one of the scopes
+        """
+        for scope in {data.scope for data, _ in items}:
+            decision = await self.permission_checker.check_permission(
+                self.user_id, self.org_id, f"memory:create:{scope}"
+            )
+            if not decision.allowed:
+                raise PermissionError(decision.reason)
+        if not items:
+            return []
+        
+        created_at = datetime.now(timezone.utc)
+        rows = [
+            {**self._new_memory_values(data, str(uuid4())), "created_at": created_at}
+            for data, _ in items
+        ]
+        await self.session.execute(insert(MemoryMetadata), rows)
+        await self.session.execute(
+            insert(MemoryMinHash),
+            [
+                NearDuplicateIndex.build_values(row["id"], self.org_id, row["content_preview"])
+                for row in rows
+            ],
+        )
+        await SynthesisAggregates(self.session, self.org_id).apply_created(
+            [(row["tags"], created_at) for row in rows]
+        )
+        
+        await QdrantService.upsert_memories(
+            self.org_id,
+            [
+                {
+                    "id": row["vector_id"],
+                    "vector": embedding,
+                    "payload": self._vector_payload(SimpleNamespace(**row), created_at),
+                }
+                for row, (_, embedding) in zip(rows, items)
+            ],
+        )
+        
+        await self.audit_service.log_memory_operation(
+            actor_id=self.user_id,
+            organization_id=self.org_id,
+            memory_id="",
+            operation="bulk_create",
+            success=True,
+            details={
+                "count": len(rows),
+                "memory_ids": [row["id"] for row in rows],
+                "request_id": request_id,
+            },
+        )
+        return rows
+    
+    def _new_memory_values(self, data: MemoryCreate, memory_id: str) -> dict:
+        """Column values of a new memory owned by the current user."""
+        return {
+            "id": memory_id,
+            "organization_id": self.org_id,
+            "owner_id": self.user_id,
+            "scope": data.scope,
+            "scope_id": data.scope_id,
+            "memory_type": data.memory_type,
+            "classification": data.classification,
+            "required_clearance": data.required_clearance or 0,
+            "title": data.title,
+            "content_preview": data.content[:500],
+            # Content hash for deduplication
+            "content_hash": hashlib.sha256(data.content.encode("utf-8")).hexdigest(),
+            "tags": data.tags or [],
+            "entities": data.entities or {},
+            "extra_metadata": data.extra_metadata or {},
+            "source_type": data.source_type,
+            "source_id": data.source_id,
+            "vector_id": str(uuid4()),
+            "embedding_model": settings.EMBEDDING_MODEL or "text-embedding-3-small",
+            "retention_days": data.retention_days,
+        }
+    
+    @staticmethod
+    def _vector_payload(memory, created_at: datetime) -> dict:
+        """Qdrant payload of a new memory."""
+        return {
+            "memory_id": str(memory.id),
+            "scope": memory.scope,
+            "scope_id": memory.scope_id,
+            # Denormalized for Qdrant filtering convenience
+            "team_id": memory.scope_id if str(memory.scope) == "team" else None,
+            "owner_id": str(memory.owner_id),
+            "tags": memory.tags or [],
+            "classification": memory.classification,
+            "required_clearance": memory.required_clearance,
+            "memory_type": memory.memory_type,
+            "created_at": created_at.isoformat(),
+            "created_ts": created_at.timestamp(),
+        }
+    
     async def create_memory_smart(
         self,
         data: MemoryCreate,
@@ -317,26 +407,32 @@ class MemoryService:
         self,
         include_short_term: bool = True,
         request_id: Optional[str] = None,
+        limit: int = 100,
+        cursor: Optional[str] = None,
     ) -> dict:
         """
         List all memories for the user, from both short-term and long-term storage.
         
+        Long-term memories are paged newest first; short-term memories are
+        only returned with the first page.
+        
         Args:
             include_short_term: Whether to include short-term memories from Redis
             request_id: Request ID for audit correlation
+            limit: Long-term memories per page
+            cursor: ``next_cursor`` of the previous page
         
         Returns:
-            Dict with 'short_term' and 'long_term' memory lists
+            Dict with 'short_term' and 'long_term' memory lists and 'next_cursor'
         """
-        from sqlalchemy import select
-        
         result = {
             "short_term": [],
             "long_term": [],
+            "next_cursor": None,
         }
         
         # Get short-term memories from Redis
-        if include_short_term:
+        if include_short_term and not cursor:
             stm_service = ShortTermMemoryService(self.user_id, self.org_id)
             result["short_term"] = await stm_service.list_user_memories()
         
@@ -345,11 +441,12 @@ class MemoryService:
             select(MemoryMetadata)
             .where(MemoryMetadata.organization_id == self.org_id)
             .where(MemoryMetadata.is_active == True)
-            .order_by(MemoryMetadata.created_at.desc())
-            .limit(100)
         )
-        db_result = await self.session.execute(query)
-        result["long_term"] = list(db_result.scalars().all())
+        page = await keyset_page(
+            self.session, query, MemoryMetadata.created_at, MemoryMetadata.id, limit=limit, cursor=cursor
+        )
+        result["long_term"] = page.items
+        result["next_cursor"] = page.next_cursor
         
         return result
 
@@ -360,22 +457,30 @@ class MemoryService:
         memory_type: Optional[str] = None,
         page: int = 1,
         page_size: int = 20,
-    ) -> tuple[list[MemoryMetadata], int, bool]:
+        cursor: Optional[str] = None,
+        count: CountMode = "exact",
+        org_wide_visibility: bool = False,
+    ) -> tuple[list[MemoryMetadata], Optional[int], bool, Optional[str]]:
         """
-        List long-term memories with optional filters.
+        List long-term memories with optional filters, newest first.
 
         Args:
             scope: Filter by scope
             tags: Filter by tags (must contain all)
             memory_type: Filter by memory_type
-            page: Page number (1-indexed)
+            page: Page number (1-indexed); ignored when ``cursor`` is given
             page_size: Items per page
+            cursor: ``next_cursor`` of the previous page (keyset paging)
+            count: How to compute the total (``exact``, ``estimate`` or ``none``)
+            org_wide_visibility: The caller can read every memory in the org, so
+                ``estimate`` may use the org-wide synthesis counters
 
         Returns:
-            (items, total, has_more)
-        """
-        from sqlalchemy import func
+            (items, total, has_more, next_cursor)
 
+        Raises:
+            InvalidCursorError: If ``cursor`` is malformed
+        """
         base_query = (
             select(MemoryMetadata)
             .where(MemoryMetadata.organization_id == self.org_id)
@@ -391,24 +496,30 @@ class MemoryService:
         if tags:
             base_query = base_query.where(MemoryMetadata.tags.contains(tags))
 
-        count_query = select(func.count()).select_from(base_query.subquery())
-        total_result = await self.session.execute(count_query)
-        total = total_result.scalar() or 0
-
-        offset = max(page - 1, 0) * page_size
-        query = (
-            base_query
-            .order_by(MemoryMetadata.created_at.desc())
-            .offset(offset)
-            .limit(page_size)
+        result = await keyset_page(
+            self.session,
+            base_query,
+            MemoryMetadata.created_at,
+            MemoryMetadata.id,
+            limit=page_size,
+            cursor=cursor,
+            offset=max(page - 1, 0) * page_size,
         )
 
-        db_result = await self.session.execute(query)
-        items = list(db_result.scalars().all())
-
-        has_more = total > (offset + page_size)
+        if (
+            count == "estimate"
+            and org_wide_visibility
+            and not scope
+            and not memory_type
+            and len(tags or []) == 1
+        ):
+            # The counters ignore RLS/ACLs, so they only answer callers who see
+            # the whole org; everyone else gets the planner's estimate.
+            total = await SynthesisAggregates(self.session, self.org_id).memory_count(tags[0])
+        else:
+            total = await count_rows(self.session, base_query, count)
 
-        return items, total, has_more
+        return result.items, total, result.has_more, result.next_cursor
     
     async def promote_memory(
         self,
@@ -506,6 +617,7 @@ class MemoryService:
         query_embedding: List[float],
         request: MemorySearchRequest,
         request_id: Optional[str] = None,
+        recorded_ids: Optional[Collection[str]] = None,
     ) -> List[MemoryMetadata]:
         """
         Search memories using vector similarity.
@@ -519,12 +631,16 @@ class MemoryService:
             query_embedding: Query vector
             request: Search parameters
             request_id: Request ID for audit
+            recorded_ids: Memory ids whose access an earlier search of the same
+                caller already recorded; they get no second access audit or
+                activation update. Every other result is recorded as usual.
         
         Returns:
             List of authorized MemoryMetadata results
         """
         qdrant_results = []
         lexical_scores: dict[str, float] = {}
+        recorded = {str(mid) for mid in recorded_ids or ()}
 
         ranking_meta = self.get_search_ranking_meta(request)
         decay_enabled = bool(ranking_meta.get("temporal_decay_enabled"))
@@ -533,13 +649,25 @@ class MemoryService:
         # Vector leg (Qdrant)
         scope_val = request.scope.value if hasattr(request.scope, "value") else request.scope
 
+        acl_filter = await self.permission_checker.build_vector_acl_filter(
+            self.user_id, self.org_id, self.clearance_level
+        )
+        if acl_filter is not None:
+            # Hits are pre-authorized; keep a little headroom for attachment
+            # points and rows archived since they were indexed.
+            fetch_limit = request.limit + max(1, request.limit // 4)
+        else:
+            fetch_limit = request.limit * 2  # Over-fetch to account for RLS filtering
+
         qdrant_results = await QdrantService.search(
             org_id=self.org_id,
             query_vector=query_embedding,
-            limit=request.limit * 2,  # Over-fetch to account for RLS filtering
+            limit=fetch_limit,
             score_threshold=request.score_threshold or 0.0,
             scope_filter=scope_val,
             team_id=request.team_id,
+            acl_filter=acl_filter,
+            group_by="memory_id",
         )
 
         # Lexical leg (Postgres FTS) - opt-in via request.hybrid
@@ -596,7 +724,11 @@ class MemoryService:
                 lexical_scores[memory_id] = float(row[1] or 0.0)
 
         # Candidate IDs from both legs
-        vector_scores = {r["payload"]["memory_id"]: float(r.get("score") or 0.0) for r in qdrant_results}
+        vector_scores: dict[str, float] = {}
+        for r in qdrant_results:
+            # A memory may be hit through its own vector and its attachment chunks.
+            memory_id = str(r["payload"]["memory_id"])
+            vector_scores[memory_id] = max(vector_scores.get(memory_id, 0.0), float(r.get("score") or 0.0))
         candidate_ids = list({*vector_scores.keys(), *lexical_scores.keys()})
         if not candidate_ids:
             return []
@@ -760,7 +892,10 @@ class MemoryService:
                 ]
 
                 authorized_memories.append(memory)
-                
+
+                if str(memory.id) in recorded:
+                    continue
+
                 # Log authorized access
                 await self.audit_service.log_memory_access(
                     user_id=self.user_id,
@@ -804,48 +939,53 @@ class MemoryService:
                 for mem in authorized_memories:
                     mem.score = activation_by_id.get(str(mem.id), 0.0)
 
-                # Write explanation log (append-only). Commit happens at request boundary.
-                explanation_id = await retrieval.write_retrieval_explanation(
-                    query=request.query,
-                    results=explanation_results,
-                    top_k=request.limit,
-                )
+                if any(str(m.id) not in recorded for m in authorized_memories):
+                    # Write explanation log (append-only). Commit happens at request boundary.
+                    explanation_id = await retrieval.write_retrieval_explanation(
+                        query=request.query,
+                        results=explanation_results,
+                        top_k=request.limit,
+                    )
 
-                # Best-effort enqueue of background updates (no-op in unit tests).
-                try:
-                    from app.core.celery_app import celery_app
-
-                    broker = celery_app.conf.broker_url
-                    if broker and not str(broker).startswith("memory://"):
-                        from app.services.memory_activation.tasks import (
-                            memory_access_update_task,
-                            coactivation_update_task,
-                        )
-
-                        top_ids = [str(m.id) for m in authorized_memories[: request.limit]]
-                        for mid in top_ids:
-                            memory_access_update_task.apply_async(
-                                kwargs={
-                                    "memory_id": mid,
-                                    "org_id": str(self.org_id),
-                                    "user_id": str(self.user_id),
-                                    "retrieval_explanation_id": explanation_id,
-                                },
-                                countdown=2,
-                            )
+                    # Best-effort enqueue of background updates (no-op in unit tests).
+                    try:
+                        from app.core.celery_app import celery_app
 
-                        if len(top_ids) > 1:
-                            coactivation_update_task.apply_async(
-                                kwargs={
-                                    "primary_memory_id": top_ids[0],
-                                    "coactivated_memory_ids": top_ids[1:],
-                                    "org_id": str(self.org_id),
-                                },
-                                countdown=2,
+                        broker = celery_app.conf.broker_url
+                        if broker and not str(broker).startswith("memory://"):
+                            from app.services.memory_activation.tasks import (
+                                memory_access_update_task,
+                                coactivation_update_task,
                             )
-                except Exception:
-                    # Celery isn't required for serving search.
-                    pass
+
+                            top_ids = [
+                                str(m.id)
+                                for m in authorized_memories[: request.limit]
+                                if str(m.id) not in recorded
+                            ]
+                            for mid in top_ids:
+                                memory_access_update_task.apply_async(
+                                    kwargs={
+                                        "memory_id": mid,
+                                        "org_id": str(self.org_id),
+                                        "user_id": str(self.user_id),
+                                        "retrieval_explanation_id": explanation_id,
+                                    },
+                                    countdown=2,
+                                )
+
+                            if len(top_ids) > 1:
+                                coactivation_update_task.apply_async(
+                                    kwargs={
+                                        "primary_memory_id": top_ids[0],
+                                        "coactivated_memory_ids": top_ids[1:],
+                                        "org_id": str(self.org_id),
+                                    },
+                                    countdown=2,
+                                )
+                    except Exception:
+                        # Celery isn't required for serving search.
+                        pass
 
             except Exception:
                 # If activation scoring fails, fall back to the legacy combined score.
@@ -968,15 +1108,23 @@ class MemoryService:
         
         if data.tags is not None:
             changes["tags"] = {"old": memory.tags, "new": data.tags}
+            old_tags = list(memory.tags or [])
             memory.tags = data.tags
+            if memory.is_active and set(old_tags) != set(data.tags):
+                await SynthesisAggregates(self.session, self.org_id).apply_memory_change(
+                    memory_id, old_tags, data.tags, memory.created_at
+                )
         
         if data.classification is not None:
             changes["classification"] = {"old": memory.classification, "new": data.classification}
             memory.classification = data.classification
         
-        if data.metadata is not None:
-            changes["metadata"] = {"old": memory.metadata, "new": data.metadata}
-            memory.metadata = data.metadata
+        if data.extra_metadata is not None:
+            changes["metadata"] = {"old": memory.extra_metadata, "new": data.extra_metadata}
+            memory.extra_metadata = data.extra_metadata
+        
+        if changes:
+            await MemoryMetadataCache.invalidate(self.org_id, [memory_id], session=self.session)
         
         # Update embedding in Qdrant if provided
         if new_embedding:
@@ -992,11 +1140,21 @@ class MemoryService:
                     "owner_id": memory.owner_id,
                     "tags": memory.tags,
                     "classification": memory.classification,
+                    "required_clearance": memory.required_clearance,
                     "memory_type": memory.memory_type,
                     "created_at": memory.created_at.isoformat(),
+                    "created_ts": memory.created_at.timestamp(),
                     "updated_at": datetime.now(timezone.utc).isoformat(),
                 },
             )
+        elif memory.vector_id and ("tags" in changes or "classification" in changes):
+            # Filtered search matches these on the point payload; keep it current.
+            payload = {"updated_at": datetime.now(timezone.utc).isoformat()}
+            if "tags" in changes:
+                payload["tags"] = memory.tags
+            if "classification" in changes:
+                payload["classification"] = memory.classification
+            await QdrantService.set_payloads(self.org_id, {str(memory.vector_id): payload})
         
         # Audit log
         await self.audit_service.log_memory_operation(
@@ -1058,7 +1216,13 @@ class MemoryService:
             raise PermissionError("Memory is under legal hold and cannot be deleted")
         
         # Soft delete
+        was_active = memory.is_active
         memory.is_active = False
+        if was_active:
+            await SynthesisAggregates(self.session, self.org_id).apply_memory_change(
+                memory_id, memory.tags, None, memory.created_at
+            )
+        await MemoryMetadataCache.invalidate(self.org_id, [memory_id], session=self.session)
         
         # Remove from Qdrant
         await QdrantService.delete_memory(memory.vector_id, self.org_id)
@@ -1121,7 +1285,7 @@ class MemoryService:
         self.session.add(share)
         await self.session.flush()
         
-        # Invalidate target's permission cache
+        # Invalidate target's permission cache and access context
         if request.share_type == "user":
             await self.permission_checker.invalidate_user_cache(
                 request.target_id, self.org_id
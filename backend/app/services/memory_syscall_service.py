@@ -3,19 +3,30 @@ Memory Syscall Service - Capability-Scoped Memory Operations
 
 Implements core memory operations (read/append/search/upsert/consolidate)
 with capability token validation and audit logging.
+
+Token verification is served from a cache keyed by token digest and usage
+is metered with Redis counters reconciled to Postgres periodically (see
+``app.services.capability_token_cache``).
 """
 
-from datetime import datetime, timedelta
+from dataclasses import replace
+from datetime import datetime
 from typing import Optional, List, Dict, Any
 import uuid
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update
+from sqlalchemy import select
 import logging
 
 from app.core.database import get_db
 from app.models.capability_token import CapabilityToken, CapabilityScope
 from app.models.knowledge import Knowledge
 from app.services.audit_service import AuditService
+from app.services.capability_token_cache import (
+    CachedToken,
+    CapabilityTokenCache,
+    TokenUsageMeter,
+    record_usage_in_db,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -52,15 +63,21 @@ class MemorySyscall:
         # Most models store UUIDs as strings (SQLA UUID with as_uuid=False).
         # Normalize to string to avoid UUID-vs-str mismatches in queries.
         self.organization_id = str(organization_id)
+        self.token_cache = CapabilityTokenCache(db, self.organization_id)
+        self.usage_meter = TokenUsageMeter()
+        # Whether the last validation read usage from Redis.
+        self._metered = False
 
     async def _validate_token(
         self,
         token_str: str,
         required_scope: str | CapabilityScope,
         user_id: Optional[uuid.UUID | str] = None,
-    ) -> CapabilityToken:
+    ) -> CachedToken:
         """
         Validate token and check capability.
+
+        Returns the cached token with usage fields set to current totals.
         
         Raises:
             TokenExpiredException: Token is revoked or expired
@@ -74,7 +91,7 @@ class MemorySyscall:
         async def _safe_audit_denied(
             *,
             event_type: str,
-            token: Optional[CapabilityToken],
+            token: Optional[CachedToken],
             error_message: str,
             details: Optional[dict] = None,
         ) -> None:
@@ -95,13 +112,7 @@ class MemorySyscall:
                 # Audit logging must not break syscall paths.
                 pass
 
-        # Fetch token
-        stmt = select(CapabilityToken).where(
-            CapabilityToken.token == token_str,
-            CapabilityToken.organization_id == self.organization_id
-        )
-        result = await self.db.execute(stmt)
-        token = result.scalar_one_or_none()
+        token = await self.token_cache.get(token_str)
 
         if not token:
             await _safe_audit_denied(
@@ -149,33 +160,40 @@ class MemorySyscall:
                 f"Token lacks scope '{required_scope_value}'. Allowed: {token.scopes}"
             )
 
-        # Check quota (simple in-DB counters; production would likely use Redis for rate limiting)
-        if token.max_tokens_per_month and token.tokens_used >= token.max_tokens_per_month:
+        # Current usage: Redis totals, or the freshly loaded row without Redis.
+        usage = await self.usage_meter.current(token)
+        self._metered = usage is not None
+        if usage is not None:
+            token = replace(
+                token,
+                tokens_used_this_month=usage.tokens_used,
+                storage_used_bytes=usage.storage_used_bytes,
+            )
+            requests_this_minute = usage.requests_this_minute
+        else:
+            requests_this_minute = await self._db_requests_this_minute(token)
+
+        if token.max_tokens_per_month and token.tokens_used_this_month >= token.max_tokens_per_month:
             await _safe_audit_denied(
                 event_type="memory.quota_exceeded",
                 token=token,
                 error_message="Monthly token quota exceeded",
                 details={
                     "required_scope": required_scope_value,
-                    "tokens_used": token.tokens_used,
+                    "tokens_used": token.tokens_used_this_month,
                     "tokens_quota": token.max_tokens_per_month,
                 },
             )
             raise QuotaExceededException("Token quota exceeded for this month")
 
-        now = datetime.utcnow()
-        if token.last_request_at is None or (now - token.last_request_at).total_seconds() >= 60:
-            token.requests_this_minute = 0
-            token.last_request_at = now
-
-        if token.max_requests_per_minute and token.requests_this_minute >= token.max_requests_per_minute:
+        if token.max_requests_per_minute and requests_this_minute >= token.max_requests_per_minute:
             await _safe_audit_denied(
                 event_type="memory.rate_limited",
                 token=token,
                 error_message="Rate limit exceeded",
                 details={
                     "required_scope": required_scope_value,
-                    "requests_this_minute": token.requests_this_minute,
+                    "requests_this_minute": requests_this_minute,
                     "requests_per_minute_quota": token.max_requests_per_minute,
                 },
             )
@@ -333,16 +351,18 @@ class MemorySyscall:
             limit=limit
         )
 
-        # RLS re-verification: ensure all results belong to org
-        verified_results = []
-        for result in results:
-            stmt = select(Knowledge).where(
-                Knowledge.id == result["id"],
-                Knowledge.organization_id == self.organization_id
+        # RLS re-verification: ensure all results belong to org (one query)
+        result_ids = [r["id"] for r in results]
+        verified_ids = set()
+        if result_ids:
+            check = await self.db.execute(
+                select(Knowledge.id).where(
+                    Knowledge.id.in_(result_ids),
+                    Knowledge.organization_id == self.organization_id,
+                )
             )
-            check = await self.db.execute(stmt)
-            if check.scalar_one_or_none():
-                verified_results.append(result)
+            verified_ids = {str(kid) for kid in check.scalars().all()}
+        verified_results = [r for r in results if str(r["id"]) in verified_ids]
 
         # Audit log
         audit_svc = AuditService(self.db)
@@ -529,19 +549,26 @@ class MemorySyscall:
             "metadata": merged.knowledge_metadata,
         }
 
+    async def _db_requests_this_minute(self, token: CachedToken) -> int:
+        """Requests in the token's current window, from the row (no Redis)."""
+        row = (
+            await self.db.execute(
+                select(CapabilityToken.requests_this_minute, CapabilityToken.last_request_at).where(
+                    CapabilityToken.id == token.id
+                )
+            )
+        ).first()
+        if row is None or row[1] is None or (datetime.utcnow() - row[1]).total_seconds() >= 60:
+            return 0
+        return int(row[0] or 0)
+
     async def _update_token_usage(
         self,
-        token: CapabilityToken,
+        token: CachedToken,
         tokens_used: int = 0,
         storage_bytes: int = 0
     ) -> None:
-        """Update token usage metrics."""
-        now = datetime.utcnow()
-        if token.last_request_at is None or (now - token.last_request_at).total_seconds() >= 60:
-            token.requests_this_minute = 0
-        token.requests_this_minute += 1
-        token.last_request_at = now
-        token.tokens_used += tokens_used
-        token.storage_used_bytes += storage_bytes
-        token.last_used_at = now
-        await self.db.flush()
+        """Record token usage (Redis counters, or an atomic row update)."""
+        if self._metered and await self.usage_meter.record(token, tokens_used, storage_bytes):
+            return
+        await record_usage_in_db(self.db, token.id, tokens_used=tokens_used, storage_bytes=storage_bytes)
@@ -0,0 +1,244 @@
+"""backend.app.services.near_duplicate_index
+
+MinHash / LSH near-duplicate index for memories.
+
+Each memory gets a MinHash signature over its token set (the same
+tokenization ``ConsolidationService`` uses), so the fraction of agreeing
+signature slots estimates the token Jaccard similarity. Signatures are split
+into bands; every band is hashed into one 64-bit key and the keys are stored
+in a GIN-indexed ``bigint[]`` column. Two memories become a candidate pair
+only if they share at least one band key, which turns the all-pairs scan into
+an indexed lookup (single memory) or a bucketed self-join (whole org).
+
+Signatures are computed over ``content_preview``, the text Postgres keeps,
+so the write path (``MemoryService.create_memory``) and the backfill of
+memories that predate the index or were imported produce comparable
+signatures. The backfill runs in ``backfill_near_duplicate_index_task``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import random
+import re
+import struct
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.memory import MemoryMetadata
+from app.models.memory_minhash import MemoryMinHash
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_MASK64 = (1 << 64) - 1
+# Slot value for texts with no tokens; two empty texts compare as identical.
+_EMPTY_SLOT = (1 << 32) - 1
+_PERMUTATION_SEED = 0x6E696E6169  # fixed so stored signatures stay comparable
+
+Signature = Tuple[int, ...]
+
+
+def tokenize(text: Optional[str]) -> set[str]:
+    return set(_TOKEN_RE.findall((text or "").lower()))
+
+
+@lru_cache(maxsize=8)
+def _permutations(num_perm: int) -> Tuple[Tuple[int, ...], Tuple[int, ...]]:
+    """Multiply-shift hash family: h_i(x) = ((a_i * x + b_i) mod 2^64) >> 32."""
+    rng = random.Random(_PERMUTATION_SEED)
+    a = tuple(rng.getrandbits(64) | 1 for _ in range(num_perm))
+    b = tuple(rng.getrandbits(64) for _ in range(num_perm))
+    return a, b
+
+
+def _token_hash(token: str) -> int:
+    return int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def minhash_signature(text: Optional[str], num_perm: Optional[int] = None) -> Signature:
+    """Compute the MinHash signature (``num_perm`` uint32 slots) of ``text``."""
+    num_perm = num_perm or settings.NEAR_DUP_MINHASH_PERMUTATIONS
+    hashes = [_token_hash(t) for t in tokenize(text)]
+    if not hashes:
+        return (_EMPTY_SLOT,) * num_perm
+
+    a, b = _permutations(num_perm)
+    if NUMPY_AVAILABLE:
+        x = np.array(hashes, dtype=np.uint64)[:, None]
+        # uint64 arithmetic wraps, which is exactly mod 2^64.
+        slots = (x * np.array(a, dtype=np.uint64) + np.array(b, dtype=np.uint64)) >> np.uint64(32)
+        return tuple(int(v) for v in slots.min(axis=0))
+    return tuple(
+        min(((ai * x + bi) & _MASK64) >> 32 for x in hashes)
+        for ai, bi in zip(a, b)
+    )
+
+
+def pack_signature(signature: Sequence[int]) -> bytes:
+    return struct.pack(f"<{len(signature)}I", *signature)
+
+
+def unpack_signature(data: bytes) -> Signature:
+    return struct.unpack(f"<{len(data) // 4}I", data)
+
+
+def lsh_band_keys(signature: Sequence[int], bands: Optional[int] = None) -> List[int]:
+    """Hash each band of ``signature`` into a signed 64-bit key (band index included)."""
+    bands = bands or settings.NEAR_DUP_LSH_BANDS
+    if len(signature) % bands:
+        raise ValueError("MinHash permutations must be a multiple of the LSH band count")
+    rows = len(signature) // bands
+    keys = []
+    for i in range(bands):
+        band = struct.pack(f"<I{rows}I", i, *signature[i * rows:(i + 1) * rows])
+        digest = hashlib.blake2b(band, digest_size=8).digest()
+        keys.append(int.from_bytes(digest, "little", signed=True))
+    return keys
+
+
+def estimate_similarity(sig_a: Sequence[int], sig_b: Sequence[int]) -> float:
+    """Estimated Jaccard similarity: fraction of agreeing signature slots."""
+    if not sig_a or len(sig_a) != len(sig_b):
+        return 0.0
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / len(sig_a)
+
+
+class NearDuplicateIndex:
+    """Read/write access to ``memory_minhash_signatures`` for one organization."""
+
+    def __init__(self, db: AsyncSession, organization_id: str):
+        self.db = db
+        self.organization_id = str(organization_id)
+
+    @staticmethod
+    def build_row(memory_id: str, organization_id: str, content: Optional[str]) -> MemoryMinHash:
+        return MemoryMinHash(**NearDuplicateIndex.build_values(memory_id, organization_id, content))
+
+    @staticmethod
+    def build_values(memory_id: str, organization_id: str, content: Optional[str]) -> dict:
+        """Column values of a signature row (for bulk inserts)."""
+        signature = minhash_signature(content)
+        return {
+            "memory_id": str(memory_id),
+            "organization_id": str(organization_id),
+            "signature": pack_signature(signature),
+            "num_perm": len(signature),
+            "band_keys": lsh_band_keys(signature),
+        }
+
+    async def backfill(self, limit: Optional[int] = None) -> int:
+        """Index up to ``limit`` active memories that have no signature yet."""
+        stmt = (
+            select(MemoryMetadata.id, MemoryMetadata.content_preview)
+            .outerjoin(MemoryMinHash, MemoryMinHash.memory_id == MemoryMetadata.id)
+            .where(
+                and_(
+                    MemoryMetadata.organization_id == self.organization_id,
+                    MemoryMetadata.is_active.is_(True),
+                    MemoryMinHash.memory_id.is_(None),
+                )
+            )
+            .limit(limit or settings.NEAR_DUP_BACKFILL_BATCH_SIZE)
+        )
+        rows = (await self.db.execute(stmt)).all()
+        for memory_id, preview in rows:
+            self.db.add(self.build_row(memory_id, self.organization_id, preview))
+        if rows:
+            await self.db.flush()
+        return len(rows)
+
+    async def signatures_for(self, memory_ids: Iterable[str]) -> Dict[str, Signature]:
+        ids = [str(m) for m in memory_ids]
+        if not ids:
+            return {}
+        stmt = select(MemoryMinHash.memory_id, MemoryMinHash.signature).where(
+            and_(
+                MemoryMinHash.organization_id == self.organization_id,
+                MemoryMinHash.memory_id.in_(ids),
+            )
+        )
+        return {str(mid): unpack_signature(sig) for mid, sig in (await self.db.execute(stmt)).all()}
+
+    async def candidates_for(
+        self,
+        memory_id: str,
+        band_keys: Sequence[int],
+        scope: Optional[str] = None,
+    ) -> Dict[str, Signature]:
+        """Active memories sharing at least one LSH band with ``band_keys``."""
+        stmt = (
+            select(MemoryMinHash.memory_id, MemoryMinHash.signature)
+            .join(MemoryMetadata, MemoryMetadata.id == MemoryMinHash.memory_id)
+            .where(
+                and_(
+                    MemoryMinHash.organization_id == self.organization_id,
+                    MemoryMinHash.band_keys.overlap(list(band_keys)),
+                    MemoryMinHash.memory_id != str(memory_id),
+                    MemoryMetadata.is_active.is_(True),
+                )
+            )
+        )
+        if scope:
+            stmt = stmt.where(MemoryMetadata.scope == scope)
+        return {str(mid): unpack_signature(sig) for mid, sig in (await self.db.execute(stmt)).all()}
+
+    async def candidate_pairs(
+        self,
+        scope: Optional[str] = None,
+        since: Optional[datetime] = None,
+    ) -> List[Tuple[str, str]]:
+        """
+        All memory pairs sharing an LSH bucket.
+
+        With ``since`` only pairs involving a memory indexed at/after that time
+        are returned (incremental mode). Oversized buckets are skipped.
+        """
+        keys = (
+            select(
+                MemoryMinHash.memory_id.label("memory_id"),
+                MemoryMinHash.created_at.label("indexed_at"),
+                func.unnest(MemoryMinHash.band_keys).label("key"),
+            )
+            .join(MemoryMetadata, MemoryMetadata.id == MemoryMinHash.memory_id)
+            .where(
+                and_(
+                    MemoryMinHash.organization_id == self.organization_id,
+                    MemoryMetadata.is_active.is_(True),
+                )
+            )
+        )
+        if scope:
+            keys = keys.where(MemoryMetadata.scope == scope)
+        keys = keys.cte("lsh_keys")
+
+        buckets = (
+            select(keys.c.key)
+            .group_by(keys.c.key)
+            .having(func.count().between(2, settings.NEAR_DUP_MAX_BUCKET_SIZE))
+            .cte("lsh_buckets")
+        )
+
+        a = keys.alias("a")
+        b = keys.alias("b")
+        stmt = (
+            select(a.c.memory_id, b.c.memory_id)
+            .distinct()
+            .select_from(a)
+            .join(b, and_(a.c.key == b.c.key, a.c.memory_id < b.c.memory_id))
+            .where(a.c.key.in_(select(buckets.c.key)))
+        )
+        if since is not None:
+            stmt = stmt.where(or_(a.c.indexed_at >= since, b.c.indexed_at >= since))
+
+        return [(str(x), str(y)) for x, y in (await self.db.execute(stmt)).all()]
@@ -0,0 +1,108 @@
+"""Object store abstraction for export artifacts.
+
+Exports are written as a sequence of chunks through an ``ObjectWriter``
+which hashes (SHA-256) and counts bytes as they pass, so callers never need
+the full artifact in memory. The local implementation writes to a temporary
+file and atomically renames it on commit; disk I/O runs in a worker thread
+so the event loop is never blocked.
+
+Swapping in S3/GCS means implementing the same ``open_writer``/``uri``
+surface (e.g. with multipart uploads per chunk).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+from pathlib import Path
+from typing import BinaryIO, Optional
+
+from app.core.config import settings
+
+
+class ObjectWriter:
+    """Chunked, hashing writer for a single object. Use as an async context manager."""
+
+    def __init__(self, final_path: Path):
+        self.final_path = final_path
+        self._tmp_path = final_path.with_name(final_path.name + ".part")
+        self._fh: Optional[BinaryIO] = None
+        self._sha256 = hashlib.sha256()
+        self.size_bytes = 0
+        self._committed = False
+
+    async def __aenter__(self) -> "ObjectWriter":
+        await asyncio.to_thread(self._open)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            await self.commit()
+        else:
+            await self.abort()
+
+    def _open(self) -> None:
+        self._tmp_path.parent.mkdir(parents=True, exist_ok=True)
+        self._fh = self._tmp_path.open("wb")
+
+    async def write(self, chunk: bytes) -> None:
+        if not chunk:
+            return
+        if self._fh is None:
+            raise RuntimeError("ObjectWriter is not open")
+        self._sha256.update(chunk)
+        self.size_bytes += len(chunk)
+        await asyncio.to_thread(self._fh.write, chunk)
+
+    @property
+    def sha256(self) -> str:
+        return self._sha256.hexdigest()
+
+    async def commit(self) -> None:
+        if self._committed or self._fh is None:
+            return
+        fh = self._fh
+        self._fh = None
+
+        def _finish() -> None:
+            fh.flush()
+            os.fsync(fh.fileno())
+            fh.close()
+            os.replace(self._tmp_path, self.final_path)
+
+        await asyncio.to_thread(_finish)
+        self._committed = True
+
+    async def abort(self) -> None:
+        fh = self._fh
+        self._fh = None
+
+        def _discard() -> None:
+            if fh is not None:
+                fh.close()
+            self._tmp_path.unlink(missing_ok=True)
+
+        await asyncio.to_thread(_discard)
+
+
+class LocalObjectStore:
+    """Filesystem-backed object store rooted at ``EXPORT_OBJECT_STORE_DIR``."""
+
+    def __init__(self, base_dir: Optional[str] = None):
+        self.base_dir = Path(base_dir or settings.EXPORT_OBJECT_STORE_DIR or "exports/objects")
+
+    def path_for(self, key: str) -> Path:
+        path = (self.base_dir / key).resolve()
+        if self.base_dir.resolve() not in path.parents:
+            raise ValueError(f"Invalid object key: {key}")
+        return path
+
+    def uri(self, key: str) -> str:
+        return self.path_for(key).as_posix()
+
+    def open_writer(self, key: str) -> ObjectWriter:
+        return ObjectWriter(self.path_for(key))
+
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread(self.path_for(key).unlink, True)
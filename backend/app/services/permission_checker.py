@@ -14,10 +14,14 @@ from sqlalchemy import select, and_, or_
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
+from app.core.qdrant import QdrantService
 from app.core.redis import RedisClient
+from app.middleware.prometheus import record_cache_hit, record_cache_miss
+from app.models.memory import MemoryMetadata
 from app.models.user import User, UserRole, Role
-from app.models.team import TeamMember
-from app.models.memory import MemoryMetadata, MemorySharing
+from app.services import access_context
+from app.services.access_context import AccessContext
+from app.services.memory_metadata_cache import CachedMemory, MemoryMetadataCache
 
 
 @dataclass
@@ -77,6 +81,7 @@ class PermissionChecker:
             session: Database session with tenant context set
         """
         self.session = session
+        self._access_contexts: dict[tuple[str, str], AccessContext] = {}
     
     # =========================================================================
     # Role & Permission Loading
@@ -104,7 +109,9 @@ class PermissionChecker:
         cache_key = f"{self.CACHE_PREFIX_PERMISSIONS}:{user_id}:{org_id}"
         cached = await RedisClient.get_json(cache_key)
         if cached is not None:
+            record_cache_hit("permissions")
             return cached
+        record_cache_miss("permissions")
         
         # Load from database
         permissions = await self._load_permissions_from_db(user_id, org_id)
@@ -275,6 +282,77 @@ class PermissionChecker:
             method="none",
         )
     
+    async def get_access_context(self, user_id: str, org_id: str) -> AccessContext:
+        """
+        Get the user's compiled access context (teams, shares, scopes, clearance).
+
+        Served from the shared versioned cache and memoized for the lifetime
+        of this checker, so a request pays at most one lookup per user.
+        """
+        key = (str(user_id), str(org_id))
+        ctx = self._access_contexts.get(key)
+        if ctx is None:
+            ctx = await access_context.get_access_context(self.session, user_id, org_id)
+            self._access_contexts[key] = ctx
+        return ctx
+    
+    async def build_vector_acl_filter(
+        self,
+        user_id: str,
+        org_id: str,
+        clearance_level: int = 0,
+    ):
+        """
+        Build the Qdrant pre-filter for memories the user may read.
+
+        Returns None when pre-filtering is disabled or the user has too many
+        shares to inline, in which case callers over-fetch and rely on the
+        Postgres verification alone.
+        """
+        if not settings.SEARCH_ACL_PREFILTER_ENABLED:
+            return None
+        ctx = await self.get_access_context(user_id, org_id)
+        shared = ctx.shared_memory_ids()
+        if len(shared) > settings.SEARCH_ACL_PREFILTER_MAX_SHARED_IDS:
+            return None
+        return QdrantService.build_acl_filter(
+            user_id=str(user_id),
+            clearance_level=clearance_level,
+            team_ids=ctx.team_ids,
+            shared_memory_ids=shared,
+        )
+    
+    async def build_sql_read_filter(
+        self,
+        user_id: str,
+        org_id: str,
+        clearance_level: int = 0,
+    ):
+        """
+        Build a SQL predicate over ``MemoryMetadata`` for memories the user may read.
+
+        Mirrors the read rules of ``check_memory_access`` (clearance, then
+        ownership, org/global scope, team membership or a live share), so
+        queries can filter, count and paginate authorized rows in Postgres.
+        """
+        ctx = await self.get_access_context(user_id, org_id)
+        readable = [
+            MemoryMetadata.owner_id == str(user_id),
+            MemoryMetadata.scope.in_(("organization", "global")),
+        ]
+        if ctx.team_ids:
+            readable.append(
+                and_(MemoryMetadata.scope == "team", MemoryMetadata.scope_id.in_(sorted(ctx.team_ids)))
+            )
+        shared = ctx.shared_memory_ids()
+        if shared:
+            readable.append(MemoryMetadata.id.in_(sorted(shared)))
+        return and_(
+            MemoryMetadata.organization_id == str(org_id),
+            MemoryMetadata.required_clearance <= clearance_level,
+            or_(*readable),
+        )
+    
     # =========================================================================
     # Memory Access Checking
     # =========================================================================
@@ -308,8 +386,8 @@ class PermissionChecker:
         Returns:
             AccessDecision with allowed status and detailed explanation
         """
-        # Load the memory
-        memory = await self.session.get(MemoryMetadata, memory_id)
+        # Load the memory (read-through metadata cache)
+        memory = await MemoryMetadataCache(self.session, org_id).get(memory_id)
         
         if not memory:
             return AccessDecision(
@@ -407,30 +485,19 @@ class PermissionChecker:
         if not memory_ids:
             return []
 
-        # Load required fields for all candidate memories (single query)
-        mem_stmt = (
-            select(
-                MemoryMetadata.id,
-                MemoryMetadata.owner_id,
-                MemoryMetadata.scope,
-                MemoryMetadata.scope_id,
-                MemoryMetadata.required_clearance,
-                MemoryMetadata.organization_id,
-            )
-            .where(MemoryMetadata.id.in_(memory_ids))
-        )
-        mem_rows = (await self.session.execute(mem_stmt)).all()
+        # Load required fields for all candidate memories (read-through cache)
+        cached = await MemoryMetadataCache(self.session, org_id).get_many(memory_ids)
 
-        mem_by_id: dict[str, tuple[str, str, str | None, int, str]] = {}
-        for row in mem_rows:
-            mem_id, owner_id, scope, scope_id, required_clearance, organization_id = row
-            mem_by_id[str(mem_id)] = (
-                str(owner_id) if owner_id is not None else "",
-                str(scope) if scope is not None else "",
-                str(scope_id) if scope_id is not None else None,
-                int(required_clearance or 0),
-                str(organization_id) if organization_id is not None else "",
+        mem_by_id: dict[str, tuple[str, str, str | None, int, str]] = {
+            mem_id: (
+                m.owner_id,
+                m.scope,
+                m.scope_id,
+                m.required_clearance,
+                m.organization_id,
             )
+            for mem_id, m in cached.items()
+        }
 
         # Candidate IDs that exist and meet org + clearance requirements
         eligible_ids: list[str] = []
@@ -448,6 +515,7 @@ class PermissionChecker:
         if not eligible_ids:
             return []
 
+        ctx = await self.get_access_context(user_id, org_id)
         allowed_set: set[str] = set()
 
         # Owner access
@@ -465,28 +533,10 @@ class PermissionChecker:
 
         # Team membership access for team-scoped memories
         if action in {"read", "comment"}:
-            team_ids: set[str] = set()
-            mem_ids_by_team: dict[str, list[str]] = {}
             for mem_id in eligible_ids:
                 _owner_id, scope, scope_id, _required_clearance, _organization_id = mem_by_id[mem_id]
-                if scope == "team" and scope_id:
-                    team_ids.add(scope_id)
-                    mem_ids_by_team.setdefault(scope_id, []).append(mem_id)
-
-            if team_ids:
-                team_stmt = select(TeamMember.team_id).where(
-                    and_(
-                        TeamMember.user_id == user_id,
-                        TeamMember.organization_id == org_id,
-                        TeamMember.is_active == True,
-                        TeamMember.team_id.in_(list(team_ids)),
-                    )
-                )
-                team_rows = (await self.session.execute(team_stmt)).all()
-                member_team_ids = {str(r[0]) for r in team_rows}
-                for team_id in member_team_ids:
-                    for mem_id in mem_ids_by_team.get(team_id, []):
-                        allowed_set.add(mem_id)
+                if scope == "team" and scope_id in ctx.team_roles:
+                    allowed_set.add(mem_id)
 
         # Explicit user share access
         permission_map = {
@@ -497,21 +547,10 @@ class PermissionChecker:
         }
         allowed_permissions = permission_map.get(action, [])
         if allowed_permissions:
-            now = datetime.now(timezone.utc)
-            share_stmt = select(MemorySharing.memory_id).where(
-                and_(
-                    MemorySharing.memory_id.in_(eligible_ids),
-                    MemorySharing.share_type == "user",
-                    MemorySharing.target_id == user_id,
-                    MemorySharing.organization_id == org_id,
-                    MemorySharing.is_active == True,
-                    MemorySharing.permission.in_(allowed_permissions),
-                    or_(MemorySharing.expires_at.is_(None), MemorySharing.expires_at > now),
-                )
-            )
-            share_rows = (await self.session.execute(share_stmt)).all()
-            for row in share_rows:
-                allowed_set.add(str(row[0]))
+            for mem_id in eligible_ids:
+                share = ctx.share_for(mem_id)
+                if share is not None and share.permission in allowed_permissions:
+                    allowed_set.add(mem_id)
 
         # Preserve input order
         return [mem_id for mem_id in memory_ids if mem_id in allowed_set]
@@ -524,19 +563,10 @@ class PermissionChecker:
         action: str,
     ) -> AccessDecision:
         """Check if user has team-based access."""
-        query = select(TeamMember).where(
-            and_(
-                TeamMember.user_id == user_id,
-                TeamMember.team_id == team_id,
-                TeamMember.organization_id == org_id,
-                TeamMember.is_active == True,
-            )
-        )
+        ctx = await self.get_access_context(user_id, org_id)
+        role = ctx.team_roles.get(str(team_id))
         
-        result = await self.session.execute(query)
-        member = result.scalar_one_or_none()
-        
-        if not member:
+        if role is None:
             return AccessDecision(
                 allowed=False,
                 reason="User is not a member of the team",
@@ -547,18 +577,18 @@ class PermissionChecker:
         if action in ("read", "comment"):
             return AccessDecision(
                 allowed=True,
-                reason=f"User is a {member.role} of the team",
+                reason=f"User is a {role} of the team",
                 method="team",
-                details={"team_role": member.role},
+                details={"team_role": role},
             )
         
         if action in ("write", "update", "share"):
-            if member.role in ("lead", "admin"):
+            if role in ("lead", "admin"):
                 return AccessDecision(
                     allowed=True,
-                    reason=f"User is a {member.role} of the team",
+                    reason=f"User is a {role} of the team",
                     method="team",
-                    details={"team_role": member.role},
+                    details={"team_role": role},
                 )
             return AccessDecision(
                 allowed=False,
@@ -567,12 +597,12 @@ class PermissionChecker:
             )
         
         if action == "delete":
-            if member.role == "admin":
+            if role == "admin":
                 return AccessDecision(
                     allowed=True,
                     reason="User is admin of the team",
                     method="team",
-                    details={"team_role": member.role},
+                    details={"team_role": role},
                 )
             return AccessDecision(
                 allowed=False,
@@ -594,26 +624,12 @@ class PermissionChecker:
         action: str,
     ) -> AccessDecision:
         """Check if user has explicit share-based access."""
-        now = datetime.now(timezone.utc)
-        
-        # Check for direct user share
-        query = select(MemorySharing).where(
-            and_(
-                MemorySharing.memory_id == memory_id,
-                MemorySharing.share_type == "user",
-                MemorySharing.target_id == user_id,
-                MemorySharing.organization_id == org_id,
-                MemorySharing.is_active == True,
-                or_(
-                    MemorySharing.expires_at.is_(None),
-                    MemorySharing.expires_at > now,
-                ),
-            )
-        )
-        
-        result = await self.session.execute(query)
-        share = result.scalar_one_or_none()
-        
+        ctx = await self.get_access_context(user_id, org_id)
+        return self._share_decision(ctx.share_for(memory_id), action)
+    
+    @staticmethod
+    def _share_decision(share, action: str) -> AccessDecision:
+        """Map an active user share (or None) to an access decision."""
         if not share:
             return AccessDecision(
                 allowed=False,
@@ -652,7 +668,7 @@ class PermissionChecker:
         self,
         user_id: str,
         org_id: str,
-        memory: MemoryMetadata,
+        memory: CachedMemory,
         action: str,
     ) -> AccessDecision:
         """Check scope-based access (org-wide, etc.)."""
@@ -747,10 +763,10 @@ class PermissionChecker:
     async def invalidate_user_cache(
         self,
         user_id: str,
-        org_id: Optional[str] = None,
+        org_id: str,
     ) -> None:
         """
-        Invalidate cached permissions for a user.
+        Invalidate cached permissions for a user within an organization.
         
         Call this when:
         - User's roles change
@@ -759,14 +775,14 @@ class PermissionChecker:
         
         Args:
             user_id: User UUID
-            org_id: Optional org UUID (invalidates all orgs if not provided)
+            org_id: Organization UUID (access contexts are cached per org)
         """
-        if org_id:
-            cache_key = f"{self.CACHE_PREFIX_PERMISSIONS}:{user_id}:{org_id}"
-            await RedisClient.delete(cache_key)
-        else:
-            pattern = f"{self.CACHE_PREFIX_PERMISSIONS}:{user_id}:*"
-            await RedisClient.delete_pattern(pattern)
+        self._access_contexts = {
+            k: v for k, v in self._access_contexts.items() if k[0] != str(user_id)
+        }
+        cache_key = f"{self.CACHE_PREFIX_PERMISSIONS}:{user_id}:{org_id}"
+        await RedisClient.delete(cache_key)
+        await access_context.invalidate_users(org_id, [user_id], session=self.session)
     
     async def invalidate_org_cache(self, org_id: str) -> None:
         """
@@ -775,9 +791,12 @@ class PermissionChecker:
         Call this when:
         - Roles are modified
         - Organization-wide policy changes
+        - Teams or the org hierarchy change
         
         Args:
             org_id: Organization UUID
         """
         pattern = f"{self.CACHE_PREFIX_PERMISSIONS}:*:{org_id}"
         await RedisClient.delete_pattern(pattern)
+        self._access_contexts.clear()
+        await access_context.invalidate_org(org_id, session=self.session)
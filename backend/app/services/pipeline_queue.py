@@ -0,0 +1,209 @@
+"""backend.app.services.pipeline_queue
+
+Queue mechanics shared by the pipeline schedulers (``SLASchedulerService``
+over ``pipeline_tasks`` and ``UnifiedPipelineScheduler`` over
+``agent_processes``).
+
+Claiming: ``fair_share_claim`` builds one statement that ranks every eligible
+row and locks the first ``limit`` of them with ``FOR UPDATE SKIP LOCKED``, so
+a worker claims a whole batch in one round-trip and concurrent workers take
+disjoint batches instead of queueing on the same head row.
+
+Ordering is deficit round robin across organizations: in each round an
+organization may claim ``weight`` tasks (weights from
+``PIPELINE_FAIR_SHARE_WEIGHTS``, default 1), and tasks it already has running
+count as served. A row's round is ``(running + rank_within_org) / weight``;
+rows are taken by round, then by the scheduler's own order (SLA, priority,
+age). A tenant with a deep backlog therefore cannot starve the others, and no
+per-organization query loop is needed.
+
+Counters: queue depth and per-minute enqueue rate are Redis counters updated
+by atomic Lua scripts instead of ``COUNT(*)`` on every enqueue. Depth is
+seeded from the table on a miss and expires, which bounds drift from
+rolled-back transactions. When Redis is unavailable callers fall back to
+counting.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from typing import Any, Awaitable, Callable, Iterable, Mapping, Optional, Sequence
+
+from sqlalchemy import Float, case, cast, func, literal, select
+from sqlalchemy.sql import ColumnElement, Select
+
+from app.core.config import settings
+from app.core.redis import RedisClient
+
+logger = logging.getLogger(__name__)
+
+# Increments an existing depth counter; a missing one is re-seeded on read.
+ADJUST_DEPTH_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return redis.call('INCRBY', KEYS[1], ARGV[1])
+end
+return false
+"""
+
+# Returns {admitted, count}. Counts only admitted requests.
+ADMIT_SCRIPT = """
+local count = redis.call('INCR', KEYS[1])
+if count == 1 then
+    redis.call('EXPIRE', KEYS[1], tonumber(ARGV[2]))
+end
+if count > tonumber(ARGV[1]) then
+    redis.call('DECR', KEYS[1])
+    return {0, count - 1}
+end
+return {1, count}
+"""
+
+
+def fair_share_weights() -> dict[str, float]:
+    return {
+        str(org): float(w)
+        for org, w in (settings.PIPELINE_FAIR_SHARE_WEIGHTS or {}).items()
+        if float(w) > 0
+    }
+
+
+def fair_share_claim(
+    model: Any,
+    *,
+    eligible: Sequence[ColumnElement],
+    order_by: Sequence[ColumnElement],
+    running: ColumnElement,
+    limit: int,
+    weights: Optional[Mapping[str, float]] = None,
+    max_running_per_org: Optional[int] = None,
+) -> Select:
+    """
+    Select (and lock) the next ``limit`` rows of ``model`` in fair-share order.
+
+    Args:
+        model: Mapped class with ``id`` and ``organization_id`` columns
+        eligible: Filters for claimable rows (status, attempts, ...)
+        order_by: Order within an organization and among equal rounds
+        running: Filter for rows that count as an organization's running work
+        limit: Batch size
+        weights: Per-organization share; organizations not listed get 1
+        max_running_per_org: Concurrency cap (running + claimed) per organization
+    """
+    limit = max(1, int(limit))
+    busy = (
+        select(model.organization_id.label("org_id"), func.count().label("n"))
+        .where(running)
+        .group_by(model.organization_id)
+        .subquery("busy")
+    )
+    ranked = (
+        select(
+            model.id.label("id"),
+            model.organization_id.label("org_id"),
+            func.row_number()
+            .over(partition_by=model.organization_id, order_by=list(order_by))
+            .label("org_rank"),
+            func.coalesce(busy.c.n, 0).label("running"),
+        )
+        .select_from(model)
+        .outerjoin(busy, busy.c.org_id == model.organization_id)
+        .where(*eligible)
+        .subquery("ranked")
+    )
+
+    weights = dict(weights or {})
+    weight: ColumnElement = (
+        case(
+            *((ranked.c.org_id == org, literal(w)) for org, w in weights.items()),
+            else_=literal(1.0),
+        )
+        if weights
+        else literal(1.0)
+    )
+    # Rows deeper than ``limit`` in their organization can never be claimed
+    # in this batch, so they are cut before the join and sort.
+    candidate_filters = [ranked.c.org_rank <= limit]
+    if max_running_per_org is not None:
+        candidate_filters.append(ranked.c.running + ranked.c.org_rank <= int(max_running_per_org))
+    scored = (
+        select(
+            ranked.c.id,
+            (cast(ranked.c.running + ranked.c.org_rank, Float) / weight).label("share_round"),
+        )
+        .where(*candidate_filters)
+        .subquery("scored")
+    )
+
+    return (
+        select(model)
+        .join(scored, scored.c.id == model.id)
+        .order_by(scored.c.share_round.asc(), *order_by)
+        .limit(limit)
+        .with_for_update(of=model, skip_locked=True)
+    )
+
+
+def _minute() -> int:
+    return int(time.time() // 60)
+
+
+class PipelineQueueCounters:
+    """Redis queue-depth and enqueue-rate counters for one queue."""
+
+    DEPTH_TTL_SECONDS = 300
+
+    def __init__(self, queue: str):
+        self.queue = queue
+
+    def _depth_key(self, org_id: str) -> str:
+        return f"pipeq:{self.queue}:depth:{org_id}"
+
+    def _rate_key(self, org_id: str, bucket: str) -> str:
+        return f"pipeq:{self.queue}:rate:{org_id}:{bucket}:{_minute()}"
+
+    async def queue_depth(self, org_id: str, count: Callable[[], Awaitable[int]]) -> int:
+        """Current depth for ``org_id``; ``count`` seeds the counter (or replaces Redis)."""
+        try:
+            client = await RedisClient.get_client()
+            key = self._depth_key(str(org_id))
+            cached = await client.get(key)
+            if cached is not None:
+                return int(cached)
+            depth = int(await count())
+            await client.set(key, depth, ex=self.DEPTH_TTL_SECONDS, nx=True)
+            return depth
+        except Exception as e:
+            logger.debug("Pipeline queue counters unavailable: %s", e)
+            return int(await count())
+
+    async def adjust_depth(self, org_id: str, delta: int) -> None:
+        if not delta:
+            return
+        try:
+            client = await RedisClient.get_client()
+            await client.register_script(ADJUST_DEPTH_SCRIPT)(
+                keys=[self._depth_key(str(org_id))], args=[int(delta)]
+            )
+        except Exception as e:
+            logger.debug("Pipeline queue counters unavailable: %s", e)
+
+    async def adjust_depths(self, deltas: Iterable[tuple[str, int]]) -> None:
+        for org_id, delta in deltas:
+            await self.adjust_depth(org_id, delta)
+
+    async def admit(self, org_id: str, bucket: str, limit: int) -> Optional[bool]:
+        """
+        Count one enqueue against ``limit`` per minute.
+
+        Returns None when Redis is unavailable (the caller decides).
+        """
+        try:
+            client = await RedisClient.get_client()
+            admitted, _count = await client.register_script(ADMIT_SCRIPT)(
+                keys=[self._rate_key(str(org_id), bucket)], args=[int(limit), 120]
+            )
+            return bool(int(admitted))
+        except Exception as e:
+            logger.debug("Pipeline queue counters unavailable: %s", e)
+            return None
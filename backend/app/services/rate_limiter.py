@@ -2,14 +2,26 @@
 Rate Limiting Service
 
 Redis-based rate limiting with per-tenant quotas and backpressure.
-Implements sliding window rate limiting and quota enforcement.
+
+Every admission decision is a single server-side Lua script invoked via
+EVALSHA, so checks are atomic under concurrency and cost exactly one
+round-trip on the async client. Supported algorithms:
+
+- ``sliding_log``: exact sliding window over a sorted set of request stamps
+- ``gcra``: generic cell rate algorithm (one float per key, smooth pacing)
+- ``token_bucket``: bursty admission with continuous refill
+
+Monthly quotas use an atomic check-and-INCRBY script. An optional in-process
+deny cache short-circuits keys that Redis has already rejected until their
+retry time, so hot abusive keys stop generating Redis traffic.
 """
 
 import time
-from typing import Optional, Dict, Any
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List
 import logging
 import uuid
-from datetime import datetime, timedelta
+from datetime import datetime
 
 try:
     import redis.asyncio as aioredis
@@ -20,67 +32,264 @@ except ImportError:
 logger = logging.getLogger(__name__)
 
 
+ALGORITHM_SLIDING_LOG = "sliding_log"
+ALGORITHM_GCRA = "gcra"
+ALGORITHM_TOKEN_BUCKET = "token_bucket"
+
+SUPPORTED_ALGORITHMS = (ALGORITHM_SLIDING_LOG, ALGORITHM_GCRA, ALGORITHM_TOKEN_BUCKET)
+
+# Quota keys outlive the month they describe so reporting across boundaries works.
+QUOTA_TTL_SECONDS = 60 * 24 * 60 * 60
+
+# All scripts take (now_ms, window_ms, limit, cost, ...) and return
+# {allowed, remaining, retry_after_ms, reset_after_ms}.
+SLIDING_LOG_SCRIPT = """
+local key = KEYS[1]
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+local cost = tonumber(ARGV[4])
+local member = ARGV[5]
+
+redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+local count = redis.call('ZCARD', key)
+
+if count + cost > limit then
+    local retry = window
+    local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+    if oldest[2] then
+        retry = math.max(0, tonumber(oldest[2]) + window - now)
+    end
+    return {0, math.max(0, limit - count), math.ceil(retry), math.ceil(retry)}
+end
+
+for i = 1, cost do
+    redis.call('ZADD', key, now, member .. ':' .. i)
+end
+redis.call('PEXPIRE', key, window + 60000)
+return {1, limit - count - cost, 0, window}
+"""
+
+GCRA_SCRIPT = """
+local key = KEYS[1]
+local now = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+local cost = tonumber(ARGV[4])
+
+local emission = period / limit
+local tat = tonumber(redis.call('GET', key))
+if not tat or tat < now then
+    tat = now
+end
+
+local new_tat = tat + emission * cost
+local allow_at = new_tat - period
+if allow_at > now then
+    return {0, 0, math.ceil(allow_at - now), math.ceil(tat - now)}
+end
+
+redis.call('SET', key, string.format('%.3f', new_tat), 'PX', math.ceil(new_tat - now) + 1)
+local remaining = math.floor((now - allow_at) / emission)
+return {1, remaining, 0, math.ceil(new_tat - now)}
+"""
+
+TOKEN_BUCKET_SCRIPT = """
+local key = KEYS[1]
+local now = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+local capacity = tonumber(ARGV[3])
+local cost = tonumber(ARGV[4])
+
+local rate = capacity / period
+local state = redis.call('HMGET', key, 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+
+local allowed = 0
+local retry = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+else
+    retry = math.ceil((cost - tokens) / rate)
+end
+
+redis.call('HSET', key, 'tokens', string.format('%.6f', tokens), 'ts', string.format('%.3f', now))
+redis.call('PEXPIRE', key, math.ceil(period) * 2)
+return {allowed, math.floor(tokens), retry, math.ceil((capacity - tokens) / rate)}
+"""
+
+# Returns {allowed, used}. Increments only when the new total fits the limit.
+QUOTA_SCRIPT = """
+local key = KEYS[1]
+local amount = tonumber(ARGV[1])
+local limit = tonumber(ARGV[2])
+local ttl = tonumber(ARGV[3])
+
+local current = tonumber(redis.call('GET', key) or '0')
+if current + amount > limit then
+    return {0, current}
+end
+
+local used = redis.call('INCRBY', key, amount)
+if used == amount then
+    redis.call('EXPIRE', key, ttl)
+end
+return {1, used}
+"""
+
+_SCRIPTS = {
+    ALGORITHM_SLIDING_LOG: SLIDING_LOG_SCRIPT,
+    ALGORITHM_GCRA: GCRA_SCRIPT,
+    ALGORITHM_TOKEN_BUCKET: TOKEN_BUCKET_SCRIPT,
+}
+
+
 class RateLimitExceeded(Exception):
     """Raised when rate limit is exceeded."""
-    pass
+
+    def __init__(
+        self,
+        message: str,
+        *,
+        limit: Optional[int] = None,
+        retry_after: int = 0,
+        reset_at: Optional[float] = None,
+    ):
+        super().__init__(message)
+        self.limit = limit
+        self.retry_after = retry_after
+        self.reset_at = reset_at
+
+
+class _LocalDenyCache:
+    """
+    Bounded in-process map of ``key -> blocked_until`` (monotonic seconds).
+
+    Only denials are cached: a key that Redis rejected with a retry-after
+    cannot be admitted before that instant, so answering locally is exact
+    for this process and saves a round-trip per rejected request.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, float]" = OrderedDict()
+
+    def blocked_for(self, key: str) -> float:
+        """Return remaining block time in seconds (0 if not blocked)."""
+        until = self._entries.get(key)
+        if until is None:
+            return 0.0
+        remaining = until - time.monotonic()
+        if remaining <= 0:
+            self._entries.pop(key, None)
+            return 0.0
+        self._entries.move_to_end(key)
+        return remaining
+
+    def block(self, key: str, seconds: float) -> None:
+        if self.max_size <= 0 or seconds <= 0:
+            return
+        self._entries[key] = time.monotonic() + seconds
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self, key: Optional[str] = None) -> None:
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
 
 
 class RateLimiter:
     """
-    Redis-based rate limiter using sliding window algorithm.
-    
+    Redis-based rate limiter with atomic Lua-scripted algorithms.
+
     Features:
     - Per-tenant rate limits
     - Per-endpoint rate limits
-    - Sliding window (more accurate than fixed window)
+    - Sliding log, GCRA and token bucket algorithms (one EVALSHA per check)
+    - Atomic monthly quotas (check-and-INCRBY)
+    - Local deny cache for hot rejected keys
     - Graceful degradation when Redis unavailable
     - Backpressure signals
     """
-    
+
     def __init__(
         self,
         redis_url: str = "redis://localhost:6379/0",
         default_limit: int = 100,
-        default_window: int = 60
+        default_window: int = 60,
+        default_algorithm: str = ALGORITHM_SLIDING_LOG,
+        local_cache_size: int = 1024,
+        redis_client: Optional["aioredis.Redis"] = None,
     ):
         """
         Initialize rate limiter.
-        
+
         Args:
-            redis_url: Redis connection URL
+            redis_url: Redis connection URL (ignored when redis_client is given)
             default_limit: Default requests per window
             default_window: Default window in seconds
+            default_algorithm: One of sliding_log, gcra, token_bucket
+            local_cache_size: Max keys in the local deny cache (0 disables)
+            redis_client: Existing async Redis client to share a pool with
         """
-        if not REDIS_AVAILABLE:
+        if default_algorithm not in SUPPORTED_ALGORITHMS:
+            raise ValueError(f"Unsupported rate limit algorithm: {default_algorithm}")
+
+        self.redis = None
+        self._scripts: Dict[str, Any] = {}
+        if redis_client is not None:
+            self.use_redis(redis_client)
+        elif not REDIS_AVAILABLE:
             logger.warning("Redis not available, rate limiting disabled")
-            self.redis = None
         else:
             try:
-                self.redis = aioredis.from_url(
-                    redis_url,
-                    decode_responses=False
-                )
+                self.use_redis(aioredis.from_url(redis_url, decode_responses=False))
             except Exception as e:
                 logger.error(f"Failed to connect to Redis: {e}")
                 self.redis = None
-        
+
         self.default_limit = default_limit
         self.default_window = default_window
-    
+        self.default_algorithm = default_algorithm
+        self.local_cache = _LocalDenyCache(local_cache_size)
+
+    def use_redis(self, redis_client: "aioredis.Redis") -> None:
+        """
+        Bind the limiter to an async Redis client and register its scripts.
+
+        ``register_script`` objects issue EVALSHA and transparently reload the
+        script on NOSCRIPT, so steady-state checks are a single round-trip.
+        """
+        self.redis = redis_client
+        self._scripts = {
+            name: redis_client.register_script(source) for name, source in _SCRIPTS.items()
+        }
+        self._scripts["quota"] = redis_client.register_script(QUOTA_SCRIPT)
+
     async def check_rate_limit(
         self,
         key: str,
         limit: Optional[int] = None,
-        window: Optional[int] = None
+        window: Optional[int] = None,
+        algorithm: Optional[str] = None,
+        cost: int = 1,
     ) -> Dict[str, Any]:
         """
         Check if request is within rate limit.
-        
+
         Args:
             key: Rate limit key (e.g., "org:123:api:memories")
             limit: Max requests per window (uses default if None)
             window: Window size in seconds (uses default if None)
-            
+            algorithm: Algorithm override (uses default if None)
+            cost: Units consumed by this request
+
         Returns:
             Dict with rate limit status:
             {
@@ -90,68 +299,51 @@ class RateLimiter:
                 "reset_at": float (timestamp),
                 "retry_after": int (seconds until can retry)
             }
-            
+
         Raises:
             RateLimitExceeded: If rate limit exceeded
         """
+        limit = limit or self.default_limit
+        window = window or self.default_window
+        algorithm = algorithm or self.default_algorithm
+
         if not self.redis:
             # Graceful degradation - allow all requests if Redis unavailable
             return {
                 "allowed": True,
-                "limit": limit or self.default_limit,
+                "limit": limit,
                 "remaining": -1,
-                "reset_at": time.time() + (window or self.default_window),
+                "reset_at": time.time() + window,
                 "retry_after": 0
             }
-        
-        limit = limit or self.default_limit
-        window = window or self.default_window
-        
+
+        script = self._scripts.get(algorithm)
+        if script is None:
+            raise ValueError(f"Unsupported rate limit algorithm: {algorithm}")
+
+        redis_key = f"ratelimit:{algorithm}:{key}"
+
+        blocked = self.local_cache.blocked_for(redis_key)
+        if blocked > 0:
+            retry_after = max(1, int(blocked + 0.999))
+            raise RateLimitExceeded(
+                f"Rate limit exceeded for {key}. Limit: {limit}/{window}s. "
+                f"Retry after {retry_after}s",
+                limit=limit,
+                retry_after=retry_after,
+                reset_at=time.time() + blocked,
+            )
+
         try:
             now = time.time()
-            window_start = now - window
-            
-            # Use sorted set for sliding window
-            redis_key = f"ratelimit:{key}"
-            
-            # Remove old entries
-            await self.redis.zremrangebyscore(redis_key, 0, window_start)
-            
-            # Count requests in current window
-            count = await self.redis.zcard(redis_key)
-            
-            if count >= limit:
-                # Rate limit exceeded
-                # Get oldest entry to calculate reset time
-                oldest = await self.redis.zrange(redis_key, 0, 0, withscores=True)
-                if oldest:
-                    reset_at = oldest[0][1] + window
-                    retry_after = max(0, int(reset_at - now))
-                else:
-                    reset_at = now + window
-                    retry_after = window
-                
-                raise RateLimitExceeded(
-                    f"Rate limit exceeded for {key}. Limit: {limit}/{window}s. "
-                    f"Retry after {retry_after}s"
-                )
-            
-            # Add current request
-            await self.redis.zadd(redis_key, {str(uuid.uuid4()): now})
-            
-            # Set expiration (window + buffer)
-            await self.redis.expire(redis_key, window + 60)
-            
-            return {
-                "allowed": True,
-                "limit": limit,
-                "remaining": limit - count - 1,
-                "reset_at": now + window,
-                "retry_after": 0
-            }
-        
-        except RateLimitExceeded:
-            raise
+            now_ms = int(now * 1000)
+            args: List[Any] = [now_ms, window * 1000, limit, cost]
+            if algorithm == ALGORITHM_SLIDING_LOG:
+                args.append(uuid.uuid4().hex)
+
+            allowed, remaining, retry_ms, reset_ms = (
+                int(v) for v in await script(keys=[redis_key], args=args)
+            )
         except Exception as e:
             logger.error(f"Error checking rate limit: {e}")
             # Fail open - allow request
@@ -162,7 +354,41 @@ class RateLimiter:
                 "reset_at": time.time() + window,
                 "retry_after": 0
             }
-    
+
+        if not allowed:
+            self.local_cache.block(redis_key, retry_ms / 1000.0)
+            retry_after = max(1, (retry_ms + 999) // 1000)
+            raise RateLimitExceeded(
+                f"Rate limit exceeded for {key}. Limit: {limit}/{window}s. "
+                f"Retry after {retry_after}s",
+                limit=limit,
+                retry_after=retry_after,
+                reset_at=now + reset_ms / 1000.0,
+            )
+
+        return {
+            "allowed": True,
+            "limit": limit,
+            "remaining": remaining,
+            "reset_at": now + reset_ms / 1000.0,
+            "retry_after": 0,
+            "algorithm": algorithm,
+        }
+
+    async def reset_rate_limit(self, key: str, algorithm: Optional[str] = None) -> bool:
+        """Clear rate limit state for a key (admin operation)."""
+        redis_key = f"ratelimit:{algorithm or self.default_algorithm}:{key}"
+        self.local_cache.clear(redis_key)
+        if not self.redis:
+            return False
+
+        try:
+            await self.redis.delete(redis_key)
+            return True
+        except Exception as e:
+            logger.error(f"Error resetting rate limit: {e}")
+            return False
+
     async def check_quota(
         self,
         org_id: uuid.UUID,
@@ -172,16 +398,19 @@ class RateLimiter:
     ) -> Dict[str, Any]:
         """
         Check monthly quota for organization.
-        
+
+        The check and the increment happen in one script, so concurrent
+        callers can neither lose increments nor overshoot the limit.
+
         Args:
             org_id: Organization ID
             resource: Resource type (e.g., 'tokens', 'storage', 'requests')
             amount: Amount to consume
             monthly_limit: Monthly limit (None = no limit)
-            
+
         Returns:
             Dict with quota status
-            
+
         Raises:
             RateLimitExceeded: If quota exceeded
         """
@@ -192,39 +421,18 @@ class RateLimiter:
                 "limit": monthly_limit,
                 "remaining": -1
             }
-        
+
         try:
             # Use current month as key
             month_key = datetime.utcnow().strftime("%Y-%m")
             redis_key = f"quota:{org_id}:{resource}:{month_key}"
-            
-            # Get current usage
-            current = await self.redis.get(redis_key)
-            current_usage = int(current) if current else 0
-            
-            new_usage = current_usage + amount
-            
-            if new_usage > monthly_limit:
-                raise RateLimitExceeded(
-                    f"Monthly quota exceeded for {resource}. "
-                    f"Used: {current_usage}, Limit: {monthly_limit}, Requesting: {amount}"
+
+            allowed, used = (
+                int(v)
+                for v in await self._scripts["quota"](
+                    keys=[redis_key], args=[amount, monthly_limit, QUOTA_TTL_SECONDS]
                 )
-            
-            # Increment usage
-            await self.redis.set(redis_key, new_usage)
-            
-            # Set expiration (60 days to handle month boundaries)
-            await self.redis.expire(redis_key, 60 * 24 * 60 * 60)
-            
-            return {
-                "allowed": True,
-                "used": new_usage,
-                "limit": monthly_limit,
-                "remaining": monthly_limit - new_usage
-            }
-        
-        except RateLimitExceeded:
-            raise
+            )
         except Exception as e:
             logger.error(f"Error checking quota: {e}")
             return {
@@ -233,7 +441,21 @@ class RateLimiter:
                 "limit": monthly_limit,
                 "remaining": -1
             }
-    
+
+        if not allowed:
+            raise RateLimitExceeded(
+                f"Monthly quota exceeded for {resource}. "
+                f"Used: {used}, Limit: {monthly_limit}, Requesting: {amount}",
+                limit=monthly_limit,
+            )
+
+        return {
+            "allowed": True,
+            "used": used,
+            "limit": monthly_limit,
+            "remaining": monthly_limit - used
+        }
+
     async def get_usage_stats(
         self,
         org_id: uuid.UUID,
@@ -242,25 +464,25 @@ class RateLimiter:
         """Get current month usage stats."""
         if not self.redis:
             return {"used": 0, "month": datetime.utcnow().strftime("%Y-%m")}
-        
+
         try:
             month_key = datetime.utcnow().strftime("%Y-%m")
             redis_key = f"quota:{org_id}:{resource}:{month_key}"
-            
+
             current = await self.redis.get(redis_key)
             current_usage = int(current) if current else 0
-            
+
             return {
                 "used": current_usage,
                 "month": month_key,
                 "resource": resource,
                 "organization_id": str(org_id)
             }
-        
+
         except Exception as e:
             logger.error(f"Error getting usage stats: {e}")
             return {"used": 0, "month": datetime.utcnow().strftime("%Y-%m")}
-    
+
     async def reset_usage(
         self,
         org_id: uuid.UUID,
@@ -270,20 +492,20 @@ class RateLimiter:
         """Reset usage for organization/resource (admin operation)."""
         if not self.redis:
             return False
-        
+
         try:
             month_key = month or datetime.utcnow().strftime("%Y-%m")
             redis_key = f"quota:{org_id}:{resource}:{month_key}"
-            
+
             await self.redis.delete(redis_key)
-            
+
             logger.info(f"Reset usage for org {org_id}, resource {resource}, month {month_key}")
             return True
-        
+
         except Exception as e:
             logger.error(f"Error resetting usage: {e}")
             return False
-    
+
     async def close(self):
         """Close Redis connection."""
         if self.redis:
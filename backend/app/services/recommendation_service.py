@@ -8,6 +8,15 @@ Recommendation Algorithm:
 - 10% User Feedback (upvotes/downvotes on past recommendations)
 
 Caches recommendations for performance and tracks feedback for ML improvements.
+
+Scoring is batched: a cold request runs one relationship query, one memory
+signal query (recency, interaction and display fields together) and one
+aggregated feedback query, regardless of how many candidates there are.
+
+Cache entries are keyed by an org generation and a per-memory generation.
+Feedback bumps the memory generation and relationship rebuilds bump the org
+generation, so stale recommendations are never served; the TTL only bounds
+how long superseded entries linger in Redis.
 """
 
 from __future__ import annotations
@@ -20,7 +29,7 @@ from typing import Optional, List, Dict, Any
 from datetime import datetime, timedelta, timezone
 import math
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
+from sqlalchemy import select, and_, or_, case, func
 
 try:
     import redis  # type: ignore
@@ -33,6 +42,40 @@ from app.models.recommendation_feedback import RecommendationFeedback
 
 logger = logging.getLogger(__name__)
 
+CACHE_PREFIX = "recommendations"
+FEEDBACK_WINDOW_DAYS = 90
+
+
+def _generation_keys(org_id: str, memory_id: str) -> List[str]:
+    return [f"{CACHE_PREFIX}:gen:{org_id}", f"{CACHE_PREFIX}:gen:{org_id}:{memory_id}"]
+
+
+async def invalidate_recommendations(
+    redis_client: Any,
+    org_id: str,
+    memory_ids: Optional[List[str]] = None,
+) -> None:
+    """
+    Invalidate cached recommendations by bumping their cache generation.
+
+    With ``memory_ids`` only recommendations *for* those memories are
+    invalidated; without, every cached recommendation in the org is.
+    Works with sync and asyncio Redis clients; failures are logged and ignored.
+    """
+    if not redis_client:
+        return
+    if memory_ids:
+        keys = [_generation_keys(org_id, str(m))[1] for m in memory_ids]
+    else:
+        keys = [f"{CACHE_PREFIX}:gen:{org_id}"]
+    try:
+        for key in keys:
+            result = redis_client.incr(key)
+            if inspect.isawaitable(result):
+                await result
+    except Exception as e:
+        logger.warning(f"Recommendation cache invalidation failed: {e}")
+
 
 class RecommendationService:
     """
@@ -82,6 +125,18 @@ class RecommendationService:
         except Exception:
             return
 
+    async def _cache_generation(self, org_id: str, memory_id: str) -> str:
+        """Current ``<org>.<memory>`` cache generation (``0.0`` when unknown)."""
+        if not self.redis:
+            return "0.0"
+        try:
+            values = self.redis.mget(_generation_keys(org_id, memory_id))
+            if inspect.isawaitable(values):
+                values = await values
+            return ".".join(str(int(v or 0)) for v in values)
+        except Exception:
+            return "0.0"
+
     async def get_recommendations(
         self,
         memory_id: str,
@@ -107,7 +162,11 @@ class RecommendationService:
         """
         
         limit = min(limit, 50)  # Cap at 50
-        cache_key = f"recommendations:{org_id}:{memory_id}:{limit}"
+        generation = await self._cache_generation(org_id, memory_id)
+        cache_key = (
+            f"{CACHE_PREFIX}:{org_id}:{memory_id}:{limit}:{max_age_days or 0}:"
+            f"{min_similarity}:g{generation}"
+        )
         
         # Try cache
         if use_cache:
@@ -130,52 +189,40 @@ class RecommendationService:
                 logger.warning(f"No related memories found for {memory_id}")
                 return []
             
-            # Calculate ranking factors for each memory
-            scored_memories = []
-            
+            candidate_ids = [rel["target_memory_id"] for rel in related]
+
+            # One query per signal type over all candidates
+            memories = await self._load_memory_signals(candidate_ids, org_id, max_age_days)
+            feedback = await self._load_feedback_scores(memory_id, candidate_ids, org_id)
+
+            now = datetime.now(timezone.utc)
+            recommendations = []
             for rel in related:
                 related_id = rel["target_memory_id"]
-                similarity_score = rel["similarity_score"]
-                
-                # Get other factors
-                recency = await self._calculate_recency_score(related_id)
-                interaction = await self._calculate_interaction_score(related_id)
-                feedback = await self._calculate_feedback_score(
-                    memory_id,
-                    related_id,
-                    org_id
-                )
-                
-                # Composite score
-                composite_score = (
-                    self.weights["similarity"] * similarity_score +
-                    self.weights["recency"] * recency +
-                    self.weights["interaction"] * interaction +
-                    self.weights["feedback"] * feedback
-                )
-                
-                scored_memories.append({
-                    "related_memory_id": related_id,
-                    "score": composite_score,
-                    "factors": {
-                        "similarity": similarity_score,
-                        "recency": recency,
-                        "interaction": interaction,
-                        "feedback": feedback
-                    },
-                    "relationship_type": rel.get("relationship_type", "RELATES_TO")
+                memory = memories.get(str(related_id))
+                if memory is None:
+                    continue  # inactive, too old, or outside the org
+
+                factors = {
+                    "similarity": rel["similarity_score"],
+                    "recency": self._recency_score(memory.created_at, memory.updated_at, now),
+                    "interaction": self._interaction_score(memory.access_count, memory.extra_metadata),
+                    "feedback": feedback.get(str(related_id), 0.5),
+                }
+                recommendations.append({
+                    "memory_id": str(related_id),
+                    "title": memory.title,
+                    "summary": (memory.content_preview or "")[:200],
+                    "score": sum(self.weights[name] * value for name, value in factors.items()),
+                    "factors": factors,
+                    "relationship_type": rel.get("relationship_type", "RELATES_TO"),
+                    "created_at": memory.created_at.isoformat() if memory.created_at else None,
+                    "updated_at": memory.updated_at.isoformat() if memory.updated_at else None,
                 })
             
             # Sort by score and take top N
-            scored_memories.sort(key=lambda x: x["score"], reverse=True)
-            top_recommendations = scored_memories[:limit]
-            
-            # Enrich with memory details
-            recommendations = await self._enrich_with_memory_details(
-                top_recommendations,
-                org_id,
-                max_age_days
-            )
+            recommendations.sort(key=lambda x: x["score"], reverse=True)
+            recommendations = recommendations[:limit]
             
             # Cache results
             await self._cache_setex(cache_key, self.cache_ttl, json.dumps(recommendations))
@@ -199,125 +246,152 @@ class RecommendationService:
         Returns relationships both incoming and outgoing.
         """
         
-        # Get outgoing relationships
-        stmt_out = select(GraphRelationship).where(
-            and_(
-                GraphRelationship.organization_id == uuid.UUID(org_id),
-                GraphRelationship.from_memory_id == memory_id,
-                GraphRelationship.similarity_score.isnot(None),
-                GraphRelationship.similarity_score >= min_similarity
-            )
-        ).order_by(GraphRelationship.similarity_score.desc())
-        
-        result_out = await self.db.execute(stmt_out)
-        outgoing = result_out.scalars().all()
-        
-        # Get incoming relationships
-        stmt_in = select(GraphRelationship).where(
+        # Outgoing and incoming relationships in one query
+        stmt = select(GraphRelationship).where(
             and_(
                 GraphRelationship.organization_id == uuid.UUID(org_id),
-                GraphRelationship.to_memory_id == memory_id,
+                or_(
+                    GraphRelationship.from_memory_id == memory_id,
+                    GraphRelationship.to_memory_id == memory_id,
+                ),
                 GraphRelationship.similarity_score.isnot(None),
                 GraphRelationship.similarity_score >= min_similarity
             )
         ).order_by(GraphRelationship.similarity_score.desc())
         
-        result_in = await self.db.execute(stmt_in)
-        incoming = result_in.scalars().all()
+        result = await self.db.execute(stmt)
         
-        # Combine and deduplicate
+        # Combine and deduplicate (max similarity when linked both ways)
         related_dict = {}
         
-        for rel in outgoing:
-            target_id = rel.to_memory_id
-            if target_id not in related_dict:
-                related_dict[target_id] = {
-                    "target_memory_id": target_id,
-                    "similarity_score": rel.similarity_score,
-                    "relationship_type": rel.relationship_type
-                }
-        
-        for rel in incoming:
-            source_id = rel.from_memory_id
-            if source_id not in related_dict:
-                related_dict[source_id] = {
-                    "target_memory_id": source_id,
+        for rel in result.scalars().all():
+            other_id = rel.to_memory_id if rel.from_memory_id == memory_id else rel.from_memory_id
+            if other_id == memory_id:
+                continue
+            if other_id not in related_dict:
+                related_dict[other_id] = {
+                    "target_memory_id": other_id,
                     "similarity_score": rel.similarity_score,
                     "relationship_type": rel.relationship_type
                 }
             else:
-                # Take max similarity if both incoming and outgoing exist
-                related_dict[source_id]["similarity_score"] = max(
-                    related_dict[source_id]["similarity_score"],
+                related_dict[other_id]["similarity_score"] = max(
+                    related_dict[other_id]["similarity_score"],
                     rel.similarity_score
                 )
         
         return list(related_dict.values())
 
-    async def _calculate_recency_score(self, memory_id: str) -> float:
+    async def _load_memory_signals(
+        self,
+        memory_ids: List[str],
+        org_id: str,
+        max_age_days: Optional[int] = None
+    ) -> Dict[str, Any]:
         """
-        Calculate recency score: 1.0 for recent, 0.0 for old.
-        
-        Exponential decay: 1.0 at 0 days, 0.5 at 30 days, 0.1 at 90 days.
+        Load recency, interaction and display columns for all candidates at once.
+
+        Only active memories of the org (and newer than ``max_age_days``) are
+        returned, keyed by id.
         """
-        
-        stmt = select(MemoryMetadata.created_at, MemoryMetadata.updated_at).where(
-            MemoryMetadata.id == memory_id
+        stmt = select(
+            MemoryMetadata.id,
+            MemoryMetadata.title,
+            MemoryMetadata.content_preview,
+            MemoryMetadata.created_at,
+            MemoryMetadata.updated_at,
+            MemoryMetadata.access_count,
+            MemoryMetadata.extra_metadata,
+        ).where(
+            and_(
+                MemoryMetadata.id.in_(memory_ids),
+                MemoryMetadata.organization_id == org_id,
+                MemoryMetadata.is_active.is_(True),
+            )
         )
         
-        result = await self.db.execute(stmt)
-        row = result.first()
+        if max_age_days:
+            cutoff_date = datetime.now(timezone.utc) - timedelta(days=max_age_days)
+            stmt = stmt.where(MemoryMetadata.created_at >= cutoff_date)
         
-        if not row:
-            return 0.0
+        result = await self.db.execute(stmt)
+        return {str(row.id): row for row in result.all()}
+
+    async def _load_feedback_scores(
+        self,
+        base_memory_id: str,
+        memory_ids: List[str],
+        org_id: str
+    ) -> Dict[str, float]:
+        """
+        Recency-weighted helpful ratio per recommended memory, aggregated in SQL.
+
+        Feedback is weighted by ``exp(-age_days/30)`` over the last
+        FEEDBACK_WINDOW_DAYS. Memories without feedback are omitted.
+        """
+        age_days = func.floor(
+            func.extract(
+                "epoch",
+                func.timezone("utc", func.now()) - RecommendationFeedback.created_at,
+            ) / 86400.0
+        )
+        weight = func.exp(-age_days / 30.0)
+        stmt = (
+            select(
+                RecommendationFeedback.recommended_memory_id,
+                func.sum(case((RecommendationFeedback.helpful.is_(True), weight), else_=0.0)),
+                func.sum(weight),
+            )
+            .where(
+                and_(
+                    RecommendationFeedback.organization_id == uuid.UUID(org_id),
+                    RecommendationFeedback.base_memory_id == base_memory_id,
+                    RecommendationFeedback.recommended_memory_id.in_(memory_ids),
+                    RecommendationFeedback.created_at
+                    >= datetime.utcnow() - timedelta(days=FEEDBACK_WINDOW_DAYS),
+                )
+            )
+            .group_by(RecommendationFeedback.recommended_memory_id)
+        )
         
-        now = datetime.now(timezone.utc)
+        result = await self.db.execute(stmt)
+        scores = {}
+        for memory_id, helpful_weight, total_weight in result.all():
+            if total_weight:
+                scores[str(memory_id)] = float(min(1.0, max(0.0, helpful_weight / total_weight)))
+        return scores
 
-        created_at = row.created_at
-        updated_at = row.updated_at
+    @staticmethod
+    def _recency_score(
+        created_at: Optional[datetime],
+        updated_at: Optional[datetime],
+        now: Optional[datetime] = None
+    ) -> float:
+        """Exponential decay on days since the last create/update: e^(-days/30)."""
+        now = now or datetime.now(timezone.utc)
         if created_at is not None and created_at.tzinfo is None:
             created_at = created_at.replace(tzinfo=timezone.utc)
         if updated_at is not None and updated_at.tzinfo is None:
             updated_at = updated_at.replace(tzinfo=timezone.utc)
 
-        most_recent = max(created_at or datetime.min.replace(tzinfo=timezone.utc), updated_at or datetime.min.replace(tzinfo=timezone.utc))
+        floor = datetime.min.replace(tzinfo=timezone.utc)
+        most_recent = max(created_at or floor, updated_at or floor)
         days_old = max(0, (now - most_recent).days)
         
-        # Exponential decay: e^(-days/30)
         recency = math.exp(-days_old / 30.0)
         return float(min(1.0, max(0.0, recency)))
 
-    async def _calculate_interaction_score(self, memory_id: str) -> float:
-        """
-        Calculate interaction score based on memory access patterns.
-        
-        Factors:
-        - View count (each view)
-        - Edit count (each edit weighted higher)
-        - Share count (each share)
-        - Time in memory (total seconds)
-        
-        Normalized to 0.0-1.0 range.
-        """
-        
-        stmt = select(MemoryMetadata.access_count, MemoryMetadata.extra_metadata).where(MemoryMetadata.id == memory_id)
-        
-        result = await self.db.execute(stmt)
-        row = result.first()
+    @staticmethod
+    def _interaction_score(access_count: Optional[int], metadata: Optional[Dict[str, Any]]) -> float:
+        """Sigmoid of log-weighted view/edit/share/time counters."""
+        access_count = int(access_count or 0)
+        metadata = metadata or {}
         
-        if not row:
-            return 0.0
-
-        access_count = int(row[0] or 0)
-        metadata = row[1] or {}
-        
-        # Extract interaction counts
         view_count = int(metadata.get("view_count", access_count) or access_count)
         edit_count = metadata.get("edit_count", 0)
         share_count = metadata.get("share_count", 0)
         time_seconds = metadata.get("time_spent_seconds", 0)
         
-        # Weighted score
         score = (
             0.3 * math.log1p(view_count) +
             0.4 * math.log1p((edit_count or 0) * 2) +
@@ -325,7 +399,6 @@ class RecommendationService:
             0.1 * math.log1p((time_seconds or 0) / 60.0)
         )
         
-        # Normalize to 0.0-1.0
         try:
             normalized = 1.0 / (1.0 + math.exp(-score))
         except OverflowError:
@@ -333,121 +406,6 @@ class RecommendationService:
 
         return float(min(1.0, max(0.0, normalized)))
 
-    async def _calculate_feedback_score(
-        self,
-        base_memory_id: str,
-        target_memory_id: str,
-        org_id: str
-    ) -> float:
-        """
-        Calculate feedback score from user reactions to past recommendations.
-        
-        Weighted average of upvotes/downvotes on similar recommendations.
-        Score: 1.0 for all upvotes, 0.0 for neutral, -1.0 for all downvotes.
-        Mapped to 0.0-1.0 range.
-        """
-        
-        stmt = select(RecommendationFeedback).where(
-            and_(
-                RecommendationFeedback.organization_id == uuid.UUID(org_id),
-                RecommendationFeedback.base_memory_id == base_memory_id,
-                RecommendationFeedback.recommended_memory_id == target_memory_id,
-                RecommendationFeedback.created_at >= datetime.utcnow() - timedelta(days=90)
-            )
-        )
-        
-        result = await self.db.execute(stmt)
-        feedback_list = result.scalars().all()
-        
-        if not feedback_list:
-            return 0.5  # Neutral if no feedback
-        
-        # Calculate weighted average
-        weights = []
-        values = []
-        
-        for feedback in feedback_list:
-            # Weight by recency
-            age_days = (datetime.utcnow() - feedback.created_at).days
-            recency_weight = math.exp(-age_days / 30.0)
-            weights.append(recency_weight)
-            
-            # Map helpful/not_helpful to score
-            if feedback.helpful:
-                values.append(1.0)
-            else:
-                values.append(0.0)
-        
-        if not weights:
-            return 0.5
-        
-        weighted_sum = sum(v * w for v, w in zip(values, weights))
-        weight_total = sum(weights) or 1.0
-        weighted_avg = weighted_sum / weight_total
-        return float(min(1.0, max(0.0, weighted_avg)))
-
-    async def _enrich_with_memory_details(
-        self,
-        recommendations: List[Dict[str, Any]],
-        org_id: str,
-        max_age_days: Optional[int] = None
-    ) -> List[Dict[str, Any]]:
-        """
-        Fetch full memory details for recommendations.
-        
-        Args:
-            recommendations: List with at least 'related_memory_id'
-            org_id: Organization ID
-            max_age_days: Exclude memories created more than N days ago
-            
-        Returns:
-            Enriched recommendations with title, summary, created_at, etc.
-        """
-        
-        if not recommendations:
-            return []
-        
-        memory_ids = [r["related_memory_id"] for r in recommendations]
-        
-        stmt = select(MemoryMetadata).where(
-            and_(
-                MemoryMetadata.id.in_(memory_ids),
-                MemoryMetadata.organization_id == org_id,
-                MemoryMetadata.is_active.is_(True),
-            )
-        )
-        
-        if max_age_days:
-            cutoff_date = datetime.utcnow() - timedelta(days=max_age_days)
-            stmt = stmt.where(MemoryMetadata.created_at >= cutoff_date)
-        
-        result = await self.db.execute(stmt)
-        memories = {str(m.id): m for m in result.scalars().all()}
-        
-        # Merge memory details into recommendations
-        enriched = []
-        
-        for rec in recommendations:
-            memory_id = rec["related_memory_id"]
-            
-            if memory_id not in memories:
-                continue
-            
-            memory = memories[memory_id]
-            
-            enriched.append({
-                "memory_id": memory_id,
-                "title": memory.title,
-                "summary": (memory.content_preview or "")[:200],
-                "score": rec["score"],
-                "factors": rec["factors"],
-                "relationship_type": rec["relationship_type"],
-                "created_at": memory.created_at.isoformat() if memory.created_at else None,
-                "updated_at": memory.updated_at.isoformat() if memory.updated_at else None,
-            })
-        
-        return enriched
-
     async def submit_feedback(
         self,
         base_memory_id: str,
@@ -477,9 +435,8 @@ class RecommendationService:
         self.db.add(feedback)
         await self.db.commit()
         
-        # Invalidate cache
-        cache_key = f"recommendations:{org_id}:{base_memory_id}:*"
-        # Note: Redis doesn't have wildcard delete, would need to track all variations
+        # Feedback changes the ranking of this base memory's recommendations
+        await invalidate_recommendations(self.redis, org_id, [base_memory_id])
         
         logger.info(f"Stored feedback: {base_memory_id} -> {recommended_memory_id} (helpful={helpful})")
         
@@ -7,16 +7,22 @@ Implements admission control with graceful degradation.
 
 import time
 from typing import Optional, Dict, Any, List
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import logging
 import uuid
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_
+from sqlalchemy import select, func
 
 from app.models.memory import Memory
-from app.models.audit import AuditEvent
 from app.services.rate_limiter import rate_limiter, RateLimitExceeded
+from app.services.usage_rollups import (
+    METRIC_REQUEST,
+    METRIC_TOKENS,
+    load_rollups,
+    merge_totals,
+    usage_rollups,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -55,26 +61,14 @@ class ResourceAccountingService:
             user_id: User who made request (optional)
         """
         try:
-            # Create audit event
-            event = AuditEvent(
-                id=uuid.uuid4(),
-                organization_id=self.org_id,
-                user_id=user_id,
-                event_type="api.request",
-                resource_type="api",
-                resource_id=endpoint,
+            usage_rollups.record_request(
+                str(self.org_id),
+                endpoint=endpoint,
+                method=method,
+                duration_ms=duration_ms,
                 success=200 <= status_code < 400,
-                metadata={
-                    "endpoint": endpoint,
-                    "method": method,
-                    "duration_ms": duration_ms,
-                    "status_code": status_code,
-                    "timestamp": datetime.utcnow().isoformat()
-                }
             )
-            
-            self.db.add(event)
-            await self.db.flush()
+            await usage_rollups.flush_if_due(str(self.org_id))
             
             # Track rate limit
             key = f"org:{self.org_id}:api:{endpoint}"
@@ -109,24 +103,8 @@ class ResourceAccountingService:
                 monthly_limit=1000000  # 1M tokens/month default
             )
             
-            # Record usage event
-            event = AuditEvent(
-                id=uuid.uuid4(),
-                organization_id=self.org_id,
-                event_type="llm.token_usage",
-                resource_type="tokens",
-                resource_id=model,
-                success=True,
-                metadata={
-                    "tokens": tokens,
-                    "model": model,
-                    "operation": operation,
-                    "timestamp": datetime.utcnow().isoformat()
-                }
-            )
-            
-            self.db.add(event)
-            await self.db.flush()
+            usage_rollups.record_tokens(str(self.org_id), model=model, operation=operation, tokens=tokens)
+            await usage_rollups.flush_if_due(str(self.org_id))
         
         except RateLimitExceeded as e:
             logger.error(f"Token quota exceeded: {e}")
@@ -178,62 +156,38 @@ class ResourceAccountingService:
             Dict with request stats
         """
         try:
-            cutoff = datetime.utcnow() - timedelta(hours=time_window_hours)
+            cutoff = datetime.now(timezone.utc) - timedelta(hours=time_window_hours)
             
-            # Get request events
-            stmt = select(AuditEvent).where(
-                and_(
-                    AuditEvent.organization_id == self.org_id,
-                    AuditEvent.event_type == "api.request",
-                    AuditEvent.created_at >= cutoff
-                )
-            )
-            result = await self.db.execute(stmt)
-            events = result.scalars().all()
+            # Merge pre-aggregated buckets (see usage_rollups) rather than raw events.
+            await usage_rollups.flush(str(self.org_id))
+            rollups = await load_rollups(self.db, str(self.org_id), METRIC_REQUEST, cutoff)
+            totals = merge_totals(rollups.values())
             
-            if not events:
+            if not totals.count:
                 return {
                     "total_requests": 0,
                     "time_window_hours": time_window_hours
                 }
             
-            # Calculate metrics
-            durations = [
-                e.metadata.get("duration_ms", 0)
-                for e in events
-                if e.metadata and "duration_ms" in e.metadata
-            ]
-            durations.sort()
-            
-            def percentile(data, p):
-                if not data:
-                    return 0
-                k = (len(data) - 1) * p / 100
-                f = int(k)
-                c = int(k) + 1 if k < len(data) - 1 else f
-                return data[f] + (k - f) * (data[c] - data[f])
-            
-            success_count = sum(1 for e in events if e.success)
-            error_count = len(events) - success_count
+            success_count = totals.count - totals.error_count
             
             # Group by endpoint
             by_endpoint = {}
-            for e in events:
-                endpoint = e.metadata.get("endpoint", "unknown") if e.metadata else "unknown"
-                by_endpoint[endpoint] = by_endpoint.get(endpoint, 0) + 1
+            for (endpoint, _method), t in rollups.items():
+                by_endpoint[endpoint] = by_endpoint.get(endpoint, 0) + t.count
             
             return {
-                "total_requests": len(events),
+                "total_requests": totals.count,
                 "success_count": success_count,
-                "error_count": error_count,
-                "success_rate": success_count / len(events) if events else 0,
-                "latency_p50_ms": percentile(durations, 50),
-                "latency_p95_ms": percentile(durations, 95),
-                "latency_p99_ms": percentile(durations, 99),
-                "avg_latency_ms": sum(durations) / len(durations) if durations else 0,
+                "error_count": totals.error_count,
+                "success_rate": success_count / totals.count,
+                "latency_p50_ms": totals.quantile(0.50),
+                "latency_p95_ms": totals.quantile(0.95),
+                "latency_p99_ms": totals.quantile(0.99),
+                "avg_latency_ms": totals.value_sum / totals.count,
                 "by_endpoint": by_endpoint,
                 "time_window_hours": time_window_hours,
-                "requests_per_hour": len(events) / time_window_hours
+                "requests_per_hour": totals.count / time_window_hours
             }
         
         except Exception as e:
@@ -246,38 +200,21 @@ class ResourceAccountingService:
     ) -> Dict[str, Any]:
         """Get token usage statistics."""
         try:
-            cutoff = datetime.utcnow() - timedelta(days=time_window_days)
+            cutoff = datetime.now(timezone.utc) - timedelta(days=time_window_days)
             
-            stmt = select(AuditEvent).where(
-                and_(
-                    AuditEvent.organization_id == self.org_id,
-                    AuditEvent.event_type == "llm.token_usage",
-                    AuditEvent.created_at >= cutoff
-                )
-            )
-            result = await self.db.execute(stmt)
-            events = result.scalars().all()
-            
-            total_tokens = sum(
-                e.metadata.get("tokens", 0)
-                for e in events
-                if e.metadata
-            )
+            await usage_rollups.flush(str(self.org_id))
+            rollups = await load_rollups(self.db, str(self.org_id), METRIC_TOKENS, cutoff)
             
             # Group by model
             by_model = {}
             by_operation = {}
             
-            for e in events:
-                if not e.metadata:
-                    continue
-                
-                tokens = e.metadata.get("tokens", 0)
-                model = e.metadata.get("model", "unknown")
-                operation = e.metadata.get("operation", "unknown")
-                
+            for (model, operation), t in rollups.items():
+                tokens = int(t.value_sum)
                 by_model[model] = by_model.get(model, 0) + tokens
-                by_operation[operation] = by_operation.get(operation, 0) + tokens
+                by_operation[operation or "unknown"] = by_operation.get(operation or "unknown", 0) + tokens
+            
+            total_tokens = sum(by_model.values())
             
             # Get current month quota status
             quota_stats = await rate_limiter.get_usage_stats(
@@ -299,6 +236,38 @@ class ResourceAccountingService:
             logger.error(f"Error getting token stats: {e}")
             return {"total_tokens": 0}
     
+    async def get_recent_latency(
+        self,
+        window_minutes: int = 5,
+        endpoint: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Latency percentiles over the last few minutes, from minute buckets.
+        
+        Cheap enough to consult on admission decisions (a handful of rows).
+        Reflects events flushed by every process; this process's own pending
+        events are flushed first.
+        """
+        try:
+            cutoff = datetime.now(timezone.utc) - timedelta(minutes=window_minutes)
+            await usage_rollups.flush(str(self.org_id))
+            rollups = await load_rollups(self.db, str(self.org_id), METRIC_REQUEST, cutoff)
+            totals = merge_totals(
+                t for (ep, _method), t in rollups.items() if endpoint is None or ep == endpoint
+            )
+            return {
+                "requests": totals.count,
+                "error_count": totals.error_count,
+                "latency_p50_ms": totals.quantile(0.50),
+                "latency_p95_ms": totals.quantile(0.95),
+                "latency_p99_ms": totals.quantile(0.99),
+                "window_minutes": window_minutes
+            }
+        
+        except Exception as e:
+            logger.error(f"Error getting recent latency: {e}")
+            return {"requests": 0, "window_minutes": window_minutes}
+    
     async def check_admission(
         self,
         operation: str,
@@ -1,7 +1,8 @@
 """SLA-based pipeline scheduler service.
 
 Manages consolidation/critique/eval pipelines with SLA ordering, backpressure,
-and fair resource allocation across tenants.
+and fair resource allocation across tenants. Workers claim tasks in batches
+(``claim_batch``) with weighted fair share across organizations.
 """
 
 from __future__ import annotations
@@ -19,6 +20,8 @@ from app.models.pipeline_task import (
     PipelineTaskType,
 )
 from app.services.audit_service import AuditService
+from app.services.pipeline_queue import fair_share_claim, fair_share_weights
+from app.core.config import settings
 from app.core.task_execution import TaskExecutionContext
 
 
@@ -126,6 +129,36 @@ class SLASchedulerService:
         Returns:
             Next PipelineTask or None if queue is empty
 
+        Raises:
+            PermissionError: If scopes don't include "pipeline.dequeue"
+        """
+        tasks = await self.claim_batch(limit=1, organization_id=organization_id, scopes=scopes)
+        return tasks[0] if tasks else None
+
+    async def claim_batch(
+        self,
+        *,
+        limit: int | None = None,
+        organization_id: str | None = None,
+        scopes: set[str] | None = None,
+    ) -> list[PipelineTask]:
+        """Claim up to ``limit`` queued tasks in one statement.
+
+        Within an organization tasks follow the SLA ordering of
+        ``dequeue_next_by_sla``; across organizations (when
+        ``organization_id`` is None) claims are interleaved by weighted
+        fair share, see ``app.services.pipeline_queue``. Rows are locked with
+        ``FOR UPDATE SKIP LOCKED`` so concurrent workers claim disjoint
+        batches. One audit event is written per organization and batch.
+
+        Args:
+            limit: Batch size (default ``PIPELINE_CLAIM_BATCH_SIZE``)
+            organization_id: Restrict the claim to one organization
+            scopes: Capability scopes (must include "pipeline.dequeue")
+
+        Returns:
+            Claimed tasks (now RUNNING), in claim order
+
         Raises:
             PermissionError: If scopes don't include "pipeline.dequeue"
         """
@@ -133,19 +166,18 @@ class SLASchedulerService:
             raise PermissionError("Missing scope: pipeline.dequeue")
 
         now = datetime.now(timezone.utc)
-
-        # Fetch tasks: breached first, then by remaining time, then by priority
-        stmt = (
-            select(PipelineTask)
-            .where(
-                and_(
-                    PipelineTask.organization_id == organization_id,
-                    PipelineTask.status == PipelineTaskStatus.QUEUED.value,
-                    PipelineTask.attempts < PipelineTask.max_attempts,
-                    PipelineTask.blocked_by_quota == False,
-                )
-            )
-            .order_by(
+        eligible = [
+            PipelineTask.status == PipelineTaskStatus.QUEUED.value,
+            PipelineTask.attempts < PipelineTask.max_attempts,
+            PipelineTask.blocked_by_quota == False,
+        ]
+        if organization_id is not None:
+            eligible.append(PipelineTask.organization_id == organization_id)
+
+        stmt = fair_share_claim(
+            PipelineTask,
+            eligible=eligible,
+            order_by=[
                 # Breached SLAs first (sla_deadline < now = breached)
                 (PipelineTask.sla_deadline < now).desc(),
                 # Then by remaining time (ascending = sooner deadline first)
@@ -154,33 +186,44 @@ class SLASchedulerService:
                 PipelineTask.priority.desc(),
                 # Tiebreaker: creation time
                 PipelineTask.created_at.asc(),
-            )
-            .limit(1)
-            .with_for_update(skip_locked=True)
+            ],
+            running=PipelineTask.status == PipelineTaskStatus.RUNNING.value,
+            limit=limit or settings.PIPELINE_CLAIM_BATCH_SIZE,
+            weights=fair_share_weights(),
         )
+        tasks = list((await self.db.execute(stmt)).scalars().all())
+        if not tasks:
+            return []
 
-        result = await self.db.execute(stmt)
-        task = result.scalar_one_or_none()
-
-        if task:
+        by_org: dict[str, list[PipelineTask]] = {}
+        for task in tasks:
             task.status = PipelineTaskStatus.RUNNING.value
             task.started_at = now
             task.attempts += 1
+            by_org.setdefault(str(task.organization_id), []).append(task)
+
+        for org_id, claimed in by_org.items():
             await self.audit.log_event(
                 event_type="pipeline.task.started",
-                organization_id=organization_id,
+                organization_id=org_id,
                 resource_type="pipeline_task",
-                resource_id=task.id,
+                resource_id=claimed[0].id if len(claimed) == 1 else None,
                 success=True,
                 details={
-                    "attempt": task.attempts,
-                    "sla_remaining_ms": task.sla_remaining_ms,
+                    "tasks": [
+                        {
+                            "id": t.id,
+                            "attempt": t.attempts,
+                            "sla_remaining_ms": t.sla_remaining_ms,
+                        }
+                        for t in claimed
+                    ],
                 },
             )
-            if not self.db.info.get("auto_commit", True):
-                await self.db.flush()
+        if not self.db.info.get("auto_commit", True):
+            await self.db.flush()
 
-        return task
+        return tasks
 
     async def mark_succeeded(
         self,
@@ -438,17 +481,15 @@ class SLASchedulerService:
         """
         now = datetime.now(timezone.utc)
 
-        # Count tasks per status
-        status_counts = {}
-        for status in PipelineTaskStatus:
-            stmt = select(func.count()).where(
-                and_(
-                    PipelineTask.organization_id == organization_id,
-                    PipelineTask.status == status.value,
-                )
-            )
-            count = await self.db.scalar(stmt)
-            status_counts[status.value] = count or 0
+        # Count tasks per status (one grouped query)
+        status_counts = {status.value: 0 for status in PipelineTaskStatus}
+        rows = await self.db.execute(
+            select(PipelineTask.status, func.count())
+            .where(PipelineTask.organization_id == organization_id)
+            .group_by(PipelineTask.status)
+        )
+        for status, count in rows.all():
+            status_counts[status] = int(count or 0)
 
         # Count breached SLAs
         breached_stmt = select(func.count()).where(
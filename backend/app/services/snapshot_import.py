@@ -0,0 +1,592 @@
+"""
+Bulk Snapshot Import
+====================
+
+Restore path for memory snapshots that scales to disaster-recovery sizes:
+
+- The snapshot is parsed incrementally (plain JSON or the ``memories.json``
+  member of a ZIP), so only one batch of records is ever held in memory.
+- Each batch is ``COPY``-ed into a temporary staging table and merged into
+  ``memory_metadata`` with a single ``INSERT ... SELECT ... ON CONFLICT``
+  statement instead of one ORM round-trip (plus permission check and audit
+  row) per memory.
+- Snapshot format 2.0 carries each memory's embedding in a ``vector`` field;
+  restored vectors are upserted into Qdrant in batches, and only records
+  without a stored vector are re-embedded.
+- A single audit event summarises the whole import.
+
+Imported rows get the same checks as ``MemoryService.create_memory``: every
+record is validated as a ``MemoryCreate`` (scope/scope_id, classification,
+clearance range) and the importer needs ``memory:create:<scope>`` for each
+scope it writes. Imported memories are owned by the importing user, and with
+``overwrite`` an existing memory is only replaced if the importer may write it.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import codecs
+import hashlib
+import json
+import logging
+import zipfile
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+from uuid import UUID, uuid4
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.qdrant import QdrantService
+from app.schemas.memory import MemoryCreate
+from app.services.audit_service import AuditService
+from app.services.memory_metadata_cache import MemoryMetadataCache
+from app.services.permission_checker import PermissionChecker
+from app.services.synthesis_aggregates import SynthesisAggregates
+from app.services.embedding_service import EmbeddingService
+
+logger = logging.getLogger(__name__)
+
+STAGING_TABLE = "memory_import_staging"
+
+# Staging columns, in COPY order. organization_id is not staged: the merge
+# always stamps the importing organization.
+STAGING_COLUMNS: Tuple[str, ...] = (
+    "id",
+    "owner_id",
+    "scope",
+    "scope_id",
+    "memory_type",
+    "classification",
+    "required_clearance",
+    "title",
+    "content_preview",
+    "content_hash",
+    "tags",
+    "entities",
+    "extra_metadata",
+    "source_type",
+    "source_id",
+    "vector_id",
+    "embedding_model",
+    "retention_days",
+    "created_at",
+    "updated_at",
+)
+
+# Columns refreshed when ``overwrite`` is set (identity, ownership and the
+# vector reference of an existing row are kept).
+_OVERWRITE_COLUMNS: Tuple[str, ...] = (
+    "scope",
+    "scope_id",
+    "memory_type",
+    "classification",
+    "required_clearance",
+    "title",
+    "content_preview",
+    "content_hash",
+    "tags",
+    "entities",
+    "extra_metadata",
+    "source_type",
+    "source_id",
+    "embedding_model",
+    "retention_days",
+    "updated_at",
+)
+
+_CREATE_STAGING_SQL = f"""
+CREATE TEMP TABLE IF NOT EXISTS {STAGING_TABLE} (
+    id uuid PRIMARY KEY,
+    owner_id uuid,
+    scope varchar(50) NOT NULL,
+    scope_id uuid,
+    memory_type varchar(50) NOT NULL,
+    classification varchar(50) NOT NULL,
+    required_clearance integer NOT NULL,
+    title varchar(500),
+    content_preview varchar(500) NOT NULL,
+    content_hash varchar(64) NOT NULL,
+    tags varchar[] NOT NULL,
+    entities jsonb NOT NULL,
+    extra_metadata jsonb NOT NULL,
+    source_type varchar(50),
+    source_id varchar(255),
+    vector_id varchar(100) NOT NULL,
+    embedding_model varchar(100) NOT NULL,
+    retention_days integer,
+    created_at timestamptz NOT NULL,
+    updated_at timestamptz NOT NULL
+) ON COMMIT DROP
+"""
+
+
+def _merge_sql(overwrite: bool) -> str:
+    if overwrite:
+        assignments = ", ".join(f"{c} = EXCLUDED.{c}" for c in _OVERWRITE_COLUMNS)
+        conflict = (
+            f"DO UPDATE SET {assignments} "
+            "WHERE m.organization_id = EXCLUDED.organization_id"
+        )
+    else:
+        conflict = "DO NOTHING"
+
+    # New rows are owned by the importing user (snapshot owner ids are not
+    # trusted), and a vector id already used by a different memory gets a
+    # fresh one so a single clash can't abort the whole restore.
+    return f"""
+INSERT INTO memory_metadata AS m (
+    id, organization_id, owner_id, scope, scope_id, memory_type, classification,
+    required_clearance, title, content_preview, content_hash, tags, entities,
+    extra_metadata, source_type, source_id, vector_id, embedding_model,
+    retention_days, access_count, legal_hold, is_active, is_promoted,
+    created_at, updated_at
+)
+SELECT
+    s.id, CAST(:org_id AS uuid), CAST(:user_id AS uuid),
+    s.scope, s.scope_id, s.memory_type, s.classification,
+    s.required_clearance, s.title, s.content_preview, s.content_hash, s.tags,
+    s.entities, s.extra_metadata, s.source_type, s.source_id,
+    CASE
+        WHEN EXISTS (
+            SELECT 1 FROM memory_metadata x
+            WHERE x.vector_id = s.vector_id AND x.id <> s.id
+        ) THEN gen_random_uuid()::text
+        ELSE s.vector_id
+    END,
+    s.embedding_model, s.retention_days, 0, false, true, false,
+    s.created_at, s.updated_at
+FROM {STAGING_TABLE} s
+ON CONFLICT (id) {conflict}
+RETURNING m.id, m.vector_id, m.owner_id, (m.xmax = 0) AS inserted
+"""
+
+
+# ---------------------------------------------------------------------------
+# Streaming parsing
+# ---------------------------------------------------------------------------
+
+
+class _JsonStream:
+    """Pull-based JSON tokenizer over a binary file, decoding one value at a time."""
+
+    _WHITESPACE = " \t\r\n"
+
+    def __init__(self, fh: BinaryIO, chunk_size: int = 64 * 1024):
+        self._fh = fh
+        self._chunk_size = chunk_size
+        self._decoder = codecs.getincrementaldecoder("utf-8-sig")()
+        self._json = json.JSONDecoder()
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        if self._eof:
+            return False
+        chunk = self._fh.read(self._chunk_size)
+        if not chunk:
+            self._eof = True
+            self._buf = self._buf[self._pos:] + self._decoder.decode(b"", final=True)
+        else:
+            self._buf = self._buf[self._pos:] + self._decoder.decode(chunk)
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Return the next non-whitespace character without consuming it ("" at EOF)."""
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in self._WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise ValueError(f"Malformed snapshot: expected {char!r}")
+        self._pos += 1
+
+    def value(self) -> Any:
+        """Decode the next complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                obj, end = self._json.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise ValueError("Malformed snapshot: truncated JSON value")
+            # A number at the end of the buffer may continue in the next chunk.
+            if end == len(self._buf) and not self._eof:
+                self._fill()
+                continue
+            self._pos = end
+            return obj
+
+    def iter_array(self) -> Iterator[Any]:
+        self.expect("[")
+        if self.peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield self.value()
+            char = self.peek()
+            self._pos += 1
+            if char == "]":
+                return
+            if char != ",":
+                raise ValueError("Malformed snapshot: expected ',' or ']'")
+
+
+def iter_snapshot_memories(fh: BinaryIO) -> Iterator[Dict[str, Any]]:
+    """
+    Yield memory records from a JSON snapshot without loading it.
+
+    Accepts the snapshot document (``{"version": ..., "memories": [...]}``)
+    or a bare array of memory records. Other top-level keys are skipped.
+    """
+    stream = _JsonStream(fh)
+    first = stream.peek()
+    if first == "[":
+        yield from stream.iter_array()
+        return
+    stream.expect("{")
+    while True:
+        char = stream.peek()
+        if char == "}" or char == "":
+            return
+        if char == ",":
+            stream.expect(",")
+            continue
+        key = stream.value()
+        stream.expect(":")
+        if key == "memories":
+            yield from stream.iter_array()
+        else:
+            stream.value()
+
+
+def open_snapshot_records(source: BinaryIO, format: str) -> Iterator[Dict[str, Any]]:
+    """Return a lazy iterator of memory records for a json or zip snapshot."""
+    if format == "json":
+        return iter_snapshot_memories(source)
+    if format == "zip":
+        def _zip_records() -> Iterator[Dict[str, Any]]:
+            with zipfile.ZipFile(source) as zf, zf.open("memories.json") as member:
+                yield from iter_snapshot_memories(member)
+        return _zip_records()
+    raise ValueError(f"Unsupported import format: {format}")
+
+
+# ---------------------------------------------------------------------------
+# Record normalisation
+# ---------------------------------------------------------------------------
+
+
+def _parse_ts(value: Any, default: datetime) -> datetime:
+    if not value:
+        return default
+    if isinstance(value, datetime):
+        ts = value
+    else:
+        ts = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return ts
+
+
+def _uuid_or_none(value: Any) -> Optional[str]:
+    if not value:
+        return None
+    return str(UUID(str(value)))
+
+
+def normalize_record(
+    record: Dict[str, Any],
+    now: datetime,
+) -> Tuple[Tuple[Any, ...], Optional[List[float]], str]:
+    """
+    Map a snapshot record onto the staging row.
+
+    Accepts both format 1.0 (``content``/``metadata``) and 2.0
+    (``content_preview``/``extra_metadata``/``vector``) records.
+
+    Returns:
+        (staging row, vector or None, text to embed when the vector is missing)
+    """
+    memory_id = str(UUID(str(record["id"])))
+    content = record.get("content") or record.get("content_preview") or ""
+    if not content:
+        raise ValueError("missing content")
+    content_hash = record.get("content_hash") or hashlib.sha256(
+        content.encode("utf-8")
+    ).hexdigest()
+
+    vector = record.get("vector")
+    if vector is not None and not isinstance(vector, list):
+        raise ValueError("vector must be a list of floats")
+
+    created_at = _parse_ts(record.get("created_at"), now)
+    row = (
+        memory_id,
+        _uuid_or_none(record.get("owner_id")),
+        record.get("scope") or "personal",
+        _uuid_or_none(record.get("scope_id")),
+        record.get("memory_type") or "long_term",
+        record.get("classification") or "internal",
+        int(record.get("required_clearance") or 0),
+        record.get("title"),
+        content[:500],
+        content_hash,
+        [str(t) for t in (record.get("tags") or [])],
+        json.dumps(record.get("entities") or {}),
+        json.dumps(record.get("extra_metadata") or record.get("metadata") or {}),
+        record.get("source_type"),
+        record.get("source_id"),
+        str(record.get("vector_id") or uuid4()),
+        record.get("embedding_model") or settings.EMBEDDING_MODEL or "text-embedding-3-small",
+        record.get("retention_days"),
+        created_at,
+        _parse_ts(record.get("updated_at"), created_at),
+    )
+    return row, vector, content
+
+
+# ---------------------------------------------------------------------------
+# Importer
+# ---------------------------------------------------------------------------
+
+
+class SnapshotBulkImporter:
+    """Set-based snapshot restore for one organization."""
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        org_id: str,
+        user_id: str,
+        batch_size: Optional[int] = None,
+        clearance_level: int = 0,
+    ):
+        self.db = db
+        self.org_id = str(org_id)
+        self.user_id = str(user_id)
+        self.batch_size = batch_size or settings.SNAPSHOT_IMPORT_BATCH_SIZE
+        self.clearance_level = clearance_level
+        self.permission_checker = PermissionChecker(db)
+        self._scope_decisions: Dict[str, Optional[str]] = {}
+
+    async def run(
+        self,
+        source: BinaryIO,
+        format: str = "json",
+        overwrite: bool = False,
+    ) -> Dict[str, Any]:
+        records = open_snapshot_records(source, format)
+        await self.db.execute(text(_CREATE_STAGING_SQL))
+        merge_sql = text(_merge_sql(overwrite))
+
+        result = {
+            "imported": 0,
+            "updated": 0,
+            "skipped": 0,
+            "total": 0,
+            "vectors_restored": 0,
+            "vectors_embedded": 0,
+            "errors": [],
+        }
+
+        while True:
+            # File reads and JSON decoding happen off the event loop.
+            batch = await asyncio.to_thread(lambda: list(islice(records, self.batch_size)))
+            if not batch:
+                break
+            result["total"] += len(batch)
+            await self._import_batch(batch, merge_sql, overwrite, result)
+
+        if result["imported"] or result["updated"]:
+            # The merge bypasses MemoryService, so rebuild synthesis aggregates once.
+            await SynthesisAggregates(self.db, self.org_id).refresh()
+        if result["updated"]:
+            await MemoryMetadataCache.invalidate_org(self.org_id, session=self.db)
+
+        await AuditService(self.db).log_memory_operation(
+            actor_id=self.user_id,
+            organization_id=self.org_id,
+            memory_id="",
+            operation="import",
+            success=True,
+            details={
+                **{k: v for k, v in result.items() if k != "errors"},
+                "error_count": len(result["errors"]),
+                "overwrite": overwrite,
+            },
+        )
+        return result
+
+    async def _import_batch(
+        self,
+        batch: List[Dict[str, Any]],
+        merge_sql,
+        overwrite: bool,
+        result: Dict[str, Any],
+    ) -> None:
+        now = datetime.now(timezone.utc)
+        rows: Dict[str, Tuple[Any, ...]] = {}
+        vectors: Dict[str, Optional[List[float]]] = {}
+        texts: Dict[str, str] = {}
+
+        for record in batch:
+            try:
+                row, vector, content = normalize_record(record, now)
+                denied = await self._check_create(row, content)
+            except Exception as e:
+                memory_ref = record.get("id") if isinstance(record, dict) else None
+                result["errors"].append(f"Memory {memory_ref}: {e}")
+                continue
+            if denied:
+                result["errors"].append(f"Memory {row[0]}: {denied}")
+                continue
+            if row[0] in rows:
+                result["skipped"] += 1
+            rows[row[0]] = row
+            vectors[row[0]] = vector
+            texts[row[0]] = content
+
+        if rows and overwrite:
+            for memory_id in await self._unwritable_existing(list(rows)):
+                result["errors"].append(f"Memory {memory_id}: no write access to existing memory")
+                del rows[memory_id]
+
+        if not rows:
+            return
+
+        await self.db.execute(text(f"TRUNCATE {STAGING_TABLE}"))
+        await self._copy_to_staging(list(rows.values()))
+        merged = (
+            await self.db.execute(merge_sql, {"org_id": self.org_id, "user_id": self.user_id})
+        ).all()
+
+        for _memory_id, _vector_id, _owner_id, inserted in merged:
+            result["imported" if inserted else "updated"] += 1
+        result["skipped"] += len(rows) - len(merged)
+
+        await self._upsert_vectors(merged, rows, vectors, texts, result)
+
+    async def _check_create(self, row: Tuple[Any, ...], content: str) -> Optional[str]:
+        """Reason the record may not be created, or None (same checks as create_memory)."""
+        values = dict(zip(STAGING_COLUMNS, row))
+        # Raises (recorded as a per-record error) on an invalid scope,
+        # missing scope_id, classification or clearance.
+        data = MemoryCreate(
+            content=content,
+            scope=values["scope"],
+            scope_id=values["scope_id"],
+            memory_type=values["memory_type"],
+            classification=values["classification"],
+            required_clearance=values["required_clearance"],
+        )
+        scope = data.scope.value if hasattr(data.scope, "value") else str(data.scope)
+        if scope not in self._scope_decisions:
+            decision = await self.permission_checker.check_permission(
+                self.user_id, self.org_id, f"memory:create:{scope}"
+            )
+            self._scope_decisions[scope] = None if decision.allowed else decision.reason
+        return self._scope_decisions[scope]
+
+    async def _unwritable_existing(self, memory_ids: List[str]) -> List[str]:
+        """Ids that already exist in the org but that the importer may not write."""
+        existing = (
+            await self.db.execute(
+                text(
+                    "SELECT id::text FROM memory_metadata "
+                    "WHERE organization_id = CAST(:org_id AS uuid) AND id = ANY(CAST(:ids AS uuid[]))"
+                ),
+                {"org_id": self.org_id, "ids": memory_ids},
+            )
+        ).all()
+        denied = []
+        for (memory_id,) in existing:
+            access = await self.permission_checker.check_memory_access(
+                self.user_id, self.org_id, str(memory_id), "write", self.clearance_level
+            )
+            if not access.allowed:
+                denied.append(str(memory_id))
+        return denied
+
+    async def _copy_to_staging(self, rows: List[Tuple[Any, ...]]) -> None:
+        """COPY rows into the staging table (asyncpg), or multi-row INSERT otherwise."""
+        conn = await self.db.connection()
+        raw = await conn.get_raw_connection()
+        driver = getattr(raw, "driver_connection", None)
+        if hasattr(driver, "copy_records_to_table"):
+            await driver.copy_records_to_table(
+                STAGING_TABLE, records=rows, columns=list(STAGING_COLUMNS)
+            )
+            return
+
+        placeholders = ", ".join(f":{c}" for c in STAGING_COLUMNS)
+        await self.db.execute(
+            text(
+                f"INSERT INTO {STAGING_TABLE} ({', '.join(STAGING_COLUMNS)}) "
+                f"VALUES ({placeholders})"
+            ),
+            [dict(zip(STAGING_COLUMNS, row)) for row in rows],
+        )
+
+    async def _upsert_vectors(
+        self,
+        merged: List[Any],
+        rows: Dict[str, Tuple[Any, ...]],
+        vectors: Dict[str, Optional[List[float]]],
+        texts: Dict[str, str],
+        result: Dict[str, Any],
+    ) -> None:
+        if not merged:
+            return
+
+        ids = [str(row[0]) for row in merged]
+        missing = [mid for mid in ids if not vectors.get(mid)]
+        if missing:
+            slots = asyncio.Semaphore(max(1, int(settings.SNAPSHOT_IMPORT_EMBED_CONCURRENCY)))
+
+            async def _embed(text_: str) -> List[float]:
+                async with slots:
+                    return await EmbeddingService.embed(text_)
+
+            embedded = await asyncio.gather(*(_embed(texts[mid]) for mid in missing))
+            for mid, vector in zip(missing, embedded):
+                vectors[mid] = vector
+            result["vectors_embedded"] += len(missing)
+        result["vectors_restored"] += len(ids) - len(missing)
+
+        col = {name: i for i, name in enumerate(STAGING_COLUMNS)}
+        points = []
+        for memory_id, vector_id, owner_id, _ in merged:
+            row = rows[str(memory_id)]
+            scope = row[col["scope"]]
+            scope_id = row[col["scope_id"]]
+            points.append(
+                {
+                    "id": str(vector_id),
+                    "vector": vectors[str(memory_id)],
+                    "payload": {
+                        "memory_id": str(memory_id),
+                        "scope": scope,
+                        "scope_id": scope_id,
+                        "team_id": scope_id if scope == "team" else None,
+                        "owner_id": str(owner_id),
+                        "tags": row[col["tags"]],
+                        "classification": row[col["classification"]],
+                        "required_clearance": row[col["required_clearance"]],
+                        "memory_type": row[col["memory_type"]],
+                        "created_at": row[col["created_at"]].isoformat(),
+                        "created_ts": row[col["created_at"]].timestamp(),
+                    },
+                }
+            )
+        await QdrantService.upsert_memories(self.org_id, points)
@@ -7,7 +7,7 @@ Supports JSON, Markdown, and S3 storage.
 
 import json
 import zipfile
-from typing import List, Optional, Dict, Any, BinaryIO
+from typing import List, Optional, Dict, Any, BinaryIO, Union
 from datetime import datetime, timedelta
 from pathlib import Path
 import logging
@@ -17,12 +17,19 @@ import io
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_
 
+from app.core.config import settings
+from app.core.pagination import KeysetPage, keyset_page
+from app.core.qdrant import QdrantService
 from app.models.memory import Memory
 from app.models.memory_snapshot import MemorySnapshot, SnapshotType, SnapshotStatus
 from app.services.memory_service import MemoryService
+from app.services.snapshot_import import SnapshotBulkImporter
 
 logger = logging.getLogger(__name__)
 
+# 2.0 added per-memory ``vector`` and the full MemoryMetadata column set.
+SNAPSHOT_FORMAT_VERSION = "2.0"
+
 
 class SnapshotService:
     """Service for creating and managing memory snapshots."""
@@ -169,30 +176,57 @@ class SnapshotService:
         return result.scalars().all()
     
     async def _export_json(self, memories: List[Memory]) -> bytes:
-        """Export memories to JSON format."""
+        """
+        Export memories to JSON format.
+        
+        Format 2.0 embeds each memory's vector so restores don't need to
+        re-embed (see ``SnapshotBulkImporter``).
+        """
+        vectors: Dict[str, List[float]] = {}
+        batch_size = settings.SNAPSHOT_IMPORT_BATCH_SIZE
+        for i in range(0, len(memories), batch_size):
+            vectors.update(
+                await QdrantService.retrieve_vectors(
+                    str(self.org_id),
+                    [m.vector_id for m in memories[i:i + batch_size] if m.vector_id],
+                )
+            )
+        
         data = {
-            "version": "1.0",
+            "version": SNAPSHOT_FORMAT_VERSION,
             "export_date": datetime.utcnow().isoformat(),
             "organization_id": str(self.org_id),
             "memory_count": len(memories),
+            "embedding_dimensions": settings.EMBEDDING_DIMENSIONS,
             "memories": [
                 {
                     "id": str(m.id),
+                    "owner_id": m.owner_id,
                     "title": m.title,
-                    "content": m.content,
+                    "content_preview": m.content_preview,
+                    "content_hash": m.content_hash,
                     "scope": m.scope,
+                    "scope_id": m.scope_id,
+                    "memory_type": m.memory_type,
+                    "classification": m.classification,
+                    "required_clearance": m.required_clearance,
                     "tags": m.tags,
-                    "session_id": m.session_id,
-                    "agent_name": m.agent_name,
+                    "entities": m.entities,
+                    "extra_metadata": m.extra_metadata,
+                    "source_type": m.source_type,
+                    "source_id": m.source_id,
+                    "retention_days": m.retention_days,
                     "created_at": m.created_at.isoformat() if m.created_at else None,
                     "updated_at": m.updated_at.isoformat() if m.updated_at else None,
-                    "metadata": m.metadata
+                    "vector_id": m.vector_id,
+                    "embedding_model": m.embedding_model,
+                    "vector": vectors.get(m.vector_id),
                 }
                 for m in memories
             ]
         }
         
-        return json.dumps(data, indent=2).encode('utf-8')
+        return json.dumps(data).encode('utf-8')
     
     async def _export_markdown(self, memories: List[Memory]) -> bytes:
         """Export memories to Markdown format."""
@@ -216,12 +250,10 @@ class SnapshotService:
                 f"**Scope**: {m.scope}  ",
                 f"**Tags**: {', '.join(m.tags) if m.tags else 'None'}  ",
                 f"**Created**: {m.created_at.isoformat() if m.created_at else 'N/A'}  ",
-                f"**Session**: {m.session_id or 'N/A'}  ",
-                f"**Agent**: {m.agent_name or 'N/A'}  ",
                 f"",
                 f"### Content",
                 f"",
-                m.content,
+                m.content_preview,
                 f"",
                 f"---",
                 f""
@@ -245,7 +277,7 @@ class SnapshotService:
             # Add individual memory files
             for m in memories:
                 filename = f"memories/{m.id}.md"
-                content = f"# {m.title}\n\n{m.content}"
+                content = f"# {m.title}\n\n{m.content_preview}"
                 zf.writestr(filename, content.encode('utf-8'))
         
         buffer.seek(0)
@@ -283,9 +315,10 @@ class SnapshotService:
         self,
         status: Optional[SnapshotStatus] = None,
         limit: int = 50,
-        offset: int = 0
-    ) -> List[MemorySnapshot]:
-        """List snapshots for organization."""
+        offset: int = 0,
+        cursor: Optional[str] = None,
+    ) -> KeysetPage:
+        """List snapshots for organization, newest first (keyset-paged by ``cursor``)."""
         stmt = select(MemorySnapshot).where(
             MemorySnapshot.organization_id == self.org_id
         )
@@ -293,11 +326,15 @@ class SnapshotService:
         if status:
             stmt = stmt.where(MemorySnapshot.status == status)
         
-        stmt = stmt.order_by(MemorySnapshot.created_at.desc())
-        stmt = stmt.limit(limit).offset(offset)
-        
-        result = await self.db.execute(stmt)
-        return result.scalars().all()
+        return await keyset_page(
+            self.db,
+            stmt,
+            MemorySnapshot.created_at,
+            MemorySnapshot.id,
+            limit=limit,
+            cursor=cursor,
+            offset=offset,
+        )
     
     async def download_snapshot(self, snapshot_id: uuid.UUID) -> Optional[bytes]:
         """Download snapshot content."""
@@ -314,80 +351,40 @@ class SnapshotService:
     
     async def import_snapshot(
         self,
-        content: bytes,
+        content: Union[bytes, BinaryIO],
         format: str = "json",
-        overwrite: bool = False
+        overwrite: bool = False,
+        clearance_level: int = 0,
     ) -> Dict[str, Any]:
         """
         Import memories from snapshot.
         
+        The snapshot is streamed batch by batch through
+        ``SnapshotBulkImporter`` (COPY into a staging table, set-based merge,
+        batched Qdrant upserts reusing the snapshot's stored vectors).
+        
         Args:
-            content: Snapshot content bytes
+            content: Snapshot bytes or a readable binary file object
             format: Format (json, zip)
             overwrite: Whether to overwrite existing memories
+            clearance_level: Importer's clearance (for overwrite access checks)
             
         Returns:
             Import result with counts
         """
+        source = io.BytesIO(content) if isinstance(content, (bytes, bytearray)) else content
         try:
-            if format == "json":
-                data = json.loads(content.decode('utf-8'))
-                memories_data = data.get("memories", [])
-            elif format == "zip":
-                # Extract JSON from ZIP
-                buffer = io.BytesIO(content)
-                with zipfile.ZipFile(buffer, 'r') as zf:
-                    json_content = zf.read("memories.json")
-                    data = json.loads(json_content.decode('utf-8'))
-                    memories_data = data.get("memories", [])
-            else:
-                raise ValueError(f"Unsupported import format: {format}")
-            
-            imported = 0
-            skipped = 0
-            errors = []
-            
-            for mem_data in memories_data:
-                try:
-                    # Check if memory exists
-                    memory_id = uuid.UUID(mem_data["id"])
-                    existing = await self.memory_service.get_memory(str(memory_id))
-                    
-                    if existing and not overwrite:
-                        skipped += 1
-                        continue
-                    
-                    # Create or update memory
-                    from app.schemas.memory import MemoryCreate
-                    memory_create = MemoryCreate(
-                        title=mem_data["title"],
-                        content=mem_data["content"],
-                        scope=mem_data.get("scope", "private"),
-                        tags=mem_data.get("tags", []),
-                        session_id=mem_data.get("session_id"),
-                        agent_name=mem_data.get("agent_name"),
-                        metadata=mem_data.get("metadata", {})
-                    )
-                    
-                    await self.memory_service.create_memory(
-                        memory_create,
-                        user_id=str(self.user_id),
-                        org_id=str(self.org_id)
-                    )
-                    
-                    imported += 1
-                
-                except Exception as e:
-                    errors.append(f"Memory {mem_data.get('id')}: {str(e)}")
-            
+            importer = SnapshotBulkImporter(
+                self.db, str(self.org_id), str(self.user_id), clearance_level=clearance_level
+            )
+            result = await importer.run(source, format=format, overwrite=overwrite)
             await self.db.commit()
             
-            return {
-                "imported": imported,
-                "skipped": skipped,
-                "errors": errors,
-                "total": len(memories_data)
-            }
+            logger.info(
+                f"Imported snapshot for org {self.org_id}: "
+                f"{result['imported']} new, {result['updated']} updated, {result['skipped']} skipped"
+            )
+            return result
         
         except Exception as e:
             logger.error(f"Error importing snapshot: {e}")
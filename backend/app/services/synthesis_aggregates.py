@@ -0,0 +1,408 @@
+"""backend.app.services.synthesis_aggregates
+
+Incrementally maintained aggregates for knowledge synthesis reports.
+
+Every memory create, re-tag and delete applies a small delta (one upsert per
+table) to the per-org tag counters, tag co-occurrence counters and weekly
+histograms in ``app.models.knowledge_synthesis``. Reports then read a handful
+of pre-aggregated rows instead of scanning the org's memories and issuing a
+relationship query per cluster.
+
+Upserts write their rows in conflict-key order so concurrent writers lock
+them in the same order. There is no per-org "all memories" counter: every
+create would update that one row, serializing the org's writers. Weekly
+totals are counted from the ``memory_metadata`` index at read time instead.
+
+Relationship counts follow the graph: a re-tag or delete adjusts them from the
+memory's own edges, and a wholesale relationship rebuild recounts them.
+``refresh()`` recomputes everything for an org with set-based SQL; it repairs
+drift from paths that bypass ``MemoryService`` (consolidation, raw SQL).
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+from itertools import combinations
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, case, func, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.knowledge_synthesis import (
+    KnowledgeTagPair,
+    KnowledgeTagStat,
+    KnowledgeTagWeek,
+)
+from app.models.memory import MemoryMetadata
+
+
+def week_start(ts: Optional[datetime]) -> date:
+    """Monday (UTC) of the week containing ``ts``; matches ``date_trunc('week')``."""
+    ts = ts or datetime.now(timezone.utc)
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    day = ts.astimezone(timezone.utc).date()
+    return day - timedelta(days=day.weekday())
+
+
+def _tag_pairs(tags: Iterable[str]) -> set[Tuple[str, str]]:
+    return set(combinations(sorted(set(tags)), 2))
+
+
+def cluster_strength(memory_count: int, relationship_count: int) -> float:
+    """Relationship density of a cluster (0-1); 0.5 for clusters under two memories."""
+    max_possible = memory_count * (memory_count - 1)
+    if max_possible <= 0:
+        return 0.5
+    return min(1.0, relationship_count / max_possible * 2)
+
+
+_EDGE_COUNTS_SQL = text("""
+SELECT t.tag, count(*) AS edges
+FROM graph_relationships gr
+JOIN memory_metadata o
+  ON o.id::text = CASE WHEN gr.from_memory_id = :memory_id
+                       THEN gr.to_memory_id ELSE gr.from_memory_id END
+CROSS JOIN unnest(CAST(:tags AS varchar[])) AS t(tag)
+WHERE gr.organization_id = CAST(:org_id AS uuid)
+  AND (gr.from_memory_id = :memory_id OR gr.to_memory_id = :memory_id)
+  AND o.is_active
+  AND t.tag = ANY(o.tags)
+GROUP BY t.tag
+""")
+
+# Distinct tags of an active memory, as a lateral row source.
+_DISTINCT_TAGS = "(SELECT DISTINCT x FROM unnest(m.tags) AS x)"
+
+_REFRESH_SQL = (
+    "DELETE FROM knowledge_tag_stats WHERE organization_id = CAST(:org_id AS uuid)",
+    "DELETE FROM knowledge_tag_pairs WHERE organization_id = CAST(:org_id AS uuid)",
+    "DELETE FROM knowledge_tag_weeks WHERE organization_id = CAST(:org_id AS uuid)",
+    f"""
+    INSERT INTO knowledge_tag_stats (organization_id, tag, memory_count, relationship_count)
+    SELECT m.organization_id, t.tag, count(*), 0
+    FROM memory_metadata m CROSS JOIN LATERAL {_DISTINCT_TAGS} AS t(tag)
+    WHERE m.organization_id = CAST(:org_id AS uuid) AND m.is_active
+    GROUP BY m.organization_id, t.tag
+    """,
+    f"""
+    INSERT INTO knowledge_tag_pairs (organization_id, tag_a, tag_b, memory_count)
+    SELECT m.organization_id, a.tag, b.tag, count(*)
+    FROM memory_metadata m
+    CROSS JOIN LATERAL {_DISTINCT_TAGS} AS a(tag)
+    CROSS JOIN LATERAL {_DISTINCT_TAGS} AS b(tag)
+    WHERE m.organization_id = CAST(:org_id AS uuid) AND m.is_active AND a.tag < b.tag
+    GROUP BY m.organization_id, a.tag, b.tag
+    """,
+    f"""
+    INSERT INTO knowledge_tag_weeks (organization_id, tag, week_start, memory_count)
+    SELECT m.organization_id, t.tag,
+           date_trunc('week', m.created_at AT TIME ZONE 'UTC')::date, count(*)
+    FROM memory_metadata m
+    CROSS JOIN LATERAL {_DISTINCT_TAGS} AS t(tag)
+    WHERE m.organization_id = CAST(:org_id AS uuid) AND m.is_active
+    GROUP BY m.organization_id, t.tag, 3
+    """,
+)
+
+_RELATIONSHIP_COUNTS_SQL = (
+    """
+    UPDATE knowledge_tag_stats SET relationship_count = 0, updated_at = now()
+    WHERE organization_id = CAST(:org_id AS uuid) AND relationship_count <> 0
+    """,
+    f"""
+    UPDATE knowledge_tag_stats s
+    SET relationship_count = r.edges, updated_at = now()
+    FROM (
+        SELECT t.tag, count(*) AS edges
+        FROM graph_relationships gr
+        JOIN memory_metadata m ON m.id::text = gr.from_memory_id
+        JOIN memory_metadata b ON b.id::text = gr.to_memory_id
+        CROSS JOIN LATERAL {_DISTINCT_TAGS} AS t(tag)
+        WHERE gr.organization_id = CAST(:org_id AS uuid)
+          AND m.is_active AND b.is_active
+          AND t.tag = ANY(b.tags)
+        GROUP BY t.tag
+    ) r
+    WHERE s.organization_id = CAST(:org_id AS uuid) AND s.tag = r.tag
+    """,
+)
+
+
+class SynthesisAggregates:
+    """Maintains and reads the synthesis aggregates of one organization."""
+
+    def __init__(self, session: AsyncSession, org_id: str):
+        self.session = session
+        self.org_id = str(org_id)
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    async def apply_memory_change(
+        self,
+        memory_id: Optional[str],
+        old_tags: Optional[Sequence[str]],
+        new_tags: Optional[Sequence[str]],
+        created_at: Optional[datetime],
+    ) -> None:
+        """
+        Apply one memory's transition to the aggregates.
+
+        ``old_tags=None`` means the memory did not count before (created);
+        ``new_tags=None`` means it no longer counts (deleted/deactivated).
+        """
+        old = set(old_tags or ())
+        new = set(new_tags or ())
+
+        tag_delta: Counter = Counter()
+        for tag in new - old:
+            tag_delta[tag] += 1
+        for tag in old - new:
+            tag_delta[tag] -= 1
+
+        pair_delta: Counter = Counter()
+        old_pairs, new_pairs = _tag_pairs(old), _tag_pairs(new)
+        for pair in new_pairs - old_pairs:
+            pair_delta[pair] += 1
+        for pair in old_pairs - new_pairs:
+            pair_delta[pair] -= 1
+
+        # A brand-new memory has no edges yet; otherwise move its edges along
+        # with the tags it gained or lost.
+        edge_delta: Dict[str, int] = {}
+        if memory_id and old_tags is not None and tag_delta:
+            edges = await self._edge_counts(str(memory_id), list(tag_delta))
+            edge_delta = {t: (1 if d > 0 else -1) * edges.get(t, 0) for t, d in tag_delta.items()}
+
+        await self._upsert_tag_stats(tag_delta, edge_delta)
+        await self._upsert_pairs(pair_delta)
+        week = week_start(created_at)
+        await self._upsert_weeks(Counter({(tag, week): d for tag, d in tag_delta.items()}))
+
+    async def apply_created(self, memories: Sequence[Tuple[Sequence[str], Optional[datetime]]]) -> None:
+        """
+        Count many new memories at once, given as ``(tags, created_at)``.
+
+        Equivalent to ``apply_memory_change(None, None, tags, created_at)``
+        per memory, with one upsert per aggregate table.
+        """
+        tag_delta: Counter = Counter()
+        pair_delta: Counter = Counter()
+        week_delta: Counter = Counter()
+        for tags, created_at in memories:
+            unique = set(tags or ())
+            week = week_start(created_at)
+            tag_delta.update(unique)
+            pair_delta.update(_tag_pairs(unique))
+            week_delta.update((tag, week) for tag in unique)
+
+        await self._upsert_tag_stats(tag_delta, {})
+        await self._upsert_pairs(pair_delta)
+        await self._upsert_weeks(week_delta)
+
+    async def _edge_counts(self, memory_id: str, tags: List[str]) -> Dict[str, int]:
+        result = await self.session.execute(
+            _EDGE_COUNTS_SQL,
+            {"memory_id": memory_id, "tags": tags, "org_id": self.org_id},
+        )
+        return {str(tag): int(edges) for tag, edges in result.all()}
+
+    async def _upsert_tag_stats(self, tag_delta: Counter, edge_delta: Dict[str, int]) -> None:
+        rows = [
+            {
+                "organization_id": self.org_id,
+                "tag": tag,
+                "memory_count": delta,
+                "relationship_count": edge_delta.get(tag, 0),
+            }
+            for tag, delta in sorted(tag_delta.items())
+            if delta or edge_delta.get(tag)
+        ]
+        if not rows:
+            return
+        stmt = pg_insert(KnowledgeTagStat).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[KnowledgeTagStat.organization_id, KnowledgeTagStat.tag],
+            set_={
+                "memory_count": KnowledgeTagStat.memory_count + stmt.excluded.memory_count,
+                "relationship_count": (
+                    KnowledgeTagStat.relationship_count + stmt.excluded.relationship_count
+                ),
+                "updated_at": func.now(),
+            },
+        )
+        await self.session.execute(stmt)
+
+    async def _upsert_pairs(self, pair_delta: Counter) -> None:
+        rows = [
+            {"organization_id": self.org_id, "tag_a": a, "tag_b": b, "memory_count": delta}
+            for (a, b), delta in sorted(pair_delta.items())
+            if delta
+        ]
+        if not rows:
+            return
+        stmt = pg_insert(KnowledgeTagPair).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[
+                KnowledgeTagPair.organization_id,
+                KnowledgeTagPair.tag_a,
+                KnowledgeTagPair.tag_b,
+            ],
+            set_={
+                "memory_count": KnowledgeTagPair.memory_count + stmt.excluded.memory_count,
+                "updated_at": func.now(),
+            },
+        )
+        await self.session.execute(stmt)
+
+    async def _upsert_weeks(self, week_delta: Counter) -> None:
+        rows = [
+            {"organization_id": self.org_id, "tag": tag, "week_start": week, "memory_count": delta}
+            for (tag, week), delta in sorted(week_delta.items())
+            if delta
+        ]
+        if not rows:
+            return
+        stmt = pg_insert(KnowledgeTagWeek).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[
+                KnowledgeTagWeek.organization_id,
+                KnowledgeTagWeek.tag,
+                KnowledgeTagWeek.week_start,
+            ],
+            set_={
+                "memory_count": KnowledgeTagWeek.memory_count + stmt.excluded.memory_count,
+                "updated_at": func.now(),
+            },
+        )
+        await self.session.execute(stmt)
+
+    async def refresh(self) -> None:
+        """Recompute all aggregates of the org from memory_metadata and the graph."""
+        params = {"org_id": self.org_id}
+        for sql in _REFRESH_SQL:
+            await self.session.execute(text(sql), params)
+        await self.refresh_relationship_counts()
+
+    async def refresh_relationship_counts(self) -> None:
+        """Recount per-tag relationships (after the org's graph was rebuilt)."""
+        params = {"org_id": self.org_id}
+        for sql in _RELATIONSHIP_COUNTS_SQL:
+            await self.session.execute(text(sql), params)
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    async def top_clusters(self, since: date, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Tags active since ``since``, ranked by cohesion.
+
+        Window counts and date ranges come from the weekly histogram;
+        cohesion uses the all-time tag and relationship counters.
+        """
+        window = (
+            select(
+                KnowledgeTagWeek.tag.label("tag"),
+                func.sum(KnowledgeTagWeek.memory_count).label("window_count"),
+                func.min(KnowledgeTagWeek.week_start).label("first_week"),
+                func.max(KnowledgeTagWeek.week_start).label("last_week"),
+            )
+            .where(
+                and_(
+                    KnowledgeTagWeek.organization_id == self.org_id,
+                    KnowledgeTagWeek.week_start >= since,
+                    KnowledgeTagWeek.memory_count > 0,
+                )
+            )
+            .group_by(KnowledgeTagWeek.tag)
+            .subquery()
+        )
+        n = KnowledgeTagStat.memory_count
+        strength = case(
+            (n < 2, 0.5),
+            else_=func.least(
+                1.0, KnowledgeTagStat.relationship_count * 2.0 / (n * (n - 1))
+            ),
+        ).label("strength")
+        stmt = (
+            select(
+                KnowledgeTagStat.tag,
+                KnowledgeTagStat.memory_count,
+                KnowledgeTagStat.relationship_count,
+                window.c.window_count,
+                window.c.first_week,
+                window.c.last_week,
+                strength,
+            )
+            .join(window, window.c.tag == KnowledgeTagStat.tag)
+            .where(
+                and_(
+                    KnowledgeTagStat.organization_id == self.org_id,
+                    KnowledgeTagStat.memory_count > 0,
+                )
+            )
+            .order_by(strength.desc(), window.c.window_count.desc(), KnowledgeTagStat.tag)
+            .limit(limit)
+        )
+        return [dict(row._mapping) for row in (await self.session.execute(stmt)).all()]
+
+    async def weekly_totals(self, since: date) -> List[Tuple[date, int]]:
+        """Active memories created per week since ``since``, counted from memory_metadata."""
+        week = func.date_trunc(
+            "week", func.timezone("UTC", MemoryMetadata.created_at)
+        ).label("week")
+        stmt = (
+            select(week, func.count())
+            .where(
+                and_(
+                    MemoryMetadata.organization_id == self.org_id,
+                    MemoryMetadata.is_active,
+                    MemoryMetadata.created_at
+                    >= datetime.combine(since, datetime.min.time(), tzinfo=timezone.utc),
+                )
+            )
+            .group_by(week)
+            .order_by(week)
+        )
+        return [
+            (week.date() if isinstance(week, datetime) else week, int(count))
+            for week, count in (await self.session.execute(stmt)).all()
+        ]
+
+    async def memory_count(self, tag: str) -> int:
+        """Active memories of the org carrying ``tag``, from the counters."""
+        stmt = select(KnowledgeTagStat.memory_count).where(
+            and_(
+                KnowledgeTagStat.organization_id == self.org_id,
+                KnowledgeTagStat.tag == tag,
+            )
+        )
+        return max(0, int((await self.session.execute(stmt)).scalar() or 0))
+
+    async def cooccurring(self, tags: Sequence[str], per_tag: int = 10) -> Dict[str, List[str]]:
+        """Most frequent co-occurring tags for each of ``tags``."""
+        if not tags:
+            return {}
+        stmt = (
+            select(KnowledgeTagPair.tag_a, KnowledgeTagPair.tag_b, KnowledgeTagPair.memory_count)
+            .where(
+                and_(
+                    KnowledgeTagPair.organization_id == self.org_id,
+                    KnowledgeTagPair.memory_count > 0,
+                    KnowledgeTagPair.tag_a.in_(tags) | KnowledgeTagPair.tag_b.in_(tags),
+                )
+            )
+            .order_by(KnowledgeTagPair.memory_count.desc())
+        )
+        wanted = set(tags)
+        related: Dict[str, List[str]] = {tag: [] for tag in tags}
+        for a, b, _ in (await self.session.execute(stmt)).all():
+            for tag, other in ((a, b), (b, a)):
+                if tag in wanted and len(related[tag]) < per_tag:
+                    related[tag].append(other)
+        return related
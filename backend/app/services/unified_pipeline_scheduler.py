@@ -7,18 +7,26 @@ Central queue for consolidation, critique, and evaluation tasks with:
 - Per-tenant concurrency caps
 - Backpressure management
 - Starvation prevention (fairness)
+
+Workers claim batches in one ``FOR UPDATE SKIP LOCKED`` statement with
+weighted fair share across organizations, and enqueue admission reads Redis
+counters instead of counting rows (see ``app.services.pipeline_queue``).
 """
 
 import uuid
-from datetime import datetime, timedelta
+from collections import Counter
+from datetime import timedelta
 from typing import Optional, Dict, Any, List
 from enum import Enum
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, and_, func
+from sqlalchemy import select, and_, func
 import logging
 
-from app.models.agent_process import AgentProcess, ProcessStatus
+from app.core.config import settings
+from app.models.agent_process import AgentProcess
+from app.models.base import utc_now
 from app.services.audit_service import AuditService
+from app.services.pipeline_queue import PipelineQueueCounters, fair_share_claim, fair_share_weights
 
 logger = logging.getLogger(__name__)
 
@@ -52,7 +60,7 @@ class PipelineSLA:
         if task.started_at is None:
             return False
 
-        elapsed = (datetime.utcnow() - task.started_at).total_seconds()
+        elapsed = (utc_now() - task.started_at).total_seconds()
         return elapsed > self.max_latency_seconds
 
 
@@ -70,6 +78,7 @@ class UnifiedPipelineScheduler:
 
     def __init__(self, db: AsyncSession):
         self.db = db
+        self.counters = PipelineQueueCounters("unified")
         # Default SLAs per task type
         self.slas = {
             PipelineTaskType.CONSOLIDATION: PipelineSLA(
@@ -105,33 +114,35 @@ class UnifiedPipelineScheduler:
         Raises:
             ValueError: If queue is full (backpressure)
         """
-        # Check rate limit
-        if not await self._check_rate_limit(organization_id, task_type):
-            raise ValueError(f"Rate limit exceeded for {task_type.value}")
-
         # Check queue depth (backpressure)
         queue_depth = await self._get_queue_depth(organization_id)
-        if queue_depth > 1000:  # Hardcoded limit
+        if queue_depth >= settings.PIPELINE_MAX_QUEUE_DEPTH:
             raise ValueError("Pipeline queue overflow - backpressure applied")
 
+        # Check rate limit (counts this enqueue when admitted)
+        if not await self._check_rate_limit(organization_id, task_type):
+            raise ValueError(f"Rate limit exceeded for {task_type.value}")
+
         # Use SLA priority if not specified
         if priority is None:
             priority = self.slas[task_type].priority
 
         # Create process
         process = AgentProcess(
-            id=uuid.uuid4(),
-            organization_id=organization_id,
-            agent_name=f"pipeline_{task_type.value}",
-            status=ProcessStatus.queued,
+            id=str(uuid.uuid4()),
+            organization_id=str(organization_id),
+            agent_name=self._agent_name(task_type),
+            status="queued",
             priority=priority,
-            created_by_user_id=user_id,
-            session_id=session_id,
-            metadata={
+            attempts=0,
+            max_attempts=self.slas[task_type].max_retry_attempts,
+            session_id=str(session_id) if session_id else None,
+            process_metadata={
                 "task_type": task_type.value,
                 "task_name": task_name,
                 "input_data": input_data,
-                "sla_deadline": (datetime.utcnow() + timedelta(
+                "created_by_user_id": str(user_id) if user_id else None,
+                "sla_deadline": (utc_now() + timedelta(
                     seconds=self.slas[task_type].max_latency_seconds
                 )).isoformat()
             }
@@ -139,6 +150,7 @@ class UnifiedPipelineScheduler:
 
         self.db.add(process)
         await self.db.flush()
+        await self.counters.adjust_depth(str(organization_id), 1)
 
         # Audit
         audit_svc = AuditService(self.db)
@@ -160,46 +172,57 @@ class UnifiedPipelineScheduler:
         return process
 
     async def dequeue_next_task(self) -> Optional[AgentProcess]:
+        """Dequeue the next task (a claim of one, see ``claim_tasks``)."""
+        tasks = await self.claim_tasks(limit=1)
+        return tasks[0] if tasks else None
+
+    async def claim_tasks(self, limit: Optional[int] = None) -> List[AgentProcess]:
         """
-        Dequeue next task respecting fairness and concurrency limits.
+        Claim up to ``limit`` tasks respecting fairness and concurrency limits.
         
-        Algorithm:
-        1. Find org with lowest current load (fairness)
-        2. Check concurrency cap for that org
-        3. Return highest priority queued task from that org
+        Algorithm (one statement):
+        1. Rank each org's queued tasks by priority, then FIFO
+        2. Drop tasks beyond the org's concurrency cap (running + claimed)
+        3. Interleave orgs by weighted fair share, least-served first
+        4. Lock the batch with SKIP LOCKED so other workers take the next one
         """
-        # Find org with lowest running task count
-        org_loads = await self._get_org_loads()
-
-        for org_id in sorted(org_loads.keys(), key=lambda x: org_loads[x]):
-            # Check if org has hit concurrency cap
-            running_count = org_loads[org_id]
-            if running_count >= await self._get_concurrency_cap(org_id):
-                continue
-
-            # Get highest priority queued task from this org
-            stmt = select(AgentProcess).where(
-                and_(
-                    AgentProcess.organization_id == org_id,
-                    AgentProcess.status == ProcessStatus.queued
-                )
-            ).order_by(
+        stmt = fair_share_claim(
+            AgentProcess,
+            eligible=[
+                AgentProcess.status == "queued",
+                AgentProcess.agent_name.in_(self._agent_names()),
+                AgentProcess.attempts < AgentProcess.max_attempts,
+            ],
+            order_by=[
                 AgentProcess.priority.asc(),  # Lower priority value = higher priority
-                AgentProcess.created_at.asc()  # FIFO for same priority
-            ).limit(1)
-
-            result = await self.db.execute(stmt)
-            task = result.scalar_one_or_none()
-
-            if task:
-                task.status = ProcessStatus.running
-                task.started_at = datetime.utcnow()
-                await self.db.flush()
+                AgentProcess.created_at.asc(),  # FIFO for same priority
+            ],
+            running=and_(
+                AgentProcess.status == "running",
+                AgentProcess.agent_name.in_(self._agent_names()),
+            ),
+            limit=limit or settings.PIPELINE_CLAIM_BATCH_SIZE,
+            weights=fair_share_weights(),
+            max_running_per_org=settings.PIPELINE_MAX_RUNNING_PER_ORG,
+        )
+        tasks = list((await self.db.execute(stmt)).scalars().all())
+        if not tasks:
+            return []
+
+        now = utc_now()
+        for task in tasks:
+            task.status = "running"
+            task.started_at = now
+            task.attempts += 1
+        await self.db.flush()
 
-                logger.info(f"Dequeued pipeline task: {task.id} (org={task.organization_id})")
-                return task
+        claimed = Counter(str(task.organization_id) for task in tasks)
+        await self.counters.adjust_depths((org_id, -n) for org_id, n in claimed.items())
 
-        return None
+        logger.info(
+            "Claimed %d pipeline tasks across %d orgs", len(tasks), len(claimed)
+        )
+        return tasks
 
     async def mark_task_succeeded(
         self,
@@ -207,26 +230,21 @@ class UnifiedPipelineScheduler:
         output_data: Optional[Dict[str, Any]] = None
     ) -> None:
         """Mark pipeline task as succeeded."""
-        stmt = select(AgentProcess).where(AgentProcess.id == task_id)
-        result = await self.db.execute(stmt)
-        task = result.scalar_one_or_none()
-
-        if not task:
-            raise ValueError("Task not found")
+        task = await self._get_task(task_id)
 
-        task.status = ProcessStatus.succeeded
-        task.completed_at = datetime.utcnow()
+        task.status = "succeeded"
+        task.finished_at = utc_now()
         if output_data:
-            task.metadata["output_data"] = output_data
+            task.process_metadata = {**(task.process_metadata or {}), "output_data": output_data}
 
         # Check SLA
-        sla = self.slas.get(PipelineTaskType(task.metadata["task_type"]))
+        sla = self.slas.get(PipelineTaskType(task.process_metadata["task_type"]))
         sla_violated = sla and sla.is_sla_violated(task)
 
         if sla_violated:
             logger.warning(
                 f"SLA VIOLATED: task={task.id} "
-                f"elapsed={(datetime.utcnow() - task.started_at).total_seconds()}s "
+                f"elapsed={(utc_now() - task.started_at).total_seconds()}s "
                 f"limit={sla.max_latency_seconds}s"
             )
 
@@ -238,32 +256,28 @@ class UnifiedPipelineScheduler:
         error_message: str
     ) -> None:
         """Mark pipeline task as failed."""
-        stmt = select(AgentProcess).where(AgentProcess.id == task_id)
-        result = await self.db.execute(stmt)
-        task = result.scalar_one_or_none()
-
-        if not task:
-            raise ValueError("Task not found")
+        task = await self._get_task(task_id)
 
         # Check retry count
         max_retries = self.slas[
-            PipelineTaskType(task.metadata["task_type"])
+            PipelineTaskType(task.process_metadata["task_type"])
         ].max_retry_attempts
 
-        if (task.attempt_count or 0) < max_retries:
+        task.last_error = error_message
+        if (task.attempts or 0) < max_retries:
             # Retry
-            task.status = ProcessStatus.queued
-            task.attempt_count = (task.attempt_count or 0) + 1
-            task.metadata["last_error"] = error_message
+            task.status = "queued"
+            task.started_at = None
+            await self.counters.adjust_depth(str(task.organization_id), 1)
             logger.info(
                 f"Task failed, retrying: {task.id} "
-                f"(attempt {task.attempt_count}/{max_retries})"
+                f"(attempt {task.attempts}/{max_retries})"
             )
         else:
             # Give up
-            task.status = ProcessStatus.failed
-            task.completed_at = datetime.utcnow()
-            task.metadata["final_error"] = error_message
+            task.status = "failed"
+            task.finished_at = utc_now()
+            task.process_metadata = {**(task.process_metadata or {}), "final_error": error_message}
             logger.error(f"Task failed permanently: {task.id} - {error_message}")
 
         await self.db.flush()
@@ -272,55 +286,61 @@ class UnifiedPipelineScheduler:
     # Internal Helpers
     # =========================================================================
 
+    @staticmethod
+    def _agent_name(task_type: PipelineTaskType) -> str:
+        return f"pipeline_{task_type.value}"
+
+    @classmethod
+    def _agent_names(cls) -> List[str]:
+        return [cls._agent_name(t) for t in PipelineTaskType]
+
+    async def _get_task(self, task_id: uuid.UUID) -> AgentProcess:
+        stmt = select(AgentProcess).where(AgentProcess.id == str(task_id))
+        result = await self.db.execute(stmt)
+        task = result.scalar_one_or_none()
+
+        if not task:
+            raise ValueError("Task not found")
+        return task
+
     async def _check_rate_limit(
         self,
         organization_id: uuid.UUID,
         task_type: PipelineTaskType
     ) -> bool:
-        """Check if org is under rate limit for this task type."""
-        # Count requests in last minute
-        one_minute_ago = datetime.utcnow() - timedelta(minutes=1)
+        """Check (and count) an enqueue against the org's per-minute limit for this task type."""
+        sla = self.slas[task_type]
+        admitted = await self.counters.admit(
+            str(organization_id), task_type.value, sla.target_throughput_per_minute
+        )
+        if admitted is not None:
+            return admitted
+
+        # Redis unavailable: count requests in last minute
+        one_minute_ago = utc_now() - timedelta(minutes=1)
 
         stmt = select(func.count(AgentProcess.id)).where(
             and_(
-                AgentProcess.organization_id == organization_id,
+                AgentProcess.organization_id == str(organization_id),
+                AgentProcess.agent_name == self._agent_name(task_type),
                 AgentProcess.created_at >= one_minute_ago
             )
         )
         result = await self.db.execute(stmt)
         count = result.scalar() or 0
-
-        sla = self.slas[task_type]
         return count < sla.target_throughput_per_minute
 
     async def _get_queue_depth(self, organization_id: uuid.UUID) -> int:
-        """Get number of queued tasks for org."""
-        stmt = select(func.count(AgentProcess.id)).where(
-            and_(
-                AgentProcess.organization_id == organization_id,
-                AgentProcess.status == ProcessStatus.queued
+        """Get number of queued tasks for org (maintained counter, seeded by a count)."""
+        async def _count() -> int:
+            stmt = select(func.count(AgentProcess.id)).where(
+                and_(
+                    AgentProcess.organization_id == str(organization_id),
+                    AgentProcess.agent_name.in_(self._agent_names()),
+                    AgentProcess.status == "queued"
+                )
             )
-        )
-        result = await self.db.execute(stmt)
-        return result.scalar() or 0
-
-    async def _get_org_loads(self) -> Dict[uuid.UUID, int]:
-        """Get current running task count per org."""
-        stmt = select(
-            AgentProcess.organization_id,
-            func.count(AgentProcess.id).label("count")
-        ).where(
-            AgentProcess.status == ProcessStatus.running
-        ).group_by(
-            AgentProcess.organization_id
-        )
-        result = await self.db.execute(stmt)
-        rows = result.all()
-
-        return {row[0]: row[1] for row in rows}
+            result = await self.db.execute(stmt)
+            return result.scalar() or 0
 
-    async def _get_concurrency_cap(self, organization_id: uuid.UUID) -> int:
-        """Get max concurrent tasks allowed for org."""
-        # In production, look up org settings
-        # For now, default to 5
-        return 5
+        return await self.counters.queue_depth(str(organization_id), _count)
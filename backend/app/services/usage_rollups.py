@@ -0,0 +1,450 @@
+"""backend.app.services.usage_rollups
+
+Pre-aggregated request latency and token usage per org.
+
+Request and token events are folded into in-process deltas keyed by
+(org, granularity, bucket, metric, dimension, sub_dimension) and upserted
+into ``usage_rollups`` in one multi-row ``ON CONFLICT`` statement per org,
+at most every USAGE_ROLLUP_FLUSH_SECONDS. Once USAGE_ROLLUP_MAX_PENDING
+buckets are waiting across all orgs, every org is flushed. A background task
+(``start``/``stop``, run by the app lifespan) also flushes orgs that have gone
+quiet, and ``stop`` flushes everything on shutdown. Counters add, maxima take the greater value, and
+latency sketches add bucket-wise, so concurrent flushes from any number of
+processes merge correctly. Rows are upserted in primary-key order, so two
+flushes touching the same buckets lock them in the same order.
+
+Each flush commits on its own tenant session: the caller's transaction is
+never aborted by a failed upsert, and deltas survive the caller rolling back
+or never committing. A failed flush puts its deltas back for the next one.
+Pending deltas of a process that dies without shutting down are lost; these
+are usage metrics, not billing records.
+
+Queries merge hour rows for the whole hours of a window plus minute rows for
+the partial hours at either edge, instead of loading every raw event in it.
+Windows are minute-aligned.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, delete, func, literal_column, or_, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import get_tenant_session
+from app.models.usage_rollup import UsageRollup
+
+logger = logging.getLogger(__name__)
+
+METRIC_REQUEST = "request"
+METRIC_TOKENS = "tokens"
+
+GRANULARITIES: Dict[str, timedelta] = {
+    "minute": timedelta(minutes=1),
+    "hour": timedelta(hours=1),
+}
+
+# Sketch layout is part of the stored format: changing it breaks merges with
+# existing rows.
+SKETCH_GAMMA = 1.1
+SKETCH_MIN_MS = 0.1
+SKETCH_MAX_MS = 600_000.0
+SKETCH_BUCKETS = math.ceil(math.log(SKETCH_MAX_MS / SKETCH_MIN_MS) / math.log(SKETCH_GAMMA)) + 2
+
+_LOG_GAMMA = math.log(SKETCH_GAMMA)
+
+RollupKey = Tuple[str, datetime, str, str, str]
+
+
+class LatencySketch:
+    """Log-bucketed latency histogram (DDSketch-style), mergeable by adding counts.
+
+    Bucket ``i`` (1 <= i < SKETCH_BUCKETS - 1) holds values in
+    ``(MIN * GAMMA**(i-1), MIN * GAMMA**i]``, so quantiles are within ~5%
+    relative error; bucket 0 holds values up to SKETCH_MIN_MS and the last
+    bucket everything above SKETCH_MAX_MS.
+    """
+
+    __slots__ = ("counts",)
+
+    def __init__(self, counts: Optional[Sequence[int]] = None) -> None:
+        self.counts: List[int] = [0] * SKETCH_BUCKETS
+        if counts:
+            for i, c in enumerate(counts[:SKETCH_BUCKETS]):
+                self.counts[i] = int(c or 0)
+
+    @staticmethod
+    def bucket_index(value_ms: float) -> int:
+        if value_ms <= SKETCH_MIN_MS:
+            return 0
+        i = math.ceil(math.log(value_ms / SKETCH_MIN_MS) / _LOG_GAMMA)
+        return max(1, min(SKETCH_BUCKETS - 1, i))
+
+    @staticmethod
+    def bucket_value(index: int) -> float:
+        if index <= 0:
+            return SKETCH_MIN_MS
+        # Midpoint (in relative terms) of (MIN*g^(i-1), MIN*g^i].
+        return 2.0 * SKETCH_MIN_MS * SKETCH_GAMMA ** index / (SKETCH_GAMMA + 1.0)
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts)
+
+    def add(self, value_ms: float, count: int = 1) -> None:
+        self.counts[self.bucket_index(float(value_ms))] += count
+
+    def merge(self, other: "LatencySketch") -> None:
+        for i, c in enumerate(other.counts):
+            if c:
+                self.counts[i] += c
+
+    def quantile(self, q: float) -> float:
+        n = self.total
+        if n <= 0:
+            return 0.0
+        rank = max(0.0, min(1.0, q)) * (n - 1)
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen > rank:
+                return self.bucket_value(i)
+        return self.bucket_value(SKETCH_BUCKETS - 1)
+
+
+@dataclass
+class RollupTotals:
+    count: int = 0
+    error_count: int = 0
+    value_sum: float = 0.0
+    value_max: float = 0.0
+    sketch: Optional[LatencySketch] = None
+
+    def add(self, value: float, *, error: bool = False, sketch: bool = False) -> None:
+        self.count += 1
+        self.error_count += int(error)
+        self.value_sum += value
+        self.value_max = max(self.value_max, value)
+        if sketch:
+            if self.sketch is None:
+                self.sketch = LatencySketch()
+            self.sketch.add(value)
+
+    def merge(self, other: "RollupTotals") -> None:
+        self.count += other.count
+        self.error_count += other.error_count
+        self.value_sum += other.value_sum
+        self.value_max = max(self.value_max, other.value_max)
+        if other.sketch is not None:
+            if self.sketch is None:
+                self.sketch = LatencySketch()
+            self.sketch.merge(other.sketch)
+
+    def quantile(self, q: float) -> float:
+        if self.sketch is None:
+            return 0.0
+        # The top bucket is open-ended; the recorded max is exact.
+        return min(self.sketch.quantile(q), self.value_max)
+
+
+def bucket_start(ts: datetime, granularity: str) -> datetime:
+    ts = ts.replace(tzinfo=timezone.utc) if ts.tzinfo is None else ts.astimezone(timezone.utc)
+    if granularity == "hour":
+        return ts.replace(minute=0, second=0, microsecond=0)
+    return ts.replace(second=0, microsecond=0)
+
+
+def window_ranges(since: datetime, until: datetime) -> List[Tuple[str, datetime, datetime]]:
+    """Half-open ``(granularity, start, end)`` bucket ranges covering ``[since, until]``."""
+    first_minute = bucket_start(since, "minute")
+    end = bucket_start(until, "minute") + GRANULARITIES["minute"]
+    first_hour = bucket_start(first_minute, "hour")
+    if first_hour < first_minute:
+        first_hour += GRANULARITIES["hour"]
+    last_hour = bucket_start(end, "hour")
+
+    if first_hour >= last_hour:
+        return [("minute", first_minute, end)]
+    ranges = [("hour", first_hour, last_hour)]
+    if first_minute < first_hour:
+        ranges.insert(0, ("minute", first_minute, first_hour))
+    if last_hour < end:
+        ranges.append(("minute", last_hour, end))
+    return ranges
+
+
+# Bucket-wise sum of two sketches (either may be NULL).
+_MERGE_SKETCH = literal_column(
+    "CASE WHEN usage_rollups.sketch IS NULL THEN excluded.sketch "
+    "WHEN excluded.sketch IS NULL THEN usage_rollups.sketch "
+    "ELSE ARRAY(SELECT coalesce(a, 0) + coalesce(b, 0) "
+    "FROM unnest(usage_rollups.sketch, excluded.sketch) AS t(a, b)) END"
+)
+
+
+@asynccontextmanager
+async def _flush_session(org_id: str) -> AsyncIterator[AsyncSession]:
+    """A session under the org's RLS context that commits when the block exits."""
+    async with get_tenant_session(
+        user_id=str(getattr(settings, "SYSTEM_TASK_USER_ID", None) or ""),
+        org_id=org_id,
+        justification="usage_rollup_flush",
+    ) as session:
+        yield session
+
+
+class UsageRollupBuffer:
+    """Per-process pending deltas, flushed per org in their own transaction."""
+
+    def __init__(self) -> None:
+        self._pending: Dict[str, Dict[RollupKey, RollupTotals]] = {}
+        self._last_flush: Dict[str, float] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Flush quiet orgs in the background; deltas otherwise wait for that org's next event."""
+        if not self.running:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background task and flush every org's pending deltas."""
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+        await self.flush_all()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(float(settings.USAGE_ROLLUP_FLUSH_SECONDS))
+            try:
+                await self.flush_due()
+            except Exception as e:
+                logger.warning("usage rollup background flush failed: %s", e)
+
+    def record_request(
+        self,
+        org_id: str,
+        *,
+        endpoint: str,
+        method: str,
+        duration_ms: float,
+        success: bool,
+        at: Optional[datetime] = None,
+    ) -> None:
+        self._record(
+            org_id, METRIC_REQUEST, endpoint, method, float(duration_ms), at, error=not success, sketch=True
+        )
+
+    def record_tokens(
+        self,
+        org_id: str,
+        *,
+        model: str,
+        operation: str,
+        tokens: int,
+        at: Optional[datetime] = None,
+    ) -> None:
+        self._record(org_id, METRIC_TOKENS, model, operation, float(tokens), at)
+
+    def _record(
+        self,
+        org_id: str,
+        metric: str,
+        dimension: str,
+        sub_dimension: str,
+        value: float,
+        at: Optional[datetime],
+        *,
+        error: bool = False,
+        sketch: bool = False,
+    ) -> None:
+        at = at or datetime.now(timezone.utc)
+        pending = self._pending.setdefault(str(org_id), {})
+        dimension = str(dimension or "unknown")[:255]
+        sub_dimension = str(sub_dimension or "")[:64]
+        for granularity in GRANULARITIES:
+            key = (granularity, bucket_start(at, granularity), metric, dimension, sub_dimension)
+            pending.setdefault(key, RollupTotals()).add(value, error=error, sketch=sketch)
+
+    def pending(self, org_id: Optional[str] = None) -> int:
+        if org_id is not None:
+            return len(self._pending.get(str(org_id), {}))
+        return sum(len(p) for p in self._pending.values())
+
+    def due(self, org_id: str) -> bool:
+        org_id = str(org_id)
+        if not self._pending.get(org_id):
+            return False
+        elapsed = time.monotonic() - self._last_flush.get(org_id, 0.0)
+        return elapsed >= float(settings.USAGE_ROLLUP_FLUSH_SECONDS)
+
+    async def flush_if_due(self, org_id: str) -> int:
+        if self.pending() >= int(settings.USAGE_ROLLUP_MAX_PENDING):
+            # The cap is process-wide, so flush every org, not just the busy one.
+            return await self.flush_all()
+        if not self.due(org_id):
+            return 0
+        return await self.flush(org_id)
+
+    async def flush_due(self) -> int:
+        """Flush every org whose interval has elapsed; returns the number of rows written."""
+        return await self._flush_orgs([org_id for org_id in self._pending if self.due(org_id)])
+
+    async def flush_all(self) -> int:
+        """Flush every org with pending deltas; returns the number of rows written."""
+        return await self._flush_orgs(list(self._pending))
+
+    async def _flush_orgs(self, org_ids: List[str]) -> int:
+        written = 0
+        for org_id in org_ids:
+            written += await self.flush(org_id)
+        return written
+
+    async def flush(self, org_id: str) -> int:
+        """Upsert and commit ``org_id``'s pending deltas; returns the number of rows written."""
+        org_id = str(org_id)
+        deltas = self._pending.pop(org_id, None)
+        self._last_flush[org_id] = time.monotonic()
+        if not deltas:
+            return 0
+
+        rows = [
+            {
+                "organization_id": org_id,
+                "granularity": granularity,
+                "bucket_start": start,
+                "metric": metric,
+                "dimension": dimension,
+                "sub_dimension": sub_dimension,
+                "count": totals.count,
+                "error_count": totals.error_count,
+                "value_sum": totals.value_sum,
+                "value_max": totals.value_max,
+                "sketch": totals.sketch.counts if totals.sketch is not None else None,
+            }
+            # Primary-key order (the org is fixed) so concurrent flushes cannot deadlock.
+            for (granularity, start, metric, dimension, sub_dimension), totals in sorted(deltas.items())
+        ]
+        stmt = pg_insert(UsageRollup).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[
+                UsageRollup.organization_id,
+                UsageRollup.granularity,
+                UsageRollup.bucket_start,
+                UsageRollup.metric,
+                UsageRollup.dimension,
+                UsageRollup.sub_dimension,
+            ],
+            set_={
+                "count": UsageRollup.count + stmt.excluded.count,
+                "error_count": UsageRollup.error_count + stmt.excluded.error_count,
+                "value_sum": UsageRollup.value_sum + stmt.excluded.value_sum,
+                "value_max": func.greatest(UsageRollup.value_max, stmt.excluded.value_max),
+                "sketch": _MERGE_SKETCH,
+                "updated_at": func.now(),
+            },
+        )
+        try:
+            async with _flush_session(org_id) as session:
+                await session.execute(stmt)
+        except Exception as e:
+            logger.warning("usage rollup flush failed for org %s: %s", org_id, e)
+            self._restore(org_id, deltas)
+            return 0
+        return len(rows)
+
+    def _restore(self, org_id: str, deltas: Dict[RollupKey, RollupTotals]) -> None:
+        pending = self._pending.setdefault(org_id, {})
+        for key, totals in deltas.items():
+            pending.setdefault(key, RollupTotals()).merge(totals)
+
+
+async def load_rollups(
+    session: AsyncSession,
+    org_id: str,
+    metric: str,
+    since: datetime,
+    until: Optional[datetime] = None,
+) -> Dict[Tuple[str, str], RollupTotals]:
+    """Merged totals per ``(dimension, sub_dimension)`` over ``[since, until]``."""
+    until = until or datetime.now(timezone.utc)
+    ranges = window_ranges(since, until)
+    stmt = select(
+        UsageRollup.dimension,
+        UsageRollup.sub_dimension,
+        UsageRollup.count,
+        UsageRollup.error_count,
+        UsageRollup.value_sum,
+        UsageRollup.value_max,
+        UsageRollup.sketch,
+    ).where(
+        UsageRollup.organization_id == str(org_id),
+        UsageRollup.metric == metric,
+        or_(
+            *(
+                and_(
+                    UsageRollup.granularity == granularity,
+                    UsageRollup.bucket_start >= start,
+                    UsageRollup.bucket_start < end,
+                )
+                for granularity, start, end in ranges
+            )
+        ),
+    )
+
+    out: Dict[Tuple[str, str], RollupTotals] = {}
+    for dimension, sub_dimension, count, errors, value_sum, value_max, sketch in (await session.execute(stmt)).all():
+        out.setdefault((dimension, sub_dimension), RollupTotals()).merge(
+            RollupTotals(
+                count=int(count or 0),
+                error_count=int(errors or 0),
+                value_sum=float(value_sum or 0.0),
+                value_max=float(value_max or 0.0),
+                sketch=LatencySketch(sketch) if sketch else None,
+            )
+        )
+    return out
+
+
+def merge_totals(totals: Iterable[RollupTotals]) -> RollupTotals:
+    merged = RollupTotals()
+    for t in totals:
+        merged.merge(t)
+    return merged
+
+
+async def prune_rollups(session: AsyncSession, org_id: str, now: Optional[datetime] = None) -> int:
+    """Drop minute and hour buckets past their retention."""
+    now = now or datetime.now(timezone.utc)
+    minute_cutoff = now - timedelta(hours=int(settings.USAGE_ROLLUP_MINUTE_RETENTION_HOURS))
+    hour_cutoff = now - timedelta(days=int(settings.USAGE_ROLLUP_HOUR_RETENTION_DAYS))
+    result = await session.execute(
+        delete(UsageRollup).where(
+            UsageRollup.organization_id == str(org_id),
+            or_(
+                and_(UsageRollup.granularity == "minute", UsageRollup.bucket_start < minute_cutoff),
+                and_(UsageRollup.granularity == "hour", UsageRollup.bucket_start < hour_cutoff),
+            ),
+        )
+    )
+    return int(result.rowcount or 0)
+
+
+usage_rollups = UsageRollupBuffer()
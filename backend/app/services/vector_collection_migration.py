@@ -0,0 +1,246 @@
+"""backend.app.services.vector_collection_migration
+
+Online moves of an organization between the shared Qdrant collection and a
+dedicated one.
+
+A move is a small state machine stored on ``vector_collection_routes`` and
+advanced by the ``rebalance_vector_collections_task`` maintenance task:
+
+1. ``start_move``: the target collection is created with the tenant's
+   config and the route starts dual-writing (``copying``).
+2. Once every process has seen the route (two route-cache TTLs), existing
+   points are copied. Points already in the target were dual-written and
+   are newer, so they are skipped. A reconcile pass then drops points that
+   were deleted from the source while the copy ran. Reads switch to the
+   target; the source keeps receiving writes (``draining``).
+3. After another grace period the tenant's points are removed from the
+   source and the move completes (``active``). A tenant moved back to the
+   shared collection loses its route row.
+
+Searches never see a partially copied collection: reads switch only after
+the copy and reconcile complete.
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from qdrant_client.http.models import FieldCondition, Filter, MatchValue, PointStruct
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.qdrant import QdrantService
+from app.core.qdrant_routing import (
+    CollectionConfig,
+    CollectionRouter,
+    dedicated_collection_name,
+    shared_collection,
+)
+from app.core.request_profiler import SPAN_QDRANT, profile_span
+from app.models.organization import Organization
+from app.models.vector_collection import VectorCollectionRoute
+
+logger = logging.getLogger(__name__)
+
+
+def _org_filter(org_id: str) -> Filter:
+    return Filter(must=[FieldCondition(key="organization_id", match=MatchValue(value=org_id))])
+
+
+def default_dedicated_config() -> CollectionConfig:
+    return CollectionConfig(
+        hnsw_m=settings.QDRANT_DEDICATED_HNSW_M,
+        hnsw_ef_construct=settings.QDRANT_DEDICATED_HNSW_EF_CONSTRUCT,
+        search_hnsw_ef=settings.QDRANT_DEDICATED_SEARCH_HNSW_EF,
+        quantization=settings.QDRANT_DEDICATED_QUANTIZATION,
+    )
+
+
+class VectorCollectionMigrator:
+    """Moves tenants between collection layouts (platform-level session)."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self.client = QdrantService.get_client()
+
+    @staticmethod
+    def _grace() -> timedelta:
+        # Every process must have reloaded the route before the next step.
+        return timedelta(seconds=2 * settings.QDRANT_ROUTE_CACHE_TTL_SECONDS)
+
+    async def start_move(
+        self,
+        org_id: str,
+        dedicated: bool = True,
+        config: Optional[CollectionConfig] = None,
+    ) -> VectorCollectionRoute:
+        """
+        Begin moving ``org_id`` to its dedicated collection (or back to shared).
+
+        Raises:
+            ValueError: If a move is already in progress or the tenant is
+                already in the requested layout
+        """
+        org_id = str(org_id)
+        route = await self.session.get(VectorCollectionRoute, org_id)
+        if route is not None and route.state != "active":
+            raise ValueError(f"Collection move already in progress for org {org_id}")
+
+        source = route.collection_name if route is not None else shared_collection()
+        target = dedicated_collection_name(org_id) if dedicated else shared_collection()
+        if source == target:
+            raise ValueError(f"Org {org_id} is already in collection {target}")
+
+        config = config or (default_dedicated_config() if dedicated else CollectionConfig())
+        await QdrantService.ensure_collection(target, config)
+
+        if route is None:
+            route = VectorCollectionRoute(organization_id=org_id)
+            self.session.add(route)
+        route.collection_name = source
+        route.secondary_collection = target
+        route.hnsw_m = config.hnsw_m
+        route.hnsw_ef_construct = config.hnsw_ef_construct
+        route.search_hnsw_ef = config.search_hnsw_ef
+        route.quantization = config.quantization
+        route.points_copied = 0
+        self._set_state(route, "copying")
+        await self.session.commit()
+        CollectionRouter.invalidate()
+        logger.info("Started vector collection move for org %s: %s -> %s", org_id, source, target)
+        return route
+
+    async def advance(self, route: VectorCollectionRoute) -> str:
+        """Run the next step of an in-flight move once its grace period passed."""
+        if route.state == "active":
+            return route.state
+        if datetime.now(timezone.utc) - route.state_changed_at < self._grace():
+            return route.state
+
+        org_id = str(route.organization_id)
+        if route.state == "copying":
+            source, target = route.collection_name, route.secondary_collection
+            route.points_copied = await self.copy_points(org_id, source, target)
+            await self.reconcile(org_id, source, target)
+            route.collection_name, route.secondary_collection = target, source
+            self._set_state(route, "draining")
+        elif route.state == "draining":
+            old = route.secondary_collection
+            if old == shared_collection():
+                await QdrantService.delete_org_points(old, org_id)
+            elif old:
+                with profile_span(SPAN_QDRANT):
+                    self.client.delete_collection(collection_name=old)
+                QdrantService.forget_collection(old)
+            route.secondary_collection = None
+            self._set_state(route, "active")
+            if route.collection_name == shared_collection():
+                await self.session.delete(route)
+
+        await self.session.commit()
+        CollectionRouter.invalidate()
+        return route.state
+
+    async def copy_points(self, org_id: str, source: str, target: str) -> int:
+        """Copy the tenant's points that the target does not have yet."""
+        copied = 0
+        offset = None
+        while True:
+            with profile_span(SPAN_QDRANT):
+                records, offset = self.client.scroll(
+                    collection_name=source,
+                    scroll_filter=_org_filter(org_id),
+                    limit=settings.QDRANT_MIGRATION_BATCH_SIZE,
+                    offset=offset,
+                    with_payload=True,
+                    with_vectors=True,
+                )
+            if records:
+                present = self._existing_ids(target, [r.id for r in records])
+                points = [
+                    PointStruct(id=r.id, vector=r.vector, payload=r.payload or {})
+                    for r in records
+                    if str(r.id) not in present and r.vector is not None
+                ]
+                if points:
+                    with profile_span(SPAN_QDRANT):
+                        self.client.upsert(collection_name=target, points=points, wait=True)
+                    copied += len(points)
+            if offset is None:
+                return copied
+
+    async def reconcile(self, org_id: str, source: str, target: str) -> int:
+        """Delete target points whose source point was deleted during the copy."""
+        removed = 0
+        offset = None
+        while True:
+            with profile_span(SPAN_QDRANT):
+                records, offset = self.client.scroll(
+                    collection_name=target,
+                    scroll_filter=_org_filter(org_id),
+                    limit=settings.QDRANT_MIGRATION_BATCH_SIZE,
+                    offset=offset,
+                    with_payload=False,
+                    with_vectors=False,
+                )
+            if records:
+                present = self._existing_ids(source, [r.id for r in records])
+                stale = [r.id for r in records if str(r.id) not in present]
+                if stale:
+                    await QdrantService.delete_points(target, stale)
+                    removed += len(stale)
+            if offset is None:
+                return removed
+
+    def _existing_ids(self, collection_name: str, ids: List[Any]) -> set:
+        with profile_span(SPAN_QDRANT):
+            found = self.client.retrieve(
+                collection_name=collection_name,
+                ids=ids,
+                with_payload=False,
+                with_vectors=False,
+            )
+        return {str(r.id) for r in found}
+
+    async def promote_large_tenants(self) -> List[str]:
+        """Start dedicated-collection moves for tenants past the size threshold."""
+        routed = {
+            str(org_id)
+            for org_id in (
+                await self.session.execute(select(VectorCollectionRoute.organization_id))
+            ).scalars().all()
+        }
+        org_ids = (
+            await self.session.execute(select(Organization.id).where(Organization.is_active.is_(True)))
+        ).scalars().all()
+
+        started: List[str] = []
+        for org_id in org_ids:
+            if str(org_id) in routed:
+                continue
+            with profile_span(SPAN_QDRANT):
+                count = self.client.count(
+                    collection_name=shared_collection(),
+                    count_filter=_org_filter(str(org_id)),
+                    exact=False,
+                ).count
+            if count >= settings.QDRANT_DEDICATED_MIN_POINTS:
+                await self.start_move(str(org_id), dedicated=True)
+                started.append(str(org_id))
+        return started
+
+    async def advance_all(self) -> Dict[str, str]:
+        routes = (
+            await self.session.execute(
+                select(VectorCollectionRoute).where(VectorCollectionRoute.state != "active")
+            )
+        ).scalars().all()
+        return {str(r.organization_id): await self.advance(r) for r in routes}
+
+    @staticmethod
+    def _set_state(route: VectorCollectionRoute, state: str) -> None:
+        route.state = state
+        route.state_changed_at = datetime.now(timezone.utc)
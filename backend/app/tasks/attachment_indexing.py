@@ -0,0 +1,98 @@
+"""Attachment indexing tasks.
+
+Uploads enqueue ``index_attachment_task`` after commit; extraction, chunking
+and embedding happen here instead of in the request.
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+from celery.utils.log import get_task_logger
+
+from app.core.celery_app import celery_app
+from app.core.config import settings
+from app.core.database import async_session_factory, set_tenant_context
+from app.services.attachment_indexer import AttachmentIndexer
+
+
+logger = get_task_logger(__name__)
+
+
+def _run_async(coro):
+    """Run an async coroutine from a synchronous Celery task."""
+    try:
+        loop = asyncio.get_event_loop()
+    except RuntimeError:
+        loop = None
+
+    if loop is not None and loop.is_running():
+        new_loop = asyncio.new_event_loop()
+        try:
+            return new_loop.run_until_complete(coro)
+        finally:
+            new_loop.close()
+
+    return asyncio.run(coro)
+
+
+async def index_attachment_now(
+    *,
+    org_id: str,
+    attachment_id: str,
+    initiator_user_id: str | None = None,
+) -> str | None:
+    """Index one attachment in its own session; returns the resulting status."""
+    async with async_session_factory() as session:
+        async with session.begin():
+            service_user_id = str(getattr(settings, "SYSTEM_TASK_USER_ID", None) or "")
+            await set_tenant_context(
+                session,
+                str(initiator_user_id or service_user_id or ""),
+                org_id,
+                roles="org_admin" if initiator_user_id else ("system_admin" if service_user_id else ""),
+                clearance_level=4,
+                justification="attachment_indexing",
+            )
+            att = await AttachmentIndexer(session, org_id).index(attachment_id)
+            return att.index_status if att is not None else None
+
+
+def enqueue_attachment_indexing(
+    *,
+    org_id: str,
+    attachment_id: str,
+    initiator_user_id: str | None = None,
+):
+    """Enqueue indexing if Celery is configured; otherwise no-op (returns None)."""
+
+    broker = celery_app.conf.broker_url
+    if not broker or str(broker).startswith("memory://"):
+        return None
+
+    return index_attachment_task.apply_async(
+        kwargs={
+            "org_id": org_id,
+            "attachment_id": attachment_id,
+            "initiator_user_id": initiator_user_id,
+        }
+    )
+
+
+@celery_app.task(
+    bind=True,
+    max_retries=3,
+    autoretry_for=(Exception,),
+    retry_backoff=True,
+    name="app.tasks.attachment_indexing.index_attachment_task",
+)
+def index_attachment_task(self, *, org_id: str, attachment_id: str, initiator_user_id: str | None = None):
+    status = _run_async(
+        index_attachment_now(
+            org_id=org_id,
+            attachment_id=attachment_id,
+            initiator_user_id=initiator_user_id,
+        )
+    )
+    logger.info("Attachment %s indexing finished: %s", attachment_id, status)
+    return status
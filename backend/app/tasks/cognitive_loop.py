@@ -92,7 +92,7 @@ def cognitive_loop_task(
 
                     # Tooling setup
                     registry = ToolRegistry()
-                    register_builtin_tools(registry=registry, memory_service=memory_service)
+                    register_builtin_tools(registry=registry, memory_service=memory_service, roles=roles)
 
                     permission_checker = PermissionChecker(db)
                     guard = PolicyGuard(permission_checker)
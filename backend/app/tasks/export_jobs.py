@@ -71,19 +71,23 @@ def run_snapshot_export_job_task(*, org_id: str, job_id: str, initiator_user_id:
                         .where(MemoryMetadata.organization_id == org_id)
                         .order_by(MemoryMetadata.created_at.asc())
                     )
-                    res = await session.execute(stmt)
-                    rows = res.scalars().all()
-
+                    # Server-side cursor: constant memory regardless of org size.
+                    item_count = 0
+                    res = await session.stream_scalars(
+                        stmt.execution_options(yield_per=int(settings.EXPORT_STREAM_BATCH_SIZE or 1000))
+                    )
                     with memories_path.open("w", encoding="utf-8") as f:
-                        for m in rows:
-                            f.write(json.dumps(m.to_dict(), ensure_ascii=False, default=_json_default))
-                            f.write("\n")
+                        async for batch in res.partitions():
+                            for m in batch:
+                                f.write(json.dumps(m.to_dict(), ensure_ascii=False, default=_json_default))
+                                f.write("\n")
+                            item_count += len(batch)
 
                     meta = {
                         "organization_id": org_id,
                         "job_id": job_id,
                         "exported_at": datetime.now(timezone.utc).isoformat(),
-                        "item_count": len(rows),
+                        "item_count": item_count,
                         "format": "jsonl",
                         "notes": "Metadata-only snapshot; full memory content is not persisted in Postgres.",
                     }
@@ -17,6 +17,7 @@ from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from app.celery_app import celery_app
 from app.core.config import settings
 from app.services.graph_relationship_service import GraphRelationshipService
+from app.services.recommendation_service import invalidate_recommendations
 from app.db.session import AsyncSessionLocal
 import redis
 
@@ -162,12 +163,23 @@ async def _cleanup_orphaned_async() -> Dict[str, Any]:
                 OR gr.to_memory_id NOT IN (
                     SELECT id FROM memories WHERE deleted_at IS NULL
                 )
+                RETURNING gr.organization_id
             """)
         )
         
-        deleted_count = result.rowcount
+        deleted_rows = result.all()
+        deleted_count = len(deleted_rows)
+        affected_orgs = {str(row[0]) for row in deleted_rows}
         await session.commit()
         
+        redis_client = redis.Redis(
+            host=settings.REDIS_HOST,
+            port=settings.REDIS_PORT,
+            decode_responses=True
+        )
+        for org_id in affected_orgs:
+            await invalidate_recommendations(redis_client, org_id)
+        
         logger.info(f"Cleanup: Deleted {deleted_count} orphaned relationships")
         
         return {
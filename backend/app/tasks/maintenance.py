@@ -23,6 +23,14 @@ from app.models.export_job import ExportJob
 from app.services.org_logseq_export_config_service import OrgLogseqExportConfigService
 from app.services.export_job_service import ExportJobService
 from app.services.audit_service import AuditService
+from app.services.agent_result_cache_service import AgentResultCacheService
+from app.services.attachment_blob_store import AttachmentBlobStore
+from app.services.capability_token_cache import mark_tokens_dirty, pop_dirty_tokens, reconcile_usage
+from app.services.filtered_search import FilteredSearchService
+from app.services.memory_attachment_service import attachments_root
+from app.services.near_duplicate_index import NearDuplicateIndex
+from app.services.vector_collection_migration import VectorCollectionMigrator
+from app.services.usage_rollups import prune_rollups
 
 
 logger = get_task_logger(__name__)
@@ -273,3 +281,273 @@ def cleanup_expired_snapshot_exports_task(self, batch_size: int = 200):
     except Exception as e:
         logger.exception("Cleanup expired snapshot exports task failed")
         raise e
+
+
+async def _backfill_search_payload_async(*, batch_size: int) -> dict:
+    async with async_session_factory() as session:
+        org_ids = (
+            await session.execute(select(Organization.id).where(Organization.is_active.is_(True)))
+        ).scalars().all()
+
+    service_user_id = str(getattr(settings, "SYSTEM_TASK_USER_ID", None) or "")
+    service_roles = "system_admin" if service_user_id else ""
+
+    points_updated = 0
+    for org_id in org_ids:
+        async with get_tenant_session(
+            user_id=service_user_id,
+            org_id=str(org_id),
+            roles=service_roles,
+            clearance_level=0,
+            justification="backfill_search_payload",
+        ) as tenant_session:
+            search = FilteredSearchService(tenant_session, str(org_id), service_user_id)
+            points_updated += await search.backfill_qdrant_payload(batch_size=batch_size)
+
+    return {
+        "ok": True,
+        "orgs_processed": len(org_ids),
+        "points_updated": points_updated,
+    }
+
+
+@celery_app.task(bind=True)
+def backfill_search_payload_task(self, batch_size: int = 500):
+    """Stamp the date-filter and ACL payload fields onto existing vectors."""
+
+    try:
+        return _run_async(_backfill_search_payload_async(batch_size=batch_size))
+    except Exception as e:
+        logger.exception("Backfill search payload task failed")
+        raise e
+
+
+async def _backfill_near_duplicate_index_async(*, batch_size: int, max_batches: int) -> dict:
+    async with async_session_factory() as session:
+        org_ids = (
+            await session.execute(select(Organization.id).where(Organization.is_active.is_(True)))
+        ).scalars().all()
+
+    service_user_id = str(getattr(settings, "SYSTEM_TASK_USER_ID", None) or "")
+    service_roles = "system_admin" if service_user_id else ""
+
+    memories_indexed = 0
+    for org_id in org_ids:
+        for _ in range(max_batches):
+            # One committed transaction (and tenant context) per batch.
+            async with get_tenant_session(
+                user_id=service_user_id,
+                org_id=str(org_id),
+                roles=service_roles,
+                clearance_level=0,
+                justification="backfill_near_duplicate_index",
+            ) as tenant_session:
+                indexed = await NearDuplicateIndex(tenant_session, str(org_id)).backfill(limit=batch_size)
+                await tenant_session.commit()
+            memories_indexed += indexed
+            if indexed < batch_size:
+                break
+
+    return {
+        "ok": True,
+        "orgs_processed": len(org_ids),
+        "memories_indexed": memories_indexed,
+    }
+
+
+@celery_app.task(bind=True)
+def backfill_near_duplicate_index_task(self, batch_size: int | None = None, max_batches: int | None = None):
+    """Write MinHash signatures for imported and legacy memories."""
+
+    try:
+        return _run_async(
+            _backfill_near_duplicate_index_async(
+                batch_size=int(batch_size or settings.NEAR_DUP_BACKFILL_BATCH_SIZE),
+                max_batches=int(max_batches or settings.NEAR_DUP_BACKFILL_MAX_BATCHES),
+            )
+        )
+    except Exception as e:
+        logger.exception("Backfill near-duplicate index task failed")
+        raise e
+
+
+async def _sweep_attachment_blobs_async(*, batch_size: int) -> dict:
+    async with async_session_factory() as session:
+        org_ids = (
+            await session.execute(select(Organization.id).where(Organization.is_active.is_(True)))
+        ).scalars().all()
+
+    service_user_id = str(getattr(settings, "SYSTEM_TASK_USER_ID", None) or "")
+    service_roles = "system_admin" if service_user_id else ""
+    root = attachments_root()
+
+    blobs_deleted = 0
+    for org_id in org_ids:
+        async with get_tenant_session(
+            user_id=service_user_id,
+            org_id=str(org_id),
+            roles=service_roles,
+            clearance_level=0,
+            justification="sweep_attachment_blobs",
+        ) as tenant_session:
+            store = AttachmentBlobStore(tenant_session, str(org_id), root)
+            blobs_deleted += await store.sweep_orphans(limit=batch_size)
+            await tenant_session.commit()
+
+    return {
+        "ok": True,
+        "orgs_processed": len(org_ids),
+        "blobs_deleted": blobs_deleted,
+    }
+
+
+@celery_app.task(bind=True)
+def sweep_attachment_blobs_task(self, batch_size: int = 500):
+    """Delete attachment blobs left unreferenced by cascading memory deletes."""
+
+    try:
+        return _run_async(_sweep_attachment_blobs_async(batch_size=batch_size))
+    except Exception as e:
+        logger.exception("Sweep attachment blobs task failed")
+        raise e
+
+
+async def _reconcile_capability_usage_async(*, batch_size: int) -> dict:
+    pending = await pop_dirty_tokens(batch_size)
+
+    service_user_id = str(getattr(settings, "SYSTEM_TASK_USER_ID", None) or "")
+    service_roles = "system_admin" if service_user_id else ""
+
+    tokens_reconciled = 0
+    for org_id, usage in pending.items():
+        try:
+            async with get_tenant_session(
+                user_id=service_user_id,
+                org_id=str(org_id),
+                roles=service_roles,
+                clearance_level=0,
+                justification="reconcile_capability_usage",
+            ) as tenant_session:
+                tokens_reconciled += await reconcile_usage(tenant_session, usage)
+                await tenant_session.commit()
+        except Exception:
+            logger.exception("Failed reconciling capability usage", extra={"org_id": org_id})
+            await mark_tokens_dirty(org_id, usage.keys())
+
+    return {
+        "ok": True,
+        "orgs_processed": len(pending),
+        "tokens_reconciled": tokens_reconciled,
+    }
+
+
+@celery_app.task(bind=True)
+def reconcile_capability_usage_task(self, batch_size: int | None = None):
+    """Write Redis capability-token usage counters back to Postgres."""
+
+    try:
+        return _run_async(
+            _reconcile_capability_usage_async(
+                batch_size=int(batch_size or settings.CAPABILITY_USAGE_RECONCILE_BATCH_SIZE)
+            )
+        )
+    except Exception as e:
+        logger.exception("Reconcile capability usage task failed")
+        raise e
+
+
+async def _prune_agent_result_cache_async() -> dict:
+    async with async_session_factory() as session:
+        org_ids = (
+            await session.execute(select(Organization.id).where(Organization.is_active.is_(True)))
+        ).scalars().all()
+
+    service_user_id = str(getattr(settings, "SYSTEM_TASK_USER_ID", None) or "")
+    service_roles = "system_admin" if service_user_id else ""
+
+    rows_deleted = 0
+    for org_id in org_ids:
+        async with get_tenant_session(
+            user_id=service_user_id,
+            org_id=str(org_id),
+            roles=service_roles,
+            clearance_level=0,
+            justification="prune_agent_result_cache",
+        ) as tenant_session:
+            rows_deleted += await AgentResultCacheService(tenant_session).prune(organization_id=str(org_id))
+            await tenant_session.commit()
+
+    return {
+        "ok": True,
+        "orgs_processed": len(org_ids),
+        "rows_deleted": rows_deleted,
+    }
+
+
+@celery_app.task(bind=True)
+def prune_agent_result_cache_task(self):
+    """Drop expired agent result cache rows and trim each org to its size limit."""
+
+    try:
+        return _run_async(_prune_agent_result_cache_async())
+    except Exception as e:
+        logger.exception("Prune agent result cache task failed")
+        raise e
+
+
+async def _prune_usage_rollups_async() -> dict:
+    async with async_session_factory() as session:
+        org_ids = (
+            await session.execute(select(Organization.id).where(Organization.is_active.is_(True)))
+        ).scalars().all()
+
+    service_user_id = str(getattr(settings, "SYSTEM_TASK_USER_ID", None) or "")
+    service_roles = "system_admin" if service_user_id else ""
+
+    rows_deleted = 0
+    for org_id in org_ids:
+        async with get_tenant_session(
+            user_id=service_user_id,
+            org_id=str(org_id),
+            roles=service_roles,
+            clearance_level=0,
+            justification="prune_usage_rollups",
+        ) as tenant_session:
+            rows_deleted += await prune_rollups(tenant_session, str(org_id))
+            await tenant_session.commit()
+
+    return {
+        "ok": True,
+        "orgs_processed": len(org_ids),
+        "rows_deleted": rows_deleted,
+    }
+
+
+@celery_app.task(bind=True)
+def prune_usage_rollups_task(self):
+    """Drop usage rollup buckets past their minute/hour retention."""
+
+    try:
+        return _run_async(_prune_usage_rollups_async())
+    except Exception as e:
+        logger.exception("Prune usage rollups task failed")
+        raise e
+
+
+async def _rebalance_vector_collections_async() -> dict:
+    async with async_session_factory() as session:
+        migrator = VectorCollectionMigrator(session)
+        started = await migrator.promote_large_tenants()
+        advanced = await migrator.advance_all()
+    return {"ok": True, "moves_started": started, "moves": advanced}
+
+
+@celery_app.task(bind=True)
+def rebalance_vector_collections_task(self):
+    """Start dedicated-collection moves for large tenants and advance in-flight moves."""
+
+    try:
+        return _run_async(_rebalance_vector_collections_async())
+    except Exception as e:
+        logger.exception("Rebalance vector collections task failed")
+        raise e
@@ -19,6 +19,7 @@ import asyncio
 from celery import chain, group
 from celery.utils.log import get_task_logger
 
+from app.agents.llm.combined_enrichment import combined_enrichment_enabled
 from app.core.celery_app import celery_app
 from app.core.config import settings
 from app.services.agent_runner import AgentRunner, PipelineContext
@@ -60,6 +61,9 @@ def build_memory_dag(
     # 6) graph linking (after 2/3)
     # 7) logseq export (optional)
     # 8) feedback learning
+    #
+    # With AGENT_COMBINED_ENRICHMENT, 1-4 run as one enrichment task sharing a
+    # single multi-task LLM call.
 
     base_kwargs = {
         "org_id": org_id,
@@ -69,6 +73,9 @@ def build_memory_dag(
         "storage": storage,
     }
 
+    if combined_enrichment_enabled():
+        return chain(enrichment_task.si(**base_kwargs), _post_enrichment_dag(base_kwargs))
+
     enrich = chain(
         classification_task.si(**base_kwargs),
         metadata_task.si(**base_kwargs),
@@ -89,6 +96,45 @@ def build_memory_dag(
     return chain(enrich, topics_then_patterns, graph_and_export, feedback_learning_task.si(**base_kwargs))
 
 
+def _post_enrichment_dag(base_kwargs: dict):
+    return chain(
+        promotion_task.si(**base_kwargs),
+        group(
+            graph_linking_task.si(**base_kwargs),
+            logseq_export_task.si(**base_kwargs),
+        ),
+        feedback_learning_task.si(**base_kwargs),
+    )
+
+
+def build_memory_batch_dag(
+    *,
+    org_id: str,
+    memory_ids: list[str],
+    initiator_user_id: str | None = None,
+    trace_id: str | None = None,
+    storage: str = "long_term",
+):
+    """Combined-enrichment DAG for several memories.
+
+    One batch task enriches all memories (so their LLM requests are packed
+    together), then starts the rest of each enriched memory's DAG. A memory
+    whose enrichment failed is retried on its own single-memory DAG.
+    """
+
+    items = [
+        {
+            "org_id": org_id,
+            "memory_id": memory_id,
+            "initiator_user_id": initiator_user_id,
+            "trace_id": trace_id,
+            "storage": storage,
+        }
+        for memory_id in memory_ids
+    ]
+    return enrichment_batch_task.si(items=items)
+
+
 def enqueue_memory_pipeline(**kwargs):
     """Enqueue the pipeline if Celery is configured; otherwise no-op."""
 
@@ -101,6 +147,31 @@ def enqueue_memory_pipeline(**kwargs):
     return sig.apply_async()
 
 
+def enqueue_memory_pipelines(
+    *,
+    org_id: str,
+    memory_ids: list[str],
+    initiator_user_id: str | None = None,
+    trace_id: str | None = None,
+    storage: str = "long_term",
+):
+    """Enqueue pipelines for several memories, batching enrichment when combined mode is on."""
+
+    broker = celery_app.conf.broker_url
+    if not broker or str(broker).startswith("memory://"):
+        return None
+
+    common = {"org_id": org_id, "initiator_user_id": initiator_user_id, "trace_id": trace_id, "storage": storage}
+    if not combined_enrichment_enabled():
+        return [build_memory_dag(memory_id=m, **common).apply_async() for m in memory_ids]
+
+    size = max(1, int(getattr(settings, "AGENT_COMBINED_BATCH_SIZE", 1) or 1))
+    return [
+        build_memory_batch_dag(memory_ids=memory_ids[i : i + size], **common).apply_async()
+        for i in range(0, len(memory_ids), size)
+    ]
+
+
 def enqueue_feedback_learning(
     *,
     org_id: str,
@@ -124,6 +195,55 @@ def enqueue_feedback_learning(
     ).apply_async()
 
 
+@celery_app.task(
+    bind=True,
+    max_retries=5,
+    autoretry_for=(Exception,),
+    dont_autoretry_for=(ValueError,),
+    retry_backoff=True,
+)
+def enrichment_task(self, org_id: str, memory_id: str, initiator_user_id: str | None = None, trace_id: str | None = None, storage: str = "long_term"):
+    runner = AgentRunner(service_user_id=getattr(settings, "SYSTEM_TASK_USER_ID", None) or None, combined_enrichment=True)
+    ctx = PipelineContext(org_id=org_id, memory_id=memory_id, initiator_user_id=initiator_user_id, trace_id=trace_id, storage=storage)
+    res = _run_async(runner.run_enrichment(ctx=ctx, attempt=self.request.retries + 1))
+    return [r.model_dump(mode="json") for r in res]
+
+
+@celery_app.task(
+    bind=True,
+    max_retries=5,
+    autoretry_for=(Exception,),
+    dont_autoretry_for=(ValueError,),
+    retry_backoff=True,
+)
+def enrichment_batch_task(self, items: list[dict]):
+    runner = AgentRunner(service_user_id=getattr(settings, "SYSTEM_TASK_USER_ID", None) or None, combined_enrichment=True)
+    ctxs = [PipelineContext(**item) for item in items]
+    res = _run_async(runner.run_enrichment_many(ctxs=ctxs, attempt=self.request.retries + 1))
+
+    enriched, failed = [], []
+    for item, outcome in zip(items, res):
+        if isinstance(outcome, Exception):
+            logger.warning(
+                "Batch enrichment failed for memory %s; retrying it alone: %s",
+                item["memory_id"],
+                outcome,
+            )
+            failed.append(item)
+        else:
+            enriched.append(item)
+
+    if enriched:
+        group([_post_enrichment_dag(item) for item in enriched]).apply_async()
+    for item in failed:
+        chain(enrichment_task.si(**item), _post_enrichment_dag(item)).apply_async()
+
+    return [
+        None if isinstance(results, Exception) else [r.model_dump(mode="json") for r in results]
+        for results in res
+    ]
+
+
 @celery_app.task(
     bind=True,
     max_retries=5,
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+
+import app.models  # noqa: F401  (configure mappers)
+import app.models.admin  # noqa: F401
+from app.core.config import settings
+from app.core.redis import RedisClient
+from app.services import access_context as ac
+from app.services import memory_metadata_cache as mmc
+from app.services.permission_checker import PermissionChecker
+from tests.test_memory_metadata_cache import FakeRedis, _row
+
+
+class _Db:
+    """Answers each query by the table it reads from."""
+
+    def __init__(self, memories, members=(), shares=(), clearance=0):
+        self.tables = {
+            "memory_metadata": list(memories),
+            "team_members": list(members),
+            "memory_sharing": list(shares),
+            "users": clearance,
+        }
+        self.queries: list[str] = []
+        self.execute = AsyncMock(side_effect=self._execute)
+
+    async def _execute(self, stmt):
+        table = next(t for t in self.tables if f"FROM {t}" in str(stmt))
+        self.queries.append(table)
+        rows = self.tables[table]
+        return SimpleNamespace(
+            all=lambda: rows,
+            scalars=lambda: SimpleNamespace(all=lambda: rows),
+            scalar_one_or_none=lambda: rows,
+        )
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    fake = FakeRedis()
+    monkeypatch.setattr(RedisClient, "get_client", AsyncMock(return_value=fake))
+    monkeypatch.setattr(RedisClient, "delete", AsyncMock())
+    ac._cache.local.clear()
+    mmc._cache.local.clear()
+    yield fake
+    ac._cache.local.clear()
+    mmc._cache.local.clear()
+
+
+def _memory(mid, scope="personal", scope_id=None, owner="owner"):
+    row = _row(mid, owner=owner, scope=scope)
+    row.scope_id = scope_id
+    return row
+
+
+@pytest.mark.asyncio
+async def test_compile_collects_teams_shares_and_clearance(redis) -> None:
+    future = datetime.now(timezone.utc) + timedelta(days=1)
+    db = _Db(
+        [],
+        members=[("t1", "lead"), ("t2", "member")],
+        shares=[("m1", "read", "owner", None), ("m1", "edit", "owner", future)],
+        clearance=3,
+    )
+
+    ctx = await ac.get_access_context(db, "u1", "org")
+
+    assert db.queries == ["team_members", "memory_sharing", "users"]
+    assert ctx.team_roles == {"t1": "lead", "t2": "member"}
+    assert ctx.share_for("m1").permission == "edit"  # most permissive share wins
+    assert ctx.clearance_level == 3
+
+    # Round-trips through the Redis tier unchanged.
+    ac._cache.local.clear()
+    assert await ac.get_access_context(db, "u1", "org") == ctx
+    assert len(db.queries) == 3
+
+
+@pytest.mark.asyncio
+async def test_decisions_are_served_from_cached_context(redis) -> None:
+    future = datetime.now(timezone.utc) + timedelta(days=1)
+    past = datetime.now(timezone.utc) - timedelta(days=1)
+    db = _Db(
+        [
+            _memory("m1"),
+            _memory("m2"),
+            _memory("m3", scope="team", scope_id="t1"),
+            _memory("m4", scope="organization"),
+            _memory("m5", scope="department", scope_id="dept-1"),
+        ],
+        members=[("t1", "member")],
+        shares=[("m1", "read", "owner", future), ("m2", "edit", "owner", past)],
+    )
+    ids = ["m1", "m2", "m3", "m4", "m5"]
+
+    allowed = await PermissionChecker(db).filter_memory_ids_with_access("u2", "org", ids, "read")
+    assert allowed == ["m1", "m3", "m4"]
+    fill_queries = len(db.queries)
+
+    checker = PermissionChecker(db)
+    assert [(await checker.check_memory_access("u2", "org", m, "read")).method for m in ids] == [
+        "share", "none", "team", "scope", "none",
+    ]
+    assert not (await checker.check_memory_access("u2", "org", "m3", "write")).allowed
+    assert len(db.queries) == fill_queries  # every decision after the fill is in-memory
+
+    # Leaving the team drops its grants in every process.
+    db.tables["team_members"] = []
+    await PermissionChecker(db).invalidate_user_cache("u2", "org")
+    allowed = await PermissionChecker(db).filter_memory_ids_with_access("u2", "org", ids, "read")
+    assert allowed == ["m1", "m4"]
+
+
+@pytest.mark.asyncio
+async def test_vector_acl_filter_encodes_the_context(redis, monkeypatch) -> None:
+    db = _Db(
+        [],
+        members=[("t1", "member")],
+        shares=[("m1", "read", "owner", None), ("m2", "comment", "owner", None)],
+    )
+    checker = PermissionChecker(db)
+
+    acl = await checker.build_vector_acl_filter("u1", "org", clearance_level=2)
+
+    (clearance,) = acl.must
+    assert clearance.should[0].key == "required_clearance" and clearance.should[0].range.lte == 2
+    by_key = {getattr(c, "key", None): c for c in acl.should}
+    assert by_key["owner_id"].match.value == "u1"
+    assert by_key["scope"].match.any == ["organization", "global"]
+    assert by_key["memory_id"].match.any == ["m1", "m2"]
+    scoped = {c.must[0].match.value: c.must[1].match.any for c in acl.should if getattr(c, "must", None)}
+    assert scoped == {"team": ["t1"]}
+
+    # Too many shares to inline: callers fall back to over-fetching.
+    monkeypatch.setattr(settings, "SEARCH_ACL_PREFILTER_MAX_SHARED_IDS", 1)
+    assert await checker.build_vector_acl_filter("u1", "org") is None
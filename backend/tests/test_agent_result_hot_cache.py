@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import json
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.core.redis import RedisClient
+from app.middleware.prometheus import agent_result_cache_evictions_total, agent_result_cache_hits_total
+from app.services import agent_result_cache_service as arc
+from app.services.agent_result_cache_service import AgentResultCacheService, hot_cache
+from app.services.agent_runner import AgentRunner, PipelineContext
+
+KEY = dict(organization_id="org-1", agent_name="TopicModelingAgent", agent_version="v1", strategy="llm", model="m", cache_key="k")
+
+
+def _count(counter, **labels) -> float:
+    return counter.labels(**labels)._value.get()
+
+
+@pytest.fixture(autouse=True)
+def _clear_local():
+    hot_cache.clear_local()
+    yield
+    hot_cache.clear_local()
+
+
+def _session(row=None):
+    session = SimpleNamespace(
+        execute=AsyncMock(return_value=SimpleNamespace(scalar_one_or_none=lambda: row, rowcount=3)),
+        flush=AsyncMock(),
+    )
+    return session
+
+
+def test_near_duplicate_content_shares_cache_key() -> None:
+    runner = AgentRunner()
+    ctx = PipelineContext(org_id="o", memory_id="m")
+
+    def key(content: str) -> str:
+        return runner._compute_cache_key(
+            agent_name="A", agent_version="v1", strategy="llm", model="m", ctx=ctx, content=content,
+            existing_classification=None, scope="personal", scope_id=None, enrichment={}, pending_feedback_fingerprint="",
+        )
+
+    assert key("Refund  order 42\n\nSent from my iPhone") == key("refund order 42")
+    assert key("refund order 42") != key("refund order 43")
+
+
+@pytest.mark.asyncio
+async def test_local_tier_serves_repeat_lookups_without_redis_or_db(monkeypatch) -> None:
+    monkeypatch.setattr(RedisClient, "get_client", AsyncMock(side_effect=ConnectionError("down")))
+    session = _session()
+    svc = AgentResultCacheService(session)
+
+    await svc.upsert(**KEY, outputs={"topics": ["billing"]}, confidence=0.7)
+    before = _count(agent_result_cache_hits_total, agent="TopicModelingAgent", tier="local")
+    hit = await svc.get(**KEY)
+
+    assert hit.outputs == {"topics": ["billing"]} and hit.tier == "local"
+    assert session.execute.await_count == 1  # the upsert only
+    assert _count(agent_result_cache_hits_total, agent="TopicModelingAgent", tier="local") == before + 1
+
+
+@pytest.mark.asyncio
+async def test_redis_tier_hit_and_per_org_eviction(monkeypatch) -> None:
+    payload = json.dumps({"o": {"topics": ["x"]}, "c": 0.5})
+    pipe = MagicMock(execute=AsyncMock(return_value=[payload, 0]))
+    script = AsyncMock(return_value=2)
+    client = MagicMock(pipeline=MagicMock(return_value=pipe), register_script=MagicMock(return_value=script))
+    monkeypatch.setattr(RedisClient, "get_client", AsyncMock(return_value=client))
+    monkeypatch.setattr(arc.settings, "AGENT_CACHE_MAX_ENTRIES_PER_ORG", 10)
+    session = _session()
+    svc = AgentResultCacheService(session)
+
+    hit = await svc.get(**KEY)
+    assert hit.tier == "redis" and hit.confidence == 0.5
+    session.execute.assert_not_awaited()
+    assert (await svc.get(**KEY)).tier == "local"
+
+    evicted = _count(agent_result_cache_evictions_total, tier="redis")
+    await svc.upsert(**KEY, outputs={"topics": ["y"]}, confidence=0.6, ttl_seconds=60)
+    keys, args = script.await_args.kwargs["keys"], script.await_args.kwargs["args"]
+    assert keys[0].startswith("agentcache:org-1:") and keys[1] == "agentcache:org-1:lru"
+    assert args[1] == 60 and args[3] == 10
+    assert _count(agent_result_cache_evictions_total, tier="redis") == evicted + 2
+
+
+@pytest.mark.asyncio
+async def test_db_hit_fills_hot_tier_and_prune_keeps_most_recent(monkeypatch) -> None:
+    monkeypatch.setattr(RedisClient, "get_client", AsyncMock(side_effect=ConnectionError("down")))
+    row = SimpleNamespace(outputs={"a": 1}, confidence=0.9, expires_at=None, last_accessed_at=None)
+    session = _session(row)
+    svc = AgentResultCacheService(session)
+
+    assert (await svc.get(**KEY)).tier == "db"
+    assert (await svc.get(**KEY)).tier == "local"
+    assert session.execute.await_count == 1
+
+    deleted = await svc.prune(organization_id="org-1", max_entries=100)
+    sql = str(session.execute.await_args.args[0].compile(dialect=postgresql.dialect()))
+    assert deleted == 3
+    assert "NOT IN" in sql and "coalesce(agent_result_cache.last_accessed_at" in sql and "LIMIT" in sql
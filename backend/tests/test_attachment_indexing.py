@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+import app.models  # noqa: F401  (configure mappers)
+import app.models.admin  # noqa: F401
+from app.core.qdrant import QdrantService
+from app.models.memory import MemoryMetadata
+from app.models.memory_attachment import MemoryAttachment
+from app.services import attachment_indexer as ai
+from app.services.attachment_indexer import AttachmentIndexer, chunk_point_id, chunk_text
+
+ATT_ID = "3f6c1e2a-8d4b-4c1e-9a55-0b6f7d2e1c10"
+
+
+def test_chunks_overlap_and_cut_at_whitespace() -> None:
+    words = " ".join(f"w{i:03d}" for i in range(200))  # 5 chars per word incl. space
+    chunks = chunk_text(words, size=100, overlap=20)
+
+    assert all(len(c) <= 100 for c in chunks)
+    assert all(not c.startswith(" ") and c.split()[0].startswith("w") for c in chunks)
+    for prev, nxt in zip(chunks, chunks[1:]):
+        assert prev.split()[-1] in nxt.split()[:5]  # shared tail
+    assert chunks[-1].endswith("w199")
+    assert chunk_text("   ", 100, 20) == []
+
+
+@pytest.fixture
+def indexed(monkeypatch):
+    memory = MemoryMetadata(
+        id="mem-1", scope="team", scope_id="t1", owner_id="u1", tags=["x"],
+        classification="internal", required_clearance=0, memory_type="long_term",
+        created_at=datetime(2026, 1, 1),
+    )
+    att = MemoryAttachment(
+        id=ATT_ID, organization_id="org-1", memory_id="mem-1", file_name="doc.txt",
+        content_type="text/plain", storage_path="org-1/mem-1/" + ATT_ID, index_status="pending",
+        sha256="ab" * 32,
+    )
+    twins = []
+    session = SimpleNamespace(
+        get=AsyncMock(side_effect=lambda model, _id: att if model is MemoryAttachment else memory),
+        execute=AsyncMock(
+            side_effect=lambda _stmt: SimpleNamespace(
+                scalars=lambda: SimpleNamespace(first=lambda: twins[0] if twins else None)
+            )
+        ),
+        twins=twins,
+    )
+    calls = SimpleNamespace(
+        extract=AsyncMock(return_value="alpha beta gamma delta " * 50),
+        embed=AsyncMock(side_effect=lambda texts: [[float(i)] for i in range(len(texts))]),
+        upsert=AsyncMock(),
+        delete=AsyncMock(),
+    )
+    monkeypatch.setattr(ai, "extract_attachment_text", calls.extract)
+    monkeypatch.setattr(ai.EmbeddingService, "embed_many", calls.embed)
+    monkeypatch.setattr(QdrantService, "upsert_memories", calls.upsert)
+    monkeypatch.setattr(QdrantService, "delete_attachment_points", calls.delete)
+    monkeypatch.setattr(ai.settings, "ATTACHMENT_CHUNK_CHARS", 300)
+    monkeypatch.setattr(ai.settings, "ATTACHMENT_CHUNK_OVERLAP_CHARS", 50)
+    return session, att, calls
+
+
+@pytest.mark.asyncio
+async def test_indexer_upserts_one_point_per_chunk(indexed) -> None:
+    session, att, calls = indexed
+
+    result = await AttachmentIndexer(session, "org-1").index(ATT_ID)
+
+    calls.delete.assert_awaited_once_with(org_id="org-1", attachment_id=ATT_ID)
+    (texts,) = calls.embed.await_args.args
+    org, points = calls.upsert.await_args.args
+    assert org == "org-1" and len(points) == len(texts) > 1
+    assert [p["id"] for p in points] == [chunk_point_id(ATT_ID, i) for i in range(len(texts))]
+    payload = points[1]["payload"]
+    assert payload["memory_id"] == "mem-1" and payload["attachment_id"] == ATT_ID
+    assert payload["chunk_index"] == 1 and payload["team_id"] == "t1" and payload["tags"] == ["x"]
+    assert (result.index_status, result.chunk_count, result.index_error) == ("indexed", len(texts), None)
+
+
+@pytest.mark.asyncio
+async def test_indexer_records_empty_and_failed(indexed) -> None:
+    session, att, calls = indexed
+    calls.extract.return_value = ""
+    await AttachmentIndexer(session, "org-1").index(ATT_ID)
+    assert (att.index_status, att.chunk_count) == ("empty", 0)
+    calls.upsert.assert_not_awaited()
+
+    calls.extract.return_value = "text"
+    calls.embed.side_effect = RuntimeError("embeddings down")
+    await AttachmentIndexer(session, "org-1").index(ATT_ID)
+    assert (att.index_status, att.index_error, att.indexed_at) == ("failed", "embeddings down", None)
+
+
+@pytest.mark.asyncio
+async def test_identical_bytes_reuse_the_indexed_twin(indexed, monkeypatch) -> None:
+    session, att, calls = indexed
+    twin_id = "9d2b7c1e-0f3a-4b8e-8c6d-5a4e3f2b1c0d"
+    session.twins.append(MemoryAttachment(id=twin_id, index_status="indexed", chunk_count=2))
+    retrieve = AsyncMock(side_effect=lambda _org, ids: {pid: [float(n)] for n, pid in enumerate(ids)})
+    monkeypatch.setattr(QdrantService, "retrieve_vectors", retrieve)
+
+    await AttachmentIndexer(session, "org-1").index(ATT_ID)
+
+    calls.extract.assert_not_awaited()
+    calls.embed.assert_not_awaited()
+    assert retrieve.await_args.args[1] == [chunk_point_id(twin_id, 0), chunk_point_id(twin_id, 1)]
+    _, points = calls.upsert.await_args.args
+    assert [(p["id"], p["vector"]) for p in points] == [
+        (chunk_point_id(ATT_ID, 0), [0.0]), (chunk_point_id(ATT_ID, 1), [1.0]),
+    ]
+    assert points[0]["payload"]["attachment_id"] == ATT_ID
+    assert (att.index_status, att.chunk_count) == ("indexed", 2)
+
+    # Vectors gone from Qdrant: fall back to extracting and embedding.
+    retrieve.side_effect = lambda _org, ids: {}
+    await AttachmentIndexer(session, "org-1").index(ATT_ID)
+    calls.embed.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_grouped_search_returns_best_chunk_per_memory(monkeypatch) -> None:
+    def hit(pid, score, mid):
+        return SimpleNamespace(id=pid, score=score, payload={"memory_id": mid})
+
+    client = MagicMock()
+    client.search_groups.return_value = SimpleNamespace(
+        groups=[
+            SimpleNamespace(id="m1", hits=[hit("c1", 0.9, "m1")]),
+            SimpleNamespace(id="m2", hits=[hit("c7", 0.5, "m2")]),
+        ]
+    )
+    monkeypatch.setattr(QdrantService, "_client", client)
+    monkeypatch.setattr(QdrantService, "_ready_collections", {"memories"})
+    monkeypatch.setattr("app.core.qdrant.CollectionRouter._load", AsyncMock(return_value={}))
+
+    results = await QdrantService.search("org-1", [0.1], limit=5, group_by="memory_id")
+
+    assert [(r["id"], r["score"]) for r in results] == [("c1", 0.9), ("c7", 0.5)]
+    assert client.search_groups.call_args.kwargs["group_by"] == "memory_id"
+    client.search.assert_not_called()
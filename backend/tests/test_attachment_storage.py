@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import io
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI, Request, UploadFile
+from fastapi.testclient import TestClient
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+import app.models  # noqa: F401  (configure mappers)
+import app.models.admin  # noqa: F401
+from app.core.file_response import RangeNotSatisfiableError, file_response, parse_range
+from app.services.attachment_blob_store import AttachmentBlobStore, BlobTooLargeError, blob_relpath
+
+
+class _BlobSession:
+    """Emulates the attachment_blobs upsert / decrement statements."""
+
+    def __init__(self):
+        self.refs: dict[str, int] = {}
+        self.sync_session = Session()  # fires the transaction events
+
+    async def execute(self, stmt):
+        sql = str(stmt.compile(dialect=postgresql.dialect()))
+        params = stmt.compile().params
+        digest = next(v for k, v in params.items() if k.startswith("sha256"))
+        if sql.startswith("INSERT"):
+            assert "ON CONFLICT (organization_id, sha256) DO UPDATE" in sql
+            self.refs[digest] = self.refs.get(digest, 0) + 1
+        elif sql.startswith("UPDATE"):
+            if digest not in self.refs:
+                return SimpleNamespace(first=lambda: None)
+            self.refs[digest] -= 1
+            row = (self.refs[digest], blob_relpath("org-1", digest))
+            return SimpleNamespace(first=lambda: row)
+        elif sql.startswith("DELETE"):
+            del self.refs[digest]
+        return SimpleNamespace()
+
+
+def _upload(data: bytes) -> UploadFile:
+    return UploadFile(io.BytesIO(data), filename="a.bin")
+
+
+@pytest.mark.asyncio
+async def test_identical_uploads_share_one_refcounted_blob(tmp_path) -> None:
+    session = _BlobSession()
+    store = AttachmentBlobStore(session, "org-1", tmp_path)
+
+    staged = [await store.stage(_upload(b"same bytes"), max_bytes=100) for _ in range(2)]
+    paths = [await store.acquire(s) for s in staged]
+
+    assert paths[0] == paths[1] == blob_relpath("org-1", staged[0].sha256)
+    assert session.refs == {staged[0].sha256: 2}
+    assert (tmp_path / paths[0]).read_bytes() == b"same bytes"
+    assert list((tmp_path / "tmp").iterdir()) == []
+
+    assert await store.release(staged[0].sha256) is False
+    assert (tmp_path / paths[0]).exists()
+    assert await store.release(staged[0].sha256) is True
+    assert session.refs == {}
+    session.sync_session.commit()
+    assert not (tmp_path / paths[0]).exists()
+    assert [p.name for p in (tmp_path / paths[0]).parent.iterdir()] == []
+
+
+@pytest.mark.asyncio
+async def test_released_blob_survives_a_rollback(tmp_path) -> None:
+    session = _BlobSession()
+    store = AttachmentBlobStore(session, "org-1", tmp_path)
+    path = tmp_path / await store.acquire(await store.stage(_upload(b"bytes"), max_bytes=100))
+    digest = path.name
+    session.sync_session.commit()
+
+    session.sync_session.begin()
+    assert await store.release(digest) is True
+    assert not path.exists()  # moved aside while the row lock is held
+    session.sync_session.rollback()
+    assert path.read_bytes() == b"bytes"
+
+    # The rolled-back release does not leak into the next commit.
+    session.sync_session.commit()
+    assert path.read_bytes() == b"bytes"
+
+
+@pytest.mark.asyncio
+async def test_rolled_back_upload_removes_its_new_blob(tmp_path) -> None:
+    session = _BlobSession()
+    store = AttachmentBlobStore(session, "org-1", tmp_path)
+    kept = tmp_path / await store.acquire(await store.stage(_upload(b"kept"), max_bytes=100))
+    session.sync_session.commit()
+
+    session.sync_session.begin()
+    shared = tmp_path / await store.acquire(await store.stage(_upload(b"kept"), max_bytes=100))
+    new = tmp_path / await store.acquire(await store.stage(_upload(b"new"), max_bytes=100))
+    assert new.read_bytes() == b"new"
+    session.sync_session.rollback()
+
+    assert not new.exists()  # no row survived, so sweep_orphans would never find it
+    assert shared == kept and kept.read_bytes() == b"kept"
+
+
+@pytest.mark.asyncio
+async def test_oversized_upload_leaves_no_temp_file(tmp_path) -> None:
+    store = AttachmentBlobStore(_BlobSession(), "org-1", tmp_path)
+    with pytest.raises(BlobTooLargeError):
+        await store.stage(_upload(b"x" * 10), max_bytes=5)
+    assert list((tmp_path / "tmp").iterdir()) == []
+
+
+def test_parse_range() -> None:
+    assert parse_range(None, 100) is None
+    assert parse_range("bytes=0-9", 100) == (0, 9)
+    assert parse_range("bytes=90-", 100) == (90, 99)
+    assert parse_range("bytes=-10", 100) == (90, 99)
+    assert parse_range("bytes=50-500", 100) == (50, 99)
+    assert parse_range("bytes=0-1,5-6", 100) is None
+    assert parse_range("items=0-1", 100) is None
+    with pytest.raises(RangeNotSatisfiableError):
+        parse_range("bytes=100-", 100)
+
+
+def test_file_response_serves_ranges_and_validators(tmp_path) -> None:
+    path = tmp_path / "blob"
+    path.write_bytes(bytes(range(256)) * 1024)  # 256 KiB, several chunks
+    api = FastAPI()
+
+    @api.get("/f")
+    async def _get(request: Request):
+        return file_response(request, path, media_type="application/octet-stream", etag="abc")
+
+    client = TestClient(api)
+
+    full = client.get("/f")
+    assert full.status_code == 200 and len(full.content) == 256 * 1024
+    assert full.headers["accept-ranges"] == "bytes" and full.headers["etag"] == '"abc"'
+
+    part = client.get("/f", headers={"Range": "bytes=65530-65545"})
+    assert part.status_code == 206
+    assert part.content == path.read_bytes()[65530:65546]
+    assert part.headers["content-range"] == f"bytes 65530-65545/{256 * 1024}"
+
+    assert client.get("/f", headers={"Range": "bytes=0-1", "If-Range": '"old"'}).status_code == 200
+    assert client.get("/f", headers={"Range": "bytes=999999-"}).status_code == 416
+    assert client.get("/f", headers={"If-None-Match": '"abc"'}).status_code == 304
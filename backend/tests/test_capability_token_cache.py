@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.core.redis import RedisClient
+from app.models.capability_token import CapabilityToken
+from app.services import capability_token_cache as ctc
+from app.services.capability_token_cache import CapabilityTokenCache, pop_dirty_tokens, reconcile_usage
+from app.services.memory_syscall_service import MemorySyscall, QuotaExceededException, TokenExpiredException
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data: dict = {}
+
+    async def mget(self, keys):
+        return [self.data.get(k) for k in keys]
+
+    def pipeline(self, transaction=False):
+        return _FakePipeline(self)
+
+    async def spop(self, key, count):
+        members = sorted(self.data.get(key, set()))[:count]
+        self.data[key] = self.data.get(key, set()) - set(members)
+        return members
+
+    async def sadd(self, key, *members):
+        self.data.setdefault(key, set()).update(members)
+
+
+class _FakePipeline:
+    def __init__(self, redis: FakeRedis):
+        self.d = redis.data
+        self.ops = []
+
+    def _hash(self, key):
+        return self.d.setdefault(key, {})
+
+    def set(self, key, value, nx=False, ex=None):
+        self.ops.append(lambda: None if nx and key in self.d else self.d.__setitem__(key, value))
+
+    def delete(self, key):
+        self.ops.append(lambda: self.d.pop(key, None))
+
+    def get(self, key):
+        self.ops.append(lambda: self.d.get(key))
+
+    def hsetnx(self, key, field, value):
+        self.ops.append(lambda: self._hash(key).setdefault(field, str(value)))
+
+    def hset(self, key, field, value):
+        self.ops.append(lambda: self._hash(key).__setitem__(field, str(value)))
+
+    def hmget(self, key, fields):
+        self.ops.append(lambda: [self.d.get(key, {}).get(f) for f in fields])
+
+    def hincrby(self, key, field, amount):
+        def op():
+            h = self._hash(key)
+            h[field] = str(int(h.get(field, 0)) + amount)
+        self.ops.append(op)
+
+    def incr(self, key):
+        self.ops.append(lambda: self.d.__setitem__(key, str(int(self.d.get(key, 0)) + 1)))
+
+    def expire(self, key, seconds):
+        self.ops.append(lambda: True)
+
+    def sadd(self, key, *members):
+        self.ops.append(lambda: self.d.setdefault(key, set()).update(members))
+
+    async def execute(self):
+        return [op() for op in self.ops]
+
+
+def _token(**overrides) -> CapabilityToken:
+    values = dict(
+        id="tok-1", token="cap_secret", organization_id="org-1", scopes="read,search",
+        quota_tokens_per_month=100, quota_storage_bytes=1000, quota_requests_per_minute=3,
+        tokens_used_this_month=10, storage_used_bytes=0, requests_this_minute=0, active=True,
+        revoked_at=None, revocation_reason=None, expires_at=datetime.utcnow() + timedelta(days=1),
+    )
+    values.update(overrides)
+    return CapabilityToken(**values)
+
+
+class _Session:
+    def __init__(self, token):
+        self.token = token
+        self.loads = 0
+        self.updates: list[str] = []
+
+    async def execute(self, stmt):
+        sql = str(stmt.compile(dialect=postgresql.dialect()))
+        if sql.startswith("UPDATE"):
+            self.updates.append(sql)
+            return SimpleNamespace()
+        self.loads += 1
+        return SimpleNamespace(scalar_one_or_none=lambda: self.token)
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    fake = FakeRedis()
+    monkeypatch.setattr(RedisClient, "get_client", AsyncMock(return_value=fake))
+    monkeypatch.setattr("app.services.memory_syscall_service.AuditService.log_event", AsyncMock())
+    ctc._cache.local.clear()
+    yield fake
+    ctc._cache.local.clear()
+
+
+@pytest.mark.asyncio
+async def test_validation_is_cached_until_revoked(redis) -> None:
+    token = _token()
+    session = _Session(token)
+    syscall = MemorySyscall(session, "org-1")
+
+    for _ in range(2):
+        validated = await syscall._validate_token("cap_secret", "read")
+        await syscall._update_token_usage(validated, tokens_used=2)
+
+    assert session.loads == 1 and session.updates == []
+    assert not any("cap_secret" in str(k) for k in redis.data)
+    assert redis.data["capusage:tok-1"]["tokens"] == "14"  # seeded from the row (10) + 2 + 2
+
+    token.revoked_at = datetime.utcnow()
+    await CapabilityTokenCache.invalidate("org-1", ["cap_secret"])
+    with pytest.raises(TokenExpiredException):
+        await syscall._validate_token("cap_secret", "read")
+    assert session.loads == 2
+
+
+@pytest.mark.asyncio
+async def test_rate_and_quota_are_enforced_from_redis_counters(redis) -> None:
+    syscall = MemorySyscall(_Session(_token()), "org-1")
+    for _ in range(3):
+        await syscall._update_token_usage(await syscall._validate_token("cap_secret", "search"))
+    with pytest.raises(QuotaExceededException, match="Rate limit"):
+        await syscall._validate_token("cap_secret", "search")
+
+    quota = MemorySyscall(_Session(_token(id="tok-2", token="cap_other", quota_requests_per_minute=0)), "org-1")
+    validated = await quota._validate_token("cap_other", "read")
+    await quota._update_token_usage(validated, tokens_used=90)
+    with pytest.raises(QuotaExceededException, match="quota"):
+        await quota._validate_token("cap_other", "read")
+
+
+@pytest.mark.asyncio
+async def test_falls_back_to_atomic_row_update_without_redis(monkeypatch) -> None:
+    monkeypatch.setattr(RedisClient, "get_client", AsyncMock(side_effect=ConnectionError("down")))
+    session = _Session(_token())
+    syscall = MemorySyscall(session, "org-1")
+    syscall._db_requests_this_minute = AsyncMock(return_value=0)
+
+    await syscall._update_token_usage(await syscall._validate_token("cap_secret", "read"), tokens_used=1)
+
+    (sql,) = session.updates
+    assert "tokens_used_this_month=(capability_tokens.tokens_used_this_month +" in sql
+    assert "requests_this_minute=CASE" in sql
+
+
+@pytest.mark.asyncio
+async def test_reconcile_writes_totals_back(redis) -> None:
+    syscall = MemorySyscall(_Session(_token()), "org-1")
+    await syscall._update_token_usage(await syscall._validate_token("cap_secret", "read"), 5, 7)
+
+    pending = await pop_dirty_tokens(100)
+    assert pending["org-1"]["tok-1"]["tokens"] == 15 and pending["org-1"]["tok-1"]["storage"] == 7
+    assert await pop_dirty_tokens(100) == {}
+
+    session = _Session(None)
+    assert await reconcile_usage(session, pending["org-1"]) == 1
+    assert "greatest(capability_tokens.tokens_used_this_month" in session.updates[0]
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.agents.classification_agent import ClassificationAgent
+from app.agents.llm.combined_enrichment import CombinedEnrichmentBatcher, EnrichmentItem
+from app.agents.topic_modeling_agent import TopicModelingAgent
+from app.services.agent_runner import AgentRunner, PipelineContext
+
+
+def _sections(i: int) -> dict:
+    return {
+        "id": f"m{i}",
+        "classification": {"classification": "internal", "confidence": 0.9, "is_sensitive": False},
+        "metadata": {"tags": ["billing"], "entities": {}, "confidence": 0.8},
+        "topics": {"topics": ["billing"], "primary_topic": "billing", "confidence": 0.7},
+        "patterns": {"patterns": [], "confidence": 0.5},
+    }
+
+
+@pytest.mark.asyncio
+async def test_batcher_packs_concurrent_memories_into_one_call() -> None:
+    client = AsyncMock()
+    # The model drops m2 from its answer.
+    client.complete_json = AsyncMock(return_value={"results": [_sections(0), _sections(1)]})
+    batcher = CombinedEnrichmentBatcher(client=client, max_batch=4, max_wait_seconds=0.01)
+
+    out = await asyncio.gather(*(batcher.enrich(EnrichmentItem(key=f"m{i}", content=f"c{i}")) for i in range(3)))
+
+    assert batcher.calls == 1
+    prompt = client.complete_json.await_args.kwargs["prompt"]
+    assert all(f"MEMORY id=m{i}" in prompt for i in range(3))
+    assert out[0]["topics"]["primary_topic"] == "billing" and set(out[1]) == {
+        "classification", "metadata", "topics", "patterns",
+    }
+    assert out[2] == {}
+
+
+@pytest.mark.asyncio
+async def test_full_batch_is_sent_without_waiting_and_failures_fail_closed() -> None:
+    client = AsyncMock()
+    client.complete_json = AsyncMock(side_effect=RuntimeError("ollama down"))
+    batcher = CombinedEnrichmentBatcher(client=client, max_batch=2, max_wait_seconds=10)
+
+    out = await asyncio.wait_for(
+        asyncio.gather(*(batcher.enrich(EnrichmentItem(key=k, content="x")) for k in ("a", "b"))), timeout=1
+    )
+
+    assert out == [{}, {}] and batcher.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_agents_use_prefetched_section_or_heuristic_without_own_call(monkeypatch) -> None:
+    def _no_client(**kwargs):
+        raise AssertionError("agent made its own LLM call")
+
+    monkeypatch.setattr("app.agents.classification_agent.create_ollama_client", _no_client)
+    monkeypatch.setattr("app.agents.topic_modeling_agent.create_ollama_client", _no_client)
+    combined = {k: v for k, v in _sections(0).items() if k != "id"}
+    combined["topics"] = {"topics": "not-a-list"}
+    ctx = {"memory": {"content": "refund the invoice payment", "classification": "internal"}, "combined_enrichment": combined}
+
+    classification = await ClassificationAgent().run("m0", ctx)
+    topics = await TopicModelingAgent().run("m0", ctx)
+
+    assert classification.outputs["confidence"] == 0.9
+    assert topics.outputs["rationale"] == "heuristic" and topics.outputs["primary_topic"] == "billing"
+
+
+@pytest.mark.asyncio
+async def test_runner_fetches_combined_sections_once_per_memory(monkeypatch) -> None:
+    monkeypatch.setattr(
+        "app.services.agent_runner.CombinedEnrichmentBatcher.enrich",
+        AsyncMock(return_value={"topics": {}}),
+    )
+    runner = AgentRunner(combined_enrichment=True)
+    ctx = PipelineContext(org_id="o", memory_id="m1")
+
+    results = await asyncio.gather(
+        *(runner._combined_sections(ctx=ctx, content="c", existing_classification=None, tool_event_sink=None) for _ in range(4))
+    )
+
+    assert results == [{"topics": {}}] * 4
+    runner._batcher.enrich.assert_awaited_once()
+
+
+def test_batch_failure_retries_only_that_memory(monkeypatch) -> None:
+    from app.tasks import memory_pipeline as mp
+
+    async def _enrich(self, *, ctx, attempt=1, max_attempts=5):
+        if ctx.memory_id == "bad":
+            raise RuntimeError("llm timeout")
+        return []
+
+    monkeypatch.setattr(AgentRunner, "run_enrichment", _enrich)
+    post = MagicMock(side_effect=lambda item: f"post:{item['memory_id']}")
+    groups, chains = MagicMock(), MagicMock()
+    monkeypatch.setattr(mp, "_post_enrichment_dag", post)
+    monkeypatch.setattr(mp, "group", groups)
+    monkeypatch.setattr(mp, "chain", chains)
+    items = [{"org_id": "o", "memory_id": m} for m in ("m1", "bad", "m2")]
+
+    assert mp.enrichment_batch_task.run(items=items) == [[], None, []]
+
+    # The batch's successes continue; the failure gets its own retrying DAG.
+    assert groups.call_args.args[0] == ["post:m1", "post:m2"]
+    groups.return_value.apply_async.assert_called_once()
+    (enrich_sig, post_sig) = chains.call_args.args
+    assert enrich_sig.kwargs["memory_id"] == "bad" and post_sig == "post:bad"
+    chains.return_value.apply_async.assert_called_once()
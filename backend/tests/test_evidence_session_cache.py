@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.schemas.cognitive import CriticOutput
+from app.services.cognitive_loop.evidence_service import CognitiveEvidenceService
+from app.services.cognitive_loop.orchestrator import LoopOrchestrator, OrchestratorConfig
+from app.services.cognitive_tooling.policy_guard import ToolContext
+from app.services.simulation_service import SimulationService
+from tests.test_loop_orchestrator import (
+    FakeExecutor,
+    FakePlanner,
+    FakeRepo,
+    FakeSession,
+    FakeSimulationReports,
+)
+
+
+def _memory(mid: str, title: str, score: float):
+    return SimpleNamespace(id=mid, title=title, content_preview=title, tags=[], score=score)
+
+
+class FakeMemoryService:
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls: list[dict] = []
+
+    async def search_memories(self, embedding, request, recorded_ids=None):
+        self.calls.append({"limit": request.limit, "recorded_ids": set(recorded_ids or ())})
+        return self.rows[: request.limit]
+
+
+class IssueCritic:
+    def __init__(self, iterations: int):
+        self.iterations = iterations
+        self.cards: list[list[str]] = []
+
+    async def critique(self, *, evidence_cards, **kwargs):
+        self.cards.append([c["id"] for c in evidence_cards])
+        done = len(self.cards) >= self.iterations
+        return CriticOutput(
+            evaluation="pass" if done else "retry",
+            issues=[{"type": "missing_evidence", "description": "No billing invoice data", "recommended_fix": "find invoices"}],
+            confidence=0.5,
+        )
+
+
+@pytest.fixture
+def embed(monkeypatch):
+    mock = AsyncMock(return_value=[0.1, 0.2])
+    monkeypatch.setattr("app.services.cognitive_loop.evidence_service.EmbeddingService.embed", mock)
+    return mock
+
+
+@pytest.mark.asyncio
+async def test_ten_iterations_embed_and_search_once(embed, monkeypatch) -> None:
+    monkeypatch.setattr("app.core.config.settings.COGNITIVE_EVIDENCE_CONTEXT_WEIGHT", 0.6)
+    rows = [_memory(f"m{i}", "release notes", 1.0 - i * 0.01) for i in range(20)]
+    rows.append(_memory("inv", "billing invoices", 0.5))
+    memory = FakeMemoryService(rows)
+    critic = IssueCritic(iterations=10)
+    orch = LoopOrchestrator(
+        repo=FakeRepo(FakeSession(id="s1", status="running", goal="quarterly billing")),
+        evidence=CognitiveEvidenceService(memory),
+        planner=FakePlanner(),
+        simulator=SimulationService(),
+        simulation_reports=FakeSimulationReports(),
+        executor=FakeExecutor(),
+        critic=critic,
+        available_tools=[],
+        config=OrchestratorConfig(max_iterations=10),
+    )
+
+    assert await orch.run(session_id="s1", tool_ctx=ToolContext(user_id="u", org_id="o")) == "succeeded"
+
+    embed.assert_awaited_once()
+    assert memory.calls == [{"limit": 30, "recorded_ids": set()}]
+    # First iteration: plain retrieval order (the invoice card is outside the top 10).
+    assert "inv" not in critic.cards[0] and len(critic.cards[0]) == 10
+    # Later iterations re-rank the cached pool towards the critic's issue.
+    assert critic.cards[1][0] == "inv"
+
+
+@pytest.mark.asyncio
+async def test_repeat_search_in_session_records_only_new_results(embed) -> None:
+    memory = FakeMemoryService([_memory(f"m{i}", "x", 1.0 - i * 0.01) for i in range(10)])
+    evidence = CognitiveEvidenceService(memory)
+    session = evidence.open_session()
+
+    await evidence.retrieve_evidence(goal="g", limit=2, session=session)
+    await evidence.retrieve_evidence(goal="g", limit=2, session=session)
+    await evidence.retrieve_evidence(goal="g", limit=20, session=session)
+
+    # The larger repeat search still records m6..m9, which it returns first.
+    assert memory.calls == [
+        {"limit": 6, "recorded_ids": set()},
+        {"limit": 50, "recorded_ids": {f"m{i}" for i in range(6)}},
+    ]
+    assert session.recorded_ids == {f"m{i}" for i in range(10)}
+    embed.assert_awaited_once()
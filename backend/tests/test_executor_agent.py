@@ -48,7 +48,7 @@ async def test_executor_agent_denied_tool_does_not_crash() -> None:
     registry.register(ToolSpec(name="memory.search", required_permissions=("memory:read:team",)), handler)
 
     log_service = AsyncMock()
-    log_service.create = AsyncMock(return_value=type("Row", (), {"id": "tc1"})())
+    log_service.create_many = AsyncMock(side_effect=lambda entries: [type("Row", (), {"id": "tc1"})() for _ in entries])
 
     invoker = ToolInvoker(registry=registry, guard=guard, log_service=log_service)
     agent = ExecutorAgent(tool_invoker=invoker)
@@ -80,7 +80,7 @@ async def test_executor_agent_success_step() -> None:
     registry.register(ToolSpec(name="math.tool", required_permissions=("math:use",)), handler)
 
     log_service = AsyncMock()
-    log_service.create = AsyncMock(return_value=type("Row", (), {"id": "tc2"})())
+    log_service.create_many = AsyncMock(side_effect=lambda entries: [type("Row", (), {"id": "tc2"})() for _ in entries])
 
     invoker = ToolInvoker(registry=registry, guard=guard, log_service=log_service)
     agent = ExecutorAgent(tool_invoker=invoker)
@@ -103,7 +103,7 @@ async def test_executor_agent_skips_step_without_tool() -> None:
     registry = ToolRegistry()
     guard = PolicyGuard(AsyncMock())
     log_service = AsyncMock()
-    log_service.create = AsyncMock(return_value=type("Row", (), {"id": "tcX"})())
+    log_service.create_many = AsyncMock(side_effect=lambda entries: [type("Row", (), {"id": "tcX"})() for _ in entries])
 
     invoker = ToolInvoker(registry=registry, guard=guard, log_service=log_service)
     agent = ExecutorAgent(tool_invoker=invoker)
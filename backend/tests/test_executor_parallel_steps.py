@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.schemas.cognitive import PlannerOutput
+from app.services.cognitive_loop import tools
+from app.services.cognitive_loop.executor_agent import ExecutorAgent
+from app.services.cognitive_tooling.policy_guard import PolicyGuard, ToolContext
+from app.services.cognitive_tooling.tool_invoker import ToolInvoker
+from app.services.cognitive_tooling.tool_registry import ToolRegistry, ToolSpec
+from app.services.permission_checker import AccessDecision
+
+CTX = ToolContext(user_id="u", org_id="o")
+
+
+def _plan(*steps: dict) -> PlannerOutput:
+    return PlannerOutput(
+        objective="goal",
+        steps=[
+            {"action": "do", "expected_output": "y", "success_criteria": ["ok"], "tool_input_hint": {}, **s}
+            for s in steps
+        ],
+        confidence=0.5,
+    )
+
+
+def _agent(registry: ToolRegistry, allowed: bool = True):
+    checker = AsyncMock()
+    checker.check_permission = AsyncMock(return_value=AccessDecision(allowed, "x", "rbac"))
+    log_service = AsyncMock()
+    log_service.create_many = AsyncMock(
+        side_effect=lambda entries: [type("Row", (), {"id": f"tc-{e['tool_name']}"})() for e in entries]
+    )
+    invoker = ToolInvoker(registry=registry, guard=PolicyGuard(checker), log_service=log_service)
+    return ExecutorAgent(tool_invoker=invoker), log_service
+
+
+def _sleepy(calls: list, delay: float = 0.2):
+    async def handler(inp: dict) -> dict:
+        calls.append(("start", inp.get("n")))
+        await asyncio.sleep(delay)
+        calls.append(("end", inp.get("n")))
+        return {"n": inp.get("n"), "items": [inp.get("n"), "x"]}
+
+    return handler
+
+
+@pytest.mark.asyncio
+async def test_independent_steps_run_concurrently_and_log_once() -> None:
+    calls: list = []
+    registry = ToolRegistry()
+    registry.register(ToolSpec(name="a.slow"), _sleepy(calls))
+    registry.register(ToolSpec(name="b.slow"), _sleepy(calls))
+    agent, log_service = _agent(registry)
+
+    t0 = time.perf_counter()
+    out = await agent.execute(
+        session_id="s", iteration_id="i", ctx=CTX,
+        plan=_plan({"step_id": "S1", "tool": "a.slow", "tool_input_hint": {"n": 1}},
+                   {"step_id": "S2", "tool": "b.slow", "tool_input_hint": {"n": 2}}),
+    )
+
+    assert time.perf_counter() - t0 < 0.35
+    assert [c[0] for c in calls[:2]] == ["start", "start"]
+    assert [(r.step_id, r.status, r.tool_call_id) for r in out.step_results] == [
+        ("S1", "success", "tc-a.slow"), ("S2", "success", "tc-b.slow"),
+    ]
+    log_service.create_many.assert_awaited_once()
+    log_service.create.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_dependent_step_waits_and_receives_output() -> None:
+    calls: list = []
+    seen: list = []
+    registry = ToolRegistry()
+    registry.register(ToolSpec(name="first"), _sleepy(calls, 0.05))
+
+    async def second(inp: dict) -> dict:
+        seen.append(inp)
+        return {}
+
+    registry.register(ToolSpec(name="second"), second)
+    agent, _ = _agent(registry)
+
+    out = await agent.execute(
+        session_id="s", iteration_id="i", ctx=CTX,
+        plan=_plan({"step_id": "S2", "tool": "second", "tool_input_hint": {"ids": "${S1.items}", "m": "${S1.items.0}"}},
+                   {"step_id": "S1", "tool": "first", "tool_input_hint": {"n": 7}}),
+    )
+
+    assert seen == [{"ids": [7, "x"], "m": 7}]
+    assert [r.status for r in out.step_results] == ["success", "success"]
+
+
+@pytest.mark.asyncio
+async def test_per_tool_limit_timeout_and_failed_dependency() -> None:
+    calls: list = []
+    registry = ToolRegistry()
+    registry.register(ToolSpec(name="serial", max_concurrency=1), _sleepy(calls, 0.02))
+    registry.register(ToolSpec(name="hang", timeout_seconds=0.05), _sleepy([], 5))
+    registry.register(ToolSpec(name="after"), _sleepy([], 0))
+    agent, _ = _agent(registry)
+
+    out = await agent.execute(
+        session_id="s", iteration_id="i", ctx=CTX,
+        plan=_plan({"step_id": "A", "tool": "serial", "tool_input_hint": {"n": 1}},
+                   {"step_id": "B", "tool": "serial", "tool_input_hint": {"n": 2}},
+                   {"step_id": "H", "tool": "hang"},
+                   {"step_id": "D", "tool": "after", "depends_on": ["H"]}),
+    )
+
+    assert [c[0] for c in calls] == ["start", "end", "start", "end"]
+    status = {r.step_id: (r.status, r.summary) for r in out.step_results}
+    assert status["H"][0] == "failed" and "TimeoutError" in status["H"][1]
+    assert status["D"] == ("skipped", "Dependency H did not succeed; step not executed.")
+    assert out.overall_status == "failed"
+
+
+@pytest.mark.asyncio
+async def test_cycles_are_not_executed() -> None:
+    registry = ToolRegistry()
+    handler = AsyncMock(return_value={})
+    registry.register(ToolSpec(name="t"), handler)
+    agent, _ = _agent(registry)
+
+    out = await agent.execute(
+        session_id="s", iteration_id="i", ctx=CTX,
+        plan=_plan({"step_id": "A", "tool": "t", "depends_on": ["B"]},
+                   {"step_id": "B", "tool": "t", "tool_input_hint": {"q": "${A}"}},
+                   {"step_id": "C", "tool": "t"}),
+    )
+
+    assert [r.status for r in out.step_results] == ["skipped", "skipped", "success"]
+    handler.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_timed_out_memory_search_leaves_the_shared_session_alone(monkeypatch) -> None:
+    opened: list[dict] = []
+
+    @asynccontextmanager
+    async def _own_session(**kwargs):
+        opened.append(kwargs)
+        yield SimpleNamespace(name="own")
+
+    async def _hang(self, embedding, request, **kwargs):
+        assert self.session.name == "own"
+        await asyncio.sleep(5)
+
+    monkeypatch.setattr(tools, "get_tenant_session", _own_session)
+    monkeypatch.setattr(tools.EmbeddingService, "embed", AsyncMock(return_value=[0.0]))
+    monkeypatch.setattr(tools.MemoryService, "search_memories", _hang)
+    shared = AsyncMock()
+    registry = ToolRegistry()
+    tools.register_builtin_tools(
+        registry=registry,
+        memory_service=tools.MemoryService(shared, user_id="u", org_id="o", clearance_level=2),
+        roles="member",
+    )
+    monkeypatch.setattr("app.core.config.settings.COGNITIVE_TOOL_TIMEOUT_SECONDS", 0.05)
+    agent, log_service = _agent(registry)
+
+    out = await agent.execute(
+        session_id="s", iteration_id="i", ctx=CTX,
+        plan=_plan({"step_id": "S", "tool": "memory.search", "tool_input_hint": {"query": "q"}}),
+    )
+
+    assert out.step_results[0].status == "failed" and "TimeoutError" in out.step_results[0].summary
+    assert opened == [{
+        "user_id": "u", "org_id": "o", "roles": "member", "clearance_level": 2,
+        "justification": "cognitive_tool:memory.search",
+    }]
+    shared.execute.assert_not_awaited()
+    log_service.create_many.assert_awaited_once()
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import csv
+import hashlib
+import io
+import json
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+
+from app.services.export_snapshot_service import ExportAndSnapshotService
+from app.services.object_store import LocalObjectStore
+
+
+class _FakeStream:
+    def __init__(self, rows, batch_size):
+        self._rows = rows
+        self._batch_size = batch_size
+
+    async def partitions(self):
+        for i in range(0, len(self._rows), self._batch_size):
+            yield self._rows[i : i + self._batch_size]
+
+
+def _memory(i: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=str(uuid4()),
+        title=f"Memory {i}",
+        content_preview=f"content, with \"quotes\" {i}",
+        scope="team",
+        memory_type="long_term",
+        classification="internal",
+        tags=["a", f"t{i}"],
+        entities={},
+        extra_metadata={"n": i},
+        source_type=None,
+        source_id=None,
+        is_active=True,
+        created_at=datetime(2024, 1, 1, 12, 0, i),
+        updated_at=datetime(2024, 1, 2, 12, 0, i),
+    )
+
+
+def _service(tmp_path, rows, batch_size=2):
+    db = MagicMock()
+    db.add = MagicMock()
+    db.flush = AsyncMock()
+    calls = []
+
+    async def stream_scalars(stmt):
+        calls.append(stmt)
+        return _FakeStream(rows, batch_size)
+
+    db.stream_scalars = stream_scalars
+    svc = ExportAndSnapshotService(
+        db, str(uuid4()), object_store=LocalObjectStore(str(tmp_path)), batch_size=batch_size
+    )
+    svc.audit_svc = MagicMock(log_event=AsyncMock())
+    return svc, calls
+
+
+def _read(snapshot) -> bytes:
+    with open(snapshot.storage_path, "rb") as f:
+        return f.read()
+
+
+@pytest.mark.asyncio
+async def test_json_export_streams_valid_array_with_rolling_checksum(tmp_path) -> None:
+    rows = [_memory(i) for i in range(5)]
+    svc, calls = _service(tmp_path, rows)
+
+    snapshot = await svc.create_memory_export(format="json")
+
+    data = _read(snapshot)
+    parsed = json.loads(data)
+    assert [r["id"] for r in parsed] == [r.id for r in rows]
+    assert parsed[0]["created_at"] == "2024-01-01T12:00:00+00:00"
+    assert snapshot.status == "completed"
+    assert snapshot.item_count == 5
+    assert snapshot.size_bytes == len(data)
+    assert snapshot.checksum == hashlib.sha256(data).hexdigest()
+    assert calls[0].get_execution_options()["yield_per"] == 2
+
+
+@pytest.mark.asyncio
+async def test_empty_json_export_is_valid(tmp_path) -> None:
+    svc, _ = _service(tmp_path, [])
+    snapshot = await svc.create_memory_export(format="json")
+    assert json.loads(_read(snapshot)) == []
+    assert snapshot.item_count == 0
+
+
+@pytest.mark.asyncio
+async def test_jsonl_and_csv_exports(tmp_path) -> None:
+    rows = [_memory(i) for i in range(3)]
+
+    svc, _ = _service(tmp_path, rows)
+    jsonl = await svc.create_memory_export(format="jsonl")
+    lines = _read(jsonl).decode().splitlines()
+    assert [json.loads(line)["title"] for line in lines] == ["Memory 0", "Memory 1", "Memory 2"]
+
+    svc, _ = _service(tmp_path, rows)
+    csv_snapshot = await svc.create_memory_export(format="csv")
+    reader = list(csv.DictReader(io.StringIO(_read(csv_snapshot).decode())))
+    assert len(reader) == 3
+    assert reader[1]["tags"] == "a,t1"
+    assert reader[1]["content_preview"] == 'content, with "quotes" 1'
+    assert json.loads(reader[2]["extra_metadata"]) == {"n": 2}
+
+
+@pytest.mark.asyncio
+async def test_parquet_export_writes_one_row_group_per_batch(tmp_path) -> None:
+    pq = pytest.importorskip("pyarrow.parquet")
+    rows = [_memory(i) for i in range(5)]
+    svc, _ = _service(tmp_path, rows, batch_size=2)
+
+    snapshot = await svc.create_memory_export(format="parquet")
+
+    parquet_file = pq.ParquetFile(snapshot.storage_path)
+    assert parquet_file.metadata.num_rows == 5
+    assert parquet_file.metadata.num_row_groups == 3
+    table = parquet_file.read()
+    assert table.column("tags").to_pylist()[4] == ["a", "t4"]
+    assert snapshot.checksum == hashlib.sha256(_read(snapshot)).hexdigest()
+
+
+@pytest.mark.asyncio
+async def test_failed_export_leaves_no_partial_object(tmp_path) -> None:
+    svc, _ = _service(tmp_path, [_memory(0)])
+
+    async def broken(stmt):
+        raise RuntimeError("cursor died")
+
+    svc.db.stream_scalars = broken
+
+    with pytest.raises(RuntimeError):
+        await svc.create_memory_export(format="jsonl")
+
+    assert not [p for p in tmp_path.rglob("*") if p.is_file()]
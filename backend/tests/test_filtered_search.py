@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+
+import app.models  # noqa: F401  (configure mappers)
+import app.models.admin  # noqa: F401
+from app.api.v1.endpoints import advanced_search as endpoint
+from app.schemas.memory import MemoryUpdate
+from app.services import filtered_search as fs
+from app.services.filtered_search import FilteredSearchService, SearchPlan
+from app.services.memory_service import MemoryService
+from app.services.search_query_parser import parse_search_query
+
+
+def _sql(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+def _plan(query: str) -> SearchPlan:
+    return SearchPlan.from_parsed(parse_search_query(query))
+
+
+def test_plan_pushes_operators_into_qdrant_and_postgres() -> None:
+    plan = _plan("deploy tag:prod tag:infra after:2024-01-01 before:2024-02-01 scope:team")
+    plan.owner_ids = ["u1", "u2"]
+
+    assert plan.text == "deploy"
+    assert plan.uses_vectors and plan.fully_pushed_down
+
+    conditions = {(c.key, getattr(c.match, "value", None)) for c in plan.qdrant_conditions()}
+    assert ("tags", "prod") in conditions and ("tags", "infra") in conditions
+    assert ("scope", "team") in conditions
+    by_key = {c.key: c for c in plan.qdrant_conditions()}
+    assert by_key["created_ts"].range.gte == datetime(2024, 1, 1, tzinfo=timezone.utc).timestamp()
+    assert by_key["created_ts"].range.lt == datetime(2024, 2, 1, tzinfo=timezone.utc).timestamp()
+    assert by_key["owner_id"].match.any == ["u1", "u2"]
+
+    where = _sql(fs.select(fs.MemoryMetadata.id).where(*plan.sql_predicates("org")))
+    assert "memory_metadata.tags @> ARRAY['prod', 'infra']" in where
+    assert "memory_metadata.created_at >= '2024-01-01" in where
+    assert "memory_metadata.created_at < '2024-02-01" in where
+    assert "memory_metadata.scope = 'team'" in where
+    assert "memory_metadata.owner_id IN ('u1', 'u2')" in where
+    assert "memory_metadata.is_active IS true" in where
+
+
+def test_shared_scope_and_archived_status_stay_in_postgres() -> None:
+    plan = _plan("rollback scope:shared status:archived")
+
+    assert not plan.uses_vectors
+    assert not plan.fully_pushed_down
+    assert not any(c.key == "scope" for c in plan.qdrant_conditions())
+
+    where = _sql(fs.select(fs.MemoryMetadata.id).where(*plan.sql_predicates("org")))
+    assert "EXISTS (SELECT *" in where and "memory_sharing.memory_id = memory_metadata.id" in where
+    assert "memory_metadata.is_active IS false" in where
+
+
+def test_facets_come_from_one_grouping_sets_query() -> None:
+    sql = _sql(FilteredSearchService.facet_query(_plan("tag:prod").sql_predicates("org")))
+
+    assert sql.count("SELECT") == 1
+    assert "LEFT OUTER JOIN LATERAL unnest(memory_metadata.tags)" in sql
+    assert "GROUP BY GROUPING SETS((memory_metadata.scope), (memory_metadata.memory_type)" in sql
+    assert ", ())" in sql
+    assert "count(DISTINCT memory_metadata.id)" in sql
+
+
+@pytest.mark.asyncio
+async def test_facets_decode_grouping_mask() -> None:
+    week = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    rows = [
+        # scope, memory_type, is_active, owner_id, week, tag, mask, count
+        ("team", None, None, None, None, None, 0b011111, 3),
+        (None, "long_term", None, None, None, None, 0b101111, 3),
+        (None, None, True, None, None, None, 0b110111, 3),
+        (None, None, None, "u1", None, None, 0b111011, 2),
+        (None, None, None, None, week, None, 0b111101, 3),
+        (None, None, None, None, None, "prod", 0b111110, 2),
+        (None, None, None, None, None, None, 0b111110, 1),  # untagged rows
+        (None, None, None, None, None, None, 0b111111, 3),
+    ]
+    session = SimpleNamespace(execute=AsyncMock(return_value=SimpleNamespace(all=lambda: rows)))
+    service = FilteredSearchService(session, "org", "user")
+    service.permission_checker = MagicMock(
+        build_sql_read_filter=AsyncMock(return_value=fs.MemoryMetadata.owner_id == "user")
+    )
+
+    facets, total = await service.facets(_plan("tag:prod"))
+
+    assert total == 3
+    assert facets == {
+        "scope": {"team": 3},
+        "memory_types": {"long_term": 3},
+        "status": {"active": 3},
+        "authors": {"u1": 2},
+        "dates": {"2024-01-01": 3},
+        "tags": {"prod": 2},
+    }
+    session.execute.assert_awaited_once()
+    # Counts cover only memories the caller can read.
+    assert "memory_metadata.owner_id = 'user'" in _sql(session.execute.await_args.args[0])
+
+
+@pytest.mark.asyncio
+async def test_read_filter_mirrors_memory_access_rules(monkeypatch) -> None:
+    ctx = SimpleNamespace(team_ids=frozenset({"t1"}), shared_memory_ids=lambda: ["m9"])
+    checker = fs.PermissionChecker(SimpleNamespace())
+    monkeypatch.setattr(checker, "get_access_context", AsyncMock(return_value=ctx))
+
+    where = _sql(fs.select(fs.MemoryMetadata.id).where(await checker.build_sql_read_filter("u1", "org", 2)))
+
+    assert "memory_metadata.required_clearance <= 2" in where
+    assert "memory_metadata.owner_id = 'u1'" in where
+    assert "memory_metadata.scope IN ('organization', 'global')" in where
+    assert "memory_metadata.scope = 'team' AND memory_metadata.scope_id IN ('t1')" in where
+    assert "memory_metadata.id IN ('m9')" in where
+
+
+@pytest.mark.asyncio
+async def test_predicate_search_pages_and_counts_readable_rows_in_sql() -> None:
+    rows = SimpleNamespace(all=lambda: [(_memory("a"), 7), (_memory("b"), 7)])
+    session = SimpleNamespace(execute=AsyncMock(return_value=rows))
+    service = FilteredSearchService(session, "org", "user")
+    service.permission_checker = MagicMock(
+        build_sql_read_filter=AsyncMock(return_value=fs.MemoryMetadata.owner_id == "user"),
+        check_memory_access=AsyncMock(),
+    )
+
+    results, total = await service.search(_plan("tag:prod"), limit=2, offset=4)
+
+    assert [r["id"] for r in results] == ["a", "b"] and total == 7
+    sql = _sql(session.execute.await_args.args[0])
+    assert "memory_metadata.owner_id = 'user'" in sql
+    assert sql.index("owner_id = 'user'") < sql.index("LIMIT 2 OFFSET 4")
+    service.permission_checker.check_memory_access.assert_not_awaited()
+
+
+def _memory(mid: str) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=mid,
+        title=mid,
+        content_preview="text",
+        scope="team",
+        scope_id="t1",
+        memory_type="long_term",
+        classification="internal",
+        tags=["prod"],
+        owner_id="u1",
+        is_active=True,
+        created_at=datetime(2024, 1, 5, tzinfo=timezone.utc),
+    )
+
+
+@pytest.mark.asyncio
+async def test_vector_search_passes_conditions_and_pages_authorized_hits() -> None:
+    memories = [_memory("a"), _memory("b"), _memory("c")]
+    user_rows = SimpleNamespace(scalars=lambda: SimpleNamespace(all=lambda: ["u1"]))
+    memory_rows = SimpleNamespace(scalars=lambda: SimpleNamespace(all=lambda: memories))
+    session = SimpleNamespace(execute=AsyncMock(side_effect=[user_rows, memory_rows]))
+
+    hits = [
+        {"id": "v-a", "score": 0.5, "payload": {"memory_id": "a"}},
+        {"id": "v-b", "score": 0.9, "payload": {"memory_id": "b"}},
+        {"id": "v-c", "score": 0.7, "payload": {"memory_id": "c"}},
+    ]
+    service = FilteredSearchService(session, "org", "user")
+    acl_filter = object()
+    service.permission_checker = MagicMock(
+        check_memory_access=AsyncMock(side_effect=lambda u, o, mid, *a: SimpleNamespace(allowed=mid != "c")),
+        build_vector_acl_filter=AsyncMock(return_value=acl_filter),
+    )
+
+    with patch.object(fs.EmbeddingService, "embed", AsyncMock(return_value=[0.1])), \
+         patch.object(fs.QdrantService, "search", AsyncMock(return_value=hits)) as search:
+        results, total = await service.search(_plan("deploy tag:prod author:john"), limit=1, offset=0)
+
+    assert [r["id"] for r in results] == ["b"]
+    assert total == 2
+    kwargs = search.await_args.kwargs
+    assert kwargs["limit"] == 1
+    assert {c.key for c in kwargs["conditions"]} == {"tags", "owner_id"}
+    assert kwargs["acl_filter"] is acl_filter
+
+
+@pytest.mark.asyncio
+async def test_unknown_author_short_circuits_and_endpoint_rejects_bad_query() -> None:
+    empty = SimpleNamespace(scalars=lambda: SimpleNamespace(all=lambda: []))
+    session = SimpleNamespace(execute=AsyncMock(return_value=empty))
+    service = FilteredSearchService(session, "org", "user")
+
+    response = await endpoint.advanced_search(
+        endpoint.AdvancedSearchRequest(query="author:nobody faceted"),
+        tenant=SimpleNamespace(),
+        service=service,
+    )
+    assert response.results == [] and response.total == 0
+    assert response.facets["tags"] == {}
+    assert session.execute.await_count == 1  # only the author lookup ran
+
+    with pytest.raises(HTTPException) as exc:
+        await endpoint.faceted_search(query="before:2024-13-45", service=service)
+    assert exc.value.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_retagged_memory_is_found_by_its_new_tag(monkeypatch) -> None:
+    memory = _memory("a")
+    memory.vector_id = "v-a"
+    points = {"v-a": {"memory_id": "a", "tags": ["prod"], "classification": "internal"}}
+
+    async def _set_payloads(org_id, payloads):
+        for point_id, payload in payloads.items():
+            points[point_id].update(payload)
+        return len(payloads)
+
+    async def _search(*, conditions=(), **kwargs):
+        wanted = {c.match.value for c in conditions if c.key == "tags"}
+        return [
+            {"id": pid, "score": 0.9, "payload": payload}
+            for pid, payload in points.items()
+            if wanted <= set(payload["tags"])
+        ]
+
+    monkeypatch.setattr(fs.QdrantService, "set_payloads", _set_payloads)
+    monkeypatch.setattr(fs.QdrantService, "search", _search)
+    monkeypatch.setattr(fs.EmbeddingService, "embed", AsyncMock(return_value=[0.1]))
+    monkeypatch.setattr("app.services.memory_service.SynthesisAggregates.apply_memory_change", AsyncMock())
+    monkeypatch.setattr("app.services.memory_service.MemoryMetadataCache.invalidate", AsyncMock())
+
+    memories = MemoryService(SimpleNamespace(get=AsyncMock(return_value=memory)), "user", "org")
+    memories.permission_checker = MagicMock(
+        check_memory_access=AsyncMock(return_value=SimpleNamespace(allowed=True))
+    )
+    memories.audit_service = MagicMock(log_memory_operation=AsyncMock())
+    await memories.update_memory("a", MemoryUpdate(tags=["prod", "release"]))
+
+    assert points["v-a"]["tags"] == ["prod", "release"]
+    rows = SimpleNamespace(scalars=lambda: SimpleNamespace(all=lambda: [memory]))
+    service = FilteredSearchService(SimpleNamespace(execute=AsyncMock(return_value=rows)), "org", "user")
+    service.permission_checker = MagicMock(
+        check_memory_access=AsyncMock(return_value=SimpleNamespace(allowed=True)),
+        build_vector_acl_filter=AsyncMock(return_value=None),
+    )
+    results, total = await service.search(_plan("deploy tag:release"), limit=5, offset=0)
+
+    assert [r["id"] for r in results] == ["a"] and total == 1
@@ -134,10 +134,15 @@ async def test_store_relationship_metadata_commits(service, mock_db):
     mock_db.execute = AsyncMock(side_effect=[MagicMock(), MagicMock(rowcount=2)])
     mock_db.commit = AsyncMock()
 
-    stored = await service._store_relationship_metadata(org_id, relationships)
+    with patch(
+        "app.services.graph_relationship_service.SynthesisAggregates.refresh_relationship_counts",
+        new=AsyncMock(),
+    ) as recount:
+        stored = await service._store_relationship_metadata(org_id, relationships)
 
     assert stored == 2
     assert mock_db.execute.await_count == 2
+    recount.assert_awaited_once()
     mock_db.commit.assert_awaited_once()
 
 
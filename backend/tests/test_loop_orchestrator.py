@@ -71,6 +71,9 @@ class FakeEvidence:
     def __init__(self):
         self.last_kwargs = None
 
+    def open_session(self):
+        return None
+
     async def retrieve_evidence(self, **kwargs):
         self.last_kwargs = dict(kwargs)
         return [{"id": "m1", "summary": "s"}]
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+import app.models  # noqa: F401  (configure mappers)
+import app.models.admin  # noqa: F401
+from app.services import memory_bulk_ingest as mbi
+from app.services.memory_bulk_ingest import InvalidItem, MemoryBulkIngestService, content_hash
+
+
+class _Session:
+    """Records statements; answers content-hash lookups from ``existing``.
+
+    Models ``SET LOCAL``: the org context ends with each commit/rollback, and
+    queries or inserts without it fail like the RLS policies would.
+    """
+
+    def __init__(self, existing=None, org_id="org-1"):
+        self.existing = dict(existing or {})
+        self.inserts: list[tuple[str, int]] = []
+        self.info: dict = {}
+        self.current_org = org_id
+        self.commit = AsyncMock(side_effect=self._end)
+        self.rollback = AsyncMock(side_effect=self._end)
+
+    async def _end(self) -> None:
+        self.current_org = None
+
+    async def execute(self, stmt, params=None):
+        sql = str(stmt)
+        if sql.startswith("SET LOCAL app.current_org_id"):
+            self.current_org = sql.split("'")[1]
+            return SimpleNamespace()
+        if sql.startswith("SET LOCAL"):
+            return SimpleNamespace()
+        assert self.current_org == "org-1", f"no tenant context for: {sql[:40]}"
+        if params is not None:
+            self.inserts.append((stmt.table.name, len(params)))
+            return SimpleNamespace()
+        return SimpleNamespace(all=lambda: list(self.existing.items()))
+
+
+async def _aiter(items):
+    for item in items:
+        yield item
+
+
+@pytest.fixture
+def sides(monkeypatch):
+    calls = SimpleNamespace(
+        embed=AsyncMock(side_effect=lambda texts: [[float(len(t))] for t in texts]),
+        upsert=AsyncMock(),
+        emit=AsyncMock(),
+        enqueue=MagicMock(),
+        aggregates=AsyncMock(),
+    )
+    monkeypatch.setattr(mbi.EmbeddingService, "embed_many", calls.embed)
+    monkeypatch.setattr("app.services.memory_service.QdrantService.upsert_memories", calls.upsert)
+    monkeypatch.setattr("app.services.memory_service.SynthesisAggregates.apply_created", calls.aggregates)
+    monkeypatch.setattr(mbi.WebhookService, "emit_event", calls.emit)
+    monkeypatch.setattr(mbi, "enqueue_memory_pipelines", calls.enqueue)
+    return calls
+
+
+def _service(session, batch_size=3, denied=()):
+    service = MemoryBulkIngestService(session, "user-1", "org-1", batch_size=batch_size)
+    checker = service.memory_service.permission_checker
+    checker.check_permission = AsyncMock(
+        side_effect=lambda _u, _o, perm: SimpleNamespace(
+            allowed=perm.rsplit(":", 1)[1] not in denied, reason="no"
+        )
+    )
+    service.memory_service.audit_service.log_memory_operation = AsyncMock()
+    return service
+
+
+def _item(content, scope="personal", **extra):
+    return {"content": content, "scope": scope, **extra}
+
+
+@pytest.mark.asyncio
+async def test_batches_dedupe_and_report_per_item_status(sides) -> None:
+    session = _Session(existing={content_hash("old"): "mem-old"})
+    service = _service(session, denied=("team",))
+
+    summary = await service.ingest(
+        _aiter([
+            _item("a", tags=["x", "y"]),
+            _item("a"),                       # repeat within the batch
+            _item("old"),                     # already stored
+            InvalidItem("Invalid JSON"),
+            {"scope": "personal"},            # no content
+            _item("b", scope="team", scope_id="t1"),
+            _item("c"),
+            _item("a"),                       # repeat across batches
+        ])
+    )
+
+    statuses = [(r.status, r.memory_id) for r in summary.results]
+    created_a = statuses[0][1]
+    assert [s for s, _ in statuses] == [
+        "created", "duplicate", "duplicate", "invalid", "invalid", "forbidden", "created", "duplicate",
+    ]
+    assert statuses[1][1] == statuses[7][1] == created_a and statuses[2][1] == "mem-old"
+
+    # One multi-row insert per table, one embed call, one upsert and one event per batch.
+    assert session.inserts == [("memory_metadata", 1), ("memory_minhash_signatures", 1)] * 2
+    assert [c.args[0] for c in sides.embed.await_args_list] == [["a"], ["c"]]
+    assert sides.upsert.await_count == 2 and session.commit.await_count == 2
+    (first_event, _) = [c.kwargs for c in sides.emit.await_args_list]
+    assert first_event["event_type"] == "memory.bulk_created" and first_event["payload"]["memory_ids"] == [created_a]
+    assert sides.enqueue.call_count == 2
+
+    point = sides.upsert.await_args_list[0].args[1][0]
+    assert point["payload"]["memory_id"] == created_a and point["payload"]["tags"] == ["x", "y"]
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_rolls_back_and_later_batches_continue(sides, monkeypatch) -> None:
+    sides.upsert.side_effect = [RuntimeError("qdrant down"), None]
+    session = _Session()
+    service = _service(session, batch_size=2)
+
+    summary = await service.ingest(_aiter([_item("a"), _item("b"), _item("c")]))
+
+    assert [r.status for r in summary.results] == ["failed", "failed", "created"]
+    assert summary.results[0].error == "qdrant down"
+    session.rollback.assert_awaited_once()
+    assert sides.emit.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_items_past_the_limit_are_truncated(sides, monkeypatch) -> None:
+    monkeypatch.setattr(mbi.settings, "MEMORY_BULK_INGEST_MAX_ITEMS", 2)
+    summary = await _service(_Session()).ingest(_aiter([_item("a"), _item("b"), _item("c")]))
+
+    assert summary.truncated and len(summary.results) == 2
+
+
+@pytest.mark.asyncio
+async def test_tenant_context_survives_batch_commits(sides) -> None:
+    session = _Session()
+    summary = await _service(session, batch_size=1).ingest(
+        _aiter([_item("a"), _item("b"), _item("c")])
+    )
+
+    assert [r.status for r in summary.results] == ["created"] * 3
+    assert session.inserts == [("memory_metadata", 1), ("memory_minhash_signatures", 1)] * 3
+    assert session.current_org == "org-1"
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from app.core.database import get_db
+from app.core.redis import RedisClient
+from app.core.security import create_access_token
+from app.main import app
+from app.services import memory_event_hub as hub_module
+from app.services.memory_event_hub import MemoryEventHub
+
+
+def _fields(org: str, event_id: str, ts: str = "2026-01-22T00:00:00") -> dict:
+    payload = {"id": event_id, "type": "memory.create", "timestamp": ts, "resource_id": f"m-{event_id}"}
+    return {"org": org, "payload": json.dumps(payload)}
+
+
+def _feed(hub: MemoryEventHub, *events: tuple[str, str]) -> None:
+    for n, (org, event_id) in enumerate(events, start=1):
+        hub._dispatch(f"{n}-0", _fields(org, event_id))
+
+
+@pytest.mark.asyncio
+async def test_fans_out_per_org_and_drops_only_the_slow_subscriber() -> None:
+    hub = MemoryEventHub(queue_size=2, replay_size=10)
+    fast, slow = hub.subscribe("o1"), hub.subscribe("o1")
+    other = hub.subscribe("o2")
+
+    _feed(hub, ("o1", "e1"), ("o1", "e2"))
+    for _ in range(2):
+        await fast.queue.get()
+    _feed(hub, ("o1", "e3"))
+
+    assert slow.overflowed and not fast.overflowed
+    assert hub.subscriber_count("o1") == 1
+    assert b"id: e3\n" in fast.queue.get_nowait()
+    assert other.queue.empty()
+
+
+@pytest.mark.asyncio
+async def test_resumes_from_last_event_id_within_the_replay_buffer() -> None:
+    hub = MemoryEventHub(replay_size=2)
+    _feed(hub, ("o1", "e1"), ("o1", "e2"), ("o1", "e3"), ("o2", "x1"))
+
+    resumed = hub.subscribe("o1", last_event_id="e2")
+    assert resumed.backlog == [hub._replay["o1"][-1].frame]
+
+    # e1 has left the bounded buffer: resume live without a replay.
+    assert hub.subscribe("o1", last_event_id="e1").backlog == []
+
+
+@pytest.mark.asyncio
+async def test_publishes_only_events_of_committed_transactions(monkeypatch) -> None:
+    hub = MemoryEventHub()
+    monkeypatch.setattr(hub_module.settings, "MEMORY_STREAM_HUB_ENABLED", True)
+    hub.publish = AsyncMock()
+    sync_session = Session(create_engine("sqlite://"))
+    session = SimpleNamespace(sync_session=sync_session)
+
+    hub.publish_after_commit(session, "o1", {"id": "rolled-back"})
+    sync_session.execute(text("select 1"))
+    sync_session.rollback()
+    hub.publish_after_commit(session, "o1", {"id": "closed"})
+    sync_session.execute(text("select 1"))
+    sync_session.close()
+    hub.publish_after_commit(session, "o1", {"id": "committed"})
+    sync_session.execute(text("select 1"))
+    sync_session.commit()
+    sync_session.commit()
+    await asyncio.gather(*hub_module._background)
+
+    assert [c.args for c in hub.publish.await_args_list] == [("o1", {"id": "committed"})]
+
+@pytest.mark.asyncio
+async def test_endpoint_streams_from_the_hub_without_touching_the_db(monkeypatch) -> None:
+    async def _block(*_args, **_kwargs):
+        await asyncio.Event().wait()
+
+    client = MagicMock(
+        xrevrange=AsyncMock(return_value=[("2-0", _fields("o1", "e2")), ("1-0", _fields("o1", "e1"))]),
+        xread=AsyncMock(side_effect=_block),
+    )
+    monkeypatch.setattr(RedisClient, "get_client", AsyncMock(return_value=client))
+    hub = MemoryEventHub()
+    monkeypatch.setattr(hub_module, "memory_event_hub", hub)
+    monkeypatch.setattr("app.api.v1.endpoints.memory_stream.memory_event_hub", hub)
+
+    session = MagicMock(execute=AsyncMock())
+
+    async def override_get_db():
+        yield session
+
+    app.dependency_overrides[get_db] = override_get_db
+    headers = {
+        "Authorization": f"Bearer {create_access_token(user_id='u1', org_id='o1', roles=['member'])}",
+        "Last-Event-ID": "e1",
+    }
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            resp = await ac.get("/api/v1/memories/stream?max_events=1", headers=headers)
+    finally:
+        app.dependency_overrides.clear()
+        await hub.stop()
+
+    assert resp.status_code == 200
+    assert "id: e2\nevent: memory.create" in resp.text and "id: e1\n" not in resp.text
+    session.execute.assert_not_awaited()
+    assert hub.subscriber_count() == 0
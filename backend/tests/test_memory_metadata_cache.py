@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.core.redis import RedisClient
+from app.services import memory_metadata_cache as mmc
+from app.services.memory_metadata_cache import MemoryMetadataCache
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data: dict[str, str] = {}
+        self.ttls: dict[str, int] = {}
+
+    async def mget(self, keys):
+        return [self.data.get(k) for k in keys]
+
+    def pipeline(self, transaction=False):
+        return _FakePipeline(self)
+
+    def _set(self, key, value, nx=False, ex=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        if ex is not None:
+            self.ttls[key] = ex
+        return True
+
+
+class _FakePipeline:
+    def __init__(self, redis: FakeRedis):
+        self.redis = redis
+        self.ops = []
+
+    def set(self, key, value, nx=False, ex=None):
+        self.ops.append(lambda: self.redis._set(key, value, nx=nx, ex=ex))
+
+    def delete(self, key):
+        self.ops.append(lambda: self.redis.data.pop(key, None))
+
+    async def execute(self):
+        return [op() for op in self.ops]
+
+
+def _row(mid: str, owner: str = "u1", scope: str = "personal") -> SimpleNamespace:
+    return SimpleNamespace(
+        id=mid,
+        organization_id="org",
+        owner_id=owner,
+        scope=scope,
+        scope_id=None,
+        memory_type="long_term",
+        classification="internal",
+        required_clearance=0,
+        title=f"title-{mid}",
+        content_preview="preview",
+        tags=["prod"],
+        vector_id=f"v-{mid}",
+        is_active=True,
+        legal_hold=False,
+        created_at=datetime(2024, 1, 1, tzinfo=timezone.utc),
+    )
+
+
+def _session(rows):
+    result = SimpleNamespace(scalars=lambda: SimpleNamespace(all=lambda: list(rows)))
+    return SimpleNamespace(execute=AsyncMock(return_value=result))
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    fake = FakeRedis()
+    monkeypatch.setattr(RedisClient, "get_client", AsyncMock(return_value=fake))
+    mmc._cache.local.clear()
+    yield fake
+    mmc._cache.local.clear()
+
+
+@pytest.mark.asyncio
+async def test_read_through_tiers_and_version_invalidation(redis) -> None:
+    session = _session([_row("m1"), _row("m2")])
+    cache = MemoryMetadataCache(session, "org")
+
+    first = await cache.get_many(["m1", "m2", "missing"])
+    assert set(first) == {"m1", "m2"} and first["m1"].tags == ("prod",)
+    assert session.execute.await_count == 1  # one query for all misses
+
+    assert (await cache.get("m1")).title == "title-m1"  # local tier
+    mmc._cache.local.clear()
+    assert (await cache.get("m2")).created_at == datetime(2024, 1, 1, tzinfo=timezone.utc)  # Redis tier
+    assert session.execute.await_count == 1
+
+    # Another process' entry is rejected once the memory's token is replaced.
+    await MemoryMetadataCache.invalidate("org", ["m1"])
+    assert "memmeta:org:m1" not in redis.data
+    await cache.get("m1")
+    assert session.execute.await_count == 2
+
+    stale_stamp = next(iter(mmc._cache.local._entries.values()))[0]
+    await MemoryMetadataCache.invalidate_org("org")
+    mmc._cache.local.put("org", "m2", stale_stamp, first["m1"], 60)
+    assert (await cache.get("m2")).id == "m2"
+    assert session.execute.await_count == 3
+
+    # Version tokens expire, and only after the entries stamped with them.
+    tokens = [k for k in redis.data if k.startswith("memmeta:ver:")]
+    entry_ttl = redis.ttls["memmeta:org:m2"]
+    assert tokens and all(redis.ttls[k] >= 2 * entry_ttl for k in tokens)
+
+
+@pytest.mark.asyncio
+async def test_write_racing_a_fill_is_not_cached(redis) -> None:
+    session = _session([_row("m1")])
+    cache = MemoryMetadataCache(session, "org")
+    original_load = cache._load
+
+    async def load_with_concurrent_write(ids):
+        loaded = await original_load(ids)
+        await MemoryMetadataCache.invalidate("org", ids)
+        return loaded
+
+    cache._load = load_with_concurrent_write
+    await cache.get("m1")
+    cache._load = original_load
+
+    await cache.get("m1")
+    assert session.execute.await_count == 2  # the racing fill never matched
+
+
+@pytest.mark.asyncio
+async def test_cache_is_bypassed_when_redis_is_down(monkeypatch) -> None:
+    monkeypatch.setattr(RedisClient, "get_client", AsyncMock(side_effect=ConnectionError("down")))
+    mmc._cache.local.clear()
+    session = _session([_row("m1")])
+
+    assert (await MemoryMetadataCache(session, "org").get("m1")).id == "m1"
+    assert (await MemoryMetadataCache(session, "org").get("m1")).id == "m1"
+    assert session.execute.await_count == 2
+    assert not mmc._cache.local._entries
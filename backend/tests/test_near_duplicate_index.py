@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.services import consolidation_service as consolidation_module
+from app.services import near_duplicate_index as ndi
+from app.services.consolidation_service import ConsolidationService
+from app.services.near_duplicate_index import (
+    NearDuplicateIndex,
+    estimate_similarity,
+    lsh_band_keys,
+    minhash_signature,
+    pack_signature,
+    unpack_signature,
+)
+
+BASE = " ".join(f"word{i}" for i in range(40))
+
+
+def _jaccard(a: str, b: str) -> float:
+    ta, tb = ndi.tokenize(a), ndi.tokenize(b)
+    return len(ta & tb) / len(ta | tb)
+
+
+def test_signature_estimates_token_jaccard() -> None:
+    near = BASE + " extra1 extra2"
+    far = " ".join(f"other{i}" for i in range(40))
+
+    sig = minhash_signature(BASE, 128)
+    assert sig == minhash_signature(BASE.upper() + "  ", 128)  # same token set
+    assert unpack_signature(pack_signature(sig)) == sig
+    assert len(pack_signature(sig)) == 512
+
+    assert abs(estimate_similarity(sig, minhash_signature(near, 128)) - _jaccard(BASE, near)) < 0.12
+    assert estimate_similarity(sig, minhash_signature(far, 128)) < 0.1
+    assert estimate_similarity(minhash_signature("", 128), minhash_signature("!!", 128)) == 1.0
+
+
+def test_pure_python_path_matches_numpy() -> None:
+    if not ndi.NUMPY_AVAILABLE:
+        pytest.skip("numpy not installed")
+    expected = minhash_signature(BASE, 64)
+    with patch.object(ndi, "NUMPY_AVAILABLE", False):
+        assert minhash_signature(BASE, 64) == expected
+
+
+def test_band_keys_collide_for_near_duplicates_only() -> None:
+    sig = minhash_signature(BASE, 128)
+    keys = lsh_band_keys(sig, 16)
+
+    assert len(keys) == 16
+    assert all(-(2**63) <= k < 2**63 for k in keys)
+    assert set(keys) & set(lsh_band_keys(minhash_signature(BASE + " tail", 128), 16))
+    assert not set(keys) & set(lsh_band_keys(minhash_signature("unrelated text here", 128), 16))
+    with pytest.raises(ValueError):
+        lsh_band_keys(sig, 3)
+
+
+@pytest.mark.asyncio
+async def test_candidate_pair_query_uses_bucketed_self_join() -> None:
+    captured = []
+
+    async def execute(stmt):
+        captured.append(stmt)
+        return SimpleNamespace(all=lambda: [])
+
+    index = NearDuplicateIndex(SimpleNamespace(execute=execute), "org")
+    await index.candidate_pairs(scope="team", since=datetime(2024, 1, 1))
+    sql = str(captured[0].compile(dialect=postgresql.dialect()))
+    assert "unnest(memory_minhash_signatures.band_keys)" in sql
+    assert "HAVING count(*) BETWEEN" in sql
+    assert "a.memory_id < b.memory_id" in sql
+    assert "a.indexed_at >=" in sql
+
+
+def _memory(mid: str, text: str, age: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=mid,
+        content_preview=text,
+        vector_id=f"vec-{mid}",
+        created_at=datetime(2024, 1, 1) + timedelta(days=age),
+    )
+
+
+@pytest.mark.asyncio
+async def test_find_candidates_groups_lsh_pairs_and_confirms_with_vectors() -> None:
+    texts = {
+        "a": BASE,
+        "b": BASE + " extra",
+        "c": BASE + " other",
+        "d": "completely different memory",
+    }
+    memories = {mid: _memory(mid, t, age) for age, (mid, t) in enumerate(texts.items())}
+    sigs = {mid: minhash_signature(t) for mid, t in texts.items()}
+
+    index = SimpleNamespace(
+        backfill=AsyncMock(return_value=0),
+        candidate_pairs=AsyncMock(return_value=[("b", "c"), ("a", "b"), ("c", "d")]),
+        signatures_for=AsyncMock(side_effect=lambda ids: {m: sigs[m] for m in ids}),
+    )
+    service = ConsolidationService(SimpleNamespace(), "org")
+    service._load_memories = AsyncMock(side_effect=lambda ids: {m: memories[m] for m in ids})
+
+    with patch.object(consolidation_module, "NearDuplicateIndex", return_value=index):
+        groups = await service.find_consolidation_candidates(similarity_threshold=0.9)
+
+        assert len(groups) == 1
+        assert groups[0]["primary"].id == "a"
+        assert {m.id for m in groups[0]["duplicates"]} == {"b", "c"}
+        assert all(s >= 0.9 for s in groups[0]["similarity_scores"])
+
+        vectors = {"vec-a": [1.0, 0.0], "vec-b": [1.0, 0.1], "vec-c": [0.0, 1.0]}
+        with patch.object(
+            consolidation_module.QdrantService, "retrieve_vectors", AsyncMock(return_value=vectors)
+        ):
+            confirmed = await service.find_consolidation_candidates(
+                similarity_threshold=0.9, vector_threshold=0.95, since=datetime(2024, 1, 2)
+            )
+
+    assert [m.id for m in confirmed[0]["duplicates"]] == ["b"]
+    assert index.candidate_pairs.await_args.kwargs["since"] == datetime(2024, 1, 2)
+    index.backfill.assert_not_awaited()  # indexing runs in its own task
+
+
+@pytest.mark.asyncio
+async def test_backfill_task_commits_each_batch_in_its_own_tenant_session(monkeypatch) -> None:
+    from contextlib import asynccontextmanager
+
+    from app.tasks import maintenance
+
+    orgs = SimpleNamespace(scalars=lambda: SimpleNamespace(all=lambda: ["org-1"]))
+
+    @asynccontextmanager
+    async def session_factory():
+        yield SimpleNamespace(execute=AsyncMock(return_value=orgs))
+
+    sessions = []
+
+    @asynccontextmanager
+    async def tenant_session(**kwargs):
+        session = SimpleNamespace(commit=AsyncMock(), org_id=kwargs["org_id"])
+        sessions.append(session)
+        yield session
+
+    batches = iter([2, 2, 1])
+    monkeypatch.setattr(maintenance, "async_session_factory", session_factory)
+    monkeypatch.setattr(maintenance, "get_tenant_session", tenant_session)
+    monkeypatch.setattr(
+        maintenance,
+        "NearDuplicateIndex",
+        lambda session, org_id: SimpleNamespace(backfill=AsyncMock(return_value=next(batches))),
+    )
+
+    result = await maintenance._backfill_near_duplicate_index_async(batch_size=2, max_batches=5)
+
+    assert result["memories_indexed"] == 5
+    assert len(sessions) == 3 and all(s.commit.await_count == 1 for s in sessions)
+
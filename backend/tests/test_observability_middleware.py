@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+from httpx import ASGITransport, AsyncClient
+
+from app.middleware.observability import UNMATCHED_ROUTE, ObservabilityMiddleware
+from app.middleware.prometheus import metrics_registry
+
+
+def _build_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(ObservabilityMiddleware)
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: str, request: Request) -> dict:
+        return {"item_id": item_id, "request_id": request.state.request_id}
+
+    @app.get("/stream")
+    async def stream() -> StreamingResponse:
+        async def gen():
+            for chunk in (b"a" * 10, b"b" * 5):
+                yield chunk
+
+        return StreamingResponse(gen(), media_type="text/plain")
+
+    return app
+
+
+def _sample(name: str, **labels: str) -> float | None:
+    return metrics_registry.get_sample_value(name, labels)
+
+
+@pytest.mark.asyncio
+async def test_request_id_propagates_to_state_and_headers() -> None:
+    async with AsyncClient(transport=ASGITransport(app=_build_app()), base_url="http://t") as client:
+        resp = await client.get("/items/abc", headers={"X-Request-ID": "req-123"})
+
+    assert resp.status_code == 200
+    assert resp.json()["request_id"] == "req-123"
+    assert resp.headers["X-Request-ID"] == "req-123"
+    assert resp.headers["X-Trace-ID"] == "req-123"
+    assert resp.headers["X-Correlation-ID"] == "req-123"
+    assert "X-Response-Time" in resp.headers
+
+
+@pytest.mark.asyncio
+async def test_metrics_use_route_template_not_raw_path() -> None:
+    before = _sample("http_requests_total", method="GET", endpoint="/items/{item_id}", status="200") or 0
+
+    async with AsyncClient(transport=ASGITransport(app=_build_app()), base_url="http://t") as client:
+        for item_id in ("one", "two", "three"):
+            await client.get(f"/items/{item_id}")
+        await client.get("/no/such/route")
+
+    after = _sample("http_requests_total", method="GET", endpoint="/items/{item_id}", status="200")
+    assert after == before + 3
+    assert _sample("http_requests_total", method="GET", endpoint="/items/one", status="200") is None
+    assert _sample("http_requests_total", method="GET", endpoint=UNMATCHED_ROUTE, status="404") >= 1
+
+
+@pytest.mark.asyncio
+async def test_streaming_response_is_passed_through_and_sized() -> None:
+    before = _sample("http_response_size_bytes_sum", method="GET", endpoint="/stream", status="200") or 0
+
+    async with AsyncClient(transport=ASGITransport(app=_build_app()), base_url="http://t") as client:
+        resp = await client.get("/stream")
+
+    assert resp.content == b"a" * 10 + b"b" * 5
+    after = _sample("http_response_size_bytes_sum", method="GET", endpoint="/stream", status="200")
+    assert after == before + 15
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import re
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+import app.models  # noqa: F401  (configure mappers)
+import app.models.admin  # noqa: F401
+from app.core.pagination import (
+    InvalidCursorError,
+    count_rows,
+    decode_cursor,
+    encode_cursor,
+    keyset_page,
+)
+from app.models.memory import MemoryMetadata
+from app.services.memory_service import MemoryService
+
+
+class _Session:
+    """Serves rows newest-first and records the SQL it was asked to run."""
+
+    def __init__(self, rows=(), scalar=None):
+        self.rows = list(rows)
+        self.scalar = scalar
+        self.sql: list[str] = []
+        self.statements: list = []
+
+    async def execute(self, stmt):
+        self.statements.append(stmt)
+        self.sql.append(str(stmt.compile(dialect=postgresql.dialect())))
+        limit = getattr(stmt, "_limit", None)
+        rows = self.rows[: limit or None]
+        return SimpleNamespace(
+            scalars=lambda: SimpleNamespace(all=lambda: rows),
+            scalar=lambda: self.scalar,
+        )
+
+
+def _memories(n):
+    base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    return [SimpleNamespace(id=f"m{i}", created_at=base - timedelta(minutes=i)) for i in range(n)]
+
+
+def test_cursor_round_trip_and_rejects_garbage() -> None:
+    ts = datetime(2026, 1, 2, 3, 4, 5, 678000, tzinfo=timezone.utc)
+    token = encode_cursor(ts, "abc")
+
+    assert decode_cursor(token) == (ts, "abc")
+    assert "=" not in token
+    for bad in ("not-a-cursor", encode_cursor(ts, "x")[:-3], "@@"):
+        with pytest.raises(InvalidCursorError):
+            decode_cursor(bad)
+
+
+@pytest.mark.asyncio
+async def test_keyset_page_seeks_past_the_cursor() -> None:
+    session = _Session(_memories(3))
+    stmt = select(MemoryMetadata).where(MemoryMetadata.organization_id == "org")
+
+    first = await keyset_page(session, stmt, MemoryMetadata.created_at, MemoryMetadata.id, limit=2)
+    assert [m.id for m in first.items] == ["m0", "m1"] and first.has_more
+    assert decode_cursor(first.next_cursor)[1] == "m1"
+
+    await keyset_page(
+        session, stmt, MemoryMetadata.created_at, MemoryMetadata.id, limit=2, cursor=first.next_cursor
+    )
+    sql = session.sql[-1]
+    assert "(memory_metadata.created_at, memory_metadata.id) < (" in sql
+    assert "ORDER BY memory_metadata.created_at DESC, memory_metadata.id DESC" in sql
+    assert "OFFSET" not in sql
+
+    last = await keyset_page(_Session(_memories(2)), stmt, MemoryMetadata.created_at, MemoryMetadata.id, limit=2)
+    assert last.next_cursor is None
+
+
+@pytest.mark.asyncio
+async def test_count_modes() -> None:
+    stmt = select(MemoryMetadata).where(MemoryMetadata.organization_id == "org")
+
+    assert await count_rows(_Session(), stmt, "none") is None
+    assert await count_rows(_Session(scalar=7), stmt, "exact") == 7
+
+    explain = _Session(scalar='[{"Plan": {"Plan Rows": 1234}}]')
+    assert await count_rows(explain, stmt, "estimate") == 1234
+    assert explain.sql[0].startswith("EXPLAIN (FORMAT JSON) SELECT")
+
+
+@pytest.mark.asyncio
+async def test_keyset_cursor_binds_with_column_types_on_asyncpg() -> None:
+    cursor = encode_cursor(datetime(2026, 1, 1, tzinfo=timezone.utc), "6f1c2a9e-0000-4000-8000-000000000001")
+    session = _Session()
+    stmt = select(MemoryMetadata).where(MemoryMetadata.organization_id == "org")
+
+    await keyset_page(session, stmt, MemoryMetadata.created_at, MemoryMetadata.id, limit=2, cursor=cursor)
+
+    # asyncpg casts every bind; the id must be cast to UUID (there is no uuid < varchar).
+    sql = str(session.statements[-1].compile(dialect=postgresql.asyncpg.dialect()))
+    assert re.search(r"\) < \(\$\d+::TIMESTAMP WITH TIME ZONE, \$\d+::UUID\)", sql)
+
+
+@pytest.mark.asyncio
+async def test_list_memories_estimate_uses_maintained_counters() -> None:
+    session = _Session(_memories(1), scalar=42)
+    service = MemoryService(session, "user", "org")
+
+    items, total, has_more, cursor = await service.list_memories(
+        tags=["infra"], page_size=5, count="estimate", org_wide_visibility=True
+    )
+
+    assert (len(items), total, has_more, cursor) == (1, 42, False, None)
+    assert "knowledge_tag_stats" in session.sql[-1]
+
+
+@pytest.mark.asyncio
+async def test_list_memories_estimate_respects_visibility() -> None:
+    session = _Session(_memories(1), scalar='[{"Plan": {"Plan Rows": 3}}]')
+    service = MemoryService(session, "user", "org")
+
+    _items, total, _more, _cursor = await service.list_memories(
+        tags=["infra"], page_size=5, count="estimate"
+    )
+
+    assert total == 3
+    assert session.sql[-1].startswith("EXPLAIN") and "knowledge_tag_stats" not in session.sql[-1]
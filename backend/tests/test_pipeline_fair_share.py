@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy import DateTime, Integer, String, create_engine
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import DeclarativeBase, Mapped, Session, mapped_column
+
+from app.core.redis import RedisClient
+from app.models.pipeline_task import PipelineTask
+from app.services.pipeline_queue import ADMIT_SCRIPT, fair_share_claim
+from app.services.sla_scheduler_service import SLASchedulerService
+from app.services.unified_pipeline_scheduler import PipelineTaskType, UnifiedPipelineScheduler
+
+
+class _Base(DeclarativeBase):
+    pass
+
+
+class _Job(_Base):
+    """Minimal queue table so the ranking SQL can run on SQLite."""
+
+    __tablename__ = "jobs"
+    id: Mapped[str] = mapped_column(String, primary_key=True)
+    organization_id: Mapped[str] = mapped_column(String)
+    status: Mapped[str] = mapped_column(String)
+    priority: Mapped[int] = mapped_column(Integer)
+    created_at: Mapped[datetime] = mapped_column(DateTime)
+
+
+def _claim(session: Session, limit: int, **kwargs) -> list[str]:
+    stmt = fair_share_claim(
+        _Job,
+        eligible=[_Job.status == "queued"],
+        order_by=[_Job.priority.asc(), _Job.created_at.asc()],
+        running=_Job.status == "running",
+        limit=limit,
+        **kwargs,
+    )
+    return [job.id for job in session.execute(stmt).scalars()]
+
+
+@pytest.fixture
+def jobs():
+    engine = create_engine("sqlite://")
+    _Base.metadata.create_all(engine)
+    t0 = datetime(2026, 1, 1)
+    with Session(engine) as session:
+        for k, (org, n) in enumerate((("a", 6), ("b", 3), ("c", 1))):
+            for i in range(n):
+                session.add(_Job(id=f"{org}{i}", organization_id=org, status="queued", priority=0,
+                                 created_at=t0 + timedelta(seconds=i, milliseconds=k)))
+        yield session
+
+
+def test_claims_interleave_orgs_round_robin(jobs) -> None:
+    # Org "a" has the oldest and deepest backlog but only gets one slot per round.
+    assert _claim(jobs, 5) == ["a0", "b0", "c0", "a1", "b1"]
+
+
+def test_weights_and_running_work_shift_the_share(jobs) -> None:
+    assert _claim(jobs, 7, weights={"a": 2.0}) == ["a0", "b0", "c0", "a1", "a2", "b1", "a3"]
+
+    jobs.add(_Job(id="b-run", organization_id="b", status="running", priority=0, created_at=datetime(2026, 1, 1)))
+    jobs.flush()
+    # "b" already holds one running task, so it is a round behind.
+    assert _claim(jobs, 4) == ["a0", "c0", "b0", "a1"]
+    assert _claim(jobs, 10, max_running_per_org=2) == ["a0", "c0", "b0", "a1"]
+
+
+def test_claim_statement_locks_with_skip_locked() -> None:
+    sql = str(fair_share_claim(
+        PipelineTask,
+        eligible=[PipelineTask.status == "queued"],
+        order_by=[PipelineTask.priority.desc()],
+        running=PipelineTask.status == "running",
+        limit=10,
+        weights={"org-1": 3.0},
+    ).compile(dialect=postgresql.dialect()))
+
+    assert "row_number() OVER (PARTITION BY pipeline_tasks.organization_id" in sql
+    assert sql.rstrip().endswith("FOR UPDATE OF pipeline_tasks SKIP LOCKED")
+
+
+@pytest.mark.asyncio
+async def test_sla_claim_batch_marks_tasks_and_audits_once_per_org(monkeypatch) -> None:
+    now = datetime.now(timezone.utc)
+    tasks = [
+        PipelineTask(id=f"t{i}", organization_id=org, status="queued", attempts=0, sla_deadline=now)
+        for i, org in enumerate(["o1", "o2", "o1"])
+    ]
+    session = MagicMock()
+    session.info = {}
+    session.execute = AsyncMock(return_value=SimpleNamespace(scalars=lambda: SimpleNamespace(all=lambda: tasks)))
+    scheduler = SLASchedulerService(session)
+    scheduler.audit = SimpleNamespace(log_event=AsyncMock())
+
+    claimed = await scheduler.claim_batch(limit=3, scopes={"pipeline.dequeue"})
+
+    assert claimed == tasks and session.execute.await_count == 1
+    assert {(t.status, t.attempts) for t in tasks} == {("running", 1)}
+    events = [c.kwargs for c in scheduler.audit.log_event.await_args_list]
+    assert [(e["organization_id"], len(e["details"]["tasks"])) for e in events] == [("o1", 2), ("o2", 1)]
+
+
+def _unified(monkeypatch, redis):
+    monkeypatch.setattr(RedisClient, "get_client", AsyncMock(return_value=redis))
+    monkeypatch.setattr("app.services.unified_pipeline_scheduler.AuditService.log_event", AsyncMock())
+    session = MagicMock()
+    session.execute = AsyncMock(return_value=SimpleNamespace(scalar=lambda: 0))
+    session.flush = AsyncMock()
+    return UnifiedPipelineScheduler(session), session
+
+
+@pytest.mark.asyncio
+async def test_unified_enqueue_admission_uses_counters(monkeypatch) -> None:
+    scripts = {}
+
+    def register_script(source):
+        scripts.setdefault(source, AsyncMock(return_value=[1, 1] if source == ADMIT_SCRIPT else 1))
+        return scripts[source]
+
+    redis = MagicMock()
+    redis.get = AsyncMock(return_value=b"3")
+    redis.register_script = MagicMock(side_effect=register_script)
+    scheduler, session = _unified(monkeypatch, redis)
+
+    process = await scheduler.enqueue_pipeline_task("org-1", PipelineTaskType.EVALUATION, "eval", {})
+
+    session.execute.assert_not_awaited()  # no COUNT(*) on the enqueue path
+    assert process.status == "queued" and process.process_metadata["task_type"] == "evaluation"
+    assert scripts[ADMIT_SCRIPT].await_args.kwargs["args"] == [10, 120]
+
+    scripts[ADMIT_SCRIPT].return_value = [0, 10]
+    with pytest.raises(ValueError, match="Rate limit"):
+        await scheduler.enqueue_pipeline_task("org-1", PipelineTaskType.EVALUATION, "eval", {})
+
+    redis.get.return_value = b"1000"
+    with pytest.raises(ValueError, match="backpressure"):
+        await scheduler.enqueue_pipeline_task("org-1", PipelineTaskType.EVALUATION, "eval", {})
+
+
+@pytest.mark.asyncio
+async def test_unified_enqueue_counts_rows_without_redis(monkeypatch) -> None:
+    scheduler, session = _unified(monkeypatch, None)
+    monkeypatch.setattr(RedisClient, "get_client", AsyncMock(side_effect=ConnectionError("down")))
+
+    await scheduler.enqueue_pipeline_task("org-1", PipelineTaskType.CONSOLIDATION, "merge", {})
+
+    assert session.execute.await_count == 2  # depth + rate
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import uuid
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from fastapi import HTTPException
+
+from app.middleware.rate_limiter import RateLimiter as EndpointRateLimiter
+from app.services.rate_limiter import (
+    ALGORITHM_GCRA,
+    QUOTA_SCRIPT,
+    RateLimiter,
+    RateLimitExceeded,
+)
+
+
+def _fake_redis(rate_result: list[int], quota_result: list[int] | None = None):
+    """Async Redis stand-in whose registered scripts return canned replies."""
+    scripts: dict[str, AsyncMock] = {}
+
+    def register_script(source: str):
+        result = quota_result if source == QUOTA_SCRIPT else rate_result
+        script = AsyncMock(return_value=result)
+        scripts[source] = script
+        return script
+
+    redis = MagicMock()
+    redis.register_script = MagicMock(side_effect=register_script)
+    return redis, scripts
+
+
+@pytest.mark.asyncio
+async def test_check_rate_limit_is_single_script_call() -> None:
+    redis, _ = _fake_redis([1, 9, 0, 60000])
+    limiter = RateLimiter(redis_client=redis)
+
+    status = await limiter.check_rate_limit("org:1:api:x", limit=10, window=60)
+
+    assert status["allowed"] is True
+    assert status["remaining"] == 9
+    script = limiter._scripts["sliding_log"]
+    script.assert_awaited_once()
+    kwargs = script.await_args.kwargs
+    assert kwargs["keys"] == ["ratelimit:sliding_log:org:1:api:x"]
+    assert kwargs["args"][1:4] == [60000, 10, 1]
+
+
+@pytest.mark.asyncio
+async def test_denied_key_is_answered_from_local_cache() -> None:
+    redis, _ = _fake_redis([0, 0, 5000, 5000])
+    limiter = RateLimiter(redis_client=redis, default_algorithm=ALGORITHM_GCRA)
+
+    with pytest.raises(RateLimitExceeded) as first:
+        await limiter.check_rate_limit("hot", limit=1, window=60)
+    assert first.value.retry_after == 5
+
+    with pytest.raises(RateLimitExceeded):
+        await limiter.check_rate_limit("hot", limit=1, window=60)
+
+    limiter._scripts[ALGORITHM_GCRA].assert_awaited_once()
+
+    await limiter.reset_rate_limit("hot")
+    assert limiter.local_cache.blocked_for("ratelimit:gcra:hot") == 0
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_fails_open_on_redis_error() -> None:
+    redis, _ = _fake_redis([1, 0, 0, 0])
+    limiter = RateLimiter(redis_client=redis)
+    limiter._scripts["sliding_log"].side_effect = ConnectionError("down")
+
+    status = await limiter.check_rate_limit("k", limit=5, window=10)
+
+    assert status["allowed"] is True
+    assert status["remaining"] == -1
+
+
+@pytest.mark.asyncio
+async def test_check_quota_uses_atomic_script() -> None:
+    redis, _ = _fake_redis([1, 0, 0, 0], quota_result=[1, 150])
+    limiter = RateLimiter(redis_client=redis)
+    org_id = uuid.uuid4()
+
+    status = await limiter.check_quota(org_id, "tokens", amount=50, monthly_limit=1000)
+
+    assert status == {"allowed": True, "used": 150, "limit": 1000, "remaining": 850}
+    args = limiter._scripts["quota"].await_args.kwargs["args"]
+    assert args[:2] == [50, 1000]
+
+
+@pytest.mark.asyncio
+async def test_check_quota_rejects_without_incrementing() -> None:
+    redis, _ = _fake_redis([1, 0, 0, 0], quota_result=[0, 990])
+    limiter = RateLimiter(redis_client=redis)
+
+    with pytest.raises(RateLimitExceeded, match="Used: 990"):
+        await limiter.check_quota(uuid.uuid4(), "tokens", amount=50, monthly_limit=1000)
+
+
+@pytest.mark.asyncio
+async def test_endpoint_decorator_maps_denial_to_429_with_retry_after() -> None:
+    engine = MagicMock()
+    engine.check_rate_limit = AsyncMock(
+        side_effect=RateLimitExceeded("nope", limit=1, retry_after=7)
+    )
+    limiter = EndpointRateLimiter(engine=engine)
+
+    @limiter.limit("admin_ops", max_requests=1, window_seconds=60)
+    async def endpoint() -> str:
+        return "ok"
+
+    with pytest.raises(HTTPException) as exc:
+        await endpoint()
+
+    assert exc.value.status_code == 429
+    assert exc.value.headers == {"Retry-After": "7"}
+    engine.check_rate_limit.assert_awaited_once_with(
+        "ratelimit:admin_ops:anonymous:admin_ops", limit=1, window=60
+    )
@@ -16,9 +16,12 @@ from datetime import datetime, timedelta
 from uuid import uuid4
 from unittest.mock import AsyncMock, MagicMock, patch
 
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.ext.asyncio import AsyncSession
 import redis
 
+import app.models  # noqa: F401  (configure mappers)
+import app.models.admin  # noqa: F401
 from app.services.recommendation_service import RecommendationService
 from app.models.graph_relationship import GraphRelationship
 from app.models.recommendation_feedback import RecommendationFeedback
@@ -83,97 +86,92 @@ class TestRecommendationRanking:
         assert expected == 0.5 * 0.9 + 0.2 * 0.7 + 0.2 * 0.6 + 0.1 * 0.8
 
 
+async def _score_candidate(
+    service,
+    mock_db,
+    *,
+    age_days=0,
+    access_count=0,
+    extra_metadata=None,
+    feedback=None,
+    active=True,
+):
+    """Factors for one candidate, scored through get_recommendations' batched queries.
+
+    ``feedback`` is the aggregated ``(helpful_weight, total_weight)`` row, if any.
+    """
+    base_id = str(uuid4())
+    candidate_id = str(uuid4())
+    when = datetime.utcnow() - timedelta(days=age_days)
+
+    rel_result = MagicMock()
+    rel_result.scalars.return_value.all.return_value = [
+        MagicMock(
+            from_memory_id=base_id,
+            to_memory_id=candidate_id,
+            similarity_score=0.8,
+            relationship_type="RELATES_TO",
+        )
+    ]
+    signal_result = MagicMock()
+    signal_result.all.return_value = [
+        MagicMock(
+            id=candidate_id,
+            title="m",
+            content_preview="text",
+            created_at=when,
+            updated_at=when,
+            access_count=access_count,
+            extra_metadata=extra_metadata,
+        )
+    ] if active else []
+    feedback_result = MagicMock()
+    feedback_result.all.return_value = [(candidate_id, *feedback)] if feedback else []
+    mock_db.execute.side_effect = [rel_result, signal_result, feedback_result]
+
+    recs = await service.get_recommendations(base_id, str(uuid4()), use_cache=False)
+    return recs[0]["factors"] if recs else None
+
+
 class TestRecencyScoringCalculation:
     """Test recency score calculation."""
 
     @pytest.mark.asyncio
     async def test_recent_memory_high_score(self, service, mock_db):
         """Test that recent memories get high recency scores."""
-        # Very recent memory
-        recent = datetime.utcnow()
-        memory_id = str(uuid4())
-        
-        # Mock database return
-        mock_row = MagicMock()
-        mock_row.created_at = recent
-        mock_row.updated_at = recent
-        
-        mock_db.execute.return_value = MagicMock()
-        mock_db.execute.return_value.first.return_value = mock_row
-        
-        score = await service._calculate_recency_score(memory_id)
+        factors = await _score_candidate(service, mock_db, age_days=0)
         
         # Should be very close to 1.0
-        assert score > 0.95
+        assert factors["recency"] > 0.95
 
     @pytest.mark.asyncio
     async def test_old_memory_low_score(self, service, mock_db):
         """Test that old memories get low recency scores."""
-        # 1 year old memory
-        old = datetime.utcnow() - timedelta(days=365)
-        memory_id = str(uuid4())
-        
-        mock_row = MagicMock()
-        mock_row.created_at = old
-        mock_row.updated_at = old
-        
-        mock_db.execute.return_value = MagicMock()
-        mock_db.execute.return_value.first.return_value = mock_row
-        
-        score = await service._calculate_recency_score(memory_id)
+        factors = await _score_candidate(service, mock_db, age_days=365)
         
         # Should be very close to 0.0
-        assert score < 0.05
+        assert factors["recency"] < 0.05
 
     @pytest.mark.asyncio
     async def test_30_day_memory_score(self, service, mock_db):
         """Test that 30-day old memory gets ~0.5 score (exponential decay)."""
-        # 30 days old
-        date_30_days = datetime.utcnow() - timedelta(days=30)
-        memory_id = str(uuid4())
-        
-        mock_row = MagicMock()
-        mock_row.created_at = date_30_days
-        mock_row.updated_at = date_30_days
-        
-        mock_db.execute.return_value = MagicMock()
-        mock_db.execute.return_value.first.return_value = mock_row
-        
-        score = await service._calculate_recency_score(memory_id)
+        factors = await _score_candidate(service, mock_db, age_days=30)
         
         # At 30 days, e^(-30/30) = e^-1 ≈ 0.368
-        assert np.isclose(score, 0.368, atol=0.01)
+        assert np.isclose(factors["recency"], 0.368, atol=0.01)
 
     @pytest.mark.asyncio
-    async def test_no_memory_returns_zero(self, service, mock_db):
-        """Test that missing memory returns 0 recency."""
-        memory_id = str(uuid4())
-        
-        mock_db.execute.return_value = MagicMock()
-        mock_db.execute.return_value.first.return_value = None
-        
-        score = await service._calculate_recency_score(memory_id)
-        
-        assert score == 0.0
+    async def test_inactive_memory_is_not_recommended(self, service, mock_db):
+        """Test that a candidate with no active memory row is skipped."""
+        assert await _score_candidate(service, mock_db, active=False) is None
 
     @pytest.mark.asyncio
     async def test_recency_score_range(self, service, mock_db):
         """Test that recency score is always in [0, 1] range."""
-        # Any valid date should produce score in [0, 1]
         for days_ago in [0, 7, 30, 90, 365]:
-            date = datetime.utcnow() - timedelta(days=days_ago)
-            memory_id = str(uuid4())
-            
-            mock_row = MagicMock()
-            mock_row.created_at = date
-            mock_row.updated_at = date
+            factors = await _score_candidate(service, mock_db, age_days=days_ago)
             
-            mock_db.execute.return_value = MagicMock()
-            mock_db.execute.return_value.first.return_value = mock_row
-            
-            score = await service._calculate_recency_score(memory_id)
-            
-            assert 0.0 <= score <= 1.0
+            assert 0.0 <= factors["recency"] <= 1.0
 
 
 class TestInteractionScoringCalculation:
@@ -182,7 +180,6 @@ class TestInteractionScoringCalculation:
     @pytest.mark.asyncio
     async def test_high_interaction_high_score(self, service, mock_db):
         """Test that memories with high interaction get high scores."""
-        memory_id = str(uuid4())
         metadata = {
             "view_count": 100,
             "edit_count": 50,
@@ -190,18 +187,14 @@ class TestInteractionScoringCalculation:
             "time_spent_seconds": 3600  # 1 hour
         }
         
-        mock_db.execute.return_value = MagicMock()
-        mock_db.execute.return_value.first.return_value = (0, metadata)
-        
-        score = await service._calculate_interaction_score(memory_id)
+        factors = await _score_candidate(service, mock_db, extra_metadata=metadata)
         
         # Should be high
-        assert score > 0.7
+        assert factors["interaction"] > 0.7
 
     @pytest.mark.asyncio
     async def test_no_interaction_neutral_score(self, service, mock_db):
         """Test that memories with no interaction get neutral scores."""
-        memory_id = str(uuid4())
         metadata = {
             "view_count": 0,
             "edit_count": 0,
@@ -209,18 +202,14 @@ class TestInteractionScoringCalculation:
             "time_spent_seconds": 0
         }
         
-        mock_db.execute.return_value = MagicMock()
-        mock_db.execute.return_value.first.return_value = (0, metadata)
-        
-        score = await service._calculate_interaction_score(memory_id)
+        factors = await _score_candidate(service, mock_db, extra_metadata=metadata)
         
         # No interaction means neutral score of 0.5 (sigmoid(0) = 0.5)
-        assert score == 0.5
+        assert factors["interaction"] == 0.5
 
     @pytest.mark.asyncio
     async def test_interaction_score_range(self, service, mock_db):
         """Test that interaction score is in [0, 1] range."""
-        memory_id = str(uuid4())
         metadata = {
             "view_count": 1000,
             "edit_count": 500,
@@ -228,23 +217,18 @@ class TestInteractionScoringCalculation:
             "time_spent_seconds": 10000
         }
         
-        mock_db.execute.return_value = MagicMock()
-        mock_db.execute.return_value.first.return_value = (0, metadata)
-        
-        score = await service._calculate_interaction_score(memory_id)
+        factors = await _score_candidate(service, mock_db, extra_metadata=metadata)
         
-        assert 0.0 <= score <= 1.0
+        assert 0.0 <= factors["interaction"] <= 1.0
 
     @pytest.mark.asyncio
-    async def test_empty_metadata_returns_zero(self, service, mock_db):
-        """Test that missing metadata yields neutral score when row exists."""
-        memory_id = str(uuid4())
-        mock_db.execute.return_value = MagicMock()
-        mock_db.execute.return_value.first.return_value = (0, None)
+    async def test_empty_metadata_falls_back_to_access_count(self, service, mock_db):
+        """Test that missing metadata uses access_count, and is neutral at zero."""
+        idle = await _score_candidate(service, mock_db, access_count=0, extra_metadata=None)
+        viewed = await _score_candidate(service, mock_db, access_count=10, extra_metadata=None)
         
-        score = await service._calculate_interaction_score(memory_id)
-        
-        assert score == 0.5
+        assert idle["interaction"] == 0.5
+        assert viewed["interaction"] > 0.5
 
 
 class TestFeedbackScoringCalculation:
@@ -253,96 +237,45 @@ class TestFeedbackScoringCalculation:
     @pytest.mark.asyncio
     async def test_all_helpful_feedback_score_one(self, service, mock_db):
         """Test that all helpful feedback gives score of 1.0."""
-        user_id = str(uuid4())
-        memory_id = str(uuid4())
-        org_id = str(uuid4())
-        
-        # Create feedback objects
-        feedbacks = [
-            MagicMock(helpful=True, created_at=datetime.utcnow()),
-            MagicMock(helpful=True, created_at=datetime.utcnow()),
-            MagicMock(helpful=True, created_at=datetime.utcnow()),
-        ]
-        
-        mock_db.execute.return_value = MagicMock()
-        mock_db.execute.return_value.scalars.return_value.all.return_value = feedbacks
-        
-        score = await service._calculate_feedback_score(memory_id, user_id, org_id)
+        factors = await _score_candidate(service, mock_db, feedback=(3.0, 3.0))
         
-        # Should be 1.0
-        assert np.isclose(score, 1.0)
+        assert np.isclose(factors["feedback"], 1.0)
 
     @pytest.mark.asyncio
     async def test_all_unhelpful_feedback_score_zero(self, service, mock_db):
         """Test that all unhelpful feedback gives score of 0.0."""
-        user_id = str(uuid4())
-        memory_id = str(uuid4())
-        org_id = str(uuid4())
+        factors = await _score_candidate(service, mock_db, feedback=(0.0, 2.0))
         
-        feedbacks = [
-            MagicMock(helpful=False, created_at=datetime.utcnow()),
-            MagicMock(helpful=False, created_at=datetime.utcnow()),
-        ]
-        
-        mock_db.execute.return_value = MagicMock()
-        mock_db.execute.return_value.scalars.return_value.all.return_value = feedbacks
-        
-        score = await service._calculate_feedback_score(memory_id, user_id, org_id)
-        
-        # Should be 0.0
-        assert np.isclose(score, 0.0)
+        assert np.isclose(factors["feedback"], 0.0)
 
     @pytest.mark.asyncio
     async def test_mixed_feedback_neutral_score(self, service, mock_db):
         """Test that mixed feedback gives neutral score."""
-        user_id = str(uuid4())
-        memory_id = str(uuid4())
-        org_id = str(uuid4())
-        
-        feedbacks = [
-            MagicMock(helpful=True, created_at=datetime.utcnow()),
-            MagicMock(helpful=False, created_at=datetime.utcnow()),
-        ]
+        factors = await _score_candidate(service, mock_db, feedback=(1.0, 2.0))
         
-        mock_db.execute.return_value = MagicMock()
-        mock_db.execute.return_value.scalars.return_value.all.return_value = feedbacks
-        
-        score = await service._calculate_feedback_score(memory_id, user_id, org_id)
-        
-        # Should be around 0.5
-        assert 0.4 <= score <= 0.6
+        assert 0.4 <= factors["feedback"] <= 0.6
 
     @pytest.mark.asyncio
     async def test_no_feedback_neutral_default(self, service, mock_db):
         """Test that no feedback returns neutral default (0.5)."""
-        user_id = str(uuid4())
-        memory_id = str(uuid4())
-        org_id = str(uuid4())
-        
-        mock_db.execute.return_value = MagicMock()
-        mock_db.execute.return_value.scalars.return_value.all.return_value = []
-        
-        score = await service._calculate_feedback_score(memory_id, user_id, org_id)
+        factors = await _score_candidate(service, mock_db, feedback=None)
         
-        assert score == 0.5
+        assert factors["feedback"] == 0.5
 
     @pytest.mark.asyncio
     async def test_recency_weights_recent_feedback(self, service, mock_db):
-        """Test that recent feedback is weighted more heavily."""
-        user_id = str(uuid4())
-        memory_id = str(uuid4())
-        org_id = str(uuid4())
+        """Test that feedback is aggregated with exp(-age_days/30) weights over 90 days."""
+        await _score_candidate(service, mock_db)
         
-        recent_fb = MagicMock(helpful=True, created_at=datetime.utcnow())
-        old_fb = MagicMock(helpful=False, created_at=datetime.utcnow() - timedelta(days=90))
+        feedback_stmt = mock_db.execute.await_args_list[2].args[0]
+        sql = str(feedback_stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
         
-        mock_db.execute.return_value = MagicMock()
-        mock_db.execute.return_value.scalars.return_value.all.return_value = [recent_fb, old_fb]
-        
-        score = await service._calculate_feedback_score(memory_id, user_id, org_id)
-        
-        # Should be closer to 1.0 (helpful) since recent feedback is weighted higher
-        assert score > 0.7
+        # Recent feedback outweighs old feedback, in the same query for every candidate
+        assert "exp((-floor(EXTRACT(epoch FROM timezone('utc', now()) - recommendation_feedback.created_at)" in sql
+        assert "/ CAST(30.0 AS FLOAT)" in sql
+        assert "GROUP BY recommendation_feedback.recommended_memory_id" in sql
+        cutoff = next(v for v in feedback_stmt.compile().params.values() if isinstance(v, datetime))
+        assert np.isclose((datetime.utcnow() - cutoff).total_seconds() / 86400, 90, atol=0.01)
 
 
 class TestRelationshipRetrieval:
@@ -423,6 +356,73 @@ class TestCaching:
         # Would need complete mocking of entire flow
 
 
+class TestBatchedScoring:
+    """Cold requests load signals with a constant number of queries."""
+
+    @pytest.mark.asyncio
+    async def test_cold_request_uses_three_queries(self, service, mock_db, mock_redis):
+        base_id = str(uuid4())
+        org_id = str(uuid4())
+        now = datetime.utcnow()
+        candidates = [str(uuid4()) for _ in range(20)]
+
+        rels = [
+            MagicMock(
+                from_memory_id=base_id if i % 2 else cid,
+                to_memory_id=cid if i % 2 else base_id,
+                similarity_score=0.5 + i / 100,
+                relationship_type="RELATES_TO",
+            )
+            for i, cid in enumerate(candidates)
+        ]
+        rel_result = MagicMock()
+        rel_result.scalars.return_value.all.return_value = rels
+
+        signal_rows = [
+            MagicMock(
+                id=cid,
+                title=f"m{i}",
+                content_preview="x" * 300,
+                created_at=now,
+                updated_at=now,
+                access_count=i,
+                extra_metadata={},
+            )
+            for i, cid in enumerate(candidates[:-1])  # last one is inactive
+        ]
+        signal_result = MagicMock()
+        signal_result.all.return_value = signal_rows
+
+        feedback_result = MagicMock()
+        feedback_result.all.return_value = [(candidates[0], 0.0, 2.0)]
+
+        mock_redis.mget.return_value = ["3", None]
+        mock_db.execute.side_effect = [rel_result, signal_result, feedback_result]
+
+        recs = await service.get_recommendations(base_id, org_id, limit=5)
+
+        assert mock_db.execute.await_count == 3
+        assert len(recs) == 5
+        assert [r["score"] for r in recs] == sorted((r["score"] for r in recs), reverse=True)
+        assert recs[0]["memory_id"] == candidates[-2]
+        assert len(recs[0]["summary"]) == 200
+        assert all(r["memory_id"] != candidates[-1] for r in recs)
+
+        cache_key, ttl, payload = mock_redis.setex.call_args.args
+        assert cache_key.endswith(":g3.0")
+        assert ttl == service.cache_ttl
+
+    @pytest.mark.asyncio
+    async def test_feedback_bumps_memory_generation(self, service, mock_db, mock_redis):
+        mock_db.add = MagicMock()
+        mock_db.commit = AsyncMock()
+        org_id = str(uuid4())
+
+        await service.submit_feedback("mem1", "mem2", org_id, str(uuid4()), helpful=True)
+
+        mock_redis.incr.assert_called_once_with(f"recommendations:gen:{org_id}:mem1")
+
+
 class TestFeedbackSubmission:
     """Test feedback submission."""
 
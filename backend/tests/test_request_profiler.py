@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import create_engine, text
+
+from app.core.request_profiler import (
+    SPAN_QDRANT,
+    current_profile,
+    end_request_profile,
+    fingerprint_statement,
+    install_query_instrumentation,
+    profile_span,
+    start_request_profile,
+)
+from app.middleware.observability import ObservabilityMiddleware
+
+
+def test_fingerprint_collapses_literals_params_and_in_lists() -> None:
+    a = fingerprint_statement(
+        "SELECT * FROM memory_metadata WHERE id = $1::UUID AND organization_id IN ($2::UUID, $3::UUID)"
+    )
+    b = fingerprint_statement(
+        "SELECT *  FROM memory_metadata WHERE id = $9::UUID AND organization_id IN ($1::UUID)"
+    )
+    c = fingerprint_statement("SELECT * FROM memory_metadata WHERE title = 'x''y' LIMIT 10")
+
+    assert a == b
+    assert a == "SELECT * FROM memory_metadata WHERE id = ? AND organization_id IN (?)"
+    assert c == "SELECT * FROM memory_metadata WHERE title = ? LIMIT ?"
+
+
+def test_sqlalchemy_events_feed_active_profile_and_detect_repeats() -> None:
+    engine = create_engine("sqlite://")
+    install_query_instrumentation(engine)
+    install_query_instrumentation(engine)  # idempotent
+
+    profile, token = start_request_profile()
+    try:
+        with engine.connect() as conn:
+            for i in range(12):
+                conn.execute(text("SELECT :v"), {"v": i})
+            conn.execute(text("SELECT 1 + 1"))
+    finally:
+        end_request_profile(token)
+
+    assert current_profile() is None
+    assert profile.db_count == 13
+    repeated = profile.repeated_statements(10)
+    assert len(repeated) == 1
+    assert repeated[0].count == 12
+    assert profile.repeated_statements(0) == []
+
+
+def test_profile_span_is_noop_outside_request() -> None:
+    with profile_span(SPAN_QDRANT):
+        pass
+    assert current_profile() is None
+
+
+@pytest.mark.asyncio
+async def test_middleware_emits_server_timing_header() -> None:
+    app = FastAPI()
+    app.add_middleware(ObservabilityMiddleware)
+
+    @app.get("/work")
+    async def work() -> dict:
+        with profile_span(SPAN_QDRANT):
+            pass
+        return {"ok": True}
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://t") as client:
+        resp = await client.get("/work")
+
+    timing = resp.headers["Server-Timing"]
+    assert timing.startswith('db;dur=0.0;desc="0 queries"')
+    assert 'qdrant;dur=' in timing and 'desc="1 calls"' in timing
+    assert "app;dur=" in timing
@@ -236,7 +236,7 @@ async def test_playbook_long_horizon_goal_flow(pg_client, pg_db_session, migrate
 
     monkeypatch.setattr(EmbeddingService, "embed", AsyncMock(side_effect=_embed))
 
-    async def _search_memories(self: MemoryService, _embedding, req):
+    async def _search_memories(self: MemoryService, _embedding, req, recorded_ids=None):
         res = await self.session.execute(
             select(MemoryMetadata)
             .where(MemoryMetadata.organization_id == self.org_id)
@@ -416,7 +416,7 @@ async def test_playbook_low_confidence_domain_leads_to_needs_evidence(pg_client,
 
     monkeypatch.setattr(EmbeddingService, "embed", AsyncMock(return_value=[0.0, 0.0, 0.0]))
 
-    async def _search_memories(self: MemoryService, _embedding, _req):
+    async def _search_memories(self: MemoryService, _embedding, _req, recorded_ids=None):
         return []
 
     monkeypatch.setattr(MemoryService, "search_memories", _search_memories, raising=True)
@@ -0,0 +1,259 @@
+from __future__ import annotations
+
+import io
+import json
+import zipfile
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+import pytest
+
+from app.services import snapshot_import
+from app.services.snapshot_import import (
+    STAGING_COLUMNS,
+    SnapshotBulkImporter,
+    _JsonStream,
+    iter_snapshot_memories,
+    normalize_record,
+    open_snapshot_records,
+)
+
+
+def _record(i: int, vector=None) -> dict:
+    return {
+        "id": str(uuid4()),
+        "title": f"m{i}",
+        "content_preview": f"content {i}",
+        "scope": "team",
+        "scope_id": str(uuid4()),
+        "tags": ["x"],
+        "created_at": "2024-01-01T00:00:00",
+        "vector": vector,
+    }
+
+
+def test_streaming_parser_handles_chunk_boundaries_and_extra_keys() -> None:
+    records = [_record(i, vector=[0.1 * i, 12345.5]) for i in range(20)]
+    doc = json.dumps(
+        {"version": "2.0", "memory_count": 123456789, "memories": records, "trailer": {"a": [1]}}
+    ).encode()
+
+    stream = io.BytesIO(doc)
+    parsed = list(iter_snapshot_memories(stream))
+    assert parsed == records
+
+    # Tiny chunks force every value to straddle reads.
+    tiny = _JsonStream(io.BytesIO(doc), chunk_size=3)
+    tiny.expect("{")
+    assert tiny.value() == "version"
+    tiny.expect(":")
+    assert tiny.value() == "2.0"
+    tiny.expect(",")
+    assert tiny.value() == "memory_count"
+    tiny.expect(":")
+    assert tiny.value() == 123456789
+
+
+def test_bare_array_and_zip_member_are_streamed() -> None:
+    records = [_record(i) for i in range(3)]
+    assert list(iter_snapshot_memories(io.BytesIO(json.dumps(records).encode()))) == records
+    assert list(iter_snapshot_memories(io.BytesIO(b'{"memories": []}'))) == []
+
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as zf:
+        zf.writestr("memories.json", json.dumps({"memories": records}))
+        zf.writestr("memories.md", "# ignored")
+    buf.seek(0)
+    assert list(open_snapshot_records(buf, "zip")) == records
+
+    with pytest.raises(ValueError):
+        open_snapshot_records(io.BytesIO(b""), "markdown")
+
+
+def test_malformed_snapshot_raises() -> None:
+    with pytest.raises(ValueError):
+        list(iter_snapshot_memories(io.BytesIO(b'{"memories": [{"id": 1} {"id": 2}]}')))
+    with pytest.raises(ValueError):
+        list(iter_snapshot_memories(io.BytesIO(b'{"memories": [{"id": ')))
+
+
+def test_normalize_record_accepts_v1_records() -> None:
+    now = snapshot_import.datetime.now(snapshot_import.timezone.utc)
+    v1 = {"id": str(uuid4()), "title": "t", "content": "x" * 600, "metadata": {"k": 1}}
+
+    row, vector, text = normalize_record(v1, now)
+    values = dict(zip(STAGING_COLUMNS, row))
+
+    assert vector is None
+    assert text == "x" * 600
+    assert len(values["content_preview"]) == 500
+    assert values["extra_metadata"] == '{"k": 1}'
+    assert values["scope"] == "personal"
+    assert values["created_at"] == now == values["updated_at"]
+
+    with pytest.raises(ValueError):
+        normalize_record({"id": str(uuid4())}, now)
+
+
+@pytest.fixture(autouse=True)
+def checker(monkeypatch):
+    """Allow every scope and write unless a test says otherwise."""
+    allowed = SimpleNamespace(allowed=True, reason="")
+    instance = SimpleNamespace(
+        check_permission=AsyncMock(return_value=allowed),
+        check_memory_access=AsyncMock(return_value=allowed),
+    )
+    monkeypatch.setattr(snapshot_import, "PermissionChecker", lambda _db: instance)
+    return instance
+
+
+def _db(merge_rows, existing=()):
+    db = MagicMock()
+    executed = []
+
+    def _rows(sql):
+        if "INSERT INTO memory_metadata" in sql:
+            return merge_rows.pop(0)
+        if sql.startswith("SELECT id::text FROM memory_metadata"):
+            return [(mid,) for mid in existing]
+        return []
+
+    async def execute(stmt, params=None):
+        executed.append((str(stmt), params))
+        return SimpleNamespace(all=lambda: _rows(str(stmt)))
+
+    db.execute = execute
+    driver = SimpleNamespace(copy_records_to_table=AsyncMock())
+    conn = MagicMock(get_raw_connection=AsyncMock(return_value=SimpleNamespace(driver_connection=driver)))
+    db.connection = AsyncMock(return_value=conn)
+    return db, driver, executed
+
+
+@pytest.mark.asyncio
+async def test_bulk_import_copies_merges_and_upserts_vectors_in_batches() -> None:
+    user_id = str(uuid4())
+    records = [_record(i, vector=[float(i)] * 3) for i in range(3)]
+    records[2]["vector"] = None
+    records.append({"id": "not-a-uuid", "content": "bad"})
+    records.append(_record(9))
+
+    # Batch 1: both inserted. Batch 2: one updated, one invalid. Batch 3: skipped.
+    merge_rows = [
+        [(records[0]["id"], "v0", user_id, True), (records[1]["id"], "v1", user_id, True)],
+        [(records[2]["id"], "v2", user_id, False)],
+        [],
+    ]
+    db, driver, executed = _db(merge_rows)
+    source = io.BytesIO(json.dumps({"memories": records}).encode())
+
+    with patch.object(snapshot_import.QdrantService, "upsert_memories", AsyncMock()) as upsert, \
+         patch.object(snapshot_import.EmbeddingService, "embed", AsyncMock(return_value=[9.0] * 3)) as embed, \
+         patch.object(snapshot_import, "AuditService") as audit_cls:
+        audit_cls.return_value.log_memory_operation = AsyncMock()
+        importer = SnapshotBulkImporter(db, str(uuid4()), user_id, batch_size=2)
+        result = await importer.run(source, "json", overwrite=True)
+
+    assert result["total"] == 5
+    assert result["imported"] == 2
+    assert result["updated"] == 1
+    assert result["skipped"] == 1
+    assert len(result["errors"]) == 1 and "not-a-uuid" in result["errors"][0]
+    assert result["vectors_restored"] == 2
+    assert result["vectors_embedded"] == 1
+    embed.assert_awaited_once_with("content 2")
+
+    assert driver.copy_records_to_table.await_count == 3
+    first_copy = driver.copy_records_to_table.await_args_list[0]
+    assert first_copy.kwargs["columns"] == list(STAGING_COLUMNS)
+    assert len(first_copy.kwargs["records"]) == 2
+
+    merges = [sql for sql, _ in executed if "INSERT INTO memory_metadata" in sql]
+    assert len(merges) == 3 and "DO UPDATE SET" in merges[0]
+
+    assert upsert.await_count == 2
+    points = upsert.await_args_list[0].args[1]
+    assert [p["id"] for p in points] == ["v0", "v1"]
+    assert points[0]["vector"] == [0.0] * 3
+    assert points[0]["payload"]["team_id"] == records[0]["scope_id"]
+    audit_cls.return_value.log_memory_operation.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_bulk_import_without_overwrite_skips_existing() -> None:
+    records = [_record(0, vector=[1.0])]
+    db, _, executed = _db([[]])
+
+    with patch.object(snapshot_import.QdrantService, "upsert_memories", AsyncMock()) as upsert, \
+         patch.object(snapshot_import, "AuditService") as audit_cls:
+        audit_cls.return_value.log_memory_operation = AsyncMock()
+        result = await SnapshotBulkImporter(db, str(uuid4()), str(uuid4())).run(
+            io.BytesIO(json.dumps(records).encode()), "json"
+        )
+
+    assert result["skipped"] == 1 and result["imported"] == 0
+    assert any("DO NOTHING" in sql for sql, _ in executed)
+    upsert.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_import_enforces_create_checks_owner_and_overwrite_access(checker) -> None:
+    user_id = str(uuid4())
+    writable, foreign = _record(0, vector=[1.0]), _record(1, vector=[1.0])
+    denied_scope = dict(_record(2, vector=[1.0]), scope="organization")
+    bad_clearance = dict(_record(3, vector=[1.0]), required_clearance=9, owner_id=str(uuid4()))
+    db, driver, executed = _db([[(writable["id"], "v0", user_id, False)]], existing=[writable["id"], foreign["id"]])
+
+    checker.check_permission.side_effect = lambda _u, _o, perm: SimpleNamespace(
+        allowed=not perm.endswith(":organization"), reason="no org scope"
+    )
+    checker.check_memory_access.side_effect = lambda _u, _o, mid, action, _c: SimpleNamespace(
+        allowed=mid == writable["id"] and action == "write", reason="no"
+    )
+
+    with patch.object(snapshot_import.QdrantService, "upsert_memories", AsyncMock()), \
+         patch.object(snapshot_import, "AuditService") as audit_cls:
+        audit_cls.return_value.log_memory_operation = AsyncMock()
+        result = await SnapshotBulkImporter(db, str(uuid4()), user_id).run(
+            io.BytesIO(json.dumps([writable, foreign, denied_scope, bad_clearance]).encode()),
+            "json",
+            overwrite=True,
+        )
+
+    staged = [r[0] for r in driver.copy_records_to_table.await_args.kwargs["records"]]
+    assert staged == [writable["id"]]
+    assert result["updated"] == 1 and len(result["errors"]) == 3
+    assert any("no write access" in e for e in result["errors"])
+    assert any("no org scope" in e for e in result["errors"])
+
+    merge_sql, params = next((sql, p) for sql, p in executed if "INSERT INTO memory_metadata" in sql)
+    assert "CAST(:user_id AS uuid)," in merge_sql and "JOIN users" not in merge_sql
+    assert params["user_id"] == user_id
+
+
+@pytest.mark.asyncio
+async def test_re_embedding_is_bounded(monkeypatch) -> None:
+    import asyncio
+
+    monkeypatch.setattr(snapshot_import.settings, "SNAPSHOT_IMPORT_EMBED_CONCURRENCY", 2)
+    records = [_record(i) for i in range(6)]
+    db, _, _ = _db([[(r["id"], f"v{i}", "u", True) for i, r in enumerate(records)]])
+    active = peak = 0
+
+    async def embed(_text):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0)
+        active -= 1
+        return [0.0]
+
+    with patch.object(snapshot_import.QdrantService, "upsert_memories", AsyncMock()), \
+         patch.object(snapshot_import.EmbeddingService, "embed", embed), \
+         patch.object(snapshot_import, "AuditService") as audit_cls:
+        audit_cls.return_value.log_memory_operation = AsyncMock()
+        result = await SnapshotBulkImporter(db, str(uuid4()), str(uuid4()), batch_size=10).run(
+            io.BytesIO(json.dumps(records).encode()), "json"
+        )
+
+    assert result["vectors_embedded"] == 6 and peak == 2
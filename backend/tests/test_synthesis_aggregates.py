@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+from datetime import date, datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+import app.models  # noqa: F401  (configure mappers)
+import app.models.admin  # noqa: F401
+from app.services.knowledge_synthesis_service import KnowledgeSynthesisService
+from app.services.synthesis_aggregates import SynthesisAggregates, cluster_strength, week_start
+
+
+class _Recorder:
+    def __init__(self, edges=()):
+        self.statements = []
+        self.edges = list(edges)
+
+    async def execute(self, stmt, params=None):
+        self.statements.append((stmt, params))
+        return SimpleNamespace(all=lambda: self.edges)
+
+    def upserts(self, table: str):
+        return [
+            stmt for stmt, _ in self.statements
+            if getattr(getattr(stmt, "table", None), "name", None) == table
+        ]
+
+
+def _rows(stmt):
+    compiled = stmt.compile(dialect=postgresql.dialect())
+    return str(compiled), compiled.params
+
+
+def test_week_start_is_utc_monday() -> None:
+    assert week_start(datetime(2024, 1, 10, 15, tzinfo=timezone.utc)) == date(2024, 1, 8)
+    assert week_start(datetime(2024, 1, 8)) == date(2024, 1, 8)
+    assert cluster_strength(1, 0) == 0.5
+    assert cluster_strength(4, 3) == 0.5
+    assert cluster_strength(3, 10) == 1.0
+
+
+@pytest.mark.asyncio
+async def test_create_applies_counts_without_edge_lookup() -> None:
+    session = _Recorder()
+    aggs = SynthesisAggregates(session, "org")
+
+    await aggs.apply_memory_change("m1", None, ["a", "b", "a"], datetime(2024, 1, 10))
+
+    assert len(session.statements) == 3  # one upsert per table, no edge query
+    sql, params = _rows(session.upserts("knowledge_tag_stats")[0])
+    assert "ON CONFLICT (organization_id, tag) DO UPDATE" in sql
+    assert "memory_count = (knowledge_tag_stats.memory_count + excluded.memory_count)" in sql
+    assert sorted(v for k, v in params.items() if k.startswith("tag")) == ["a", "b"]
+
+    _, params = _rows(session.upserts("knowledge_tag_pairs")[0])
+    assert (params["tag_a_m0"], params["tag_b_m0"], params["memory_count_m0"]) == ("a", "b", 1)
+
+    # Per-tag weekly rows only: no org-wide row that every create would update.
+    _, params = _rows(session.upserts("knowledge_tag_weeks")[0])
+    assert [(params[f"tag_m{i}"], params[f"memory_count_m{i}"]) for i in range(2)] == [("a", 1), ("b", 1)]
+    assert "tag_m2" not in params and params["week_start_m0"] == date(2024, 1, 8)
+
+
+@pytest.mark.asyncio
+async def test_retag_moves_counts_pairs_and_edges() -> None:
+    session = _Recorder(edges=[("a", 2), ("c", 5)])
+    aggs = SynthesisAggregates(session, "org")
+
+    await aggs.apply_memory_change("m1", ["a", "b"], ["b", "c"], datetime(2024, 1, 10))
+
+    edge_sql, edge_params = session.statements[0]
+    assert "unnest(CAST(:tags AS varchar[]))" in str(edge_sql)
+    assert sorted(edge_params["tags"]) == ["a", "c"]
+
+    _, params = _rows(session.upserts("knowledge_tag_stats")[0])
+    stats = {
+        params[f"tag_m{i}"]: (params[f"memory_count_m{i}"], params[f"relationship_count_m{i}"])
+        for i in range(2)
+    }
+    assert stats == {"a": (-1, -2), "c": (1, 5)}
+
+    _, params = _rows(session.upserts("knowledge_tag_pairs")[0])
+    pairs = {
+        (params[f"tag_a_m{i}"], params[f"tag_b_m{i}"]): params[f"memory_count_m{i}"]
+        for i in range(2)
+    }
+    assert pairs == {("a", "b"): -1, ("b", "c"): 1}
+
+    _, params = _rows(session.upserts("knowledge_tag_weeks")[0])
+    assert [params[f"tag_m{i}"] for i in range(2)] == ["a", "c"]
+    assert "tag_m2" not in params
+
+
+@pytest.mark.asyncio
+async def test_upsert_rows_are_in_conflict_key_order() -> None:
+    session = _Recorder()
+    aggs = SynthesisAggregates(session, "org")
+
+    await aggs.apply_created([(["z", "b"], datetime(2024, 1, 17)), (["m", "b"], datetime(2024, 1, 10))])
+
+    def keys(table, *cols):
+        _, params = _rows(session.upserts(table)[0])
+        n = sum(1 for k in params if k.startswith(f"{cols[0]}_m"))
+        return [tuple(params[f"{c}_m{i}"] for c in cols) for i in range(n)]
+
+    # Concurrent writers lock the rows they share in the same order.
+    assert keys("knowledge_tag_stats", "tag") == [("b",), ("m",), ("z",)]
+    assert keys("knowledge_tag_pairs", "tag_a", "tag_b") == [("b", "m"), ("b", "z")]
+    weeks = keys("knowledge_tag_weeks", "tag", "week_start")
+    assert weeks == sorted(weeks) and len(weeks) == 4
+
+
+@pytest.mark.asyncio
+async def test_weekly_totals_are_counted_from_memories() -> None:
+    session = SimpleNamespace(
+        execute=AsyncMock(return_value=SimpleNamespace(all=lambda: [(datetime(2024, 1, 8), 3)]))
+    )
+
+    assert await SynthesisAggregates(session, "org").weekly_totals(date(2024, 1, 1)) == [(date(2024, 1, 8), 3)]
+    sql = str(session.execute.await_args.args[0].compile(dialect=postgresql.dialect()))
+    assert "FROM memory_metadata" in sql and "knowledge_tag_weeks" not in sql
+
+
+@pytest.mark.asyncio
+async def test_org_report_is_served_from_aggregates() -> None:
+    sample = SimpleNamespace(
+        id="m1",
+        title="Deploy",
+        content_preview="x" * 120,
+        created_at=datetime(2024, 1, 10, tzinfo=timezone.utc),
+        tags=["infra", "prod"],
+        tag="infra",
+    )
+    relationship = SimpleNamespace(from_memory_id="m1", to_memory_id="m2", relationship_type="RELATES_TO")
+    session = SimpleNamespace(
+        execute=AsyncMock(
+            side_effect=[
+                SimpleNamespace(all=lambda: [sample]),
+                SimpleNamespace(scalars=lambda: SimpleNamespace(all=lambda: [relationship])),
+            ]
+        )
+    )
+    service = KnowledgeSynthesisService(session, org_id="org")
+    service.aggregates = SimpleNamespace(
+        refresh=AsyncMock(),
+        weekly_totals=AsyncMock(
+            return_value=[(date(2024, 1, 1), 2), (date(2024, 1, 8), 3), (date(2024, 1, 15), 6)]
+        ),
+        top_clusters=AsyncMock(
+            return_value=[
+                {
+                    "tag": "infra",
+                    "memory_count": 4,
+                    "relationship_count": 6,
+                    "window_count": 4,
+                    "first_week": date(2024, 1, 1),
+                    "last_week": date(2024, 1, 15),
+                    "strength": 1.0,
+                }
+            ]
+        ),
+        cooccurring=AsyncMock(return_value={"infra": ["prod"]}),
+    )
+
+    report = await service.create_synthesis_report(days_back=30, refresh=True)
+
+    service.aggregates.refresh.assert_awaited_once()
+    assert report.memory_count == 11
+    cluster = report.clusters[0]
+    assert cluster.concept == "infra" and cluster.tags == ["infra", "prod"]
+    assert cluster.relationships_count == 6
+    assert cluster.memories[0]["content"].endswith("...")
+    assert report.trends[0].trajectory == "increasing"
+    assert report.relationships == {"m1": ["RELATES_TO:m2"]}
+    # Samples + sample relationships; nothing scales with the org's memory count.
+    assert session.execute.await_count == 2
@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import random
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.sql.dml import Insert
+
+from app.services import resource_accounting as ra
+from app.services import usage_rollups as ur
+from app.services.resource_accounting import ResourceAccountingService
+from app.services.usage_rollups import LatencySketch, UsageRollupBuffer
+
+_KEY = ("organization_id", "granularity", "bucket_start", "metric", "dimension", "sub_dimension")
+_VALUES = ("count", "error_count", "value_sum", "value_max", "sketch")
+
+
+class _RollupTable:
+    """Applies the rollup upsert in Python; selects return the minute rows.
+
+    Every event in these tests happens "now", so a window's trailing partial
+    hour is answered from minute rows alone (see window_ranges).
+    """
+
+    def __init__(self):
+        self.rows: dict[tuple, dict] = {}
+        self.upserts: list[str] = []
+        self.keys: list[list[tuple]] = []
+
+    async def execute(self, stmt, *args, **kwargs):
+        if isinstance(stmt, Insert):
+            compiled = stmt.compile(dialect=postgresql.dialect())
+            self.upserts.append(str(compiled))
+            params, i = compiled.params, 0
+            self.keys.append([])
+            while f"granularity_m{i}" in params:
+                row = {c: params[f"{c}_m{i}"] for c in _KEY + _VALUES}
+                self.keys[-1].append(tuple(row[c] for c in _KEY))
+                self._merge(row)
+                i += 1
+            return SimpleNamespace(rowcount=i)
+        minute = [r for r in self.rows.values() if r["granularity"] == "minute"]
+        return SimpleNamespace(
+            all=lambda: [
+                (r["dimension"], r["sub_dimension"], *(r[c] for c in _VALUES)) for r in minute
+            ]
+        )
+
+    def _merge(self, row):
+        key = tuple(row[c] for c in _KEY)
+        cur = self.rows.get(key)
+        if cur is None:
+            self.rows[key] = row
+            return
+        for c in ("count", "error_count", "value_sum"):
+            cur[c] += row[c]
+        cur["value_max"] = max(cur["value_max"], row["value_max"])
+        if row["sketch"]:
+            cur["sketch"] = [a + b for a, b in zip(cur["sketch"] or [0] * len(row["sketch"]), row["sketch"])]
+
+
+@pytest.fixture
+def table(monkeypatch):
+    """The rollup table, reached through the buffer's own committed session."""
+    rollups = _RollupTable()
+    rollups.commits = 0
+
+    @asynccontextmanager
+    async def flush_session(org_id):
+        yield rollups
+        rollups.commits += 1
+
+    monkeypatch.setattr(ur, "_flush_session", flush_session)
+    return rollups
+
+
+@pytest.fixture
+def buffer(monkeypatch, table):
+    buf = UsageRollupBuffer()
+    monkeypatch.setattr(ra, "usage_rollups", buf)
+    monkeypatch.setattr(ra.rate_limiter, "check_rate_limit", AsyncMock())
+    monkeypatch.setattr(ra.rate_limiter, "check_quota", AsyncMock())
+    monkeypatch.setattr(ra.rate_limiter, "get_usage_stats", AsyncMock(return_value={"used": 7, "month": "2026-10"}))
+    return buf
+
+
+def _exact(data, q):
+    data = sorted(data)
+    return data[int(q * (len(data) - 1))]
+
+
+def test_sketches_merge_by_adding_counts_within_relative_error() -> None:
+    rng = random.Random(7)
+    data = [rng.lognormvariate(3.0, 1.0) for _ in range(5000)]
+    left, right, whole = LatencySketch(), LatencySketch(), LatencySketch()
+    for i, v in enumerate(data):
+        (left if i % 2 else right).add(v)
+        whole.add(v)
+
+    left.merge(right)
+    assert left.counts == whole.counts
+    for q in (0.5, 0.95, 0.99):
+        assert left.quantile(q) == pytest.approx(_exact(data, q), rel=0.05)
+
+
+@pytest.mark.asyncio
+async def test_request_metrics_merge_buckets_flushed_by_several_processes(buffer, table, monkeypatch) -> None:
+    other_process = UsageRollupBuffer()
+    for ms in range(1, 51):
+        other_process.record_request("org-1", endpoint="/search", method="POST", duration_ms=ms, success=True)
+    await other_process.flush("org-1")
+
+    service = ResourceAccountingService(table, "org-1")
+    monkeypatch.setattr(ur.settings, "USAGE_ROLLUP_FLUSH_SECONDS", 3600)
+    for ms in range(51, 101):
+        await service.track_request("/memories", "GET", ms, 500 if ms > 95 else 200)
+
+    # First call flushed once; the rest are still pending in this process.
+    assert len(table.upserts) == 2 and buffer.pending("org-1") == 2
+    assert "ON CONFLICT" in table.upserts[0] and "unnest(usage_rollups.sketch, excluded.sketch)" in table.upserts[0]
+
+    metrics = await service.get_request_metrics(time_window_hours=24)
+
+    assert buffer.pending("org-1") == 0
+    assert metrics["total_requests"] == 100 and metrics["error_count"] == 5
+    assert metrics["by_endpoint"] == {"/search": 50, "/memories": 50}
+    assert metrics["avg_latency_ms"] == pytest.approx(50.5)
+    assert metrics["latency_p95_ms"] == pytest.approx(95, rel=0.05)
+    assert metrics["latency_p99_ms"] <= 100
+    assert {key[1] for key in table.rows} == {"minute", "hour"}
+
+
+@pytest.mark.asyncio
+async def test_token_usage_stats_read_rollups(buffer, table) -> None:
+    service = ResourceAccountingService(table, "org-1")
+    await service.track_token_usage(100, "llama3", "completion")
+    await service.track_token_usage(40, "llama3", "embedding")
+    await service.track_token_usage(10, "gpt-4", "completion")
+
+    stats = await service.get_token_usage_stats(time_window_days=30)
+
+    assert stats["total_tokens"] == 150
+    assert stats["by_model"] == {"llama3": 140, "gpt-4": 10}
+    assert stats["by_operation"] == {"completion": 110, "embedding": 40}
+    assert stats["current_month_usage"] == 7
+
+
+@pytest.mark.asyncio
+async def test_flush_commits_on_its_own_session_in_key_order(buffer, table, monkeypatch) -> None:
+    for endpoint in ("/z", "/a", "/m"):
+        buffer.record_request("org-1", endpoint=endpoint, method="GET", duration_ms=5, success=True)
+    caller = SimpleNamespace(execute=AsyncMock(), rollback=AsyncMock())
+    service = ResourceAccountingService(caller, "org-1")
+    monkeypatch.setattr(ra, "load_rollups", AsyncMock(return_value={}))
+
+    await service.get_request_metrics()
+
+    # Written and committed independently of the caller's (read-only) session.
+    caller.execute.assert_not_awaited()
+    assert table.commits == 1 and len(table.rows) == 6
+    assert table.keys[0] == sorted(table.keys[0])
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_keeps_deltas_for_the_next_one(buffer, table, monkeypatch) -> None:
+    buffer.record_tokens("org-1", model="llama3", operation="completion", tokens=10)
+
+    @asynccontextmanager
+    async def broken_session(org_id):
+        raise ConnectionError("db down")
+        yield
+
+    monkeypatch.setattr(ur, "_flush_session", broken_session)
+    assert await buffer.flush("org-1") == 0
+    assert buffer.pending("org-1") == 2
+
+
+@pytest.mark.asyncio
+async def test_pending_cap_flushes_idle_orgs_too(buffer, table, monkeypatch) -> None:
+    monkeypatch.setattr(ur.settings, "USAGE_ROLLUP_FLUSH_SECONDS", 3600)
+    monkeypatch.setattr(ur.settings, "USAGE_ROLLUP_MAX_PENDING", 4)
+    buffer.record_tokens("idle-org", model="llama3", operation="completion", tokens=10)
+    await buffer.flush("busy-org")  # busy-org flushed recently, so only the cap can trigger
+
+    buffer.record_tokens("busy-org", model="llama3", operation="completion", tokens=5)
+    assert await buffer.flush_if_due("busy-org") == 4
+
+    assert buffer.pending() == 0
+    assert {key[0] for key in table.rows} == {"idle-org", "busy-org"}
+
+
+@pytest.mark.asyncio
+async def test_stop_flushes_every_org(buffer, table, monkeypatch) -> None:
+    monkeypatch.setattr(ur.settings, "USAGE_ROLLUP_FLUSH_SECONDS", 3600)
+    for org_id in ("org-1", "org-2"):
+        buffer.record_request(org_id, endpoint="/a", method="GET", duration_ms=5, success=True)
+    buffer.start()
+    assert buffer.running
+
+    await buffer.stop()
+
+    assert not buffer.running and buffer.pending() == 0
+    assert table.commits == 2 and {key[0] for key in table.rows} == {"org-1", "org-2"}
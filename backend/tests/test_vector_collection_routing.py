@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+from qdrant_client.http import models as qm
+
+import app.models  # noqa: F401  (configure mappers)
+import app.models.admin  # noqa: F401
+from app.core.qdrant import QdrantService
+from app.core.qdrant_routing import CollectionRouter, dedicated_collection_name, layout_for_route
+from app.services.vector_collection_migration import VectorCollectionMigrator
+
+
+def _org_of(flt) -> str:
+    return flt.must[0].match.value
+
+
+class FakeQdrant:
+    """Minimal in-memory stand-in for the Qdrant client calls used here."""
+
+    def __init__(self):
+        self.collections: dict[str, dict] = {"memories": {}}
+        self.created: dict[str, dict] = {}
+        self.searched: list[str] = []
+
+    def get_collections(self):
+        return SimpleNamespace(collections=[SimpleNamespace(name=n) for n in self.collections])
+
+    def create_collection(self, collection_name, **config):
+        self.collections[collection_name] = {}
+        self.created[collection_name] = config
+
+    def create_payload_index(self, **_kwargs):
+        pass
+
+    def upsert(self, collection_name, points, wait=False):
+        for p in points:
+            self.collections[collection_name][str(p.id)] = (p.vector, dict(p.payload))
+
+    def _records(self, collection_name, org_id):
+        return [
+            SimpleNamespace(id=pid, vector=vector, payload=payload)
+            for pid, (vector, payload) in sorted(self.collections[collection_name].items())
+            if payload.get("organization_id") == org_id
+        ]
+
+    def scroll(self, collection_name, scroll_filter, limit, offset=None, **_kwargs):
+        records = self._records(collection_name, _org_of(scroll_filter))
+        start = offset or 0
+        page = records[start:start + limit]
+        return page, (start + limit if start + limit < len(records) else None)
+
+    def retrieve(self, collection_name, ids, **_kwargs):
+        points = self.collections[collection_name]
+        return [SimpleNamespace(id=i, vector=points[str(i)][0]) for i in ids if str(i) in points]
+
+    def delete(self, collection_name, points_selector):
+        points = self.collections[collection_name]
+        if isinstance(points_selector, qm.PointIdsList):
+            for pid in points_selector.points:
+                points.pop(str(pid), None)
+        else:
+            org_id = _org_of(points_selector.filter)
+            for pid in [p for p, (_, pl) in points.items() if pl.get("organization_id") == org_id]:
+                del points[pid]
+
+    def delete_collection(self, collection_name):
+        del self.collections[collection_name]
+
+    def search(self, collection_name, **_kwargs):
+        self.searched.append(collection_name)
+        return []
+
+
+@pytest.fixture
+def qdrant(monkeypatch):
+    fake = FakeQdrant()
+    monkeypatch.setattr(QdrantService, "_client", fake)
+    monkeypatch.setattr(QdrantService, "_ready_collections", {"memories"})
+    routes: dict = {}
+    monkeypatch.setattr(
+        CollectionRouter,
+        "_load",
+        AsyncMock(side_effect=lambda: {org: layout_for_route(r) for org, r in routes.items()}),
+    )
+    CollectionRouter.invalidate()
+    yield fake, routes
+    CollectionRouter.invalidate()
+
+
+def _session(routes):
+    def add(route):
+        routes[route.organization_id] = route
+
+    async def delete(route):
+        routes.pop(route.organization_id, None)
+
+    async def commit():
+        CollectionRouter.invalidate()
+
+    return SimpleNamespace(
+        get=AsyncMock(side_effect=lambda _model, org: routes.get(org)),
+        add=add,
+        delete=AsyncMock(side_effect=delete),
+        commit=AsyncMock(side_effect=commit),
+    )
+
+
+async def _backdate(route):
+    route.state_changed_at = datetime.now(timezone.utc) - timedelta(hours=1)
+
+
+@pytest.mark.asyncio
+async def test_online_move_to_dedicated_collection(qdrant) -> None:
+    fake, routes = qdrant
+    big, small = "big-org", "small-org"
+    dedicated = dedicated_collection_name(big)
+    await QdrantService.upsert_memories(big, [{"id": "p1", "vector": [1.0], "payload": {}},
+                                             {"id": "p2", "vector": [2.0], "payload": {}}])
+    await QdrantService.upsert_memory("q1", small, [3.0], {})
+
+    migrator = VectorCollectionMigrator(_session(routes))
+    route = await migrator.start_move(big)
+    assert fake.created[dedicated]["hnsw_config"].m == 32
+    assert fake.created[dedicated]["quantization_config"] is not None
+
+    # Copying: reads stay on the shared collection, writes go to both.
+    await QdrantService.upsert_memory("p3", big, [4.0], {})
+    await QdrantService.delete_memory("p2", big)
+    assert set(fake.collections[dedicated]) == {"p3"}
+    assert await migrator.advance(route) == "copying"  # grace period not over
+
+    await _backdate(route)
+    assert await migrator.advance(route) == "draining"
+    assert set(fake.collections[dedicated]) == {"p1", "p3"}
+    await QdrantService.search(big, [0.0])
+    await QdrantService.search(small, [0.0])
+    assert fake.searched == [dedicated, "memories"]
+
+    await _backdate(route)
+    assert await migrator.advance(route) == "active"
+    assert set(fake.collections["memories"]) == {"q1"}
+    assert (await CollectionRouter.layout(big)).writes == (dedicated,)
+
+
+@pytest.mark.asyncio
+async def test_reconcile_drops_points_deleted_during_copy(qdrant) -> None:
+    fake, routes = qdrant
+    await QdrantService.upsert_memories("org", [{"id": f"p{i}", "vector": [float(i)], "payload": {}} for i in range(5)])
+    migrator = VectorCollectionMigrator(_session(routes))
+    route = await migrator.start_move("org")
+    target = route.secondary_collection
+
+    # A page copied just before its source point was deleted.
+    fake.collections[target]["p0"] = fake.collections["memories"].pop("p0")
+    await _backdate(route)
+    await migrator.advance(route)
+
+    assert set(fake.collections[target]) == {"p1", "p2", "p3", "p4"}
+    assert route.points_copied == 4
+
+    # Moving back to the shared collection removes the route and the collection.
+    await _backdate(route)
+    await migrator.advance(route)
+    await migrator.start_move("org", dedicated=False)
+    await _backdate(route)
+    await migrator.advance(route)
+    await _backdate(route)
+    await migrator.advance(route)
+    assert "org" not in routes and target not in fake.collections
+    assert {p for p, (_, pl) in fake.collections["memories"].items() if pl["organization_id"] == "org"} == {
+        "p1", "p2", "p3", "p4",
+    }
+
+
+@pytest.mark.asyncio
+async def test_move_back_to_a_deleted_dedicated_collection_recreates_it(qdrant) -> None:
+    fake, routes = qdrant
+    dedicated = dedicated_collection_name("org")
+    await QdrantService.upsert_memory("p1", "org", [1.0], {})
+    migrator = VectorCollectionMigrator(_session(routes))
+
+    async def _move(dedicated_layout: bool):
+        route = await migrator.start_move("org", dedicated=dedicated_layout)
+        while route.state != "active":
+            await _backdate(route)
+            await migrator.advance(route)
+
+    await _move(True)
+    await _move(False)
+    assert dedicated not in fake.collections and dedicated not in QdrantService._ready_collections
+
+    # Same process, dedicated again: the collection is created anew.
+    await _move(True)
+    assert set(fake.collections[dedicated]) == {"p1"}
+    assert set(fake.collections["memories"]) == set()
@@ -58,13 +58,39 @@ async def test_search_memories_postgres_recheck_filters_missing_ids(monkeypatch)
     assert any("organization_id" in s for s in stmt_strs)
 
 
+@pytest.mark.asyncio
+async def test_search_memories_audits_only_results_not_recorded_before(monkeypatch):
+    qdrant_results = [
+        {"id": "v1", "score": 0.9, "payload": {"memory_id": "m_seen"}},
+        {"id": "v2", "score": 0.8, "payload": {"memory_id": "m_new"}},
+    ]
+    monkeypatch.setattr(memory_service_module.QdrantService, "search", AsyncMock(return_value=qdrant_results))
+
+    session = AsyncMock()
+    session.execute = AsyncMock(
+        return_value=_execute_result_with_scalars([SimpleNamespace(id="m_seen"), SimpleNamespace(id="m_new")])
+    )
+    svc = MemoryService(session=session, user_id="user", org_id="org", clearance_level=0)
+    svc.permission_checker.check_memory_access = AsyncMock(
+        return_value=SimpleNamespace(allowed=True, method="rls", reason="")
+    )
+    svc.audit_service.log_memory_access = AsyncMock()
+
+    req = MemorySearchRequest(query="hello", limit=10)
+    results = await svc.search_memories(query_embedding=[0.0] * 3, request=req, recorded_ids={"m_seen"})
+
+    assert {m.id for m in results} == {"m_seen", "m_new"}
+    audited = [c.kwargs["memory_id"] for c in svc.audit_service.log_memory_access.await_args_list]
+    assert audited == ["m_new"]
+
+
 @pytest.mark.asyncio
 async def test_create_memory_includes_team_id_in_qdrant_payload(monkeypatch):
     org_id = "org"
     user_id = "user"
     team_id = str(uuid4())
 
-    session = SimpleNamespace(add=MagicMock(), flush=AsyncMock())
+    session = SimpleNamespace(add=MagicMock(), flush=AsyncMock(), execute=AsyncMock())
     svc = MemoryService(session=session, user_id=user_id, org_id=org_id, clearance_level=0)
     svc.permission_checker.check_permission = AsyncMock(return_value=SimpleNamespace(allowed=True, reason=""))
     svc.audit_service.log_memory_operation = AsyncMock()